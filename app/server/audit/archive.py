@@ -0,0 +1,221 @@
+"""
+Activity log retention.
+
+archive_logs() moves ActivityLog rows older than ACTIVITY_LOG_RETENTION_MONTHS
+out of the database into one gzip-compressed NDJSON file per month
+(activity_logs_YYYY_MM.ndjson.gz under DEFAULT_BACKUP_DIR/activity_logs).
+Rows are read, appended and deleted in batches of ACTIVITY_LOG_ARCHIVE_BATCH_SIZE;
+each batch is on disk before it is deleted, and every batch is its own gzip
+member, so an interrupted run leaves readable files and can simply be re-run.
+
+search_archives() streams the monthly files covering a date range, newest
+month first, applies the same filters as ActivityLogViewSet and stops once the
+requested page is filled, so archived months stay searchable without loading
+the whole archive.
+"""
+import gzip
+import json
+import logging
+import os
+import re
+from collections import defaultdict
+from datetime import datetime
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FILE_RE = re.compile(r'^activity_logs_(\d{4})_(\d{2})\.ndjson\.gz$')
+
+ARCHIVED_FIELDS = (
+    'id', 'user_id', 'role', 'action', 'module', 'description', 'message',
+    'metadata', 'ip_address', 'user_agent', 'created_at',
+)
+
+
+def get_archive_dir():
+    return os.path.join(settings.DEFAULT_BACKUP_DIR, 'activity_logs')
+
+
+def archive_file_name(year, month):
+    return f"activity_logs_{year:04d}_{month:02d}.ndjson.gz"
+
+
+def retention_cutoff(months=None, now=None):
+    """Start of the (local) month `months` months before now; older rows are archived"""
+    if months is None:
+        months = getattr(settings, 'ACTIVITY_LOG_RETENTION_MONTHS', 12)
+    now = timezone.localtime(now or timezone.now())
+    year, month = now.year, now.month - months
+    while month <= 0:
+        month += 12
+        year -= 1
+    return timezone.make_aware(datetime(year, month, 1))
+
+
+def _archive_record(row):
+    record = {field: row[field] for field in ARCHIVED_FIELDS}
+    # Keep who did it readable after the user row is gone
+    record['user_email'] = row['user__email'] or ''
+    record['user_name'] = ' '.join(
+        part for part in (row['user__first_name'], row['user__last_name']) if part
+    )
+    return record
+
+
+def archive_logs(months=None, batch_size=None, now=None):
+    """
+    Move logs older than the retention cutoff into monthly archive files.
+    Returns {'archived': n, 'files': [...], 'cutoff': datetime}.
+    """
+    from .models import ActivityLog
+
+    cutoff = retention_cutoff(months, now)
+    batch_size = batch_size or getattr(settings, 'ACTIVITY_LOG_ARCHIVE_BATCH_SIZE', 1000)
+    archive_dir = get_archive_dir()
+    os.makedirs(archive_dir, exist_ok=True)
+
+    archived = 0
+    files = set()
+    last_pk = 0
+    while True:
+        rows = list(
+            ActivityLog.objects.filter(created_at__lt=cutoff, pk__gt=last_pk)
+            .order_by('pk')
+            .values(*ARCHIVED_FIELDS, 'user__email', 'user__first_name', 'user__last_name')[:batch_size]
+        )
+        if not rows:
+            break
+
+        by_month = defaultdict(list)
+        for row in rows:
+            created = timezone.localtime(row['created_at'])
+            by_month[(created.year, created.month)].append(_archive_record(row))
+
+        for (year, month), records in by_month.items():
+            file_path = os.path.join(archive_dir, archive_file_name(year, month))
+            # Append mode adds a new gzip member; readers see one continuous stream
+            with gzip.open(file_path, 'at', encoding='utf-8') as archive:
+                for record in records:
+                    archive.write(json.dumps(record, cls=DjangoJSONEncoder, separators=(',', ':')))
+                    archive.write('\n')
+            files.add(file_path)
+
+        ids = [row['id'] for row in rows]
+        ActivityLog.objects.filter(pk__in=ids).delete()
+        archived += len(ids)
+        last_pk = ids[-1]
+
+    if archived:
+        logger.info(f"Archived {archived} activity logs older than {cutoff:%Y-%m-%d} into {len(files)} files")
+    return {'archived': archived, 'files': sorted(files), 'cutoff': cutoff}
+
+
+def list_archives():
+    """[{'month': 'YYYY-MM', 'file_name', 'size'}] for every archive file, newest first"""
+    archive_dir = get_archive_dir()
+    if not os.path.isdir(archive_dir):
+        return []
+    archives = []
+    for file_name in os.listdir(archive_dir):
+        match = ARCHIVE_FILE_RE.match(file_name)
+        if match:
+            archives.append({
+                'month': f"{match.group(1)}-{match.group(2)}",
+                'file_name': file_name,
+                'size': os.path.getsize(os.path.join(archive_dir, file_name)),
+            })
+    return sorted(archives, key=lambda archive: archive['month'], reverse=True)
+
+
+def iter_archive_months(start=None, end=None):
+    """Yield (month, records) for the archive files whose month overlaps [start, end), newest first"""
+    start_month = timezone.localtime(start).strftime('%Y-%m') if start else None
+    end_month = timezone.localtime(end).strftime('%Y-%m') if end else None
+    archive_dir = get_archive_dir()
+
+    for archive in list_archives():
+        if start_month and archive['month'] < start_month:
+            continue
+        if end_month and archive['month'] > end_month:
+            continue
+        yield archive['month'], _read_archive(os.path.join(archive_dir, archive['file_name']))
+
+
+def _read_archive(file_path):
+    seen = set()
+    with gzip.open(file_path, 'rt', encoding='utf-8') as lines:
+        for line in lines:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            # A run interrupted between append and delete re-archives its last batch
+            if record['id'] in seen:
+                continue
+            seen.add(record['id'])
+            record['created_at'] = parse_datetime(record['created_at'])
+            yield record
+
+
+def _contains(value, needle):
+    return needle in str(value or '').lower()
+
+
+def search_archives(start=None, end=None, user=None, role=None, action=None, keyword=None, offset=0, limit=None):
+    """
+    Archived records matching the ActivityLogViewSet filters, newest first,
+    skipping the first `offset` matches. start/end bound created_at (start
+    inclusive, end exclusive).
+
+    Files are one local month each, so they are read newest month first and
+    reading stops as soon as the page is filled: only the months up to the
+    requested page are decompressed, one month's matches at a time. With a
+    limit, up to limit + 1 records are returned; the extra one only tells the
+    caller that another page exists.
+    """
+    user = (user or '').lower()
+    role = (role or '').lower()
+    action = (action or '').lower()
+    keyword = (keyword or '').lower()
+
+    def matches(record):
+        created_at = record['created_at']
+        if start and created_at < start:
+            return False
+        if end and created_at >= end:
+            return False
+        if role and not _contains(record.get('role'), role):
+            return False
+        if action and (record.get('action') or '').lower() != action:
+            return False
+        if keyword and not any(
+            _contains(record.get(field), keyword) for field in ('description', 'module', 'message')
+        ):
+            return False
+        if user:
+            metadata = record.get('metadata') or {}
+            if not (
+                _contains(record.get('user_email'), user)
+                or _contains(record.get('user_name'), user)
+                or _contains(metadata.get('entity_name'), user)
+                or _contains(metadata.get('email'), user)
+            ):
+                return False
+        return True
+
+    page = []
+    to_skip = offset
+    for _, records in iter_archive_months(start, end):
+        month_matches = [record for record in records if matches(record)]
+        if len(month_matches) <= to_skip:
+            to_skip -= len(month_matches)
+            continue
+        month_matches.sort(key=lambda record: (record['created_at'], record['id']), reverse=True)
+        page.extend(month_matches[to_skip:])
+        to_skip = 0
+        if limit is not None and len(page) > limit:
+            return page[:limit + 1]
+    return page
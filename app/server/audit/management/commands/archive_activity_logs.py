@@ -0,0 +1,35 @@
+"""
+Management command to move old activity logs into the monthly archive files
+"""
+from django.core.management.base import BaseCommand
+from audit.archive import archive_logs
+
+
+class Command(BaseCommand):
+    help = 'Archive activity logs older than the retention period into compressed monthly NDJSON files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=None,
+            help='Keep this many months in the database (default: ACTIVITY_LOG_RETENTION_MONTHS)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Number of rows to archive and delete per batch (default: ACTIVITY_LOG_ARCHIVE_BATCH_SIZE)',
+        )
+
+    def handle(self, *args, **options):
+        result = archive_logs(months=options['months'], batch_size=options['batch_size'])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Completed! Archived {result['archived']} logs older than "
+                f"{result['cutoff']:%Y-%m-%d} into {len(result['files'])} files"
+            )
+        )
+        for file_path in result['files']:
+            self.stdout.write(f"  {file_path}")
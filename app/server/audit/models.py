@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -26,10 +27,21 @@ class ActivityLog(models.Model):
     metadata = models.JSONField(default=dict, blank=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(null=True, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set from the event time by the buffered writer (audit/sink.py)
+    created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ["-created_at"]
+        # Match ActivityLogViewSet: date-range scans ordered by created_at, optionally
+        # narrowed by action/role/module/user. Retention archiving (audit/archive.py)
+        # walks created_at too.
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="audit_log_created_idx"),
+            models.Index(fields=["action", "created_at"], name="audit_log_action_created_idx"),
+            models.Index(fields=["role", "created_at"], name="audit_log_role_created_idx"),
+            models.Index(fields=["module", "created_at"], name="audit_log_module_created_idx"),
+            models.Index(fields=["user", "created_at"], name="audit_log_user_created_idx"),
+        ]
 
     def __str__(self):
         user_display = getattr(self.user, "email", None) or str(self.user) if self.user else "System"
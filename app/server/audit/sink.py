@@ -0,0 +1,164 @@
+"""
+Buffered audit log writer.
+
+log_activity() hands finished entries to ``audit_sink`` instead of inserting
+them one by one. The sink keeps a process-wide buffer and writes it with a
+single bulk_create when:
+  - a request finishes (AuditFlushMiddleware) or a Celery task finishes,
+  - the buffer reaches AUDIT_BUFFER_SIZE entries, or
+  - AUDIT_FLUSH_INTERVAL seconds have passed since the last flush,
+and once more when the worker process exits.
+
+With AUDIT_SINK_CELERY the batch is handed to audit.tasks.write_activity_logs
+instead (written inline if the broker is unreachable). AUDIT_BUFFER_ENABLED =
+False restores the old one-insert-per-event behaviour.
+
+Entries join the buffer only when the surrounding transaction commits
+(immediately outside one), so audit rows for rolled-back work are dropped as
+they were with the old inline insert. Entries carry their own timestamp, so
+created_at reflects when the event happened rather than when the batch was
+written.
+"""
+import atexit
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+
+class _MetadataEncoder(DjangoJSONEncoder):
+    """Audit metadata must never break the write; unknown objects become strings"""
+
+    def default(self, o):
+        try:
+            return super().default(o)
+        except TypeError:
+            return str(o)
+
+
+def snapshot_metadata(metadata):
+    """JSON round trip: a detached, JSON-safe copy of the caller's metadata"""
+    return json.loads(json.dumps(metadata, cls=_MetadataEncoder))
+
+
+def write_entries(entries):
+    """Insert serialized entries (dicts of ActivityLog fields) in one statement"""
+    from .models import ActivityLog
+
+    if not entries:
+        return 0
+    logs = []
+    for entry in entries:
+        fields = dict(entry)
+        created_at = fields.pop('created_at', None)
+        if isinstance(created_at, str):
+            created_at = parse_datetime(created_at)
+        logs.append(ActivityLog(created_at=created_at or timezone.now(), **fields))
+    try:
+        with transaction.atomic():
+            ActivityLog.objects.bulk_create(logs, batch_size=500)
+        return len(logs)
+    except Exception as e:
+        # One bad row (e.g. a user deleted meanwhile) must not cost the whole batch
+        logger.warning(f"Audit batch insert failed, writing rows one by one: {str(e)}")
+    written = 0
+    for log in logs:
+        try:
+            with transaction.atomic():
+                log.save(force_insert=True)
+            written += 1
+        except Exception as e:
+            logger.error(f"Failed to write audit log entry '{log.description}': {str(e)}")
+    return written
+
+
+class AuditSink:
+    """Process-wide buffer of pending ActivityLog rows"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._buffer = []
+        self._last_flush = time.monotonic()
+
+    @property
+    def enabled(self):
+        return getattr(settings, 'AUDIT_BUFFER_ENABLED', True)
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def add(self, entry):
+        """Queue one entry (a dict of ActivityLog field values) once the current transaction commits"""
+        if not self.enabled:
+            write_entries([entry])
+            return
+        transaction.on_commit(lambda: self._append(entry))
+
+    def _append(self, entry):
+        with self._lock:
+            self._buffer.append(entry)
+            due = (
+                len(self._buffer) >= getattr(settings, 'AUDIT_BUFFER_SIZE', 100)
+                or time.monotonic() - self._last_flush >= getattr(settings, 'AUDIT_FLUSH_INTERVAL', 5)
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write everything buffered so far; never raises"""
+        with self._flush_lock:
+            with self._lock:
+                entries, self._buffer = self._buffer, []
+                self._last_flush = time.monotonic()
+            if not entries:
+                return 0
+            try:
+                if getattr(settings, 'AUDIT_SINK_CELERY', False):
+                    self._offload(entries)
+                else:
+                    write_entries(entries)
+            except Exception as e:
+                logger.error(f"Failed to write {len(entries)} audit log entries: {str(e)}")
+                return 0
+            return len(entries)
+
+    def _offload(self, entries):
+        from .tasks import write_activity_logs
+
+        try:
+            write_activity_logs.apply_async(args=[entries], retry=False)
+        except Exception as e:
+            logger.error(f"Could not queue audit log batch, writing inline: {str(e)}")
+            write_entries(entries)
+
+    def discard(self):
+        with self._lock:
+            self._buffer = []
+
+
+audit_sink = AuditSink()
+
+# Flush whatever is still buffered when the worker exits
+atexit.register(audit_sink.flush)
+
+
+class AuditFlushMiddleware:
+    """Write the request's audit entries in one batch once the response is ready"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            audit_sink.flush()
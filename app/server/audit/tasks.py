@@ -0,0 +1,45 @@
+import logging
+import os
+
+from celery import shared_task
+from celery.signals import task_postrun, worker_process_shutdown
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def write_activity_logs(entries):
+    """Write a batch of audit entries offloaded by audit.sink"""
+    from .sink import write_entries
+
+    try:
+        return write_entries(entries)
+    except Exception as e:
+        logger.error(f"Failed to write {len(entries)} audit log entries: {str(e)}")
+        raise
+
+
+@shared_task
+def archive_activity_logs():
+    """Move activity logs past ACTIVITY_LOG_RETENTION_MONTHS into the monthly archive files"""
+    from .archive import archive_logs
+
+    try:
+        result = archive_logs()
+    except Exception as e:
+        logger.error(f"Activity log archiving failed: {str(e)}")
+        raise
+    return {'archived': result['archived'], 'files': [os.path.basename(path) for path in result['files']]}
+
+
+@task_postrun.connect
+def flush_audit_after_task(**kwargs):
+    # Tasks have no request/response cycle; flush like the middleware does
+    from .sink import audit_sink
+    audit_sink.flush()
+
+
+@worker_process_shutdown.connect
+def flush_audit_on_shutdown(**kwargs):
+    from .sink import audit_sink
+    audit_sink.flush()
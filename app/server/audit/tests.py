@@ -1,3 +1,158 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from . import archive as archive_module
+from .archive import archive_logs, list_archives, search_archives
+from .models import ActivityLog
+from .sink import AuditFlushMiddleware, audit_sink
+from .utils import log_activity
+
+User = get_user_model()
+
+
+@override_settings(AUDIT_BUFFER_ENABLED=True, AUDIT_BUFFER_SIZE=100, AUDIT_FLUSH_INTERVAL=3600)
+class AuditSinkTest(TestCase):
+    def setUp(self):
+        audit_sink.discard()
+        self.addCleanup(audit_sink.discard)
+        self.user = User.objects.create_user(
+            email='auditor@example.com', password='testpass123', password_provided=True, userlevel='Admin'
+        )
+
+    def log(self, *args, **kwargs):
+        # TestCase never commits; run the on-commit hand-off to the buffer directly
+        with self.captureOnCommitCallbacks(execute=True):
+            log_activity(*args, **kwargs)
+
+    def test_entries_are_written_in_one_insert_at_request_end(self):
+        def view(request):
+            for number in range(5):
+                self.log(self.user, 'update', module='INSPECTIONS', description=f'step {number}')
+            self.assertEqual(ActivityLog.objects.count(), 0)
+            return 'response'
+
+        with CaptureQueriesContext(connection) as queries:
+            AuditFlushMiddleware(view)(mock.Mock())
+        inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT INTO "audit_activitylog"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(
+            list(ActivityLog.objects.order_by('id').values_list('description', flat=True)),
+            [f'step {number}' for number in range(5)]
+        )
+
+    @override_settings(AUDIT_BUFFER_SIZE=3)
+    def test_size_threshold_flushes(self):
+        for _ in range(3):
+            self.log(self.user, 'view')
+        self.assertEqual(ActivityLog.objects.count(), 3)
+        self.assertEqual(len(audit_sink), 0)
+
+    def test_entry_keeps_event_time_and_metadata_snapshot(self):
+        metadata = {'status': 'success', 'when': timezone.now().date(), 'ids': [1]}
+        with mock.patch('audit.utils.timezone.now', return_value=timezone.now() - timedelta(minutes=10)):
+            self.log(self.user, 'create', metadata=metadata)
+        metadata['ids'].append(2)
+        audit_sink.flush()
+
+        log = ActivityLog.objects.get()
+        self.assertEqual(log.metadata['ids'], [1])
+        self.assertLess(log.created_at, timezone.now() - timedelta(minutes=9))
+        self.assertEqual(log.user, self.user)
+
+    def test_rolled_back_entries_are_dropped(self):
+        log_activity(self.user, 'delete')  # the test transaction never commits
+        self.assertEqual(len(audit_sink), 0)
+
+    def test_failed_batch_falls_back_to_single_rows(self):
+        self.log(self.user, 'update', description='first')
+        self.log(self.user, 'update', description='second')
+        with mock.patch.object(ActivityLog.objects, 'bulk_create', side_effect=Exception('batch rejected')):
+            audit_sink.flush()
+        self.assertEqual(ActivityLog.objects.count(), 2)
+
+
+class ActivityLogArchiveTest(APITestCase):
+    def setUp(self):
+        backup_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, backup_dir, ignore_errors=True)
+        overrides = self.settings(DEFAULT_BACKUP_DIR=backup_dir, ACTIVITY_LOG_RETENTION_MONTHS=3)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.user = User.objects.create_user(
+            email='archivist@example.com', password='testpass123', password_provided=True, userlevel='Admin'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.now = timezone.make_aware(datetime(2026, 6, 15, 12, 0))
+
+    def _log(self, created_at, **fields):
+        fields.setdefault('action', 'update')
+        return ActivityLog.objects.create(user=self.user, role='Admin', created_at=created_at, **fields)
+
+    def test_old_months_move_to_compressed_files_in_batches(self):
+        january = timezone.make_aware(datetime(2026, 1, 10))
+        for day in range(5):
+            self._log(january + timedelta(days=day), description=f'old {day}')
+        self._log(timezone.make_aware(datetime(2026, 2, 20)), description='february')
+        recent = self._log(timezone.make_aware(datetime(2026, 3, 1)), description='kept')
+
+        result = archive_logs(batch_size=2, now=self.now)
+
+        self.assertEqual(result['archived'], 6)
+        self.assertEqual(list(ActivityLog.objects.values_list('pk', flat=True)), [recent.pk])
+        self.assertEqual([archive['month'] for archive in list_archives()], ['2026-02', '2026-01'])
+        self.assertTrue(all(path.endswith('.ndjson.gz') and os.path.exists(path) for path in result['files']))
+
+        archived = search_archives()
+        self.assertEqual(len(archived), 6)
+        self.assertEqual(archived[0]['description'], 'february')
+        self.assertEqual(archived[0]['user_email'], 'archivist@example.com')
+
+    def test_rerun_is_idempotent(self):
+        self._log(timezone.make_aware(datetime(2026, 1, 10)), description='once')
+        archive_logs(now=self.now)
+        self.assertEqual(archive_logs(now=self.now)['archived'], 0)
+        self.assertEqual(len(search_archives()), 1)
+
+    def test_search_stops_reading_once_page_is_filled(self):
+        for day in range(3):
+            self._log(timezone.make_aware(datetime(2026, 2, 10 + day)), description=f'february {day}')
+        for day in range(2):
+            self._log(timezone.make_aware(datetime(2026, 1, 10 + day)), description=f'january {day}')
+        archive_logs(now=self.now)
+
+        with mock.patch('audit.archive._read_archive', wraps=archive_module._read_archive) as read:
+            page = search_archives(limit=2)
+        # Two records plus one telling there is more, all from the newest month
+        self.assertEqual([record['description'] for record in page], ['february 2', 'february 1', 'february 0'])
+        self.assertEqual(read.call_count, 1)
+
+        page = search_archives(offset=3, limit=2)
+        self.assertEqual([record['description'] for record in page], ['january 1', 'january 0'])
+
+    def test_archive_endpoint_applies_list_filters(self):
+        self._log(timezone.make_aware(datetime(2026, 1, 10, 9)), action='delete', description='Removed permit')
+        self._log(timezone.make_aware(datetime(2026, 1, 11, 9)), action='update', description='Edited permit')
+        self._log(timezone.make_aware(datetime(2026, 2, 11, 9)), action='delete', description='Removed other')
+        archive_logs(now=self.now)
+
+        response = self.client.get('/api/activity-logs/archive/', {
+            'date_from': '2026-01-01', 'date_to': '2026-01-31', 'action_type': 'DELETE', 'keyword': 'permit',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['description'], 'Removed permit')
+
+        months = self.client.get('/api/activity-logs/archive/months/')
+        self.assertEqual([archive['month'] for archive in months.data], ['2026-02', '2026-01'])
 
-# Create your tests here.
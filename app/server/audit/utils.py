@@ -1,9 +1,8 @@
-from copy import deepcopy
-
+from django.utils import timezone
 from django.utils.text import capfirst
 
 from .constants import AUDIT_ACTIONS, AUDIT_MODULES
-from .models import ActivityLog
+from .sink import audit_sink, snapshot_metadata
 
 
 def log_activity(
@@ -21,6 +20,9 @@ def log_activity(
     """
     Create a standardized audit log entry.
 
+    The entry is queued on the buffered audit sink (audit/sink.py) and written
+    in a batch at the end of the request, task or flush interval.
+
     Args:
         user: Django user performing the action (optional for system events).
         action: Verb describing the change (use constants from AUDIT_ACTIONS).
@@ -45,7 +47,7 @@ def log_activity(
 
     payload = {}
     if metadata:
-        payload.update(deepcopy(metadata))
+        payload.update(metadata)
 
     # Ensure a status is present for UI filtering (default to success)
     payload.setdefault("status", "success")
@@ -66,17 +68,19 @@ def log_activity(
         payload,
     )
 
-    ActivityLog.objects.create(
-        user=user_to_log,
-        role=getattr(user_to_log, "userlevel", "") if user_to_log else "",
-        action=normalized_action,
-        module=module_label,
-        description=final_description,
-        message=message or final_description,
-        metadata=payload,
-        ip_address=ip,
-        user_agent=ua or "",
-    )
+    audit_sink.add({
+        "user_id": getattr(user_to_log, "pk", None),
+        "role": getattr(user_to_log, "userlevel", "") if user_to_log else "",
+        "action": normalized_action,
+        "module": module_label,
+        "description": final_description,
+        "message": message or final_description,
+        # Detached copy: the caller may keep mutating its dict before the flush
+        "metadata": snapshot_metadata(payload),
+        "ip_address": ip,
+        "user_agent": ua or "",
+        "created_at": timezone.now().isoformat(),
+    })
 
 
 def resolve_user(user):
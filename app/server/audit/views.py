@@ -1,55 +1,83 @@
 from datetime import datetime, timedelta
 
 from django.db.models import Q
+from django.utils import timezone
 from rest_framework import permissions, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
+from core.pagination import CursorOrPagePagination, StandardResultsSetPagination
+
+from .archive import list_archives, search_archives
 from .models import ActivityLog
 from .serializers import ActivityLogSerializer
 
 
-class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = ActivityLog.objects.select_related("user").all()
-    serializer_class = ActivityLogSerializer
-    permission_classes = [permissions.IsAuthenticated]
+def parse_date_range(params):
+    """
+    (start, end) bounds for the date_from/date_to query params: start of date_from,
+    start of the day after date_to. Future dates are clamped to today and a
+    reversed range is swapped.
+    """
+    parsed_date_from = None
+    parsed_date_to = None
 
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        params = self.request.query_params
+    raw_date_from = params.get("date_from")
+    if raw_date_from:
+        try:
+            parsed_date_from = datetime.fromisoformat(raw_date_from)
+        except ValueError:
+            parsed_date_from = None
 
-        parsed_date_from = None
-        parsed_date_to = None
+    raw_date_to = params.get("date_to")
+    if raw_date_to:
+        try:
+            parsed_date_to = datetime.fromisoformat(raw_date_to)
+        except ValueError:
+            parsed_date_to = None
 
-        raw_date_from = params.get("date_from")
-        if raw_date_from:
-            try:
-                parsed_date_from = datetime.fromisoformat(raw_date_from)
-            except ValueError:
-                parsed_date_from = None
+    today = datetime.utcnow().date()
 
-        raw_date_to = params.get("date_to")
-        if raw_date_to:
-            try:
-                parsed_date_to = datetime.fromisoformat(raw_date_to)
-            except ValueError:
-                parsed_date_to = None
+    if parsed_date_from and parsed_date_from.date() > today:
+        parsed_date_from = datetime.combine(today, datetime.min.time())
 
-        today = datetime.utcnow().date()
+    if parsed_date_to and parsed_date_to.date() > today:
+        parsed_date_to = datetime.combine(today, datetime.min.time())
 
-        if parsed_date_from and parsed_date_from.date() > today:
-            parsed_date_from = datetime.combine(today, datetime.min.time())
+    if parsed_date_from and parsed_date_to and parsed_date_to < parsed_date_from:
+        parsed_date_from, parsed_date_to = parsed_date_to, parsed_date_from
 
-        if parsed_date_to and parsed_date_to.date() > today:
-            parsed_date_to = datetime.combine(today, datetime.min.time())
+    start_dt = end_dt = None
+    if parsed_date_from:
+        start_dt = parsed_date_from.replace(hour=0, minute=0, second=0, microsecond=0)
 
-        if parsed_date_from and parsed_date_to and parsed_date_to < parsed_date_from:
-            parsed_date_from, parsed_date_to = parsed_date_to, parsed_date_from
+    if parsed_date_to:
+        end_dt = parsed_date_to.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
 
-        if parsed_date_from:
-            start_dt = parsed_date_from.replace(hour=0, minute=0, second=0, microsecond=0)
-            queryset = queryset.filter(created_at__gte=start_dt)
+    # Dates are local calendar days
+    if start_dt and timezone.is_naive(start_dt):
+        start_dt = timezone.make_aware(start_dt)
+    if end_dt and timezone.is_naive(end_dt):
+        end_dt = timezone.make_aware(end_dt)
+    return start_dt, end_dt
 
-        if parsed_date_to:
-            end_dt = parsed_date_to.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = ActivityLog.objects.select_related("user").all()
+    serializer_class = ActivityLogSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    # ?pagination=cursor / ?cursor=... for keyset paging on (created_at, id)
+    pagination_class = CursorOrPagePagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+
+        start_dt, end_dt = parse_date_range(params)
+        if start_dt:
+            queryset = queryset.filter(created_at__gte=start_dt)
+        if end_dt:
             queryset = queryset.filter(created_at__lt=end_dt)
 
         user_query = params.get("user")
@@ -85,3 +113,40 @@ class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
             ordering = "-created_at"
 
         return queryset.order_by(ordering, "-created_at")
+
+    @action(detail=False, methods=["get"], url_path="archive")
+    def archive(self, request):
+        """Search logs moved to the monthly archive files (same filters as the list)"""
+        params = request.query_params
+        start_dt, end_dt = parse_date_range(params)
+        page_size = StandardResultsSetPagination().get_page_size(request)
+        try:
+            page_number = max(1, int(params.get("page", 1)))
+        except ValueError:
+            page_number = 1
+        offset = (page_number - 1) * page_size
+        records = search_archives(
+            start=start_dt,
+            end=end_dt,
+            user=params.get("user"),
+            role=params.get("role"),
+            action=params.get("action_type"),
+            keyword=params.get("keyword") or params.get("search"),
+            offset=offset,
+            limit=page_size,
+        )
+        # The search stops reading once this page is filled, so the total is only known on the last page
+        has_next = len(records) > page_size
+        records = records[:page_size]
+        url = request.build_absolute_uri()
+        return Response({
+            "count": None if has_next else offset + len(records),
+            "next": replace_query_param(url, "page", page_number + 1) if has_next else None,
+            "previous": replace_query_param(url, "page", page_number - 1) if page_number > 1 else None,
+            "results": records,
+        })
+
+    @action(detail=False, methods=["get"], url_path="archive/months")
+    def archive_months(self, request):
+        """Archived months available to the archive search"""
+        return Response(list_archives())
@@ -0,0 +1,141 @@
+"""
+Shared cache helpers on top of the default (Redis) cache.
+
+Keys are namespaced and version-stamped: a key embeds the current version of
+every scope its value depends on ("inspections", "law:RA-8749", "user:12",
+"inspection:345", ...). bump() increments a scope's version, which retires
+every key built on it at once without scanning or deleting anything; the old
+entries simply expire. invalidate_on() wires bumps to model saves/deletes and
+cached_view() caches DRF responses under such keys.
+"""
+import hashlib
+import logging
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY_PREFIX = 'cache:version:'
+
+
+def _version_key(scope):
+    return f"{VERSION_KEY_PREFIX}{scope}"
+
+
+def get_versions(scopes):
+    """Return {scope: version} for the scopes, in one round trip when they already exist"""
+    keys = {_version_key(scope): scope for scope in scopes}
+    if not keys:
+        return {}
+    found = cache.get_many(list(keys))
+    versions = {}
+    for key, scope in keys.items():
+        version = found.get(key)
+        if version is None:
+            # First use (or evicted): start at 1 unless another process got there first
+            if not cache.add(key, 1, None):
+                version = cache.get(key)
+            version = version or 1
+        versions[scope] = version
+    return versions
+
+
+def get_version(scope):
+    return get_versions([scope])[scope]
+
+
+def bump(*scopes):
+    """Retire every cached value built on the given scopes"""
+    for scope in scopes:
+        key = _version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Version key expired or was never set; start from a fresh, unique value
+            cache.set(key, time.time_ns(), None)
+
+
+def make_key(name, scopes=(), *parts):
+    """
+    Cache key for `name` that changes whenever one of the scopes is bumped.
+    parts distinguish entries inside the namespace (user id, filters, ...).
+    """
+    scopes = list(scopes)
+    versions = get_versions(scopes)
+    stamp = ','.join(f"{scope}={versions[scope]}" for scope in scopes)
+    digest = hashlib.md5(f"{stamp}|{parts!r}".encode('utf-8')).hexdigest()
+    return f"{name}:{digest}"
+
+
+def invalidate_on(model, scopes):
+    """
+    Bump scopes(instance) whenever a model instance is saved or deleted.
+    Bumped immediately (same-request reads) and again on commit, so a value
+    computed from the pre-commit state by another request cannot stay cached.
+    """
+    def bump_scopes(sender, instance, raw=False, **kwargs):
+        if raw:
+            return
+        try:
+            instance_scopes = [scope for scope in scopes(instance) if scope]
+            bump(*instance_scopes)
+            transaction.on_commit(lambda: bump(*instance_scopes))
+        except Exception as e:
+            logger.error(f"Failed to bump cache scopes for {model.__name__} {instance.pk}: {str(e)}")
+
+    uid = f"core.cache:{model._meta.label}:{scopes.__module__}.{scopes.__qualname__}"
+    post_save.connect(bump_scopes, sender=model, weak=False, dispatch_uid=f"{uid}:save")
+    post_delete.connect(bump_scopes, sender=model, weak=False, dispatch_uid=f"{uid}:delete")
+    return bump_scopes
+
+
+def cached_view(name, scopes=(), timeout=None, vary_on_user=True):
+    """
+    Cache successful (200) DRF responses of a view function or viewset action.
+
+    The key covers the scope versions, the query string and, unless
+    vary_on_user=False, the requesting user. scopes may be a callable taking
+    the request. timeout defaults to DASHBOARD_CACHE_TIMEOUT. Cache outages
+    fall back to running the view.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            from rest_framework.response import Response
+
+            request = args[0] if hasattr(args[0], 'query_params') else args[1]
+            view_scopes = scopes(request) if callable(scopes) else scopes
+            params = sorted(
+                (key, value)
+                for key in request.query_params
+                for value in request.query_params.getlist(key)
+            )
+            user_id = getattr(request.user, 'pk', None) if vary_on_user else None
+
+            try:
+                cache_key = make_key(f"view:{name}", view_scopes, user_id, params)
+                data = cache.get(cache_key)
+            except Exception as e:
+                logger.warning(f"Cache unavailable for {name}: {str(e)}")
+                return view(*args, **kwargs)
+            if data is not None:
+                return Response(data)
+
+            response = view(*args, **kwargs)
+            if getattr(response, 'status_code', None) == 200 and hasattr(response, 'data'):
+                try:
+                    cache.set(
+                        cache_key,
+                        response.data,
+                        timeout if timeout is not None else getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300),
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to cache {name}: {str(e)}")
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,286 @@
+"""
+Primary/replica database routing for reports and analytics.
+
+Writes always go to ``default``. Reads go to the read replica
+(REPLICA_DATABASE_ALIAS) only inside a replica block, which
+ReplicaReadMixin (the report viewsets, safe methods only) and @replica_reads
+(single read-only views and actions) open for the request. Everything else,
+including Celery tasks and management commands, reads the primary.
+
+A replica block still reads the primary when:
+  - no replica database is configured,
+  - the requesting user wrote to the primary in the last
+    REPLICA_STICKY_SECONDS (ReplicaStickyMiddleware marks them), so people
+    always see their own changes,
+  - the replica is unreachable or more than REPLICA_MAX_LAG_SECONDS behind.
+    Lag is measured at most every REPLICA_LAG_CHECK_INTERVAL seconds per
+    process: SHOW REPLICA STATUS on MySQL, a connectivity check elsewhere.
+
+Streaming responses keep reading the replica while they are iterated. The
+router only picks aliases, so two SQLite databases (default + replica)
+exercise the whole path locally and in tests.
+"""
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+logger = logging.getLogger(__name__)
+
+STICKY_KEY_PREFIX = 'db:primary-sticky:user:'
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+# Alias reads are routed to in the current context; None reads the primary
+_read_alias = contextvars.ContextVar('replica_read_alias', default=None)
+
+
+def get_replica_alias():
+    return getattr(settings, 'REPLICA_DATABASE_ALIAS', 'replica')
+
+
+def replica_configured():
+    return get_replica_alias() in settings.DATABASES
+
+
+def measure_replica_lag(alias):
+    """Seconds the replica is behind the primary; None when unreachable or not replicating"""
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'mysql':
+                return _mysql_lag(cursor)
+            cursor.execute('SELECT 1')
+            return 0
+    except Exception as e:
+        logger.warning(f"Read replica '{alias}' unavailable: {str(e)}")
+        return None
+
+
+def _mysql_lag(cursor):
+    # SHOW REPLICA STATUS needs MySQL 8.0.22+; older servers only know the SLAVE spelling
+    for statement, column in (
+        ('SHOW REPLICA STATUS', 'Seconds_Behind_Source'),
+        ('SHOW SLAVE STATUS', 'Seconds_Behind_Master'),
+    ):
+        try:
+            cursor.execute(statement)
+        except DatabaseError:
+            continue
+        row = cursor.fetchone()
+        if row is None:
+            # Not a replica (e.g. a read-only user on the primary): nothing to lag behind
+            return 0
+        status = dict(zip([column_info[0] for column_info in cursor.description], row))
+        lag = status.get(column)
+        # NULL while replication is stopped or broken
+        return None if lag is None else float(lag)
+    logger.warning("Could not read replica status; grant REPLICATION CLIENT to the replica user")
+    return None
+
+
+class ReplicaHealth:
+    """Per-process, rate-limited view of the replica's lag"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lag = None
+        self._checked_at = None
+
+    def lag(self):
+        """Last measured lag in seconds (None = unusable), re-measured every REPLICA_LAG_CHECK_INTERVAL"""
+        interval = getattr(settings, 'REPLICA_LAG_CHECK_INTERVAL', 5)
+        with self._lock:
+            if self._checked_at is not None and time.monotonic() - self._checked_at < interval:
+                return self._lag
+
+        alias = get_replica_alias()
+        lag = measure_replica_lag(alias)
+        max_lag = getattr(settings, 'REPLICA_MAX_LAG_SECONDS', 10)
+        if lag is not None and lag > max_lag:
+            logger.warning(f"Read replica '{alias}' is {lag:.0f}s behind (max {max_lag}s); reading the primary")
+        with self._lock:
+            self._lag = lag
+            self._checked_at = time.monotonic()
+        return lag
+
+    def healthy(self):
+        lag = self.lag()
+        return lag is not None and lag <= getattr(settings, 'REPLICA_MAX_LAG_SECONDS', 10)
+
+    def reset(self):
+        with self._lock:
+            self._lag = None
+            self._checked_at = None
+
+
+replica_health = ReplicaHealth()
+
+
+def replica_status():
+    """{'alias', 'configured', 'lag_seconds', 'healthy'} for the performance report"""
+    if not replica_configured():
+        return {'alias': get_replica_alias(), 'configured': False, 'lag_seconds': None, 'healthy': False}
+    return {
+        'alias': get_replica_alias(),
+        'configured': True,
+        'lag_seconds': replica_health.lag(),
+        'healthy': replica_health.healthy(),
+    }
+
+
+def _sticky_key(user_id):
+    return f"{STICKY_KEY_PREFIX}{user_id}"
+
+
+def mark_primary_sticky(user):
+    """Read the primary for this user's replica-routed requests for REPLICA_STICKY_SECONDS"""
+    if not getattr(user, 'is_authenticated', False):
+        return
+    try:
+        cache.set(_sticky_key(user.pk), 1, getattr(settings, 'REPLICA_STICKY_SECONDS', 15))
+    except Exception as e:
+        logger.warning(f"Failed to pin user {user.pk} to the primary database: {str(e)}")
+
+
+def is_primary_sticky(user):
+    if not getattr(user, 'is_authenticated', False):
+        return False
+    try:
+        return cache.get(_sticky_key(user.pk)) is not None
+    except Exception as e:
+        # Without the marker we cannot promise read-your-writes; stay on the primary
+        logger.warning(f"Cache unavailable for replica stickiness: {str(e)}")
+        return True
+
+
+def choose_read_alias(request=None):
+    """Alias a replica block should read from for this request, or None for the primary"""
+    if not replica_configured():
+        return None
+    if request is not None and is_primary_sticky(getattr(request, 'user', None)):
+        return None
+    if not replica_health.healthy():
+        return None
+    return get_replica_alias()
+
+
+def current_read_alias():
+    return _read_alias.get()
+
+
+@contextmanager
+def read_from_replica(request=None):
+    """Route reads in the block to the replica when it is usable; yields the alias or None"""
+    alias = choose_read_alias(request)
+    token = _read_alias.set(alias)
+    try:
+        yield alias
+    finally:
+        _read_alias.reset(token)
+
+
+def _iterate_on(alias, iterable):
+    # Set per step: a generator must not leave the alias set in its consumer's context
+    iterator = iter(iterable)
+    while True:
+        token = _read_alias.set(alias)
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _read_alias.reset(token)
+        yield item
+
+
+def _bind_streaming(response, alias):
+    """Keep a streaming response's lazy queries on the alias chosen for the request"""
+    if alias and getattr(response, 'streaming', False):
+        response.streaming_content = _iterate_on(alias, response.streaming_content)
+    return response
+
+
+def replica_reads(view):
+    """Serve a read-only view function or viewset action from the replica"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        request = args[0] if hasattr(args[0], 'query_params') else args[1]
+        with read_from_replica(request) as alias:
+            response = view(*args, **kwargs)
+        return _bind_streaming(response, alias)
+    return wrapper
+
+
+class ReplicaReadMixin:
+    """ViewSet mixin: serve safe (GET/HEAD/OPTIONS) requests from the replica"""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # After authentication, so stickiness can look at the user
+        if request.method in SAFE_METHODS:
+            self._replica_alias = choose_read_alias(request)
+            self._replica_token = _read_alias.set(self._replica_alias)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_replica_token', None)
+        if token is not None:
+            self._replica_token = None
+            _read_alias.reset(token)
+            _bind_streaming(response, self._replica_alias)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class PrimaryReplicaRouter:
+    """Reads follow the current replica block (primary by default); writes go to the primary"""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Same rows on both sides: objects read from the replica may relate to primary ones
+        databases = {DEFAULT_DB_ALIAS, get_replica_alias()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class _WriteDetector:
+    """connection.execute_wrapper callable that notes whether any statement wrote"""
+
+    def __init__(self):
+        self.wrote = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if not self.wrote and sql.lstrip()[:7].upper().startswith(WRITE_STATEMENTS):
+            self.wrote = True
+        return execute(sql, params, many, context)
+
+
+class ReplicaStickyMiddleware:
+    """Pin users to the primary for REPLICA_STICKY_SECONDS after a request of theirs writes"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replica_configured():
+            return self.get_response(request)
+
+        detector = _WriteDetector()
+        with connections[DEFAULT_DB_ALIAS].execute_wrapper(detector):
+            response = self.get_response(request)
+        if detector.wrote:
+            # DRF copies the authenticated (e.g. JWT) user onto the Django request
+            mark_primary_sticky(getattr(request, 'user', None))
+        return response
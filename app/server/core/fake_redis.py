@@ -0,0 +1,268 @@
+"""
+Minimal in-process Redis server for tests (and local runs without Redis).
+
+Speaks enough RESP2 for redis-py and Django's RedisCache: PING, GET/SET
+(EX/PX/NX/XX), MGET/MSET, DEL, EXISTS, INCR/INCRBY/DECR/DECRBY,
+EXPIRE/PERSIST/TTL, FLUSHDB/FLUSHALL, MULTI/EXEC and CLIENT. Data lives in a
+dict guarded by a lock; expired keys are dropped lazily on access.
+
+    with FakeRedisServer() as server:
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': server.url,
+        }}):
+            ...
+"""
+import socketserver
+import threading
+import time
+
+
+class _Error(Exception):
+    pass
+
+
+class _Status(str):
+    """Simple-string reply (+OK) as opposed to a bulk string"""
+
+
+OK = _Status('OK')
+QUEUED = _Status('QUEUED')
+
+
+def _encode(value):
+    if isinstance(value, _Error):
+        return f"-ERR {value}\r\n".encode()
+    if isinstance(value, _Status):
+        return f"+{value}\r\n".encode()
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, int):
+        return f":{value}\r\n".encode()
+    if isinstance(value, list):
+        return f"*{len(value)}\r\n".encode() + b''.join(_encode(item) for item in value)
+    if isinstance(value, str):
+        value = value.encode()
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class _Store:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.data = {}
+        self.expires = {}
+
+    def _alive(self, key):
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def execute(self, name, args):
+        handler = getattr(self, f"cmd_{name}", None)
+        if handler is None:
+            return _Error(f"unknown command '{name}'")
+        with self.lock:
+            try:
+                return handler(*args)
+            except _Error as e:
+                return e
+            except (TypeError, ValueError):
+                return _Error(f"wrong arguments for '{name}' command")
+
+    def cmd_ping(self, *args):
+        return args[0] if args else _Status('PONG')
+
+    def cmd_client(self, *args):
+        return OK
+
+    def cmd_select(self, db):
+        return OK
+
+    def cmd_get(self, key):
+        return self.data[key] if self._alive(key) else None
+
+    def cmd_mget(self, *keys):
+        return [self.cmd_get(key) for key in keys]
+
+    def cmd_set(self, key, value, *options):
+        options = [option.decode().upper() if isinstance(option, bytes) else option for option in options]
+        deadline = None
+        keep_ttl = False
+        nx = xx = False
+        index = 0
+        while index < len(options):
+            option = options[index]
+            if option in ('EX', 'PX'):
+                amount = int(options[index + 1])
+                deadline = time.monotonic() + (amount if option == 'EX' else amount / 1000)
+                index += 2
+                continue
+            nx = nx or option == 'NX'
+            xx = xx or option == 'XX'
+            keep_ttl = keep_ttl or option == 'KEEPTTL'
+            index += 1
+        exists = self._alive(key)
+        if (nx and exists) or (xx and not exists):
+            return None
+        self.data[key] = value
+        if deadline is not None:
+            self.expires[key] = deadline
+        elif not keep_ttl:
+            self.expires.pop(key, None)
+        return OK
+
+    def cmd_mset(self, *pairs):
+        for index in range(0, len(pairs), 2):
+            self.cmd_set(pairs[index], pairs[index + 1])
+        return OK
+
+    def cmd_del(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                del self.data[key]
+                self.expires.pop(key, None)
+                removed += 1
+        return removed
+
+    def cmd_exists(self, *keys):
+        return sum(1 for key in keys if self._alive(key))
+
+    def cmd_incrby(self, key, delta):
+        current = int(self.data[key]) if self._alive(key) else 0
+        try:
+            value = current + int(delta)
+        except ValueError:
+            raise _Error('value is not an integer or out of range')
+        self.data[key] = str(value).encode()
+        return value
+
+    def cmd_incr(self, key):
+        return self.cmd_incrby(key, 1)
+
+    def cmd_decrby(self, key, delta):
+        return self.cmd_incrby(key, -int(delta))
+
+    def cmd_decr(self, key):
+        return self.cmd_incrby(key, -1)
+
+    def cmd_expire(self, key, seconds):
+        if not self._alive(key):
+            return 0
+        self.expires[key] = time.monotonic() + int(seconds)
+        return 1
+
+    def cmd_persist(self, key):
+        if not self._alive(key) or key not in self.expires:
+            return 0
+        del self.expires[key]
+        return 1
+
+    def cmd_ttl(self, key):
+        if not self._alive(key):
+            return -2
+        if key not in self.expires:
+            return -1
+        return max(0, round(self.expires[key] - time.monotonic()))
+
+    def cmd_flushdb(self, *args):
+        self.data.clear()
+        self.expires.clear()
+        return OK
+
+    cmd_flushall = cmd_flushdb
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _read_command(self):
+        header = self.rfile.readline()
+        if not header:
+            return None
+        if not header.startswith(b'*'):
+            # Inline command (e.g. typed into telnet)
+            return header.split()
+        parts = []
+        for _ in range(int(header[1:])):
+            length = int(self.rfile.readline()[1:])
+            parts.append(self.rfile.read(length + 2)[:-2])
+        return parts
+
+    def handle(self):
+        store = self.server.store
+        queued = None
+        while True:
+            try:
+                command = self._read_command()
+            except (ConnectionError, ValueError):
+                return
+            if not command:
+                return
+            name = command[0].decode().lower()
+            args = command[1:]
+
+            if name == 'multi':
+                queued = []
+                reply = OK
+            elif name == 'exec':
+                if queued is None:
+                    reply = _Error('EXEC without MULTI')
+                else:
+                    reply = [store.execute(queued_name, queued_args) for queued_name, queued_args in queued]
+                    queued = None
+            elif name == 'discard':
+                queued = None
+                reply = OK
+            elif queued is not None:
+                queued.append((name, args))
+                reply = QUEUED
+            elif name == 'quit':
+                self.wfile.write(_encode(OK))
+                return
+            else:
+                reply = store.execute(name, args)
+            try:
+                self.wfile.write(_encode(reply))
+            except ConnectionError:
+                return
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class FakeRedisServer:
+    """Threaded RESP server on 127.0.0.1 and a free port; `url` is its redis:// URL"""
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self._server = _Server((host, port), _Handler)
+        self._server.store = _Store()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    @property
+    def store(self):
+        return self._server.store
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,185 @@
+"""
+Per-request database instrumentation.
+
+QueryBudgetMiddleware records, for every request resolved to a named URL
+(DRF actions resolve to names such as ``inspection-tab-counts``):
+query count, total SQL time, response render time and response size.
+Samples go into a rolling in-memory window per endpoint (``perf_stats``),
+which /api/db/perf/ reports. Each gunicorn worker keeps its own window.
+
+Requests that run more queries than their budget log a warning. Budgets come
+from QUERY_BUDGETS (endpoint name -> max queries), with QUERY_BUDGET_DEFAULT
+as the fallback.
+"""
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the request duration histogram buckets
+DURATION_BUCKETS_MS = (10, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class PerfStats:
+    """Rolling window of request samples per endpoint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(self._new_window)
+
+    @staticmethod
+    def _new_window():
+        return deque(maxlen=getattr(settings, 'PERF_SAMPLE_WINDOW', 500))
+
+    def record(self, endpoint, sample):
+        with self._lock:
+            self._samples[endpoint].append(sample)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+    def summary(self):
+        """Per-endpoint percentiles and duration histogram, slowest p95 first"""
+        with self._lock:
+            windows = {endpoint: list(samples) for endpoint, samples in self._samples.items()}
+
+        report = []
+        for endpoint, samples in windows.items():
+            durations = [s['total_ms'] for s in samples]
+            queries = [s['queries'] for s in samples]
+            histogram = {f"<={bound}ms": 0 for bound in DURATION_BUCKETS_MS}
+            histogram[f">{DURATION_BUCKETS_MS[-1]}ms"] = 0
+            for duration in durations:
+                for bound in DURATION_BUCKETS_MS:
+                    if duration <= bound:
+                        histogram[f"<={bound}ms"] += 1
+                        break
+                else:
+                    histogram[f">{DURATION_BUCKETS_MS[-1]}ms"] += 1
+
+            report.append({
+                'endpoint': endpoint,
+                'samples': len(samples),
+                'budget': get_query_budget(endpoint),
+                'over_budget': sum(1 for s in samples if s['over_budget']),
+                'queries': {
+                    'p50': _percentile(queries, 0.5),
+                    'p95': _percentile(queries, 0.95),
+                    'max': max(queries),
+                },
+                'total_ms': {
+                    'p50': round(_percentile(durations, 0.5), 2),
+                    'p95': round(_percentile(durations, 0.95), 2),
+                    'max': round(max(durations), 2),
+                },
+                'sql_ms_p95': round(_percentile([s['sql_ms'] for s in samples], 0.95), 2),
+                'render_ms_p95': round(_percentile([s['render_ms'] for s in samples], 0.95), 2),
+                'response_bytes_p95': _percentile([s['response_bytes'] for s in samples], 0.95),
+                'histogram': histogram,
+            })
+        report.sort(key=lambda row: row['total_ms']['p95'], reverse=True)
+        return report
+
+
+perf_stats = PerfStats()
+
+
+def get_query_budget(endpoint):
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    return budgets.get(endpoint, getattr(settings, 'QUERY_BUDGET_DEFAULT', 50))
+
+
+class _QueryTimer:
+    """connection.execute_wrapper callable that counts and times queries"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+
+
+class QueryBudgetMiddleware:
+    """Record per-endpoint query count, SQL time, render time and response size"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'PERF_MONITORING_ENABLED', True):
+            return self.get_response(request)
+
+        timer = _QueryTimer()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        try:
+            self._record(request, response, timer, total_ms)
+        except Exception as e:
+            logger.error(f"Failed to record request metrics: {str(e)}")
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF Responses are rendered after this hook; time the renderer
+        request._perf_render_start = time.perf_counter()
+
+        def _render_done(rendered):
+            request._perf_render_ms = (time.perf_counter() - request._perf_render_start) * 1000
+
+        response.add_post_render_callback(_render_done)
+        return response
+
+    def _record(self, request, response, timer, total_ms):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return
+        endpoint = match.view_name
+
+        budget = get_query_budget(endpoint)
+        over_budget = timer.count > budget
+        if over_budget:
+            logger.warning(
+                f"Query budget exceeded for {endpoint}: {timer.count} queries "
+                f"(budget {budget}, {timer.seconds * 1000:.1f} ms SQL) "
+                f"{request.method} {request.get_full_path()}"
+            )
+
+        if getattr(response, 'streaming', False):
+            response_bytes = 0
+        else:
+            response_bytes = len(response.content)
+
+        perf_stats.record(endpoint, {
+            'status': response.status_code,
+            'queries': timer.count,
+            'sql_ms': timer.seconds * 1000,
+            'render_ms': getattr(request, '_perf_render_ms', 0.0),
+            'response_bytes': response_bytes,
+            'total_ms': total_ms,
+            'over_budget': over_budget,
+        })
@@ -1,4 +1,51 @@
-from rest_framework.pagination import PageNumberPagination
+"""
+Pagination classes.
+
+StandardResultsSetPagination is the default OFFSET (page number) pagination.
+KeysetPagination walks a list newest-first by (created_at, id): each page is
+`WHERE (created_at, id) < cursor ORDER BY created_at DESC, id DESC LIMIT n`,
+so deep pages cost the same as the first and no COUNT is needed. Totals are
+opt-in with ?count=exact, or ?count=estimate for a count capped at
+CURSOR_COUNT_CAP rows.
+
+CursorOrPagePagination keeps page numbers by default and switches to the
+keyset cursor when the request has ?cursor=<token> or ?pagination=cursor.
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _positive_int(value, default, maximum=None):
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return default
+    if value < 1:
+        return default
+    return min(value, maximum) if maximum else value
+
+
+def _cursor_datetime(value):
+    parsed = parse_datetime(value) if isinstance(value, str) else None
+    if parsed is None:
+        raise ValueError(f"Not a datetime: {value!r}")
+    return parsed
+
+
+def _cursor_int(value):
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"Not an integer: {value!r}")
+    return value
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -10,3 +57,149 @@ class StandardResultsSetPagination(PageNumberPagination):
     page_size_query_param = "page_size"
     max_page_size = 100
 
+
+class ListPagePagination(BasePagination):
+    """
+    Page-number pagination with the response shape the establishment and user
+    lists have always returned: count, page, page_size, total_pages, results.
+    Pages past the end are empty rather than 404.
+    """
+
+    page_size = 10
+    # These lists were never capped: the maps and the assignee picker load
+    # everything in one page (page_size=10000 / 1000)
+    max_page_size = 10000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page = _positive_int(request.query_params.get("page"), 1)
+        self.page_size = _positive_int(request.query_params.get("page_size"), self.page_size, self.max_page_size)
+        self.count = queryset.count()
+        start = (self.page - 1) * self.page_size
+        return list(queryset[start:start + self.page_size])
+
+    def get_paginated_response(self, data):
+        return Response({
+            "count": self.count,
+            "page": self.page,
+            "page_size": self.page_size,
+            "total_pages": (self.count + self.page_size - 1) // self.page_size,
+            "results": data,
+        })
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination on (created_at, id), newest first"""
+
+    page_size = 20
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    keyset = ("created_at", "id")
+    # Validate and convert each cursor value before it reaches a filter
+    keyset_parsers = (_cursor_datetime, _cursor_int)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = _positive_int(request.query_params.get("page_size"), self.page_size, self.max_page_size)
+        queryset = queryset.order_by(*[f"-{field}" for field in self.keyset])
+        self.count, self.count_is_estimate = self.get_count(queryset, request)
+
+        token = request.query_params.get(self.cursor_query_param)
+        if token:
+            queryset = queryset.filter(self.after(self.decode_cursor(token)))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_cursor = self.encode_cursor(self.position(rows[-1])) if self.has_next else None
+        return rows
+
+    def get_count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param)
+        if mode == "exact":
+            return queryset.count(), False
+        if mode == "estimate":
+            cap = getattr(settings, "CURSOR_COUNT_CAP", 1000)
+            # COUNT over a LIMITed subquery: stops scanning after cap + 1 rows
+            count = queryset.order_by()[:cap + 1].count()
+            return min(count, cap), count > cap
+        return None, False
+
+    def position(self, row):
+        if isinstance(row, dict):
+            return [row[field] for field in self.keyset]
+        return [getattr(row, field) for field in self.keyset]
+
+    def after(self, position):
+        """Rows strictly after position in descending keyset order"""
+        condition = Q()
+        for index, field in enumerate(self.keyset):
+            step = Q(**{f"{field}__lt": position[index]})
+            for previous, value in zip(self.keyset[:index], position[:index]):
+                step &= Q(**{previous: value})
+            condition |= step
+        return condition
+
+    def encode_cursor(self, position):
+        values = [value.isoformat() if isinstance(value, (datetime, date)) else value for value in position]
+        return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii").rstrip("=")
+
+    def decode_cursor(self, token):
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            position = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        except (binascii.Error, UnicodeError, ValueError):
+            raise NotFound("Invalid cursor.")
+        if not isinstance(position, list) or len(position) != len(self.keyset):
+            raise NotFound("Invalid cursor.")
+        try:
+            return [parse(value) for parse, value in zip(self.keyset_parsers, position)]
+        except ValueError:
+            raise NotFound("Invalid cursor.")
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, "page")
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        payload = {
+            "next": self.get_next_link(),
+            "next_cursor": self.next_cursor,
+            "page_size": self.page_size,
+            "results": data,
+        }
+        if self.count is not None:
+            payload["count"] = self.count
+            payload["count_is_estimate"] = self.count_is_estimate
+        return Response(payload)
+
+
+class CursorOrPagePagination(BasePagination):
+    """Page numbers by default; the keyset cursor with ?cursor=<token> or ?pagination=cursor"""
+
+    page_pagination_class = StandardResultsSetPagination
+    cursor_pagination_class = KeysetPagination
+
+    @staticmethod
+    def wants_cursor(request):
+        params = request.query_params
+        return "cursor" in params or params.get("pagination") == "cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.wants_cursor(request):
+            self.paginator = self.cursor_pagination_class()
+        else:
+            self.paginator = self.page_pagination_class()
+        return self.paginator.paginate_queryset(queryset, request, view=view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+
+class ListCursorOrPagePagination(CursorOrPagePagination):
+    """CursorOrPagePagination with the legacy establishment/user list page shape"""
+
+    page_pagination_class = ListPagePagination
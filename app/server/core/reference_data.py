@@ -0,0 +1,176 @@
+"""
+Process-wide registry of small, rarely changing reference data.
+
+Laws (reference code -> details), user roles and sections, and the Region 1
+district map are loaded once per process into indexed dicts, so hot paths
+(quota validation, assignment, district lookup) stop re-querying Law or
+re-scanning REGION_1 per call.
+
+Law saves/deletes (laws/signals.py) drop this process's copy and bump the
+shared REFERENCE_DATA_SCOPE version; other processes compare that version at
+most every REFERENCE_DATA_CHECK_INTERVAL seconds and reload when it moved.
+
+bootstrap() is the client payload behind /api/reference-data/, with an ETag
+derived from its content.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_DATA_SCOPE = 'reference-data'
+
+LAW_DETAIL_FIELDS = ('reference_code', 'law_title', 'category', 'status')
+
+
+def _city_base(name):
+    return name.replace(' City', '').replace(' (Capital)', '').strip().lower()
+
+
+class ReferenceSnapshot:
+    """One immutable load of the reference tables"""
+
+    def __init__(self, laws, user_model, regions, version=None):
+        self.version = version
+        # laws come in Law's default ordering; legacy rows may have no reference code
+        self.laws = {law['reference_code']: law for law in laws if law['reference_code']}
+        self.active_laws = [law['reference_code'] for law in laws if law['status'] == 'Active']
+        self.user_has_district = any(field.name == 'district' for field in user_model._meta.get_fields())
+        self.roles = [{'value': value, 'label': label} for value, label in user_model.USERLEVEL_CHOICES]
+        self.sections = [{'value': value, 'label': label} for value, label in user_model.SECTION_CHOICES]
+
+        self.regions = regions
+        self.provinces = {province.lower(): province for province in regions}
+        # lower-cased province -> lower-cased city -> district
+        self.districts_by_city = {
+            province.lower(): {
+                city.lower(): district
+                for district, cities in districts.items()
+                for city in cities
+            }
+            for province, districts in regions.items()
+        }
+
+        self.payload = {
+            'laws': [
+                {**{field: law[field] for field in LAW_DETAIL_FIELDS}, 'effective_date': law['effective_date']}
+                for law in laws
+            ],
+            'active_laws': self.active_laws,
+            'roles': self.roles,
+            'sections': self.sections,
+            'regions': [
+                {'province': province, 'district': district, 'cities': cities}
+                for province, districts in regions.items()
+                for district, cities in districts.items()
+            ],
+        }
+        encoded = json.dumps(self.payload, cls=DjangoJSONEncoder, sort_keys=True, separators=(',', ':'))
+        self.etag = f'"{hashlib.md5(encoded.encode("utf-8")).hexdigest()}"'
+
+    def district_for_city(self, province, city):
+        province_key = (province or '').lower()
+        cities = self.districts_by_city.get(province_key)
+        if cities is None:
+            return None
+        clean_city = (city or '').strip()
+        district = cities.get(clean_city.lower())
+        if district:
+            return district
+
+        # Common variations: "San Fernando" vs "San Fernando City (Capital)", partial names
+        base_input = _city_base(clean_city)
+        for district, district_cities in self.regions[self.provinces[province_key]].items():
+            for city_in_list in district_cities:
+                base_city = _city_base(city_in_list)
+                if (
+                    base_city == base_input
+                    or base_city in base_input
+                    or base_input in base_city
+                    or base_city.replace(' ', '') == base_input.replace(' ', '')
+                ):
+                    return district
+        return None
+
+
+class ReferenceDataRegistry:
+    """Lazily loaded, version-checked ReferenceSnapshot for this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._checked_at = 0.0
+
+    @staticmethod
+    def _shared_version():
+        from .cache import get_version
+
+        try:
+            return get_version(REFERENCE_DATA_SCOPE)
+        except Exception as e:
+            logger.warning(f"Cache unavailable for reference data version: {str(e)}")
+            return None
+
+    @staticmethod
+    def _load(version):
+        from django.contrib.auth import get_user_model
+        from inspections.regions import REGION_1
+        from laws.models import Law
+
+        laws = list(Law.objects.values(*LAW_DETAIL_FIELDS, 'effective_date'))
+        return ReferenceSnapshot(laws, get_user_model(), REGION_1, version)
+
+    def snapshot(self):
+        snapshot = self._snapshot
+        interval = getattr(settings, 'REFERENCE_DATA_CHECK_INTERVAL', 30)
+        if snapshot is not None and time.monotonic() - self._checked_at < interval:
+            return snapshot
+
+        version = self._shared_version()
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or (version is not None and version != snapshot.version):
+                snapshot = self._snapshot = self._load(version)
+            self._checked_at = time.monotonic()
+            return snapshot
+
+    def invalidate(self):
+        """Drop this process's copy and tell the other processes to reload theirs"""
+        from .cache import bump
+
+        with self._lock:
+            self._snapshot = None
+        try:
+            bump(REFERENCE_DATA_SCOPE)
+        except Exception as e:
+            logger.warning(f"Failed to bump reference data version: {str(e)}")
+
+    def law_details(self, reference_code):
+        """{'reference_code', 'law_title', 'category', 'status'} or None"""
+        law = self.snapshot().laws.get(reference_code)
+        if law is None:
+            return None
+        return {field: law[field] for field in LAW_DETAIL_FIELDS}
+
+    def active_laws(self):
+        return list(self.snapshot().active_laws)
+
+    def user_has_district(self):
+        return self.snapshot().user_has_district
+
+    def district_for_city(self, province, city):
+        return self.snapshot().district_for_city(province, city)
+
+    def bootstrap(self):
+        """(payload, etag) for the client bootstrap endpoint"""
+        snapshot = self.snapshot()
+        return snapshot.payload, snapshot.etag
+
+
+reference_data = ReferenceDataRegistry()
@@ -0,0 +1,353 @@
+"""
+In-process trigram index backing SearchSuggestionsView.
+
+Establishment (name, nature_of_business, city) and user (names, email) text is
+broken into padded character trigrams so a query only has to look at rows that
+share n-grams with it. The top-k candidates are then re-ranked/verified with the
+Levenshtein-based fuzzy_match in core.views.
+
+Each process keeps its own copy. post_save/post_delete signals (see
+establishments/signals.py and users/signals.py) apply a change locally at once
+and, on commit, publish it as a per-key delta in the Django cache under a
+shared version counter. Every SEARCH_INDEX_SYNC_INTERVAL seconds a process
+replays the deltas between its version and the shared one; it rebuilds from
+the database instead when deltas are missing (expired, evicted) or more than
+SEARCH_INDEX_MAX_REPLAY behind. Processes that never loaded the index (Celery,
+management commands) only publish.
+
+Only full database builds write the JSON snapshot on disk, stamped with the
+version they include, so gunicorn workers can start from it and catch up
+through the deltas. Snapshots older than SEARCH_INDEX_MAX_AGE are rebuilt.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 2
+
+SEARCH_INDEX_VERSION_KEY = 'search_index:version'
+
+# User fields that affect the index; saves touching only other fields are ignored
+USER_INDEXED_FIELDS = {'first_name', 'last_name', 'email'}
+
+
+def _delta_key(version):
+    return f"search_index:delta:{version}"
+
+
+def _word_ngrams(word, n=3):
+    padded = f"{' ' * (n - 1)}{word} "
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+def text_ngrams(text, n=3):
+    """Return the set of padded character n-grams for every word in text"""
+    grams = set()
+    for word in (text or '').lower().split():
+        grams |= _word_ngrams(word, n)
+    return grams
+
+
+class TrigramIndex:
+    """Inverted index of trigram -> document keys"""
+
+    def __init__(self):
+        self.documents = {}
+        self.postings = defaultdict(set)
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add(self, key, texts):
+        self.remove(key)
+        texts = [text for text in texts if text]
+        self.documents[key] = texts
+        for text in texts:
+            for gram in text_ngrams(text):
+                self.postings[gram].add(key)
+
+    def remove(self, key):
+        texts = self.documents.pop(key, None)
+        if texts is None:
+            return
+        for text in texts:
+            for gram in text_ngrams(text):
+                keys = self.postings.get(gram)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self.postings[gram]
+
+    def search(self, query, limit):
+        """Return up to `limit` document keys ordered by shared trigram count"""
+        scores = Counter()
+        for gram in text_ngrams(query):
+            for key in self.postings.get(gram, ()):
+                scores[key] += 1
+        return [key for key, _ in scores.most_common(limit)]
+
+
+class SearchIndex:
+    """Establishment and user trigram indexes kept in step through shared deltas"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.establishments = TrigramIndex()
+        self.users = TrigramIndex()
+        self.loaded = False
+        self._version = None
+        self._last_sync_check = 0.0
+
+    # ------------------------------------------------------------------ config
+    @property
+    def snapshot_path(self):
+        return getattr(settings, 'SEARCH_INDEX_SNAPSHOT_PATH', None)
+
+    @property
+    def sync_interval(self):
+        return getattr(settings, 'SEARCH_INDEX_SYNC_INTERVAL', 5)
+
+    @property
+    def max_snapshot_age(self):
+        return getattr(settings, 'SEARCH_INDEX_MAX_AGE', 3600)
+
+    # --------------------------------------------------------------- documents
+    @staticmethod
+    def establishment_texts(establishment):
+        return [establishment.name, establishment.nature_of_business, establishment.city]
+
+    @staticmethod
+    def user_texts(user):
+        full_name = f"{user.first_name or ''} {user.last_name or ''}".strip()
+        return [user.first_name, user.last_name, full_name, user.email]
+
+    def build(self):
+        """Rebuild both indexes from the database and write a snapshot"""
+        from django.contrib.auth import get_user_model
+        from establishments.models import Establishment
+
+        # Read first: changes published while we scan are replayed afterwards (replays are idempotent)
+        version = self._shared_version(create=True)
+        User = get_user_model()
+        establishments = TrigramIndex()
+        users = TrigramIndex()
+
+        for pk, name, nature, city in Establishment.objects.values_list(
+            'pk', 'name', 'nature_of_business', 'city'
+        ).iterator(chunk_size=2000):
+            establishments.add(pk, [name, nature, city])
+
+        for pk, first_name, last_name, email in User.objects.values_list(
+            'pk', 'first_name', 'last_name', 'email'
+        ).iterator(chunk_size=2000):
+            full_name = f"{first_name or ''} {last_name or ''}".strip()
+            users.add(pk, [first_name, last_name, full_name, email])
+
+        with self._lock:
+            self.establishments = establishments
+            self.users = users
+            self._version = version
+            self.loaded = True
+        self.write_snapshot(version, establishments, users)
+        logger.info(
+            f"Search index built: {len(establishments)} establishments, {len(users)} users"
+        )
+
+    def reset(self):
+        with self._lock:
+            self.establishments = TrigramIndex()
+            self.users = TrigramIndex()
+            self.loaded = False
+            self._version = None
+            self._last_sync_check = 0.0
+
+    # ---------------------------------------------------------------- version
+    @staticmethod
+    def _shared_version(create=False):
+        try:
+            if create:
+                cache.add(SEARCH_INDEX_VERSION_KEY, 1, None)
+            return cache.get(SEARCH_INDEX_VERSION_KEY)
+        except Exception as e:
+            logger.warning(f"Cache unavailable for search index version: {str(e)}")
+            return None
+
+    @staticmethod
+    def _publish(index_name, key, texts):
+        """Record a change as the next shared version; returns that version or None"""
+        try:
+            try:
+                version = cache.incr(SEARCH_INDEX_VERSION_KEY)
+            except ValueError:
+                # Counter evicted or never set: a far-off value makes every loaded process rebuild
+                version = time.time_ns()
+                cache.set(SEARCH_INDEX_VERSION_KEY, version, None)
+            cache.set(_delta_key(version), [index_name, key, texts], getattr(settings, 'SEARCH_INDEX_DELTA_TTL', 3600))
+            return version
+        except Exception as e:
+            logger.warning(f"Could not publish search index change for {index_name} {key}: {str(e)}")
+            return None
+
+    # --------------------------------------------------------------- snapshots
+    def _read_snapshot(self):
+        path = self.snapshot_path
+        if not path or not os.path.exists(path):
+            return None
+        if time.time() - os.path.getmtime(path) > self.max_snapshot_age:
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('format') != SNAPSHOT_FORMAT_VERSION:
+            return None
+        return data
+
+    def load_snapshot(self):
+        """Load the on-disk snapshot; returns False if missing, stale or invalid"""
+        try:
+            data = self._read_snapshot()
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read search index snapshot: {e}")
+            return False
+        if data is None:
+            return False
+
+        establishments = TrigramIndex()
+        users = TrigramIndex()
+        for pk, texts in data.get('establishments', {}).items():
+            establishments.add(int(pk), texts)
+        for pk, texts in data.get('users', {}).items():
+            users.add(int(pk), texts)
+
+        with self._lock:
+            self.establishments = establishments
+            self.users = users
+            self._version = data.get('index_version')
+            self.loaded = True
+        return True
+
+    def write_snapshot(self, version, establishments, users):
+        """Atomically write a freshly built index, stamped with the shared version it includes"""
+        path = self.snapshot_path
+        if not path:
+            return
+        data = {
+            'format': SNAPSHOT_FORMAT_VERSION,
+            'index_version': version,
+            'built_at': time.time(),
+            'establishments': establishments.documents,
+            'users': users.documents,
+        }
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write search index snapshot: {e}")
+
+    # ------------------------------------------------------------ lifecycle
+    def warm(self):
+        """Load the snapshot, or build from the database if there is none"""
+        with self._lock:
+            if self.loaded:
+                return
+            if not self.load_snapshot():
+                self.build()
+
+    def ensure_current(self):
+        """Load on first use, then replay other processes' changes every SEARCH_INDEX_SYNC_INTERVAL"""
+        if not self.loaded:
+            self.warm()
+
+        now = time.time()
+        if now - self._last_sync_check < self.sync_interval:
+            return
+        self._last_sync_check = now
+        self.sync()
+
+    def sync(self):
+        """Catch up with the shared version through its deltas, or rebuild when that is not possible"""
+        shared = self._shared_version()
+        local = self._version
+        if shared is None or shared == local:
+            # Cache down or nothing new; the next published change moves the counter again
+            return
+        if local is None or shared < local or shared - local > getattr(settings, 'SEARCH_INDEX_MAX_REPLAY', 500):
+            self.build()
+            return
+
+        keys = [_delta_key(version) for version in range(local + 1, shared + 1)]
+        try:
+            deltas = cache.get_many(keys)
+        except Exception as e:
+            logger.warning(f"Cache unavailable for search index deltas: {str(e)}")
+            return
+        if len(deltas) != len(keys):
+            # Expired or evicted: the database is the only complete source left
+            self.build()
+            return
+        with self._lock:
+            for key in keys:
+                self._apply(*deltas[key])
+            if self._version is not None and shared > self._version:
+                self._version = shared
+
+    # -------------------------------------------------------------- updates
+    def _apply(self, index_name, key, texts):
+        index = getattr(self, index_name)
+        if texts is None:
+            index.remove(key)
+        else:
+            index.add(key, texts)
+
+    def _update(self, index_name, key, texts=None):
+        with self._lock:
+            if self.loaded:
+                # This process sees its own change right away
+                self._apply(index_name, key, texts)
+        # Other processes only once the row is committed
+        transaction.on_commit(lambda: self._publish_update(index_name, key, texts))
+
+    def _publish_update(self, index_name, key, texts):
+        version = self._publish(index_name, key, texts)
+        with self._lock:
+            if not self.loaded or version is None:
+                return
+            # Again: a replay of older deltas may have overwritten the key since
+            self._apply(index_name, key, texts)
+            # Still current only if nobody else published in between; otherwise sync() replays the gap
+            if self._version is not None and version == self._version + 1:
+                self._version = version
+
+    def index_establishment(self, establishment):
+        self._update('establishments', establishment.pk, self.establishment_texts(establishment))
+
+    def remove_establishment(self, pk):
+        self._update('establishments', pk)
+
+    def index_user(self, user):
+        self._update('users', user.pk, self.user_texts(user))
+
+    def remove_user(self, pk):
+        self._update('users', pk)
+
+    # --------------------------------------------------------------- queries
+    def search_establishments(self, query, limit=None):
+        self.ensure_current()
+        return self.establishments.search(query, limit or getattr(settings, 'SEARCH_INDEX_CANDIDATES', 50))
+
+    def search_users(self, query, limit=None):
+        self.ensure_current()
+        return self.users.search(query, limit or getattr(settings, 'SEARCH_INDEX_CANDIDATES', 50))
+
+
+search_index = SearchIndex()
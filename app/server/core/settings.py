@@ -3,7 +3,10 @@ Django settings for core project.
 """
 from datetime import timedelta
 from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
 import os
+import sys
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 import secrets
 import string
@@ -60,6 +63,7 @@ AUTH_USER_MODEL = 'users.User'
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.QueryBudgetMiddleware',  # Per-endpoint query/timing stats (/api/db/perf/)
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Serve static files in production
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -68,6 +72,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'audit.sink.AuditFlushMiddleware',  # Batch-write the request's audit log entries
+    'core.db_router.ReplicaStickyMiddleware',  # Pin writers to the primary (read replica)
 ]
 
 # REST Framework + JWT
@@ -82,6 +88,9 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 20,
 }
 
+# Largest total returned by ?pagination=cursor&count=estimate (core/pagination.py)
+CURSOR_COUNT_CAP = int(os.getenv("CURSOR_COUNT_CAP", 1000))
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=int(os.getenv("ACCESS_TOKEN_LIFETIME_MINUTES", 60))),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=int(os.getenv("REFRESH_TOKEN_LIFETIME_DAYS", 1))),
@@ -152,24 +161,22 @@ EMAIL_HEADERS = {
 
 # Email Retry Configuration
 EMAIL_RETRY_ATTEMPTS = 3
-EMAIL_RETRY_DELAY = 5  # seconds
+
+# Email outbox (notifications/outbox.py), delivered by the Celery consumer
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", 50))
+EMAIL_OUTBOX_RETRY_BASE = int(os.getenv("EMAIL_OUTBOX_RETRY_BASE", 30))  # seconds, doubled per attempt
+EMAIL_OUTBOX_CLAIM_TIMEOUT = 600  # seconds before a batch left in SENDING is picked up again
+EMAIL_OUTBOX_BACKEND = os.getenv("EMAIL_OUTBOX_BACKEND", "")  # e.g. console/locmem backend for local runs
+EMAIL_OUTBOX_EAGER = os.getenv("EMAIL_OUTBOX_EAGER", "False") == "True"  # deliver in-process after commit
+EMAIL_OUTBOX_RETENTION_DAYS = int(os.getenv("EMAIL_OUTBOX_RETENTION_DAYS", 30))  # purge SENT/FAILED rows after this
 
 # Email Verification
 EMAIL_VERIFICATION_REQUIRED = True
 
 # If email credentials are not set, fall back to console backend
+# (reported by the system.W001 check instead of printed by every process)
 if not EMAIL_HOST_USER or not EMAIL_HOST_PASSWORD:
     EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
-    print("⚠️  EMAIL CREDENTIALS NOT SET - Using console backend for development")
-    print("   To enable email sending, set these environment variables:")
-    print("   - EMAIL_HOST_USER (your Gmail address)")
-    print("   - EMAIL_HOST_PASSWORD (your Gmail app password)")
-    print("   - DEFAULT_FROM_EMAIL (sender email address)")
-    print("   Emails will be printed to console instead of sent.")
-else:
-    print("Email configuration loaded successfully")
-    print(f"   SMTP Host: {EMAIL_HOST}:{EMAIL_PORT}")
-    print(f"   From Email: {DEFAULT_FROM_EMAIL}")
 
 TEMPLATES = [
     {
@@ -207,13 +214,99 @@ else:
         }
     }
 
+# Read replica for reports and analytics (core/db_router.py). REPLICA_DATABASE_URL, or
+# MYSQL_REPLICA_HOST with the primary's credentials unless MYSQL_REPLICA_* overrides them
+REPLICA_DATABASE_ALIAS = 'replica'
+if HAS_DJ_DATABASE_URL and os.environ.get('REPLICA_DATABASE_URL'):
+    DATABASES[REPLICA_DATABASE_ALIAS] = dj_database_url.parse(
+        os.environ['REPLICA_DATABASE_URL'], conn_max_age=600, conn_health_checks=True
+    )
+    if DATABASES[REPLICA_DATABASE_ALIAS]['ENGINE'] == 'django.db.backends.mysql':
+        DATABASES[REPLICA_DATABASE_ALIAS]['OPTIONS'] = dict(DATABASES['default'].get('OPTIONS', {}))
+elif os.environ.get('MYSQL_REPLICA_HOST'):
+    DATABASES[REPLICA_DATABASE_ALIAS] = {
+        **DATABASES['default'],
+        'HOST': os.environ['MYSQL_REPLICA_HOST'],
+        'PORT': os.environ.get('MYSQL_REPLICA_PORT') or DATABASES['default'].get('PORT'),
+        'USER': os.environ.get('MYSQL_REPLICA_USER') or DATABASES['default'].get('USER'),
+        'PASSWORD': os.environ.get('MYSQL_REPLICA_PASSWORD') or DATABASES['default'].get('PASSWORD'),
+        'OPTIONS': dict(DATABASES['default'].get('OPTIONS', {})),
+    }
+if REPLICA_DATABASE_ALIAS in DATABASES:
+    # Tests read the replica alias from the primary's test database
+    DATABASES[REPLICA_DATABASE_ALIAS]['TEST'] = {'MIRROR': 'default'}
+DATABASE_ROUTERS = ['core.db_router.PrimaryReplicaRouter']
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", 15))  # primary reads after a user's write
+REPLICA_MAX_LAG_SECONDS = int(os.getenv("REPLICA_MAX_LAG_SECONDS", 10))  # fall back to the primary beyond this
+REPLICA_LAG_CHECK_INTERVAL = int(os.getenv("REPLICA_LAG_CHECK_INTERVAL", 5))  # seconds between lag checks
 
 
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
+
+# Celery's broker and results; prefer REDIS_URL if available (Railway), else localhost
+REDIS_URL = os.getenv('REDIS_URL') or os.getenv('REDIS_PUBLIC_URL') or 'redis://localhost:6379/0'
+
+
+def _redis_db_url(url, db):
+    """Same Redis server as url, different logical database"""
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc, f"/{db}", parts.query, parts.fragment))
+
+
+def _redis_database(url):
+    parts = urlsplit(url)
+    return (parts.hostname, parts.port or 6379, parts.path.strip('/') or '0')
+
+
+# Shared cache across gunicorn workers and Celery processes (OTPs, dashboards, rosters).
+# Keys are version-stamped per scope, see core/cache.py. The cache gets its own Redis
+# database (CACHE_REDIS_URL, else CACHE_REDIS_DB on the broker's server) because
+# cache.clear() flushes the whole database. CACHE_BACKEND=locmem for a per-process
+# cache when no Redis is available (single-process local runs only). Tests always
+# use locmem so they never touch a configured Redis.
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+CACHE_BACKEND = 'locmem' if TESTING else os.getenv("CACHE_BACKEND", "redis")
+if CACHE_BACKEND == "locmem":
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'unique-snowflake',
+        }
+    }
+else:
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL') or _redis_db_url(REDIS_URL, os.getenv('CACHE_REDIS_DB', '1'))
+    if _redis_database(CACHE_REDIS_URL) == _redis_database(REDIS_URL):
+        raise ImproperlyConfigured("The cache must not share the Celery broker's Redis database; set CACHE_REDIS_URL or CACHE_REDIS_DB")
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+            'KEY_PREFIX': os.getenv('CACHE_KEY_PREFIX', 'ierms'),
+            'TIMEOUT': int(os.getenv('CACHE_DEFAULT_TIMEOUT', 300)),
+        }
     }
+
+# Seconds to cache dashboard/report responses (core.cache.cached_view)
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv("DASHBOARD_CACHE_TIMEOUT", 300))
+
+# Seconds to cache per-user inspection dashboard tab counts
+INSPECTION_TAB_COUNTS_CACHE_TIMEOUT = int(os.getenv("INSPECTION_TAB_COUNTS_CACHE_TIMEOUT", 5))
+
+# Search suggestions trigram index (core/search_index.py)
+SEARCH_INDEX_SNAPSHOT_PATH = os.getenv("SEARCH_INDEX_SNAPSHOT_PATH", os.path.join(BASE_DIR, ".search_index.json"))
+SEARCH_INDEX_SYNC_INTERVAL = int(os.getenv("SEARCH_INDEX_SYNC_INTERVAL", 5))  # seconds between shared version checks
+SEARCH_INDEX_MAX_AGE = int(os.getenv("SEARCH_INDEX_MAX_AGE", 3600))  # rebuild snapshots older than this
+SEARCH_INDEX_DELTA_TTL = int(os.getenv("SEARCH_INDEX_DELTA_TTL", 3600))  # seconds a published change stays replayable
+SEARCH_INDEX_MAX_REPLAY = int(os.getenv("SEARCH_INDEX_MAX_REPLAY", 500))  # rebuild instead when further behind
+SEARCH_INDEX_CANDIDATES = int(os.getenv("SEARCH_INDEX_CANDIDATES", 50))  # top-k before Levenshtein re-ranking
+
+# Request instrumentation (core/middleware.py)
+PERF_MONITORING_ENABLED = os.getenv("PERF_MONITORING_ENABLED", "True") == "True"
+PERF_SAMPLE_WINDOW = int(os.getenv("PERF_SAMPLE_WINDOW", 500))  # samples kept per endpoint
+QUERY_BUDGET_DEFAULT = int(os.getenv("QUERY_BUDGET_DEFAULT", 50))
+# Per-endpoint query budgets keyed by URL name
+QUERY_BUDGETS = {
+    'inspection-tab-counts': 3,
+    'inspection-quotas': 10,
 }
 
 
@@ -244,20 +337,64 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
-# Ensure media directory exists
-os.makedirs(MEDIA_ROOT, exist_ok=True)
-
 # Default folder for database backups
-DEFAULT_BACKUP_DIR = os.path.join(BASE_DIR, "backups")
+DEFAULT_BACKUP_DIR = os.path.join(BASE_DIR, "backups")  # created by whatever writes there first
+
+# Python backup engine (system/backup.py)
+BACKUP_COMPRESSION = os.getenv("BACKUP_COMPRESSION", "")  # '', 'gzip' or 'zstd' (needs zstandard)
+BACKUP_INSERT_BATCH_ROWS = int(os.getenv("BACKUP_INSERT_BATCH_ROWS", 500))  # rows per extended INSERT
+BACKUP_MAX_STATEMENT_BYTES = int(os.getenv("BACKUP_MAX_STATEMENT_BYTES", 1024 * 1024))  # stay below max_allowed_packet
+RESTORE_COMMIT_EVERY = int(os.getenv("RESTORE_COMMIT_EVERY", 200))  # statements per restore transaction
+
+# Row cap for write-only report exports (?stream=true, inspections/excel_streaming.py)
+EXCEL_STREAM_MAX_ROWS = int(os.getenv("EXCEL_STREAM_MAX_ROWS", 20000))
+
+# Run report export jobs in-process instead of on the Celery worker (reports/jobs.py)
+REPORT_JOBS_EAGER = os.getenv("REPORT_JOBS_EAGER", "False") == "True"
+REPORT_JOB_CLAIM_TIMEOUT = int(os.getenv("REPORT_JOB_CLAIM_TIMEOUT", 1800))  # seconds before an in-flight job counts as dead
+
+# Paged JSON mode of /api/reports/generate/ (reports/generators.py)
+REPORT_DEFAULT_PAGE_SIZE = int(os.getenv("REPORT_DEFAULT_PAGE_SIZE", 500))
+REPORT_MAX_PAGE_SIZE = int(os.getenv("REPORT_MAX_PAGE_SIZE", 5000))
+
+# Buffered audit log writer (audit/sink.py)
+AUDIT_BUFFER_ENABLED = os.getenv("AUDIT_BUFFER_ENABLED", "True") == "True"
+AUDIT_BUFFER_SIZE = int(os.getenv("AUDIT_BUFFER_SIZE", 100))
+AUDIT_FLUSH_INTERVAL = int(os.getenv("AUDIT_FLUSH_INTERVAL", 5))  # seconds
+AUDIT_SINK_CELERY = os.getenv("AUDIT_SINK_CELERY", "False") == "True"  # write batches on the Celery worker
+
+# Activity log retention (audit/archive.py): older months move to DEFAULT_BACKUP_DIR/activity_logs
+ACTIVITY_LOG_RETENTION_MONTHS = int(os.getenv("ACTIVITY_LOG_RETENTION_MONTHS", 12))
+ACTIVITY_LOG_ARCHIVE_BATCH_SIZE = int(os.getenv("ACTIVITY_LOG_ARCHIVE_BATCH_SIZE", 1000))
+
+# Notification fan-out (notifications/dispatcher.py): role roster cache lifetime (seconds)
+NOTIFICATION_ROSTER_CACHE_TIMEOUT = int(os.getenv("NOTIFICATION_ROSTER_CACHE_TIMEOUT", 300))
+
+# Delta auto-save (inspections/autosave.py): write-behind window and history/audit throttle (seconds)
+AUTOSAVE_COALESCE_SECONDS = int(os.getenv("AUTOSAVE_COALESCE_SECONDS", 3))  # 0 writes every delta through
+AUTOSAVE_HISTORY_INTERVAL = int(os.getenv("AUTOSAVE_HISTORY_INTERVAL", 300))
+AUTOSAVE_BUFFER_TTL = int(os.getenv("AUTOSAVE_BUFFER_TTL", 86400))  # seconds buffered deltas wait for a flush
+# Acknowledged deltas live only in the buffer until flushed: give it a dedicated Redis that
+# never evicts (maxmemory-policy noeviction). Without one the default cache is used, and a
+# per-process (locmem) cache turns buffering off, writing every delta through.
+AUTOSAVE_CACHE_ALIAS = 'default'
+if os.getenv('AUTOSAVE_REDIS_URL') and CACHE_BACKEND != 'locmem':
+    if _redis_database(os.getenv('AUTOSAVE_REDIS_URL')) in (_redis_database(REDIS_URL), _redis_database(CACHE_REDIS_URL)):
+        raise ImproperlyConfigured("AUTOSAVE_REDIS_URL must not share the broker's or the cache's Redis database")
+    CACHES['autosave'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('AUTOSAVE_REDIS_URL'),
+        'KEY_PREFIX': os.getenv('CACHE_KEY_PREFIX', 'ierms'),
+    }
+    AUTOSAVE_CACHE_ALIAS = 'autosave'
 
-# Ensure the folder exists
-os.makedirs(DEFAULT_BACKUP_DIR, exist_ok=True)
+# Reference data registry (core/reference_data.py): seconds between checks for other workers' law changes
+REFERENCE_DATA_CHECK_INTERVAL = int(os.getenv("REFERENCE_DATA_CHECK_INTERVAL", 30))
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-# Celery Configuration: prefer REDIS_URL if available (Railway), else localhost
-REDIS_URL = os.getenv('REDIS_URL') or os.getenv('REDIS_PUBLIC_URL') or 'redis://localhost:6379/0'
+# Celery Configuration (REDIS_URL is defined with CACHES above; the cache uses another database)
 CELERY_BROKER_URL = REDIS_URL
 CELERY_RESULT_BACKEND = REDIS_URL
 CELERY_ACCEPT_CONTENT = ['json']
@@ -280,5 +417,17 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'inspections.tasks.send_nov_compliance_reminders',
         'schedule': 86400.0,  # Run daily (every 24 hours)
     },
+    'deliver-email-outbox': {
+        'task': 'notifications.tasks.deliver_outbox',
+        'schedule': 60.0,  # Pick up email retries every minute
+    },
+    'purge-email-outbox': {
+        'task': 'notifications.tasks.purge_outbox',
+        'schedule': 86400.0,  # Run daily
+    },
+    'archive-activity-logs': {
+        'task': 'audit.tasks.archive_activity_logs',
+        'schedule': 86400.0,  # Run daily
+    },
 }
 
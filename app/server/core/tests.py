@@ -0,0 +1,465 @@
+import os
+import tempfile
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.db import connections, router
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from establishments.models import Establishment
+from inspections.models import ComplianceQuota, Inspection, InspectionForm
+from inspections.regions import get_district_by_city
+from laws.models import Law
+from notifications.models import Notification
+from users.utils.otp_utils import generate_otp, verify_otp
+
+from .cache import bump, get_version, make_key
+from .db_router import read_from_replica, replica_health
+from .reference_data import REFERENCE_DATA_SCOPE, reference_data
+from .fake_redis import FakeRedisServer
+from .middleware import perf_stats
+from .pagination import KeysetPagination
+from .search_index import SearchIndex, search_index
+
+User = get_user_model()
+
+
+@override_settings(SEARCH_INDEX_SNAPSHOT_PATH=None)
+class SearchSuggestionsIndexTest(APITestCase):
+    def setUp(self):
+        search_index.reset()
+        self.admin = User.objects.create_user(
+            email='admin@example.com', password='testpass123', password_provided=True,
+            userlevel='Admin'
+        )
+        User.objects.create_user(
+            email='jdelacruz@example.com', password='testpass123', password_provided=True,
+            first_name='Juan', last_name='Dela Cruz', userlevel='Section Chief'
+        )
+        self.restaurant = self._establishment('Saint Mary Restaurant', 'Food Service', 'Vigan')
+        self._establishment('Ilocos Cement Plant', 'Manufacturing', 'Laoag')
+        self.client.force_authenticate(user=self.admin)
+
+    def tearDown(self):
+        search_index.reset()
+
+    def _establishment(self, name, nature, city):
+        return Establishment.objects.create(
+            name=name, nature_of_business=nature, year_established='2000',
+            province='Ilocos Sur', city=city, barangay='Poblacion',
+            street_building='Main St', postal_code='2700',
+            latitude=17.5, longitude=120.3,
+        )
+
+    def _names(self, q, category):
+        response = self.client.get('/api/search/suggestions/', {'q': q, 'role': 'Admin'})
+        self.assertEqual(response.status_code, 200)
+        return [s['name'] for s in response.data['suggestions'] if s['category'] == category]
+
+    def test_fuzzy_matches_come_from_index(self):
+        self.assertEqual(self._names('restrant', 'Establishments'), ['Saint Mary Restaurant'])
+        self.assertEqual(self._names('sainff', 'Establishments'), ['Saint Mary Restaurant'])
+        self.assertEqual(self._names('juam', 'Users'), ['Juan Dela Cruz'])
+        self.assertIn(self.restaurant.pk, search_index.search_establishments('vigan'))
+
+    def test_signals_keep_index_current(self):
+        self._names('cement', 'Establishments')  # builds the index
+        self.restaurant.name = 'Saint Mary Bakery'
+        self.restaurant.save()
+        self.assertEqual(self._names('bakery', 'Establishments'), ['Saint Mary Bakery'])
+        self.restaurant.delete()
+        self.assertEqual(self._names('bakery', 'Establishments'), [])
+
+
+@override_settings(SEARCH_INDEX_SYNC_INTERVAL=0)
+class SharedSearchIndexTest(APITestCase):
+    """Two worker processes sharing one snapshot file and one cache"""
+
+    def setUp(self):
+        cache.clear()
+        snapshot_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(snapshot_dir.cleanup)
+        self.snapshot_path = os.path.join(snapshot_dir.name, 'search_index.json')
+        override = override_settings(SEARCH_INDEX_SNAPSHOT_PATH=self.snapshot_path)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.bakery = self._establishment('Saint Mary Bakery', 'Food Service', 'Vigan')
+        self.plant = self._establishment('Ilocos Cement Plant', 'Manufacturing', 'Laoag')
+        self.worker_a = SearchIndex()
+        self.worker_b = SearchIndex()
+        self.worker_a.warm()  # builds and writes the snapshot
+        self.worker_b.warm()  # starts from the snapshot
+
+    def _establishment(self, name, nature, city):
+        return Establishment.objects.create(
+            name=name, nature_of_business=nature, year_established='2000',
+            province='Ilocos Sur', city=city, barangay='Poblacion',
+            street_building='Main St', postal_code='2700',
+            latitude=17.5, longitude=120.3,
+        )
+
+    def _indexed_name(self, worker, establishment):
+        worker.ensure_current()
+        return worker.establishments.documents[establishment.pk][0]
+
+    def _rename(self, worker, establishment, name):
+        establishment.name = name
+        with self.captureOnCommitCallbacks(execute=True):
+            worker.index_establishment(establishment)
+
+    def test_changes_from_both_workers_reach_each_other(self):
+        self._rename(self.worker_a, self.bakery, 'Saint Mary Pharmacy')
+        self._rename(self.worker_b, self.plant, 'Ilocos Steel Plant')
+
+        with mock.patch.object(SearchIndex, 'build') as build:
+            for worker in (self.worker_a, self.worker_b):
+                self.assertEqual(self._indexed_name(worker, self.bakery), 'Saint Mary Pharmacy')
+                self.assertEqual(self._indexed_name(worker, self.plant), 'Ilocos Steel Plant')
+        build.assert_not_called()
+
+    def test_new_worker_catches_up_from_snapshot(self):
+        self._rename(self.worker_a, self.bakery, 'Saint Mary Pharmacy')
+        late_worker = SearchIndex()
+        with mock.patch.object(SearchIndex, 'build') as build:
+            self.assertEqual(self._indexed_name(late_worker, self.bakery), 'Saint Mary Pharmacy')
+        build.assert_not_called()
+
+    def test_unloaded_process_publishes_without_dropping_snapshot(self):
+        task_process = SearchIndex()
+        self._rename(task_process, self.bakery, 'Saint Mary Pharmacy')
+
+        self.assertFalse(task_process.loaded)
+        self.assertTrue(os.path.exists(self.snapshot_path))
+        self.assertEqual(self._indexed_name(self.worker_b, self.bakery), 'Saint Mary Pharmacy')
+
+    def test_missing_delta_rebuilds_from_database(self):
+        self.bakery.name = 'Saint Mary Pharmacy'
+        self.bakery.save()
+        self._rename(self.worker_a, self.bakery, 'Saint Mary Pharmacy')
+        cache.delete('search_index:delta:2')
+
+        self.assertEqual(self._indexed_name(self.worker_b, self.bakery), 'Saint Mary Pharmacy')
+        self.assertEqual(self.worker_b._version, cache.get('search_index:version'))
+
+
+class QueryBudgetMiddlewareTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        perf_stats.reset()
+        self.admin = User.objects.create_user(
+            email='perfadmin@example.com', password='testpass123', password_provided=True,
+            userlevel='Admin'
+        )
+        self.client.force_authenticate(user=self.admin)
+
+    def test_perf_report_lists_endpoint_samples(self):
+        self.client.get('/api/inspections/tab_counts/')
+        self.client.get('/api/inspections/tab_counts/')
+        response = self.client.get('/api/db/perf/')
+        self.assertEqual(response.status_code, 200)
+        rows = {row['endpoint']: row for row in response.data['endpoints']}
+        row = rows['inspection-tab-counts']
+        self.assertEqual(row['samples'], 2)
+        self.assertGreaterEqual(row['queries']['max'], 1)
+        self.assertGreater(row['response_bytes_p95'], 0)
+        self.assertEqual(sum(row['histogram'].values()), 2)
+
+    @override_settings(QUERY_BUDGETS={'inspection-tab-counts': 0})
+    def test_budget_exceeded_logs_warning(self):
+        with self.assertLogs('core.middleware', level='WARNING') as logs:
+            self.client.get('/api/inspections/tab_counts/')
+        self.assertIn('inspection-tab-counts', logs.output[0])
+        self.assertEqual(perf_stats.summary()[0]['over_budget'], 1)
+
+    def test_perf_report_is_admin_only(self):
+        chief = User.objects.create_user(
+            email='perfchief@example.com', password='testpass123', password_provided=True,
+            userlevel='Section Chief', section='RA-8749'
+        )
+        self.client.force_authenticate(user=chief)
+        self.assertEqual(self.client.get('/api/db/perf/').status_code, 403)
+
+
+class SharedRedisCacheTest(APITestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.redis = FakeRedisServer().start()
+        cls.cache_settings = override_settings(CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                'LOCATION': cls.redis.url,
+                'KEY_PREFIX': 'test',
+            }
+        })
+        cls.cache_settings.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.cache_settings.disable()
+        cls.redis.stop()
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            email='cache-admin@example.com', password='testpass123', password_provided=True,
+            userlevel='Admin'
+        )
+
+    def test_otp_is_visible_to_other_workers(self):
+        otp = generate_otp('otp@example.com')
+        # A separate client, as another gunicorn worker or Celery process would have
+        other_worker = caches.create_connection('default')
+        self.assertEqual(other_worker.get('otp_otp@example.com'), otp)
+        self.assertTrue(verify_otp('otp@example.com', otp))
+
+    def test_bump_retires_only_dependent_keys(self):
+        air = make_key('dashboard', ['inspections', 'law:RA-8749'], 'monthly')
+        waste = make_key('dashboard', ['law:RA-9003'], 'monthly')
+        bump('law:RA-8749')
+        self.assertNotEqual(make_key('dashboard', ['inspections', 'law:RA-8749'], 'monthly'), air)
+        self.assertEqual(make_key('dashboard', ['law:RA-9003'], 'monthly'), waste)
+
+    def test_model_saves_bump_their_scopes(self):
+        inspection = Inspection.objects.create(law='RA-8749')
+        before = {scope: get_version(scope) for scope in ('inspections', 'law:RA-8749', f"inspection:{inspection.pk}")}
+        InspectionForm.objects.create(inspection=inspection, compliance_decision='COMPLIANT')
+        for scope, version in before.items():
+            self.assertGreater(get_version(scope), version, scope)
+        self.assertEqual(get_version('law:RA-9003'), 1)
+
+    def test_cached_view_serves_repeats_until_inspections_change(self):
+        self.client.force_authenticate(user=self.admin)
+        first = self.client.get('/api/inspections/compliance_stats/')
+        with self.assertNumQueries(0):
+            repeat = self.client.get('/api/inspections/compliance_stats/')
+        self.assertEqual(repeat.data, first.data)
+
+        inspection = Inspection.objects.create(law='PD-1586')
+        InspectionForm.objects.create(inspection=inspection, compliance_decision='COMPLIANT')
+        fresh = self.client.get('/api/inspections/compliance_stats/')
+        self.assertEqual(fresh.data['compliant'], first.data['compliant'] + 1)
+
+
+class KeysetPaginationTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='pager@example.com', password='testpass123', password_provided=True, userlevel='Admin'
+        )
+        self.client.force_authenticate(user=self.user)
+        Notification.objects.bulk_create([
+            Notification(recipient=self.user, user=self.user, notification_type='new_user',
+                         title=f'Notice {number}', message='')
+            for number in range(7)
+        ])
+        # Ties on created_at must still page deterministically by id
+        tied = list(Notification.objects.order_by('pk').values_list('pk', flat=True)[:4])
+        Notification.objects.filter(pk__in=tied).update(created_at=Notification.objects.get(pk=tied[0]).created_at)
+
+    def _walk(self, url, params):
+        seen = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            seen.extend(row['id'] for row in response.data['results'])
+            if not response.data['next_cursor']:
+                return seen, response
+            response = self.client.get(url, {**params, 'cursor': response.data['next_cursor']})
+
+    def test_cursor_pages_cover_every_row_once_in_order(self):
+        seen, _ = self._walk('/api/notifications/', {'pagination': 'cursor', 'page_size': 2})
+        expected = list(
+            Notification.objects.filter(recipient=self.user)
+            .order_by('-created_at', '-id').values_list('pk', flat=True)
+        )
+        self.assertEqual(seen, expected)
+
+    def test_deep_page_skips_count(self):
+        first = self.client.get('/api/notifications/', {'pagination': 'cursor', 'page_size': 3})
+        self.assertNotIn('count', first.data)
+        with self.assertNumQueries(1):
+            self.client.get('/api/notifications/', {'cursor': first.data['next_cursor'], 'page_size': 3})
+
+    @override_settings(CURSOR_COUNT_CAP=5)
+    def test_estimated_count_is_capped(self):
+        response = self.client.get('/api/notifications/', {'pagination': 'cursor', 'count': 'estimate'})
+        self.assertEqual((response.data['count'], response.data['count_is_estimate']), (5, True))
+        exact = self.client.get('/api/notifications/', {'pagination': 'cursor', 'count': 'exact'})
+        self.assertEqual((exact.data['count'], exact.data['count_is_estimate']), (7, False))
+
+    def test_invalid_cursor_is_not_found(self):
+        self.assertEqual(self.client.get('/api/notifications/', {'cursor': 'not-a-cursor'}).status_code, 404)
+        paginator = KeysetPagination()
+        for position in (['x', 'y'], ['2026-01-01T00:00:00', 'y'], ['2026-01-01T00:00:00', True], [1, 2]):
+            tampered = paginator.encode_cursor(position)
+            self.assertEqual(self.client.get('/api/notifications/', {'cursor': tampered}).status_code, 404)
+
+    def test_establishment_lists_keep_page_shape_and_accept_cursor(self):
+        for number in range(3):
+            Establishment.objects.create(
+                name=f'Plant {number}', nature_of_business='Manufacturing', year_established='2000',
+                province='Ilocos Norte', city='Laoag', barangay='1', street_building='Main',
+                postal_code='2900', latitude='18.190000', longitude='120.590000',
+            )
+        page = self.client.get('/api/establishments/', {'page': 2, 'page_size': 2}).data
+        self.assertEqual((page['count'], page['page'], page['total_pages'], len(page['results'])), (3, 2, 2, 1))
+        # The maps ask for everything in one page; the legacy lists stay uncapped in practice
+        page = self.client.get('/api/establishments/', {'page_size': 10000}).data
+        self.assertEqual((page['page_size'], len(page['results'])), (10000, 3))
+
+        seen, _ = self._walk('/api/establishments/my_establishments/', {'pagination': 'cursor', 'page_size': 2})
+        self.assertEqual(len(seen), 3)
+
+
+REPLICA_CONFIGURED = settings.REPLICA_DATABASE_ALIAS in settings.DATABASES
+
+
+@skipUnless(REPLICA_CONFIGURED, "needs a second database under REPLICA_DATABASE_ALIAS (e.g. two SQLite databases)")
+class ReadReplicaRoutingTest(APITestCase):
+    databases = {'default', settings.REPLICA_DATABASE_ALIAS} if REPLICA_CONFIGURED else {'default'}
+
+    def setUp(self):
+        cache.clear()
+        replica_health.reset()
+        self.alias = settings.REPLICA_DATABASE_ALIAS
+        self.chief = User.objects.create_user(
+            email='replica@example.com', password='testpass123', password_provided=True,
+            userlevel='Division Chief'
+        )
+        self.client.force_authenticate(user=self.chief)
+
+    def tearDown(self):
+        replica_health.reset()
+
+    def _replica_queries(self, request):
+        with CaptureQueriesContext(connections[self.alias]) as queries:
+            response = request()
+            if getattr(response, 'streaming', False):
+                b''.join(response.streaming_content)
+        self.assertLess(response.status_code, 400)
+        return len(queries)
+
+    def test_reads_outside_replica_blocks_use_primary(self):
+        self.assertEqual(Inspection.objects.all().db, 'default')
+        with read_from_replica() as alias:
+            self.assertEqual(alias, self.alias)
+            self.assertEqual(Inspection.objects.all().db, self.alias)
+            self.assertEqual(router.db_for_write(Inspection), 'default')
+        self.assertEqual(Inspection.objects.all().db, 'default')
+
+    def test_report_endpoints_read_replica(self):
+        self.assertGreater(self._replica_queries(lambda: self.client.get('/api/legal-reports/')), 0)
+        self.assertGreater(self._replica_queries(lambda: self.client.get('/api/legal-reports/statistics/')), 0)
+        self.assertGreater(
+            self._replica_queries(lambda: self.client.get('/api/inspections/compliance_by_law/')), 0
+        )
+        # Regular API reads stay on the primary
+        self.assertEqual(self._replica_queries(lambda: self.client.get('/api/notifications/')), 0)
+
+    def test_streamed_report_reads_replica_while_iterating(self):
+        from reports.models import ReportAccess
+
+        ReportAccess.objects.using(self.alias).create(role='Division Chief', report_type='inspection')
+        queries = self._replica_queries(lambda: self.client.post('/api/reports/generate/', {
+            'report_type': 'inspection', 'time_filter': 'custom',
+            'date_from': '2000-01-01', 'date_to': '2100-01-01', 'format': 'ndjson',
+        }, format='json'))
+        self.assertGreater(queries, 1)
+
+    def test_writer_sticks_to_primary(self):
+        self.client.post('/api/notifications/mark-all-read/')
+        self.assertEqual(self._replica_queries(lambda: self.client.get('/api/legal-reports/')), 0)
+
+        other = User.objects.create_user(
+            email='replica-other@example.com', password='testpass123', password_provided=True,
+            userlevel='Division Chief'
+        )
+        self.client.force_authenticate(user=other)
+        self.assertGreater(self._replica_queries(lambda: self.client.get('/api/legal-reports/')), 0)
+
+    @override_settings(REPLICA_MAX_LAG_SECONDS=5)
+    def test_lagging_or_unreachable_replica_falls_back_to_primary(self):
+        with mock.patch('core.db_router.measure_replica_lag', return_value=30.0) as measure:
+            with self.assertLogs('core.db_router', level='WARNING'):
+                self.assertEqual(self._replica_queries(lambda: self.client.get('/api/legal-reports/')), 0)
+            # Lag is re-measured once per REPLICA_LAG_CHECK_INTERVAL, not per request
+            self.client.get('/api/legal-reports/')
+            self.assertEqual(measure.call_count, 1)
+
+        replica_health.reset()
+        with mock.patch('core.db_router.measure_replica_lag', return_value=None):
+            self.assertEqual(self._replica_queries(lambda: self.client.get('/api/legal-reports/')), 0)
+
+
+class ReferenceDataRegistryTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        reference_data.invalidate()
+        self.law = Law.objects.create(
+            law_title='Clean Air Act', reference_code='RA-8749', description='Air quality',
+            category='Air', effective_date='1999-06-23',
+        )
+        self.user = User.objects.create_user(
+            email='refdata@example.com', password='testpass123', password_provided=True,
+            userlevel='Admin'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def tearDown(self):
+        # Rolled-back test rows must not outlive the test in the process-wide registry
+        reference_data.invalidate()
+
+    def test_loaded_once_per_process(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(ComplianceQuota.get_law_details('RA-8749')['law_title'], 'Clean Air Act')
+            self.assertEqual(ComplianceQuota.get_active_laws(), ['RA-8749'])
+            self.assertIsNone(ComplianceQuota.get_law_details('RA-0000'))
+            self.assertIn(reference_data.user_has_district(), (True, False))
+
+    def test_law_changes_reload_registry(self):
+        self.assertEqual(reference_data.active_laws(), ['RA-8749'])
+        self.law.status = 'Inactive'
+        self.law.save()
+        self.assertEqual(reference_data.active_laws(), [])
+        self.assertEqual(reference_data.law_details('RA-8749')['status'], 'Inactive')
+        self.law.delete()
+        self.assertIsNone(reference_data.law_details('RA-8749'))
+
+    @override_settings(REFERENCE_DATA_CHECK_INTERVAL=0)
+    def test_other_process_changes_are_picked_up(self):
+        reference_data.active_laws()
+        # Another worker saved a law: only the shared version moves here
+        Law.objects.filter(pk=self.law.pk).update(status='Inactive')
+        bump(REFERENCE_DATA_SCOPE)
+        self.assertEqual(reference_data.active_laws(), [])
+
+    def test_district_lookup(self):
+        self.assertEqual(get_district_by_city('la union', ' San Fernando '), '1st District')
+        self.assertEqual(get_district_by_city('Ilocos Norte', 'burgos'), '1st District')
+        self.assertEqual(get_district_by_city('La Union', 'Burgos'), '2nd District')
+        self.assertEqual(get_district_by_city('Ilocos Sur', 'Vigan'), '1st District')
+        self.assertIsNone(get_district_by_city('Abra', 'Bangued'))
+
+    def test_bootstrap_endpoint_revalidates_with_etag(self):
+        response = self.client.get('/api/reference-data/')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertEqual([law['reference_code'] for law in response.data['laws']], ['RA-8749'])
+        self.assertIn({'value': 'Admin', 'label': 'Admin'}, response.data['roles'])
+        self.assertTrue(any(row['province'] == 'Pangasinan' for row in response.data['regions']))
+
+        with self.assertNumQueries(0):
+            cached = self.client.get('/api/reference-data/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+
+        self.law.law_title = 'Philippine Clean Air Act'
+        self.law.save()
+        changed = self.client.get('/api/reference-data/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
@@ -5,7 +5,7 @@ from django.conf.urls.static import static
 from rest_framework.routers import DefaultRouter
 from establishments.views import EstablishmentViewSet
 from audit.views import ActivityLogViewSet
-from .views import GlobalSearchView, SearchFilterOptionsView, SearchSuggestionsView  
+from .views import GlobalSearchView, ReferenceDataView, SearchFilterOptionsView, SearchSuggestionsView
 
 # DRF router for ViewSets
 router = DefaultRouter()
@@ -35,6 +35,9 @@ urlpatterns = [
     path('api/search/suggestions/', SearchSuggestionsView.as_view()),
     path('api/search/options/', SearchFilterOptionsView.as_view()),
 
+    # Laws / roles / districts bootstrap (ETag revalidated)
+    path('api/reference-data/', ReferenceDataView.as_view(), name='reference-data'),
+
     # DRF router
     path('api/', include(router.urls)),
 ]
@@ -3,12 +3,14 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth import get_user_model
 from django.db.models import Q
+from django.utils.http import parse_etags
 from establishments.models import Establishment
 from inspections.models import Inspection
 from establishments.serializers import EstablishmentSerializer
 from inspections.serializers import InspectionSerializer
 from users.serializers import UserSerializer
-from Levenshtein import distance as levenshtein_distance
+from .reference_data import reference_data
+from .search_index import search_index
 
 User = get_user_model()
 
@@ -22,6 +24,9 @@ def fuzzy_match(query, text, threshold=2):
     """
     if not query or not text:
         return False
+    
+    # Loaded on first search rather than by every process that imports the URLconf
+    from Levenshtein import distance as levenshtein_distance
         
     query_lower = query.lower()
     text_lower = text.lower()
@@ -43,6 +48,15 @@ def fuzzy_match(query, text, threshold=2):
     
     return False
 
+
+def indexed_candidates(queryset, candidate_ids):
+    """
+    Fetch index candidates from queryset in index rank order.
+    Rows filtered out by queryset (or deleted since indexing) are dropped.
+    """
+    rows = queryset.in_bulk(candidate_ids)
+    return [rows[pk] for pk in candidate_ids if pk in rows]
+
 class GlobalSearchView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -215,13 +229,14 @@ class SearchSuggestionsView(APIView):
             if role == 'Admin':
                 # Admin: See all users except admin accounts
                 all_users = User.objects.exclude(is_active=False).exclude(is_superuser=True).exclude(userlevel='Admin')
+                candidate_users = indexed_candidates(all_users, search_index.search_users(q))
             else:
                 # All other roles: No user search access
-                all_users = User.objects.none()
+                candidate_users = []
 
-            # Fuzzy match users
+            # Fuzzy match users: trigram index candidates, verified with Levenshtein
             matching_users = []
-            for user in all_users:
+            for user in candidate_users:
                 full_name = f"{user.first_name} {user.last_name}"
                 if (fuzzy_match(q, user.first_name or '', threshold=2) or
                     fuzzy_match(q, user.last_name or '', threshold=2) or
@@ -245,11 +260,13 @@ class SearchSuggestionsView(APIView):
 
             # ============ ESTABLISHMENT SUGGESTIONS ============
             # All roles can see all establishments (public information)
-            all_establishments = Establishment.objects.all()
+            candidate_establishments = indexed_candidates(
+                Establishment.objects.all(), search_index.search_establishments(q)
+            )
 
-            # Fuzzy match establishments
+            # Fuzzy match establishments: trigram index candidates, verified with Levenshtein
             matching_establishments = []
-            for est in all_establishments:
+            for est in candidate_establishments:
                 if (fuzzy_match(q, est.name, threshold=2) or 
                     fuzzy_match(q, est.nature_of_business or '', threshold=2) or
                     fuzzy_match(q, est.city or '', threshold=2)):
@@ -427,4 +444,20 @@ class SearchFilterOptionsView(APIView):
             "municipalities": [c for c in cities if c],
             "sectors": sector_options,
             "risk_levels": [],
-        })
\ No newline at end of file
+        })
+
+
+class ReferenceDataView(APIView):
+    """
+    Laws, roles, sections and Region 1 districts in one bootstrap payload.
+    Clients send the ETag back in If-None-Match and get a 304 until a law changes.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        payload, etag = reference_data.bootstrap()
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        client_etags = [tag.removeprefix("W/") for tag in parse_etags(request.headers.get("If-None-Match", ""))]
+        if etag in client_etags or "*" in client_etags:
+            return Response(status=304, headers=headers)
+        return Response(payload, headers=headers)
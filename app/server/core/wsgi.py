@@ -14,3 +14,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_wsgi_application()
+
+# Warm the search suggestions index so the first keystroke doesn't pay for it
+try:
+    from core.search_index import search_index
+    search_index.warm()
+except Exception as e:
+    import logging
+    logging.getLogger(__name__).warning(f"Search index warm-up skipped: {e}")
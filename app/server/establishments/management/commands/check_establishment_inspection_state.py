@@ -0,0 +1,74 @@
+"""
+Management command to verify (and optionally repair) the denormalized
+inspection state stored on establishments
+"""
+from django.core.management.base import BaseCommand
+from establishments.models import Establishment
+
+
+class Command(BaseCommand):
+    help = 'Compare establishment inspection state (active count, current inspection, last outcome) with the inspections'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Rewrite the establishments that are out of sync',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of establishments to check per batch (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        fix = options['fix']
+        batch_size = options['batch_size']
+        stored_fields = ['active_inspection_count', 'current_inspection_id', 'last_inspection_outcome', 'last_inspected_at']
+
+        self.stdout.write("Checking establishment inspection state...")
+
+        checked = 0
+        mismatched = []
+        last_pk = 0
+        while True:
+            rows = list(
+                Establishment.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', 'name', *stored_fields)[:batch_size]
+            )
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+            checked += len(rows)
+
+            states = Establishment.compute_inspection_states([row[0] for row in rows])
+            for pk, name, *values in rows:
+                stored = dict(zip(stored_fields, values))
+                if stored != states[pk]:
+                    mismatched.append(pk)
+                    differences = ', '.join(
+                        f"{field}: {stored[field]!r} != {states[pk][field]!r}"
+                        for field in stored_fields
+                        if stored[field] != states[pk][field]
+                    )
+                    self.stdout.write(self.style.WARNING(f"  {name} (#{pk}): {differences}"))
+
+        if mismatched and fix:
+            fixed = 0
+            for start in range(0, len(mismatched), batch_size):
+                fixed += Establishment.refresh_inspection_state(mismatched[start:start + batch_size])
+            self.stdout.write(
+                self.style.SUCCESS(f"Completed! Checked {checked} establishments, fixed {fixed}")
+            )
+        elif mismatched:
+            self.stdout.write(
+                self.style.ERROR(
+                    f"Checked {checked} establishments, {len(mismatched)} out of sync (re-run with --fix)"
+                )
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"Completed! Checked {checked} establishments, all in sync")
+            )
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.17 on 2026-10-17 00:44
+
+from django.db import migrations, models
+
+
+def fill_polygon_bounds(apps, schema_editor):
+    Establishment = apps.get_model('establishments', 'Establishment')
+    for establishment in Establishment.objects.exclude(polygon=None).only('pk', 'polygon').iterator():
+        polygon = establishment.polygon
+        if not isinstance(polygon, list) or len(polygon) < 3:
+            continue
+        try:
+            lats = [float(coord[0]) for coord in polygon]
+            lngs = [float(coord[1]) for coord in polygon]
+        except (TypeError, ValueError, IndexError):
+            continue
+        Establishment.objects.filter(pk=establishment.pk).update(
+            bbox_min_lat=min(lats), bbox_min_lng=min(lngs),
+            bbox_max_lat=max(lats), bbox_max_lng=max(lngs),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('establishments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='establishment',
+            name='bbox_max_lat',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='establishment',
+            name='bbox_max_lng',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='establishment',
+            name='bbox_min_lat',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='establishment',
+            name='bbox_min_lng',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_polygon_bounds, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 4.2.17 on 2026-10-17 01:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+CLOSED_STATUSES = ['CLOSED_COMPLIANT', 'CLOSED_NON_COMPLIANT']
+
+
+def fill_inspection_state(apps, schema_editor):
+    Establishment = apps.get_model('establishments', 'Establishment')
+    Inspection = apps.get_model('inspections', 'Inspection')
+    states = {}
+    links = (
+        Inspection.establishments.through.objects
+        .order_by('inspection__created_at', 'inspection_id')
+        .values_list('establishment_id', 'inspection_id', 'inspection__current_status', 'inspection__updated_at')
+    )
+    for establishment_id, inspection_id, status, updated_at in links.iterator():
+        state = states.setdefault(establishment_id, {
+            'active_inspection_count': 0,
+            'current_inspection_id': None,
+            'last_inspection_outcome': '',
+            'last_inspected_at': None,
+        })
+        if status not in CLOSED_STATUSES:
+            state['active_inspection_count'] += 1
+            state['current_inspection_id'] = inspection_id
+        elif state['last_inspected_at'] is None or updated_at >= state['last_inspected_at']:
+            state['last_inspection_outcome'] = 'COMPLIANT' if status == 'CLOSED_COMPLIANT' else 'NON_COMPLIANT'
+            state['last_inspected_at'] = updated_at
+    for establishment_id, state in states.items():
+        Establishment.objects.filter(pk=establishment_id).update(**state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inspections', '0012_compliance_rollup'),
+        ('establishments', '0002_establishment_polygon_bbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='establishment',
+            name='active_inspection_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='establishment',
+            name='current_inspection',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Most recently created inspection that is not closed', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='inspections.inspection'),
+        ),
+        migrations.AddField(
+            model_name='establishment',
+            name='last_inspected_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='establishment',
+            name='last_inspection_outcome',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='establishment',
+            index=models.Index(fields=['active_inspection_count'], name='establishme_active__9830bc_idx'),
+        ),
+        migrations.RunPython(fill_inspection_state, migrations.RunPython.noop),
+    ]
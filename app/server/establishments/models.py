@@ -3,6 +3,10 @@ from django.db import models
 from django.core.exceptions import ValidationError
 
 class Establishment(models.Model):
+    INSPECTION_STATE_FIELDS = (
+        'active_inspection_count', 'current_inspection', 'last_inspection_outcome', 'last_inspected_at'
+    )
+
     name = models.CharField(max_length=255, unique=True)
     nature_of_business = models.CharField(max_length=255)
     year_established = models.CharField(max_length=4)
@@ -20,10 +24,32 @@ class Establishment(models.Model):
     
     # Store polygon as JSON in database
     polygon = models.JSONField(blank=True, null=True)
+
+    # Polygon bounding box, kept in sync by save(); null when there is no polygon
+    bbox_min_lat = models.FloatField(blank=True, null=True, editable=False)
+    bbox_min_lng = models.FloatField(blank=True, null=True, editable=False)
+    bbox_max_lat = models.FloatField(blank=True, null=True, editable=False)
+    bbox_max_lng = models.FloatField(blank=True, null=True, editable=False)
     
     # Marker icon type (stores the key from ESTABLISHMENT_ICON_MAP)
     marker_icon = models.CharField(max_length=100, blank=True, null=True)
     
+    # Inspection state, maintained by inspections.signals through
+    # refresh_inspection_state(); verify/repair with
+    # `manage.py check_establishment_inspection_state`
+    active_inspection_count = models.PositiveIntegerField(default=0, editable=False)
+    current_inspection = models.ForeignKey(
+        'inspections.Inspection',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        help_text='Most recently created inspection that is not closed'
+    )
+    last_inspection_outcome = models.CharField(max_length=20, blank=True, default='', editable=False)
+    last_inspected_at = models.DateTimeField(blank=True, null=True, editable=False)
+
     # Status and timestamps
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -39,10 +65,100 @@ class Establishment(models.Model):
         ).exclude(pk=self.pk).exists():
             raise ValidationError({'name': 'An establishment with this name already exists.'})
     
+    @staticmethod
+    def polygon_bounds(polygon):
+        """(min_lat, min_lng, max_lat, max_lng) of a [[lat, lng], ...] polygon, or None"""
+        if not isinstance(polygon, list) or len(polygon) < 3:
+            return None
+        try:
+            lats = [float(coord[0]) for coord in polygon]
+            lngs = [float(coord[1]) for coord in polygon]
+        except (TypeError, ValueError, IndexError):
+            return None
+        return min(lats), min(lngs), max(lats), max(lngs)
+
+    def update_bounds(self):
+        bounds = self.polygon_bounds(self.polygon) or (None, None, None, None)
+        self.bbox_min_lat, self.bbox_min_lng, self.bbox_max_lat, self.bbox_max_lng = bounds
+
     def save(self, *args, **kwargs):
         self.full_clean()  # Run validation before saving
+        self.update_bounds()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'polygon' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {
+                'bbox_min_lat', 'bbox_min_lng', 'bbox_max_lat', 'bbox_max_lng'
+            }
+        elif update_fields is None and not self._state.adding and not kwargs.get('force_insert'):
+            # The inspection state is owned by refresh_inspection_state(); never write back a stale copy
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.INSPECTION_STATE_FIELDS
+            ]
         super().save(*args, **kwargs)
 
+    @staticmethod
+    def compute_inspection_states(establishment_ids):
+        """
+        {establishment_id: {field: value}} for the inspection state fields,
+        computed from the inspections linked to each establishment.
+        """
+        from inspections.models import Inspection
+
+        states = {
+            pk: {
+                'active_inspection_count': 0,
+                'current_inspection_id': None,
+                'last_inspection_outcome': '',
+                'last_inspected_at': None,
+            }
+            for pk in establishment_ids
+        }
+        links = (
+            Inspection.establishments.through.objects
+            .filter(establishment_id__in=list(states))
+            .order_by('inspection__created_at', 'inspection_id')
+            .values_list('establishment_id', 'inspection_id', 'inspection__current_status', 'inspection__updated_at')
+        )
+        for establishment_id, inspection_id, status, updated_at in links:
+            state = states[establishment_id]
+            if status not in Inspection.CLOSED_STATUSES:
+                state['active_inspection_count'] += 1
+                # Rows come oldest first, so the newest active inspection wins
+                state['current_inspection_id'] = inspection_id
+            elif state['last_inspected_at'] is None or updated_at >= state['last_inspected_at']:
+                state['last_inspection_outcome'] = (
+                    'COMPLIANT' if status == 'CLOSED_COMPLIANT' else 'NON_COMPLIANT'
+                )
+                state['last_inspected_at'] = updated_at
+        return states
+
+    @classmethod
+    def refresh_inspection_state(cls, establishment_ids):
+        """
+        Recompute the inspection state of the given establishments and write
+        the rows that changed. Returns the number of establishments updated.
+        """
+        from django.db import transaction
+
+        ids = {pk for pk in establishment_ids if pk}
+        if not ids:
+            return 0
+        stored_fields = ['active_inspection_count', 'current_inspection_id', 'last_inspection_outcome', 'last_inspected_at']
+        with transaction.atomic():
+            # Lock the rows first so concurrent refreshes of one establishment queue up
+            stored = {
+                row[0]: dict(zip(stored_fields, row[1:]))
+                for row in cls.objects.select_for_update().filter(pk__in=ids).values_list('pk', *stored_fields)
+            }
+            states = cls.compute_inspection_states(stored)
+            changed = 0
+            for pk, state in states.items():
+                if state != stored[pk]:
+                    cls.objects.filter(pk=pk).update(**state)
+                    changed += 1
+        return changed
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
@@ -50,4 +166,5 @@ class Establishment(models.Model):
             models.Index(fields=['nature_of_business']),
             models.Index(fields=['city']),
             models.Index(fields=['barangay']),
+            models.Index(fields=['active_inspection_count']),
         ]
\ No newline at end of file
@@ -1,7 +1,10 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from .models import Establishment
 from audit.utils import log_activity
+from core.search_index import search_index
+from .spatial_index import spatial_index
+from core.cache import invalidate_on
 
 @receiver(post_save, sender=Establishment)
 def log_establishment_save(sender, instance, created, **kwargs):
@@ -21,3 +24,34 @@ def log_establishment_save(sender, instance, created, **kwargs):
             module="ESTABLISHMENTS",
             description=f"Updated establishment: {instance.name}",
         )
+
+
+@receiver(post_save, sender=Establishment)
+def update_search_index(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search_index.index_establishment(instance)
+
+
+@receiver(post_delete, sender=Establishment)
+def remove_from_search_index(sender, instance, **kwargs):
+    search_index.remove_establishment(instance.pk)
+
+
+@receiver(post_save, sender=Establishment)
+def update_spatial_index(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'polygon' not in update_fields):
+        return
+    spatial_index.index_establishment(instance)
+
+
+@receiver(post_delete, sender=Establishment)
+def remove_from_spatial_index(sender, instance, **kwargs):
+    spatial_index.remove_establishment(instance.pk)
+
+
+def establishment_cache_scopes(establishment):
+    return ['establishments', f"establishment:{establishment.pk}"]
+
+
+# Retire cached establishment lists/filter options (core/cache.py)
+invalidate_on(Establishment, establishment_cache_scopes)
@@ -0,0 +1,171 @@
+"""
+In-process STRtree over establishment polygons, used by set_polygon's
+overlap enforcement.
+
+Only rows with a stored bounding box (i.e. a polygon of 3+ points) are
+loaded, and only valid, non-empty shapes are indexed. Polygon changes update
+the cached geometries one establishment at a time (establishments/signals.py);
+the immutable STRtree is rebuilt lazily from those cached shapes on the next
+query, so no polygon JSON is re-parsed. A version counter in the Django cache
+tells other workers that their copy is stale.
+"""
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_shapely = None
+
+SPATIAL_INDEX_VERSION_KEY = 'establishments:spatial_index:version'
+
+
+def load_shapely():
+    """
+    (Polygon, STRtree, unary_union) from shapely, imported on first use so
+    processes that never touch polygons don't load GEOS; Nones when shapely
+    is not installed.
+    """
+    global _shapely
+    if _shapely is None:
+        try:
+            from shapely.geometry import Polygon
+            from shapely.ops import unary_union
+            from shapely.strtree import STRtree
+            _shapely = (Polygon, STRtree, unary_union)
+        except Exception:
+            _shapely = (None, None, None)
+    return _shapely
+
+
+def polygon_to_shape(polygon):
+    """Shapely polygon for a [[lat, lng], ...] list, or None if it is not a usable area"""
+    ShapelyPolygon = load_shapely()[0]
+    if ShapelyPolygon is None or not isinstance(polygon, list) or len(polygon) < 3:
+        return None
+    try:
+        shape = ShapelyPolygon([(float(lng), float(lat)) for lat, lng in polygon])
+    except Exception:
+        return None
+    if not shape.is_valid or shape.area == 0:
+        return None
+    return shape
+
+
+class EstablishmentSpatialIndex:
+    """Establishment pk -> validated geometry, queried through an STRtree"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.shapes = {}
+        self.loaded = False
+        self._version = None
+        self._tree = None
+        self._tree_keys = []
+        self._tree_shapes = []
+
+    # ---------------------------------------------------------------- version
+    @staticmethod
+    def _current_version():
+        from django.core.cache import cache
+        try:
+            return cache.get(SPATIAL_INDEX_VERSION_KEY)
+        except Exception as e:
+            logger.error(f"Failed to read spatial index version: {str(e)}")
+            return None
+
+    @staticmethod
+    def _bump_version():
+        """Bump the shared version; returns the new value"""
+        from django.core.cache import cache
+        try:
+            return cache.incr(SPATIAL_INDEX_VERSION_KEY)
+        except ValueError:
+            version = time.time_ns()
+            cache.set(SPATIAL_INDEX_VERSION_KEY, version, None)
+            return version
+        except Exception as e:
+            logger.error(f"Failed to bump spatial index version: {str(e)}")
+            return None
+
+    # ------------------------------------------------------------------ build
+    def build(self):
+        """Load every establishment polygon from the database"""
+        from .models import Establishment
+
+        version = self._current_version()
+        shapes = {}
+        rows = Establishment.objects.filter(bbox_min_lat__isnull=False).values_list('pk', 'polygon')
+        for pk, polygon in rows.iterator(chunk_size=500):
+            shape = polygon_to_shape(polygon)
+            if shape is not None:
+                shapes[pk] = shape
+
+        with self._lock:
+            self.shapes = shapes
+            self._tree = None
+            self._version = version
+            self.loaded = True
+        logger.info(f"Spatial index built: {len(shapes)} establishment polygons")
+
+    def ensure_current(self):
+        if not self.loaded or self._current_version() != self._version:
+            self.build()
+
+    def reset(self):
+        with self._lock:
+            self.shapes = {}
+            self.loaded = False
+            self._version = None
+            self._tree = None
+
+    # ---------------------------------------------------------------- updates
+    def _update(self, pk, polygon=None):
+        with self._lock:
+            version = self._bump_version()
+            # Only our own bump may separate the new version from the one this copy
+            # was built at; anything else means another process changed polygons too
+            if not self.loaded or self._version is None or version != self._version + 1:
+                # Stale or never loaded here; the next query rebuilds anyway
+                self.loaded = False
+                return
+            # Geometry is only parsed for a loaded index
+            shape = polygon_to_shape(polygon)
+            if shape is None:
+                self.shapes.pop(pk, None)
+            else:
+                self.shapes[pk] = shape
+            self._tree = None
+            self._version = version
+
+    def index_establishment(self, establishment):
+        self._update(establishment.pk, establishment.polygon)
+
+    def remove_establishment(self, pk):
+        self._update(pk)
+
+    # ---------------------------------------------------------------- queries
+    def _get_tree(self):
+        with self._lock:
+            if self._tree is None:
+                self._tree_keys = list(self.shapes)
+                self._tree_shapes = [self.shapes[pk] for pk in self._tree_keys]
+                self._tree = load_shapely()[1](self._tree_shapes)
+            return self._tree, self._tree_keys, self._tree_shapes
+
+    def neighbours(self, shape, exclude_pk=None):
+        """Indexed shapes that intersect shape (other than exclude_pk)"""
+        if load_shapely()[1] is None:
+            return []
+        self.ensure_current()
+        tree, keys, shapes = self._get_tree()
+        if not keys:
+            return []
+        return [
+            shapes[index]
+            for index in tree.query(shape, predicate='intersects')
+            if keys[index] != exclude_pk
+        ]
+
+
+spatial_index = EstablishmentSpatialIndex()
@@ -1,3 +1,168 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+from .models import Establishment
+from .spatial_index import polygon_to_shape, spatial_index
+
+User = get_user_model()
+
+
+def square(lat, lng, size=0.01):
+    return [[lat, lng], [lat + size, lng], [lat + size, lng + size], [lat, lng + size]]
+
+
+class PolygonOverlapTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        spatial_index.reset()
+        self.addCleanup(spatial_index.reset)
+
+        self.user = User.objects.create_user(
+            email='polygons@example.com', password='testpass123', password_provided=True,
+            userlevel='Admin'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _establishment(self, name, polygon=None):
+        return Establishment.objects.create(
+            name=name, nature_of_business='Manufacturing', year_established='2000',
+            province='La Union', city='San Fernando', barangay='Poro',
+            street_building='Main St', postal_code='2500',
+            latitude='16.600000', longitude='120.300000', polygon=polygon,
+        )
+
+    def test_bounding_box_tracks_polygon(self):
+        establishment = self._establishment('Boxed', square(16.6, 120.3))
+        self.assertAlmostEqual(establishment.bbox_min_lat, 16.6)
+        self.assertAlmostEqual(establishment.bbox_max_lng, 120.31)
+
+        establishment.polygon = []
+        establishment.save()
+        establishment.refresh_from_db()
+        self.assertIsNone(establishment.bbox_min_lat)
+
+    def test_set_polygon_trims_overlap_with_neighbour(self):
+        self._establishment('Neighbour', square(16.6, 120.3))
+        target = self._establishment('Target')
+
+        response = self.client.post(
+            f'/api/establishments/{target.pk}/set_polygon/',
+            {'polygon': square(16.605, 120.3)}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(min(lat for lat, _ in response.data['polygon']), 16.61 - 1e-9)
+
+    def test_neighbours_only_returns_intersecting_shapes(self):
+        near = self._establishment('Near', square(16.6, 120.3))
+        self._establishment('Far', square(17.5, 121.0))
+        candidates = spatial_index.neighbours(polygon_to_shape(square(16.605, 120.305)))
+        self.assertEqual(candidates, [spatial_index.shapes[near.pk]])
+
+    def test_polygon_changes_update_index_without_rebuild(self):
+        self._establishment('First', square(16.6, 120.3))
+        spatial_index.ensure_current()
+
+        with mock.patch.object(spatial_index, 'build', wraps=spatial_index.build) as build:
+            moved = self._establishment('Second', square(16.7, 120.4))
+            spatial_index.ensure_current()
+            build.assert_not_called()
+        self.assertIn(moved.pk, spatial_index.shapes)
+
+        moved.delete()
+        self.assertNotIn(moved.pk, spatial_index.shapes)
+
+    def test_concurrent_bump_marks_index_stale(self):
+        self._establishment('First', square(16.6, 120.3))
+        spatial_index.ensure_current()
+
+        # Another process changes a polygon between our version read and our bump
+        bump = spatial_index._bump_version
+        with mock.patch.object(spatial_index, '_bump_version', side_effect=lambda: bump() and bump()):
+            self._establishment('Second', square(16.7, 120.4))
+        self.assertFalse(spatial_index.loaded)
+
+
+class EstablishmentInspectionStateTest(APITestCase):
+    def setUp(self):
+        self.inspector = User.objects.create_user(
+            email='inspector@example.com', password='testpass123', password_provided=True,
+            userlevel='Monitoring Personnel'
+        )
+        self.plant = self._establishment('Plant')
+        self.depot = self._establishment('Depot')
+
+    def _establishment(self, name):
+        return Establishment.objects.create(
+            name=name, nature_of_business='Manufacturing', year_established='2000',
+            province='La Union', city='San Fernando', barangay='Poro',
+            street_building='Main St', postal_code='2500',
+            latitude='16.600000', longitude='120.300000',
+        )
+
+    def _inspection(self, *establishments, status='MONITORING_ASSIGNED'):
+        from inspections.models import Inspection
+
+        inspection = Inspection.objects.create(
+            law='RA-8749', current_status=status, assigned_to=self.inspector
+        )
+        inspection.establishments.set(establishments)
+        return inspection
+
+    def _state(self, establishment):
+        establishment.refresh_from_db()
+        return (
+            establishment.active_inspection_count, establishment.current_inspection_id,
+            establishment.last_inspection_outcome,
+        )
+
+    def test_state_follows_links_status_and_deletion(self):
+        inspection = self._inspection(self.plant)
+        self.assertEqual(self._state(self.plant), (1, inspection.pk, ''))
+        self.assertEqual(self._state(self.depot), (0, None, ''))
+
+        inspection.current_status = 'CLOSED_NON_COMPLIANT'
+        inspection.save()
+        self.assertEqual(self._state(self.plant), (0, None, 'NON_COMPLIANT'))
+
+        reopened = self._inspection(self.plant, self.depot)
+        self.assertEqual(self._state(self.depot), (1, reopened.pk, ''))
+        reopened.establishments.remove(self.depot)
+        self.assertEqual(self._state(self.depot), (0, None, ''))
+
+        reopened.delete()
+        self.assertEqual(self._state(self.plant), (0, None, 'NON_COMPLIANT'))
+
+    def test_stale_instance_save_keeps_state(self):
+        stale = Establishment.objects.get(pk=self.plant.pk)
+        inspection = self._inspection(self.plant)
+        stale.nature_of_business = 'Food processing'
+        stale.save()
+        self.assertEqual(self._state(self.plant), (1, inspection.pk, ''))
+
+    def test_endpoints_use_state(self):
+        self._inspection(self.plant)
+        self.client.force_authenticate(user=self.inspector)
+
+        available = self.client.get('/api/establishments/available_for_inspection/')
+        self.assertEqual([row['name'] for row in available.data['results']], ['Depot'])
+
+        mine = self.client.get('/api/establishments/my_establishments/')
+        self.assertEqual([row['name'] for row in mine.data['results']], ['Plant'])
+
+    def test_consistency_command_repairs_drift(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        inspection = self._inspection(self.plant)
+        Establishment.objects.filter(pk=self.plant.pk).update(active_inspection_count=0, current_inspection=None)
+
+        out = StringIO()
+        call_command('check_establishment_inspection_state', stdout=out)
+        self.assertIn('1 out of sync', out.getvalue())
+        self.assertEqual(self._state(self.plant), (0, None, ''))
+
+        call_command('check_establishment_inspection_state', '--fix', stdout=StringIO())
+        self.assertEqual(self._state(self.plant), (1, inspection.pk, ''))
@@ -5,31 +5,29 @@ from rest_framework.response import Response
 from django.contrib.auth import get_user_model
 from .models import Establishment
 from .serializers import EstablishmentSerializer
+from .spatial_index import load_shapely, spatial_index
 from django.db.models import Q
 from audit.constants import AUDIT_ACTIONS, AUDIT_MODULES
 from audit.utils import log_activity
-
-try:
-    from shapely.geometry import Polygon as ShapelyPolygon, MultiPolygon as ShapelyMultiPolygon
-    from shapely.ops import unary_union
-except Exception:
-    ShapelyPolygon = None
-    ShapelyMultiPolygon = None
-    unary_union = None
+from core.pagination import ListCursorOrPagePagination
 
 User = get_user_model()
 
+
 class EstablishmentViewSet(viewsets.ModelViewSet):
     queryset = Establishment.objects.all()
     serializer_class = EstablishmentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # Legacy page shape by default; ?pagination=cursor / ?cursor=... for keyset paging on (created_at, id)
+    pagination_class = ListCursorOrPagePagination
+    
+    def _paginated_response(self, queryset, paginator=None):
+        paginator = paginator or self.paginator
+        establishments = paginator.paginate_queryset(queryset, self.request, view=self)
+        serializer = self.get_serializer(establishments, many=True)
+        return paginator.get_paginated_response(serializer.data)
     
     def list(self, request, *args, **kwargs):
-        # Get pagination parameters
-        
-        page = int(request.query_params.get('page', 1))
-        page_size = int(request.query_params.get('page_size', 10))
-        
         # Get filtered queryset
         queryset = self.get_queryset()
         
@@ -50,25 +48,7 @@ class EstablishmentViewSet(viewsets.ModelViewSet):
         if province:
             queryset = queryset.filter(province__icontains=province)
         
-        # Calculate pagination
-        total_count = queryset.count()
-        start_index = (page - 1) * page_size
-        end_index = start_index + page_size
-        
-        # Apply pagination
-        establishments = queryset[start_index:end_index]
-        
-        # Serialize data
-        serializer = self.get_serializer(establishments, many=True)
-        
-        # Return paginated response
-        return Response({
-            'count': total_count,
-            'page': page,
-            'page_size': page_size,
-            'total_pages': (total_count + page_size - 1) // page_size,
-            'results': serializer.data
-        })
+        return self._paginated_response(queryset)
     
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -136,21 +116,17 @@ class EstablishmentViewSet(viewsets.ModelViewSet):
             )
     
     def send_establishment_creation_notification(self, establishment, created_by):
+        from notifications.dispatcher import notify_roles
+
         # Users who should be notified about new establishments
         notify_userlevels = ["Admin", "Legal Unit", "Division Chief", "Section Chief", "Unit Head"]
-        
-        # Get all users with these levels
-        users_to_notify = User.objects.filter(userlevel__in=notify_userlevels, is_active=True)
-        
-        for recipient in users_to_notify:
-            from notifications.models import Notification
-            Notification.objects.create(
-                recipient=recipient,
-                sender=created_by,
-                notification_type='new_establishment',
-                title='New Establishment Created',
-                message=f'A new establishment "{establishment.name}" has been created by {created_by.email}.'
-            )
+        notify_roles(
+            notify_userlevels,
+            'new_establishment',
+            'New Establishment Created',
+            f'A new establishment "{establishment.name}" has been created by {created_by.email}.',
+            sender=created_by,
+        )
     
     @action(detail=True, methods=['post'])
     def set_polygon(self, request, pk=None):
@@ -175,6 +151,7 @@ class EstablishmentViewSet(viewsets.ModelViewSet):
             was_adjusted = False
             adjustment_message = ""
             
+            ShapelyPolygon, _, unary_union = load_shapely()
             if ShapelyPolygon is not None and polygon_data and len(polygon_data) >= 3:
                 # Build current polygon
                 try:
@@ -184,17 +161,8 @@ class EstablishmentViewSet(viewsets.ModelViewSet):
                 if not drawn.is_valid or drawn.area == 0:
                     return Response({'error': 'Invalid or empty polygon'}, status=status.HTTP_400_BAD_REQUEST)
 
-                # Collect other establishment polygons
-                others = Establishment.objects.exclude(pk=establishment.pk).values_list('polygon', flat=True)
-                shapes = []
-                for poly in others:
-                    if isinstance(poly, list) and len(poly) >= 3:
-                        try:
-                            shp = ShapelyPolygon([(float(lng), float(lat)) for lat, lng in poly])
-                            if shp.is_valid and shp.area > 0:
-                                shapes.append(shp)
-                        except Exception:
-                            continue
+                # Only establishments whose shapes intersect this one can overlap it
+                shapes = spatial_index.neighbours(drawn, exclude_pk=establishment.pk)
                 if shapes:
                     union = unary_union(shapes)
                     diff = drawn.difference(union)
@@ -279,22 +247,14 @@ class EstablishmentViewSet(viewsets.ModelViewSet):
     def available_for_inspection(self, request):
         """
         Get establishments that are available for inspection (not currently under active inspection).
-        An establishment is considered unavailable if it has any inspection with status not in:
-        - CLOSED_COMPLIANT
-        - CLOSED_NON_COMPLIANT
-        - CREATED (initial state, can be overridden)
+        An establishment is unavailable while any of its inspections is not closed
+        (CLOSED_COMPLIANT / CLOSED_NON_COMPLIANT); see Establishment.active_inspection_count.
         """
-        from inspections.models import Inspection
-        
-        # Get pagination parameters
-        page = int(request.query_params.get('page', 1))
-        page_size = int(request.query_params.get('page_size', 10))
-        
         # Get search parameter
         search = request.query_params.get('search', '').strip()
         
-        # Get all establishments
-        queryset = Establishment.objects.all()
+        # Establishments without an open inspection (maintained counter, indexed)
+        queryset = Establishment.objects.filter(active_inspection_count=0)
         
         # Apply search filter if provided
         if search:
@@ -307,43 +267,7 @@ class EstablishmentViewSet(viewsets.ModelViewSet):
                 Q(nature_of_business__icontains=search)
             )
         
-        # Exclude establishments that have active inspections
-        # Active statuses are all except the final closed states
-        active_statuses = [
-            'SECTION_ASSIGNED', 'SECTION_IN_PROGRESS', 'SECTION_COMPLETED',
-            'UNIT_ASSIGNED', 'UNIT_IN_PROGRESS', 'UNIT_COMPLETED',
-            'MONITORING_ASSIGNED', 'MONITORING_IN_PROGRESS', 
-            'MONITORING_COMPLETED_COMPLIANT', 'MONITORING_COMPLETED_NON_COMPLIANT',
-            'UNIT_REVIEWED', 'SECTION_REVIEWED', 'DIVISION_REVIEWED',
-            'LEGAL_REVIEW', 'NOV_SENT', 'NOO_SENT'
-        ]
-        
-        # Get establishment IDs that have active inspections
-        active_inspection_establishment_ids = Inspection.objects.filter(
-            current_status__in=active_statuses
-        ).values_list('establishments', flat=True)
-        
-        # Exclude establishments with active inspections
-        queryset = queryset.exclude(id__in=active_inspection_establishment_ids)
-        
-        # Calculate pagination
-        total_count = queryset.count()
-        start_index = (page - 1) * page_size
-        end_index = start_index + page_size
-        
-        # Apply pagination
-        establishments = queryset[start_index:end_index]
-        
-        # Serialize data
-        serializer = self.get_serializer(establishments, many=True)
-        
-        return Response({
-            'results': serializer.data,
-            'count': total_count,
-            'page': page,
-            'page_size': page_size,
-            'total_pages': (total_count + page_size - 1) // page_size
-        })
+        return self._paginated_response(queryset)
     
     @action(detail=False, methods=['get'])
     def my_establishments(self, request):
@@ -355,21 +279,6 @@ class EstablishmentViewSet(viewsets.ModelViewSet):
         from inspections.models import Inspection
         
         user = request.user
-        page = int(request.query_params.get('page', 1))
-        page_size = int(request.query_params.get('page_size', 10000))
-        
-        # Define active inspection statuses (not closed)
-        active_statuses = [
-            'CREATED',
-            'SECTION_ASSIGNED', 'SECTION_IN_PROGRESS', 
-            'SECTION_COMPLETED_COMPLIANT', 'SECTION_COMPLETED_NON_COMPLIANT',
-            'UNIT_ASSIGNED', 'UNIT_IN_PROGRESS', 
-            'UNIT_COMPLETED_COMPLIANT', 'UNIT_COMPLETED_NON_COMPLIANT',
-            'MONITORING_ASSIGNED', 'MONITORING_IN_PROGRESS',
-            'MONITORING_COMPLETED_COMPLIANT', 'MONITORING_COMPLETED_NON_COMPLIANT',
-            'UNIT_REVIEWED', 'SECTION_REVIEWED', 'DIVISION_REVIEWED',
-            'LEGAL_REVIEW', 'NOV_SENT', 'NOO_SENT'
-        ]
         
         # Role-based filtering
         if user.userlevel in ['Admin', 'Division Chief', 'Legal Unit']:
@@ -377,20 +286,17 @@ class EstablishmentViewSet(viewsets.ModelViewSet):
             queryset = Establishment.objects.all()
         else:
             # Section Chief, Unit Head, Monitoring Personnel
-            # Get establishment IDs from active inspections assigned to this user
-            # Handle ManyToMany field properly
-            inspections = Inspection.objects.filter(
-                assigned_to=user,
-                current_status__in=active_statuses
-            ).prefetch_related('establishments')
-            
-            # Collect unique establishment IDs from the ManyToMany relationship
-            establishment_ids = set()
-            for inspection in inspections:
-                establishment_ids.update(inspection.establishments.values_list('id', flat=True))
-            
-            # Filter establishments
-            queryset = Establishment.objects.filter(id__in=establishment_ids)
+            # Establishments whose open inspection is assigned to this user. The rare
+            # establishment with several open inspections is checked through the link table.
+            assigned_links = Inspection.establishments.through.objects.filter(
+                inspection__assigned_to=user
+            ).exclude(
+                inspection__current_status__in=Inspection.CLOSED_STATUSES
+            ).values('establishment_id')
+            queryset = Establishment.objects.filter(
+                Q(current_inspection__assigned_to=user) |
+                Q(active_inspection_count__gt=1, id__in=assigned_links)
+            )
         
         # Apply search if provided
         search = request.query_params.get('search', '').strip()
@@ -404,24 +310,7 @@ class EstablishmentViewSet(viewsets.ModelViewSet):
                 Q(nature_of_business__icontains=search)
             )
         
-        # Calculate pagination
-        total_count = queryset.count()
-        start_index = (page - 1) * page_size
-        end_index = start_index + page_size
-        
-        # Apply pagination
-        establishments = queryset[start_index:end_index]
-        
-        # Serialize
-        serializer = self.get_serializer(establishments, many=True)
-        
-        return Response({
-            'count': total_count,
-            'page': page,
-            'page_size': page_size,
-            'total_pages': (total_count + page_size - 1) // page_size if page_size > 0 else 1,
-            'results': serializer.data
-        })
+        return self._paginated_response(queryset)
     
     @action(detail=False, methods=['get'])
     def location_options(self, request):
@@ -17,9 +17,10 @@ HELP_BACKUPS_DIR = os.path.join(HELP_DATA_DIR, 'backups')
 HELP_TOPICS_FILE = os.path.join(HELP_DATA_DIR, 'help_topics.json')
 HELP_CATEGORIES_FILE = os.path.join(HELP_DATA_DIR, 'help_categories.json')
 
-# Ensure directories exist
-os.makedirs(HELP_DATA_DIR, exist_ok=True)
-os.makedirs(HELP_BACKUPS_DIR, exist_ok=True)
+
+def ensure_help_dirs():
+    """Create the help data and backup directories (on first write, not at import)"""
+    os.makedirs(HELP_BACKUPS_DIR, exist_ok=True)
 
 
 def get_help_topics():
@@ -260,6 +261,8 @@ def save_help_topics(topics):
     if deleted_count > 0:
         print(f"Deleted {deleted_count} unused image(s)")
     
+    ensure_help_dirs()
+    
     # Create backup before saving
     if os.path.exists(HELP_TOPICS_FILE):
         backup_file = os.path.join(
@@ -301,6 +304,8 @@ def save_help_categories(categories):
             if field not in category:
                 raise ValueError(f"Category missing required field: {field}")
     
+    ensure_help_dirs()
+    
     # Create backup before saving
     if os.path.exists(HELP_CATEGORIES_FILE):
         backup_file = os.path.join(
@@ -0,0 +1,306 @@
+"""
+Delta auto-save for inspection forms.
+
+Clients PATCH only the checklist sections that changed, as a JSON Merge Patch
+(RFC 7386: objects merge key by key, null removes a key, anything else
+replaces), together with the form version they last saw. A request whose
+version is not the current one is rejected so the client can reload instead
+of overwriting someone else's changes.
+
+Accepted deltas are merged into a short write-behind buffer in the cache
+named by AUTOSAVE_CACHE_ALIAS, one entry per form, under the form's row lock.
+The buffer is written to the database in a single UPDATE when:
+  - AUTOSAVE_COALESCE_SECONDS have passed since its first pending delta
+    (flush_inspection_autosave runs on Celery with that countdown, or inline
+    when the broker is unreachable), or
+  - a later save arrives after that window.
+AUTOSAVE_COALESCE_SECONDS = 0 writes every delta straight through, and so does
+a per-process buffer cache (locmem/dummy), which other workers and Celery
+could not see. Buffered deltas have already been acknowledged to the client
+and exist nowhere else until flushed, so the buffer belongs in a dedicated
+Redis that never evicts (AUTOSAVE_REDIS_URL, maxmemory-policy noeviction).
+
+Readers going through InspectionFormSerializer see buffered deltas merged
+in. Any other write of the form (submit, signature upload, legacy full
+auto-save, ...) first flushes the pending buffer under the row lock, then
+writes only what it changed itself on top (carry_flushed_deltas): checklist
+sections it did not touch keep the flushed deltas. The buffer is kept for
+AUTOSAVE_BUFFER_TTL seconds, so deltas survive a delayed or missed flush
+task until the next write of the form. History/audit rows for auto-saves are
+throttled to one per inspection per AUTOSAVE_HISTORY_INTERVAL seconds.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+AUTOSAVE_SECTIONS = (
+    'general', 'purpose', 'permits', 'complianceItems', 'systems',
+    'recommendationState', 'lawFilter', 'findingImages', 'generalFindings',
+)
+
+AUTOSAVE_REMARKS = 'Auto-saved inspection form'
+
+# Columns a flush may write besides checklist/version (see AutosaveBuffer._write)
+AUTOSAVE_COLUMNS = ('violations_found', 'compliance_decision', 'scheduled_at', 'inspected_by_id')
+
+_MISSING = object()
+
+
+def buffer_cache():
+    return caches[getattr(settings, 'AUTOSAVE_CACHE_ALIAS', 'default')]
+
+
+def coalesce_seconds():
+    """AUTOSAVE_COALESCE_SECONDS, or 0 when the buffer cache is not shared across processes"""
+    if isinstance(buffer_cache(), (LocMemCache, DummyCache)):
+        return 0
+    return getattr(settings, 'AUTOSAVE_COALESCE_SECONDS', 3)
+
+
+class StaleVersion(Exception):
+    """The client's form version is not the current one"""
+
+    def __init__(self, current_version):
+        super().__init__(f"Form is at version {current_version}")
+        self.current_version = current_version
+
+
+def apply_merge_patch(target, patch):
+    """Return target with an RFC 7386 merge patch applied (target is not modified)"""
+    if not isinstance(patch, dict):
+        return patch
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
+
+
+def combine_merge_patches(first, second):
+    """One merge patch equivalent to applying first, then second"""
+    if not isinstance(first, dict) or not isinstance(second, dict):
+        return second
+    combined = dict(first)
+    for key, value in second.items():
+        if isinstance(value, dict) and isinstance(combined.get(key), dict):
+            combined[key] = combine_merge_patches(combined[key], value)
+        else:
+            # Includes None: the removal has to survive into the combined patch
+            combined[key] = value
+    return combined
+
+
+def apply_general_fields(form, general):
+    """Copy the checklist's general section onto the form's own columns"""
+    if general.get('violations_found'):
+        form.violations_found = general['violations_found']
+    if general.get('compliance_observations'):
+        form.compliance_decision = general['compliance_observations']
+    if general.get('inspection_date_time'):
+        form.scheduled_at = general['inspection_date_time']
+
+
+def carry_flushed_deltas(form, base, flushed):
+    """
+    Rebase an unsaved form instance onto deltas flushed under it. base is the
+    row as it was before the flush, flushed the row after it. Top-level
+    checklist keys and AUTOSAVE_COLUMNS the caller changed relative to base
+    keep the caller's value; everything else takes the flushed value.
+    """
+    ours = form.checklist if isinstance(form.checklist, dict) else {}
+    before = base.checklist if isinstance(base.checklist, dict) else {}
+    merged = dict(flushed.checklist or {})
+    for key in set(ours) | set(before):
+        if ours.get(key, _MISSING) != before.get(key, _MISSING):
+            if key in ours:
+                merged[key] = ours[key]
+            else:
+                merged.pop(key, None)
+    form.checklist = merged
+    for column in AUTOSAVE_COLUMNS:
+        if getattr(form, column) == getattr(base, column):
+            setattr(form, column, getattr(flushed, column))
+
+
+def log_autosave_history(inspection, user, request=None):
+    """History + audit entry for an auto-save, at most once per inspection per AUTOSAVE_HISTORY_INTERVAL"""
+    from audit.constants import AUDIT_ACTIONS
+    from .models import InspectionHistory
+    from .views import audit_inspection_event
+
+    try:
+        due = cache.add(
+            f"autosave:history:{inspection.pk}", 1, getattr(settings, 'AUTOSAVE_HISTORY_INTERVAL', 300)
+        )
+    except Exception as e:
+        logger.warning(f"Cache unavailable for auto-save history throttle: {str(e)}")
+        due = True
+    if not due:
+        return False
+
+    InspectionHistory.objects.create(
+        inspection=inspection,
+        previous_status=inspection.current_status,
+        new_status=inspection.current_status,
+        changed_by=user,
+        remarks=AUTOSAVE_REMARKS
+    )
+    audit_inspection_event(
+        user,
+        inspection,
+        AUDIT_ACTIONS["UPDATE"],
+        f"{user.email} auto-saved inspection form",
+        request,
+        metadata={
+            "auto_save": True,
+            "remarks": AUTOSAVE_REMARKS,
+        },
+    )
+    return True
+
+
+class AutosaveBuffer:
+    """Pending merged deltas per form, kept in the shared buffer cache"""
+
+    @staticmethod
+    def _key(form_pk):
+        return f"autosave:form:{form_pk}"
+
+    def _get(self, form_pk):
+        try:
+            return buffer_cache().get(self._key(form_pk))
+        except Exception as e:
+            logger.warning(f"Cache unavailable for auto-save buffer of form {form_pk}: {str(e)}")
+            return None
+
+    def pending(self, form):
+        """The buffered state for a (locked) form, or None; drops state a full write superseded"""
+        state = self._get(form.pk)
+        if state is not None and state['base_version'] != form.version:
+            self.discard(form.pk)
+            return None
+        return state
+
+    def peek(self, form):
+        """Pending state still based on the form's stored version, without locking; memoized on the instance"""
+        if not hasattr(form, '_autosave_state'):
+            state = self._get(form.pk)
+            form._autosave_state = state if state is not None and state['base_version'] == form.version else None
+        return form._autosave_state
+
+    def checklist(self, form):
+        """The form's checklist as readers should see it: stored value plus buffered deltas"""
+        state = self.peek(form)
+        if state is None:
+            return form.checklist
+        return apply_merge_patch(form.checklist or {}, state['patch'])
+
+    def current_version(self, form):
+        state = self.peek(form)
+        return state['version'] if state else form.version
+
+    def buffered_version(self, form_pk):
+        """Version handed out for the form's pending deltas, or None"""
+        state = self._get(form_pk)
+        return state['version'] if state else None
+
+    def stage(self, form, user, version, sections, request=None):
+        """
+        Merge sections into the form's buffer. The form must be locked
+        (select_for_update) by the caller. Returns (new_version, last_saved, written).
+        Raises StaleVersion when version is not the current one.
+        """
+        state = self.pending(form)
+        current = state['version'] if state else form.version
+        if version != current:
+            raise StaleVersion(current)
+
+        now = timezone.now()
+        new_buffer = state is None
+        if new_buffer:
+            state = {'base_version': form.version, 'patch': {}, 'first_at': now.timestamp()}
+        state['patch'] = combine_merge_patches(state['patch'], sections)
+        state['version'] = current + 1
+        state['user_id'] = user.pk
+        state['last_saved'] = now.isoformat()
+
+        delay = coalesce_seconds()
+        if delay > 0 and now.timestamp() - state['first_at'] < delay:
+            try:
+                # Long enough to outlive a delayed or missed flush task; the next write of the form flushes it
+                buffer_cache().set(self._key(form.pk), state, max(getattr(settings, 'AUTOSAVE_BUFFER_TTL', 86400), delay * 20))
+            except Exception as e:
+                logger.warning(f"Cache unavailable, writing auto-save of form {form.pk} through: {str(e)}")
+            else:
+                if new_buffer:
+                    transaction.on_commit(lambda: schedule_flush(form.pk, delay))
+                return state['version'], state['last_saved'], False
+
+        self._write(form, state, user, request)
+        self.discard(form.pk)
+        return state['version'], state['last_saved'], True
+
+    def flush(self, form_pk, request=None):
+        """Write the form's pending deltas, if any; returns True when something was written"""
+        from django.contrib.auth import get_user_model
+        from .models import InspectionForm
+
+        with transaction.atomic():
+            form = InspectionForm.objects.select_for_update().filter(pk=form_pk).first()
+            if form is None:
+                self.discard(form_pk)
+                return False
+            state = self.pending(form)
+            if state is None:
+                return False
+            user = get_user_model().objects.filter(pk=state['user_id']).first()
+            self._write(form, state, user, request)
+            self.discard(form_pk)
+        return True
+
+    def _write(self, form, state, user, request=None):
+        checklist = apply_merge_patch(form.checklist or {}, state['patch'])
+        checklist.update({
+            'is_draft': True,
+            'last_saved': state['last_saved'],
+            'saved_by': state['user_id'],
+            'auto_save': True,
+        })
+        form.checklist = checklist
+        if 'general' in state['patch']:
+            apply_general_fields(form, checklist.get('general') or {})
+        if form.inspected_by_id is None:
+            form.inspected_by_id = state['user_id']
+        form.version = state['version']
+        form.save(bump_version=False, update_fields=['checklist', *AUTOSAVE_COLUMNS, 'version', 'updated_at'])
+        if user is not None:
+            log_autosave_history(form.inspection, user, request)
+
+    def discard(self, form_pk):
+        try:
+            buffer_cache().delete(self._key(form_pk))
+        except Exception as e:
+            logger.warning(f"Failed to drop auto-save buffer for form {form_pk}: {str(e)}")
+
+
+autosave_buffer = AutosaveBuffer()
+
+
+def schedule_flush(form_pk, delay):
+    """Flush the buffer after delay seconds on Celery; now, inline, when the broker is down"""
+    from .tasks import flush_inspection_autosave
+
+    try:
+        flush_inspection_autosave.apply_async(args=[form_pk], countdown=delay, retry=False)
+    except Exception as e:
+        logger.error(f"Could not queue auto-save flush for form {form_pk}, writing inline: {str(e)}")
+        autosave_buffer.flush(form_pk)
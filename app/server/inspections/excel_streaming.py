@@ -0,0 +1,121 @@
+"""
+Write-only (streaming) Excel exports for the report ViewSets.
+
+The regular generators build a styled, multi-sheet workbook in memory. With
+?stream=true the export_excel actions use this module instead: one data sheet
+written through openpyxl's write-only mode (rows are flushed to a temp file as
+they are appended), records serialized in chunks from a queryset iterator,
+and the finished file streamed back from disk in chunks.
+"""
+import tempfile
+
+from django.conf import settings
+from django.http import FileResponse
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def _date_part(value):
+    return value[:10] if value else 'N/A'
+
+
+def _report_status(record):
+    status = record.get('simplified_status', record.get('current_status', 'N/A')) or 'N/A'
+    if 'CLOSED' in status or 'SECTION_COMPLETED' in status:
+        return 'Completed'
+    return status
+
+
+def _legal_actions(record):
+    nov_noo = [label for label, key in (('NOV', 'has_nov'), ('NOO', 'has_noo')) if record.get(key)]
+    return ', '.join(nov_noo) if nov_noo else 'None'
+
+
+# (header, column width, value for a serialized record)
+INSPECTION_REPORT_COLUMNS = [
+    ('Inspection No.', 18, lambda r: r.get('code') or 'N/A'),
+    ('Establishment', 40, lambda r: r.get('establishment_name') or 'N/A'),
+    ('Law', 12, lambda r: r.get('law') or 'N/A'),
+    ('Inspection Date', 14, lambda r: _date_part(r.get('created_at'))),
+    ('Status', 26, _report_status),
+    ('NOV', 6, lambda r: '✓' if r.get('has_nov') else '✗'),
+    ('NOO', 6, lambda r: '✓' if r.get('has_noo') else '✗'),
+    ('Compliance Status', 18, lambda r: r.get('compliance_status') or 'PENDING'),
+    ('Inspected By', 28, lambda r: r.get('inspected_by_name') or 'Not Inspected'),
+]
+
+LEGAL_REPORT_COLUMNS = [
+    ('Inspection No.', 18, lambda r: r.get('inspection_code') or 'N/A'),
+    ('Establishment', 40, lambda r: r.get('establishment_name') or 'N/A'),
+    ('Billing Amount', 16, lambda r: float(r.get('amount') or 0)),
+    ('Billing Date', 14, lambda r: _date_part(r.get('sent_date'))),
+    ('Payment Status', 16, lambda r: r.get('payment_status') or 'UNPAID'),
+    ('Payment Date', 14, lambda r: r.get('payment_date') or 'N/A'),
+    ('NOV/NOO', 10, _legal_actions),
+    ('Compliance Status', 18, lambda r: r.get('compliance_status') or 'PENDING'),
+    ('Legal Actions', 18, lambda r: (r.get('legal_action') or 'NONE').replace('_', ' ').title()),
+    ('Remarks', 40, lambda r: (r.get('payment_notes') or r.get('recommendations') or 'N/A')[:100]),
+    ('Assigned Legal Officer', 28, lambda r: r.get('assigned_legal_officer') or 'N/A'),
+]
+
+
+def wants_streaming_export(request):
+    return request.query_params.get('stream') == 'true'
+
+
+def iter_serialized(queryset, serializer_class, context=None, chunk_size=500):
+    """Serialize a queryset chunk by chunk so only one chunk of instances is alive"""
+    chunk = []
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(obj)
+        if len(chunk) >= chunk_size:
+            yield from serializer_class(chunk, many=True, context=context).data
+            chunk = []
+    if chunk:
+        yield from serializer_class(chunk, many=True, context=context).data
+
+
+def stream_report_excel(queryset, serializer_class, columns, filename, context=None):
+    """Streaming export of up to EXCEL_STREAM_MAX_ROWS rows of an ordered queryset"""
+    max_rows = getattr(settings, 'EXCEL_STREAM_MAX_ROWS', 20000)
+    records = iter_serialized(queryset[:max_rows], serializer_class, context=context)
+    return streaming_excel_response(records, columns, filename)
+
+
+def streaming_excel_response(records, columns, filename, sheet_title='Detailed Data'):
+    """Write records through a write-only workbook and stream the file back"""
+    # openpyxl is only loaded by processes that actually export
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Font, PatternFill
+    from openpyxl.utils import get_column_letter
+
+    workbook = Workbook(write_only=True)
+    ws = workbook.create_sheet(title=sheet_title)
+
+    header_font = Font(name='Arial', size=12, bold=True, color='FFFFFF')
+    header_fill = PatternFill(start_color='0066CC', end_color='0066CC', fill_type='solid')
+    for index, (_, width, _) in enumerate(columns):
+        ws.column_dimensions[get_column_letter(index + 1)].width = width
+    ws.freeze_panes = 'A2'
+
+    header = []
+    for title, _, _ in columns:
+        cell = WriteOnlyCell(ws, value=title)
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = Alignment(horizontal='center', vertical='center')
+        header.append(cell)
+    ws.append(header)
+
+    for record in records:
+        ws.append([value(record) for _, _, value in columns])
+
+    # Anonymous temp file: removed automatically when FileResponse closes it
+    output = tempfile.TemporaryFile(suffix='.xlsx')
+    workbook.save(output)
+    output.seek(0)
+
+    response = FileResponse(output, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
+    response.block_size = 64 * 1024
+    return response
@@ -5,11 +5,9 @@ Run this command daily via cron or task scheduler:
 """
 from django.core.management.base import BaseCommand
 from django.utils import timezone
-from django.core.mail import send_mail
-from django.conf import settings
 from datetime import timedelta
 from inspections.models import ReinspectionSchedule
-from notifications.models import Notification
+from notifications.dispatcher import notify, queue_email
 from users.models import User
 import logging
 
@@ -51,13 +49,12 @@ class Command(BaseCommand):
         
         self.stdout.write(f"Found {upcoming_schedules.count()} upcoming reinspections")
         
-        # Get Division Chiefs
-        division_chiefs = User.objects.filter(
-            userlevel='Division Chief',
-            is_active=True
+        # Get Division Chiefs (resolved once for every schedule)
+        division_chiefs = list(
+            User.objects.filter(userlevel='Division Chief', is_active=True).only('id', 'email', 'first_name')
         )
         
-        if not division_chiefs.exists():
+        if not division_chiefs:
             self.stdout.write(self.style.WARNING("No active Division Chiefs found"))
             return
         
@@ -68,19 +65,18 @@ class Command(BaseCommand):
                 # Calculate days until due
                 days_until_due = (schedule.due_date - today).days
                 
-                # Create notification for each Division Chief
+                # One in-app notification per Division Chief, written in a single insert
+                notify(
+                    division_chiefs,
+                    'reinspection_reminder',
+                    f'Reinspection Reminder - {schedule.establishment.name}',
+                    self._create_reminder_message(schedule, days_until_due),
+                    related_object_type='reinspection_schedule',
+                    related_object_id=schedule.id
+                )
+                
                 for chief in division_chiefs:
-                    # Create in-app notification
-                    notification = Notification.objects.create(
-                        recipient=chief,
-                        notification_type='reinspection_reminder',
-                        title=f'Reinspection Reminder - {schedule.establishment.name}',
-                        message=self._create_reminder_message(schedule, days_until_due),
-                        related_object_type='reinspection_schedule',
-                        related_object_id=schedule.id
-                    )
-                    
-                    # Send email notification
+                    # Queue email notification (delivered by the Celery worker)
                     if not dry_run:
                         self._send_email_reminder(chief, schedule, days_until_due)
                     
@@ -136,7 +132,7 @@ Please schedule the reinspection accordingly.
         return message
 
     def _send_email_reminder(self, chief, schedule, days_until_due):
-        """Send email reminder to Division Chief"""
+        """Queue email reminder to Division Chief"""
         try:
             compliance_text = "Compliant" if schedule.compliance_status == 'COMPLIANT' else "Non-Compliant"
             
@@ -170,16 +166,10 @@ Best regards,
 Environmental Management System
             """.strip()
             
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[chief.email],
-                fail_silently=False,
-            )
+            queue_email(subject, message, [chief.email])
             
-            logger.info(f"Email reminder sent to {chief.email} for {schedule.establishment.name}")
+            logger.info(f"Email reminder queued for {chief.email} for {schedule.establishment.name}")
             
         except Exception as e:
-            logger.error(f"Failed to send email reminder to {chief.email}: {str(e)}")
+            logger.error(f"Failed to queue email reminder to {chief.email}: {str(e)}")
             raise
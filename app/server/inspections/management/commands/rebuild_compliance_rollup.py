@@ -0,0 +1,28 @@
+"""
+Management command to rebuild the materialized daily compliance rollup
+"""
+from django.core.management.base import BaseCommand
+from inspections.models import ComplianceRollup
+
+
+class Command(BaseCommand):
+    help = 'Backfill/rebuild ComplianceRollup daily counts from inspection forms'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rows to read and write per batch (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Rebuilding daily compliance rollup...")
+
+        counted, rows = ComplianceRollup.rebuild(batch_size=options['batch_size'])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Completed! Counted {counted} inspection forms into {rows} rollup rows"
+            )
+        )
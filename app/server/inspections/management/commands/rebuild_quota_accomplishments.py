@@ -0,0 +1,28 @@
+"""
+Management command to rebuild the materialized quota accomplishment counters
+"""
+from django.core.management.base import BaseCommand
+from inspections.models import QuotaAccomplishment
+
+
+class Command(BaseCommand):
+    help = 'Backfill/rebuild QuotaAccomplishment counters from finished inspections'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rows to read and write per batch (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Rebuilding quota accomplishment counters...")
+
+        counted, rows = QuotaAccomplishment.rebuild(batch_size=options['batch_size'])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Completed! Counted {counted} finished inspections into {rows} law/month counters"
+            )
+        )
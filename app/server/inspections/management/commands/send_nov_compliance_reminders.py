@@ -83,18 +83,8 @@ class Command(BaseCommand):
                 try:
                     # Get inspection date from form if available
                     inspection_date = 'N/A'
-                    if hasattr(inspection, 'form') and inspection.form:
-                        try:
-                            if hasattr(inspection.form, 'checklist') and inspection.form.checklist:
-                                if isinstance(inspection.form.checklist, dict):
-                                    general = inspection.form.checklist.get('general', {})
-                                    if general and general.get('inspection_date_time'):
-                                        from django.utils.dateparse import parse_datetime
-                                        date_obj = parse_datetime(general.get('inspection_date_time'))
-                                        if date_obj:
-                                            inspection_date = date_obj.strftime('%B %d, %Y')
-                        except Exception:
-                            pass
+                    if nov.inspection_form.inspection_date:
+                        inspection_date = timezone.localtime(nov.inspection_form.inspection_date).strftime('%B %d, %Y')
                     
                     # Format deadline date and time
                     deadline_date = nov.compliance_deadline.strftime('%B %d, %Y') if nov.compliance_deadline else 'N/A'
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.17 on 2026-10-17 00:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inspections', '0009_add_reinspection_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuotaAccomplishment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('law', models.CharField(max_length=50)),
+                ('year', models.IntegerField()),
+                ('month', models.IntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['year', 'month', 'law'],
+                'indexes': [models.Index(fields=['year', 'month'], name='inspections_year_3eeae5_idx')],
+                'unique_together': {('law', 'year', 'month')},
+            },
+        ),
+        migrations.CreateModel(
+            name='InspectionAccomplishment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('law', models.CharField(max_length=50)),
+                ('year', models.IntegerField()),
+                ('month', models.IntegerField()),
+                ('inspection', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quota_accomplishments', to='inspections.inspection')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['law', 'year', 'month'], name='inspections_law_8dff2c_idx')],
+                'unique_together': {('inspection', 'law')},
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.17 on 2026-10-17 00:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inspections', '0010_quota_accomplishment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InspectionCodeSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefix', models.CharField(max_length=10)),
+                ('date', models.DateField()),
+                ('last_value', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('prefix', 'date')},
+            },
+        ),
+    ]
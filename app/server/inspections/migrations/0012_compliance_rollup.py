@@ -0,0 +1,44 @@
+# Generated by Django 4.2.17 on 2026-10-17 00:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inspections', '0011_inspection_code_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ComplianceRollupEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('law', models.CharField(max_length=50)),
+                ('district', models.CharField(blank=True, default='', max_length=100)),
+                ('status', models.CharField(max_length=40)),
+                ('compliance_decision', models.CharField(max_length=30)),
+                ('inspection', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='compliance_rollup_entry', to='inspections.inspection')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ComplianceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('law', models.CharField(max_length=50)),
+                ('district', models.CharField(blank=True, default='', max_length=100)),
+                ('status', models.CharField(max_length=40)),
+                ('compliance_decision', models.CharField(max_length=30)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['date', 'law'],
+                'indexes': [models.Index(fields=['date', 'law'], name='inspections_date_c74352_idx')],
+                'unique_together': {('date', 'law', 'district', 'status', 'compliance_decision')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.17 on 2026-10-17 01:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inspections', '0012_compliance_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inspectionform',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 4.2.17 on 2026-10-17 01:30
+
+from datetime import datetime, time
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+
+def checklist_projection(checklist):
+    """(laws, inspection_date, is_draft) as InspectionForm.save() projects them"""
+    checklist = checklist if isinstance(checklist, dict) else {}
+    general = checklist.get('general') or {}
+    if not isinstance(general, dict):
+        general = {}
+
+    laws = general.get('environmental_laws')
+    laws = {law for law in laws if isinstance(law, str) and law} if isinstance(laws, (list, tuple)) else set()
+
+    inspection_date = None
+    value = general.get('inspection_date_time')
+    if value and isinstance(value, str):
+        try:
+            inspection_date = parse_datetime(value)
+            if inspection_date is None:
+                day = parse_date(value)
+                inspection_date = datetime.combine(day, time.min) if day else None
+        except ValueError:
+            inspection_date = None
+        if inspection_date is not None and timezone.is_naive(inspection_date):
+            inspection_date = timezone.make_aware(inspection_date)
+
+    return laws, inspection_date, bool(checklist.get('is_draft', False))
+
+
+def backfill_projection(apps, schema_editor):
+    InspectionForm = apps.get_model('inspections', 'InspectionForm')
+    InspectionFormLaw = apps.get_model('inspections', 'InspectionFormLaw')
+    law_rows = []
+    for form_id, checklist in InspectionForm.objects.values_list('pk', 'checklist').iterator(chunk_size=500):
+        laws, inspection_date, is_draft = checklist_projection(checklist)
+        if inspection_date is not None or is_draft:
+            InspectionForm.objects.filter(pk=form_id).update(inspection_date=inspection_date, is_draft=is_draft)
+        law_rows.extend(InspectionFormLaw(form_id=form_id, law=law) for law in sorted(laws))
+        if len(law_rows) >= 500:
+            InspectionFormLaw.objects.bulk_create(law_rows, ignore_conflicts=True)
+            law_rows = []
+    if law_rows:
+        InspectionFormLaw.objects.bulk_create(law_rows, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inspections', '0013_inspectionform_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inspectionform',
+            name='inspection_date',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='inspectionform',
+            name='is_draft',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.CreateModel(
+            name='InspectionFormLaw',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('law', models.CharField(max_length=50)),
+                ('form', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='laws', to='inspections.inspectionform')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['law', 'form'], name='inspections_law_28f34c_idx')],
+                'unique_together': {('form', 'law')},
+            },
+        ),
+        migrations.RunPython(backfill_projection, migrations.RunPython.noop),
+    ]
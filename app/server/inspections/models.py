@@ -6,6 +6,7 @@ from django.db import models
 from django.utils import timezone
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from core.reference_data import reference_data
 from establishments.models import Establishment
 
 
@@ -51,6 +52,9 @@ class Inspection(models.Model):
         ('CLOSED_COMPLIANT', 'Closed - Compliant'),
         ('CLOSED_NON_COMPLIANT', 'Closed - Non-Compliant'),
     ]
+
+    # Every other status means the inspection is still open for its establishments
+    CLOSED_STATUSES = ['CLOSED_COMPLIANT', 'CLOSED_NON_COMPLIANT']
     
     # Core fields
     code = models.CharField(max_length=30, unique=True, null=True, blank=True)
@@ -109,67 +113,56 @@ class Inspection(models.Model):
     def __str__(self):
         return f"{self.code} - {self.get_simplified_status()}"
 
+    # Inspection code prefix per law
+    CODE_PREFIXES = {
+        "PD-1586": "EIA",
+        "RA-6969": "TOX",
+        "RA-8749": "AIR",
+        "RA-9275": "WATER",
+        "RA-9003": "WASTE",
+    }
+
+    @classmethod
+    def reserve_codes(cls, law, count=1):
+        """Allocate `count` consecutive inspection codes for a law, e.g. EIA-2026-10-17-0003"""
+        prefix = cls.CODE_PREFIXES.get(law, "INS")
+        return InspectionCodeSequence.reserve(prefix, timezone.now().date(), count)
+
     def save(self, *args, **kwargs):
         """Generate unique inspection code if not set"""
         if not self.code:
-            prefix_map = {
-                "PD-1586": "EIA",
-                "RA-6969": "TOX",
-                "RA-8749": "AIR",
-                "RA-9275": "WATER",
-                "RA-9003": "WASTE",
-            }
-            prefix = prefix_map.get(self.law, "INS")
-            now = timezone.now()
-            year = now.year
-            month = str(now.month).zfill(2)
-            day = str(now.day).zfill(2)
-            
-            # Get the count for this law+date (same day) for better uniqueness
-            base_qs = Inspection.objects.filter(
-                law=self.law, 
-                created_at__year=year,
-                created_at__month=now.month,
-                created_at__day=now.day
-            ).exclude(pk=self.pk)
-            seq = base_qs.count() + 1
-            candidate = f"{prefix}-{year}-{month}-{day}-{str(seq).zfill(4)}"
-            
-            # Ensure uniqueness
-            while Inspection.objects.filter(code=candidate).exclude(pk=self.pk).exists():
-                seq += 1
-                candidate = f"{prefix}-{year}-{month}-{day}-{str(seq).zfill(4)}"
-            
-            self.code = candidate
+            self.code = self.reserve_codes(self.law)[0]
         
         super().save(*args, **kwargs)
     
+    # User-friendly status labels
+    SIMPLIFIED_STATUS_LABELS = {
+        'CREATED': 'Created',
+        'SECTION_ASSIGNED': 'New – Waiting for Action',
+        'SECTION_IN_PROGRESS': 'In Progress',
+        'SECTION_COMPLETED_COMPLIANT': 'Completed – Compliant',
+        'SECTION_COMPLETED_NON_COMPLIANT': 'Completed – Non-Compliant',
+        'UNIT_ASSIGNED': 'New – Waiting for Action',
+        'UNIT_IN_PROGRESS': 'In Progress',
+        'UNIT_COMPLETED_COMPLIANT': 'Completed – Compliant',
+        'UNIT_COMPLETED_NON_COMPLIANT': 'Completed – Non-Compliant',
+        'MONITORING_ASSIGNED': 'New – Waiting for Action',
+        'MONITORING_IN_PROGRESS': 'In Progress',
+        'MONITORING_COMPLETED_COMPLIANT': 'Completed – Compliant',
+        'MONITORING_COMPLETED_NON_COMPLIANT': 'Completed – Non-Compliant',
+        'UNIT_REVIEWED': 'Reviewed',
+        'SECTION_REVIEWED': 'Reviewed',
+        'DIVISION_REVIEWED': 'For Legal Review',
+        'LEGAL_REVIEW': 'For Legal Review',
+        'NOV_SENT': 'NOV Sent',
+        'NOO_SENT': 'NOO Sent',
+        'CLOSED_COMPLIANT': 'Closed ✅',
+        'CLOSED_NON_COMPLIANT': 'Closed ❌',
+    }
+    
     def get_simplified_status(self):
         """Return user-friendly status labels"""
-        status_map = {
-            'CREATED': 'Created',
-            'SECTION_ASSIGNED': 'New – Waiting for Action',
-            'SECTION_IN_PROGRESS': 'In Progress',
-            'SECTION_COMPLETED_COMPLIANT': 'Completed – Compliant',
-            'SECTION_COMPLETED_NON_COMPLIANT': 'Completed – Non-Compliant',
-            'UNIT_ASSIGNED': 'New – Waiting for Action',
-            'UNIT_IN_PROGRESS': 'In Progress',
-            'UNIT_COMPLETED_COMPLIANT': 'Completed – Compliant',
-            'UNIT_COMPLETED_NON_COMPLIANT': 'Completed – Non-Compliant',
-            'MONITORING_ASSIGNED': 'New – Waiting for Action',
-            'MONITORING_IN_PROGRESS': 'In Progress',
-            'MONITORING_COMPLETED_COMPLIANT': 'Completed – Compliant',
-            'MONITORING_COMPLETED_NON_COMPLIANT': 'Completed – Non-Compliant',
-            'UNIT_REVIEWED': 'Reviewed',
-            'SECTION_REVIEWED': 'Reviewed',
-            'DIVISION_REVIEWED': 'For Legal Review',
-            'LEGAL_REVIEW': 'For Legal Review',
-            'NOV_SENT': 'NOV Sent',
-            'NOO_SENT': 'NOO Sent',
-            'CLOSED_COMPLIANT': 'Closed ✅',
-            'CLOSED_NON_COMPLIANT': 'Closed ❌',
-        }
-        return status_map.get(self.current_status, self.current_status)
+        return self.SIMPLIFIED_STATUS_LABELS.get(self.current_status, self.current_status)
     
     def can_transition_to(self, new_status, user):
         """Check if transition to new_status is valid for the current state and user"""
@@ -277,7 +270,7 @@ class Inspection(models.Model):
         if self.law in ['PD-1586', 'RA-8749', 'RA-9275']:
             target_section = 'PD-1586,RA-8749,RA-9275'  # EIA, Air & Water Combined
         
-        user_has_district = any(field.name == 'district' for field in User._meta.get_fields())
+        user_has_district = reference_data.user_has_district()
         
         # Auto-assign Section Chief
         section_filters = {
@@ -352,7 +345,7 @@ class Inspection(models.Model):
                     target_section = 'PD-1586,RA-8749,RA-9275'  # EIA, Air & Water Combined
                 query = query.filter(section=target_section)
         
-        user_has_district = any(field.name == 'district' for field in User._meta.get_fields())
+        user_has_district = reference_data.user_has_district()
         
         # For all roles except division/legal, prefer same district
         if (
@@ -368,6 +361,59 @@ class Inspection(models.Model):
         return query.first()
 
 
+class InspectionCodeSequence(models.Model):
+    """
+    Last issued inspection code number per (law prefix, day).
+    Codes are handed out by bumping last_value under the row lock, so
+    concurrent creators never probe for free codes or collide.
+    """
+    prefix = models.CharField(max_length=10)
+    date = models.DateField()
+    last_value = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = [('prefix', 'date')]
+
+    def __str__(self):
+        return f"{self.prefix} {self.date}: {self.last_value}"
+
+    @staticmethod
+    def format_code(prefix, date, value):
+        return f"{prefix}-{date.year}-{str(date.month).zfill(2)}-{str(date.day).zfill(2)}-{str(value).zfill(4)}"
+
+    @classmethod
+    def _issued_before(cls, prefix, date):
+        """Highest number already used by codes for this prefix/day (codes issued before this table)"""
+        code_prefix = cls.format_code(prefix, date, 0)[:-4]
+        last_code = Inspection.objects.filter(code__startswith=code_prefix).aggregate(
+            last=models.Max('code')
+        )['last']
+        try:
+            return int(last_code[len(code_prefix):]) if last_code else 0
+        except ValueError:
+            return 0
+
+    @classmethod
+    def reserve(cls, prefix, date, count=1):
+        """Atomically reserve `count` consecutive codes and return them in order"""
+        from django.db import transaction
+
+        if count < 1:
+            return []
+        rows = cls.objects.filter(prefix=prefix, date=date)
+        with transaction.atomic():
+            # The UPDATE holds the row lock until commit, so the read below sees our own increment
+            if not rows.update(last_value=models.F('last_value') + count):
+                # First code of the day: create the row, then take the lock as above
+                cls.objects.get_or_create(
+                    prefix=prefix, date=date,
+                    defaults={'last_value': lambda: cls._issued_before(prefix, date)},
+                )
+                rows.update(last_value=models.F('last_value') + count)
+            last_value = rows.values_list('last_value', flat=True).get()
+        return [cls.format_code(prefix, date, value) for value in range(last_value - count + 1, last_value + 1)]
+
+
 class InspectionForm(models.Model):
     """
     OneToOne relationship with Inspection for form data
@@ -411,13 +457,112 @@ class InspectionForm(models.Model):
         help_text='User who first filled out this inspection form'
     )
     
+    # Optimistic concurrency: bumped by every write, checked by delta auto-saves (see autosave.py)
+    version = models.PositiveIntegerField(default=0)
+    
+    # Indexed copies of checklist values, set by save() whenever the checklist is written.
+    # The checklist's general.environmental_laws are projected into InspectionFormLaw rows.
+    inspection_date = models.DateTimeField(null=True, blank=True, db_index=True)
+    is_draft = models.BooleanField(default=False, db_index=True)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    PROJECTED_FIELDS = ('inspection_date', 'is_draft')
+    
     def __str__(self):
         return f"Form for {self.inspection.code}"
     
+    @staticmethod
+    def checklist_laws(checklist):
+        """The set of law codes listed in a checklist's general.environmental_laws"""
+        general = (checklist if isinstance(checklist, dict) else {}).get('general') or {}
+        laws = general.get('environmental_laws') if isinstance(general, dict) else None
+        if not isinstance(laws, (list, tuple)):
+            return set()
+        return {law for law in laws if isinstance(law, str) and law}
+    
+    @staticmethod
+    def checklist_inspection_date(checklist):
+        """A checklist's general.inspection_date_time as an aware datetime, or None"""
+        from datetime import datetime, time
+        from django.utils.dateparse import parse_date, parse_datetime
+        
+        general = (checklist if isinstance(checklist, dict) else {}).get('general') or {}
+        value = general.get('inspection_date_time') if isinstance(general, dict) else None
+        if not value or not isinstance(value, str):
+            return None
+        try:
+            parsed = parse_datetime(value)
+            if parsed is None:
+                day = parse_date(value)
+                parsed = datetime.combine(day, time.min) if day else None
+        except ValueError:
+            return None
+        if parsed is not None and timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+    
+    def project_checklist(self):
+        """Copy the checklist's projected values onto their indexed columns"""
+        checklist = self.checklist if isinstance(self.checklist, dict) else {}
+        self.inspection_date = self.checklist_inspection_date(checklist)
+        self.is_draft = bool(checklist.get('is_draft', False))
+    
+    def sync_laws(self):
+        """Make the form's InspectionFormLaw rows match its checklist laws"""
+        desired = self.checklist_laws(self.checklist)
+        existing = set(InspectionFormLaw.objects.filter(form_id=self.pk).values_list('law', flat=True))
+        if existing - desired:
+            InspectionFormLaw.objects.filter(form_id=self.pk, law__in=existing - desired).delete()
+        if desired - existing:
+            InspectionFormLaw.objects.bulk_create(
+                [InspectionFormLaw(form_id=self.pk, law=law) for law in sorted(desired - existing)],
+                ignore_conflicts=True,
+            )
+    
+    def save(self, *args, bump_version=True, **kwargs):
+        """
+        Project the checklist onto its indexed columns when it is written.
+        Unless bump_version=False (the auto-save writer itself), pending
+        auto-save deltas are flushed under the row lock first and this write
+        is rebased onto them, so a partial write (signature, recommendation)
+        never drops deltas the inspector already saved.
+        """
+        from django.db import transaction
+        
+        # savepoint=False: no extra SAVEPOINT round trips inside the caller's transaction
+        with transaction.atomic(savepoint=False):
+            if bump_version:
+                self._flush_autosave()
+            update_fields = kwargs.get('update_fields')
+            extra_fields = []
+            if update_fields is None or 'checklist' in update_fields:
+                self.project_checklist()
+                extra_fields.extend(self.PROJECTED_FIELDS)
+            if bump_version:
+                extra_fields.append('version')
+            if update_fields is not None:
+                kwargs['update_fields'] = [*update_fields, *(field for field in extra_fields if field not in update_fields)]
+            super().save(*args, **kwargs)
+    
+    def _flush_autosave(self):
+        """Lock the row, write pending auto-save deltas and move this instance past their version"""
+        from .autosave import autosave_buffer, carry_flushed_deltas
+        
+        base = None
+        if not self._state.adding:
+            base = InspectionForm.objects.select_for_update().filter(pk=self.pk).first()
+        if base is None:
+            self.version = (self.version or 0) + 1
+            return
+        current = base
+        if autosave_buffer.flush(self.pk):
+            current = InspectionForm.objects.get(pk=self.pk)
+            carry_flushed_deltas(self, base, current)
+        self.version = max(self.version or 0, current.version) + 1
+    
     def clean(self):
         """Validate that non-compliant requires violations"""
         if self.compliance_decision == 'NON_COMPLIANT' and not self.violations_found:
@@ -426,6 +571,25 @@ class InspectionForm(models.Model):
             })
 
 
+class InspectionFormLaw(models.Model):
+    """
+    One row per law listed in a form's checklist general.environmental_laws,
+    so "forms under law X" is an indexed lookup instead of a JSON scan.
+    Maintained by inspections.signals on every checklist write.
+    """
+    form = models.ForeignKey(InspectionForm, on_delete=models.CASCADE, related_name='laws')
+    law = models.CharField(max_length=50)
+
+    class Meta:
+        unique_together = [('form', 'law')]
+        indexes = [
+            models.Index(fields=['law', 'form']),
+        ]
+
+    def __str__(self):
+        return f"{self.law} for form {self.form_id}"
+
+
 class NoticeOfViolation(models.Model):
     """
     Notice of Violation (NOV) - separate table for normalized data
@@ -812,18 +976,15 @@ class ComplianceQuota(models.Model):
         """Validate that the law exists in the Law model and is active"""
         super().clean()
         
-        # Import here to avoid circular imports
-        from laws.models import Law
-        
         # Validate law exists and is active
         if self.law:
-            law_obj = Law.objects.filter(reference_code=self.law).first()
-            if not law_obj:
+            law_details = reference_data.law_details(self.law)
+            if not law_details:
                 raise ValidationError({
                     'law': f'Law with reference code "{self.law}" does not exist. '
                            'Please add it to the Law Management system first.'
                 })
-            if law_obj.status != 'Active':
+            if law_details['status'] != 'Active':
                 raise ValidationError({
                     'law': f'Law "{self.law}" is not active. Only active laws can have quotas.'
                 })
@@ -845,68 +1006,64 @@ class ComplianceQuota(models.Model):
     
     @staticmethod
     def get_active_laws():
-        """Get list of active law reference codes from Law model"""
-        from laws.models import Law
-        return list(Law.objects.filter(status='Active').values_list('reference_code', flat=True))
+        """Get list of active law reference codes (process-wide registry of the Law table)"""
+        return reference_data.active_laws()
     
     @staticmethod
     def get_law_details(reference_code):
-        """Get law details from Law model"""
-        from laws.models import Law
-        try:
-            law = Law.objects.get(reference_code=reference_code)
-            return {
-                'reference_code': law.reference_code,
-                'law_title': law.law_title,
-                'category': law.category,
-                'status': law.status
-            }
-        except Law.DoesNotExist:
-            return None
+        """Get law details (process-wide registry of the Law table)"""
+        return reference_data.law_details(reference_code)
+
+    # Statuses that count toward a quota's accomplishment
+    FINISHED_STATUSES = [
+        'SECTION_COMPLETED_COMPLIANT', 'SECTION_COMPLETED_NON_COMPLIANT',
+        'UNIT_COMPLETED_COMPLIANT', 'UNIT_COMPLETED_NON_COMPLIANT',
+        'MONITORING_COMPLETED_COMPLIANT', 'MONITORING_COMPLETED_NON_COMPLIANT',
+        'CLOSED_COMPLIANT', 'CLOSED_NON_COMPLIANT'
+    ]
+
+    # Per-instance cache of the accomplished count (see with_accomplished)
+    _accomplished = None
 
     @property
     def accomplished(self):
         """
-        Calculate accomplished inspections for this quota period.
-        Counts finished inspections where this law is in their applicable environmental laws.
-        Uses month-specific date range for monthly quotas.
+        Accomplished inspections for this quota period.
+        Reads the materialized QuotaAccomplishment counter instead of scanning
+        finished inspections; the value is cached on the instance.
         """
-        from datetime import datetime
-        
-        # Get month date range for monthly quotas
-        if self.month:
-            month_start, month_end = self.get_month_dates(self.month)
-        else:
-            # Fallback to quarter date range (for backward compatibility)
-            month_start, month_end = self.get_quarter_dates()
-        
-        # Count finished inspections
-        finished_statuses = [
-            'SECTION_COMPLETED_COMPLIANT', 'SECTION_COMPLETED_NON_COMPLIANT',
-            'UNIT_COMPLETED_COMPLIANT', 'UNIT_COMPLETED_NON_COMPLIANT',
-            'MONITORING_COMPLETED_COMPLIANT', 'MONITORING_COMPLETED_NON_COMPLIANT',
-            'CLOSED_COMPLIANT', 'CLOSED_NON_COMPLIANT'
-        ]
-        
-        # Get all finished inspections in this month/period
-        finished_inspections = Inspection.objects.filter(
-            current_status__in=finished_statuses,
-            updated_at__range=[month_start, month_end]
-        ).prefetch_related('form')
-        
-        # Count inspections where this law is in their applicable environmental laws
-        count = 0
-        for inspection in finished_inspections:
-            if hasattr(inspection, 'form') and inspection.form:
-                checklist = inspection.form.checklist if hasattr(inspection.form, 'checklist') else {}
-                general = checklist.get('general', {})
-                applicable_laws = general.get('environmental_laws', [])
-                
-                # Check if this quota's law is in the inspection's applicable laws
-                if self.law in applicable_laws:
-                    count += 1
-        
-        return count
+        if self._accomplished is None:
+            if self.month:
+                self._accomplished = QuotaAccomplishment.get_count(self.law, self.year, self.month)
+            else:
+                # Fallback to quarter range (for backward compatibility)
+                counts = QuotaAccomplishment.get_counts(
+                    self.year, self.get_months_in_quarter(self.quarter), laws=[self.law]
+                )
+                self._accomplished = sum(counts.values())
+        return self._accomplished
+
+    @staticmethod
+    def with_accomplished(quotas):
+        """
+        Evaluate a quota queryset and attach accomplished counts to every
+        instance using a single counter query.
+        """
+        quotas = list(quotas)
+        if not quotas:
+            return quotas
+        counts = {}
+        for year in {quota.year for quota in quotas}:
+            year_quotas = [quota for quota in quotas if quota.year == year]
+            for (law, month), count in QuotaAccomplishment.get_counts(
+                year,
+                {quota.month for quota in year_quotas},
+                laws={quota.law for quota in year_quotas},
+            ).items():
+                counts[(law, year, month)] = count
+        for quota in quotas:
+            quota._accomplished = counts.get((quota.law, quota.year, quota.month), 0)
+        return quotas
 
     def get_quarter_dates(self):
         """Get start and end dates for this quarter"""
@@ -944,39 +1101,11 @@ class ComplianceQuota(models.Model):
         return start, end
     
     def get_accomplished_for_month(self, month):
-        """Calculate accomplished inspections for a specific month"""
-        from datetime import datetime
-        
-        # Get month date range
-        month_start, month_end = self.get_month_dates(month)
-        
-        # Count finished inspections (same logic as accomplished property)
-        finished_statuses = [
-            'SECTION_COMPLETED_COMPLIANT', 'SECTION_COMPLETED_NON_COMPLIANT',
-            'UNIT_COMPLETED_COMPLIANT', 'UNIT_COMPLETED_NON_COMPLIANT',
-            'MONITORING_COMPLETED_COMPLIANT', 'MONITORING_COMPLETED_NON_COMPLIANT',
-            'CLOSED_COMPLIANT', 'CLOSED_NON_COMPLIANT'
-        ]
-        
-        # Get all finished inspections in this month
-        finished_inspections = Inspection.objects.filter(
-            current_status__in=finished_statuses,
-            updated_at__range=[month_start, month_end]
-        ).prefetch_related('form')
-        
-        # Count inspections where this law is in their applicable environmental laws
-        count = 0
-        for inspection in finished_inspections:
-            if hasattr(inspection, 'form') and inspection.form:
-                checklist = inspection.form.checklist if hasattr(inspection.form, 'checklist') else {}
-                general = checklist.get('general', {})
-                applicable_laws = general.get('environmental_laws', [])
-                
-                # Check if this quota's law is in the inspection's applicable laws
-                if self.law in applicable_laws:
-                    count += 1
-        
-        return count
+        """Get accomplished inspections for a specific month"""
+        # Validate month
+        if month < 1 or month > 12:
+            raise ValueError(f"Month must be between 1 and 12, got {month}")
+        return QuotaAccomplishment.get_count(self.law, self.year, month)
 
     def auto_adjust_next_quarter(self):
         """Auto-set next quarter quota if current accomplishments exceed target"""
@@ -1038,14 +1167,411 @@ class ComplianceQuota(models.Model):
     @staticmethod
     def get_quarterly_totals(law, year, quarter):
         """Calculate total target and achieved for a quarter from monthly quotas"""
+        from django.db.models import Sum
+
         months = ComplianceQuota.get_months_in_quarter(quarter)
         # Get all monthly quotas for this quarter
-        quotas = ComplianceQuota.objects.filter(law=law, year=year, month__in=months)
-        total_target = sum(q.target for q in quotas) if quotas.exists() else 0
-        total_achieved = sum(q.accomplished for q in quotas) if quotas.exists() else 0
+        quota_targets = dict(
+            ComplianceQuota.objects.filter(law=law, year=year, month__in=months)
+            .values_list('month', 'target')
+        )
+        if not quota_targets:
+            return 0, 0
+        total_target = sum(quota_targets.values())
+        # Only months that have a quota contribute to the achieved total
+        total_achieved = QuotaAccomplishment.objects.filter(
+            law=law, year=year, month__in=list(quota_targets)
+        ).aggregate(total=Sum('count'))['total'] or 0
         return total_target, total_achieved
 
 
+class QuotaAccomplishment(models.Model):
+    """
+    Materialized count of finished inspections per (law, year, month).
+    An inspection counts toward every law listed in its checklist's
+    general.environmental_laws (read from the indexed InspectionFormLaw
+    projection), in the month it was last updated while in a finished
+    status. Maintained by inspections.signals through the
+    InspectionAccomplishment ledger; rebuild with
+    `manage.py rebuild_quota_accomplishments`.
+    """
+    law = models.CharField(max_length=50)
+    year = models.IntegerField()
+    month = models.IntegerField()
+    count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = [('law', 'year', 'month')]
+        ordering = ['year', 'month', 'law']
+        indexes = [
+            models.Index(fields=['year', 'month']),
+        ]
+
+    def __str__(self):
+        return f"{self.law} {self.year}-{str(self.month).zfill(2)}: {self.count}"
+
+    @classmethod
+    def get_count(cls, law, year, month):
+        """Return the accomplished count for a single law/month"""
+        return cls.objects.filter(law=law, year=year, month=month).values_list('count', flat=True).first() or 0
+
+    @classmethod
+    def get_counts(cls, year, months, laws=None):
+        """Return {(law, month): count} for the given year and months"""
+        queryset = cls.objects.filter(year=year, month__in=list(months))
+        if laws is not None:
+            queryset = queryset.filter(law__in=list(laws))
+        return {
+            (law, month): count
+            for law, month, count in queryset.values_list('law', 'month', 'count')
+        }
+
+    @staticmethod
+    def get_inspection_periods(inspection, laws):
+        """Return the {(law, year, month)} periods an inspection with the given checklist laws counts toward"""
+        if inspection.current_status not in ComplianceQuota.FINISHED_STATUSES or not inspection.updated_at:
+            return set()
+        updated_at = timezone.localtime(inspection.updated_at)
+        return {(law, updated_at.year, updated_at.month) for law in laws}
+
+    @classmethod
+    def _adjust(cls, law, year, month, delta):
+        """Atomically add delta to a counter row, creating it if needed"""
+        row, _ = cls.objects.get_or_create(law=law, year=year, month=month)
+        cls.objects.filter(pk=row.pk).update(count=models.F('count') + delta, updated_at=timezone.now())
+
+    @classmethod
+    def sync_inspection(cls, inspection):
+        """
+        Bring the counters in line with an inspection's current status,
+        checklist laws and update month.
+        """
+        from django.db import transaction
+
+        desired = cls.get_inspection_periods(
+            inspection, InspectionFormLaw.objects.filter(form_id=inspection.pk).values_list('law', flat=True)
+        )
+
+        with transaction.atomic():
+            existing = {
+                (entry.law, entry.year, entry.month): entry.pk
+                for entry in InspectionAccomplishment.objects.select_for_update().filter(inspection_id=inspection.pk)
+            }
+            if set(existing) == desired:
+                return
+
+            removed = [key for key in existing if key not in desired]
+            if removed:
+                InspectionAccomplishment.objects.filter(pk__in=[existing[key] for key in removed]).delete()
+                for law, year, month in removed:
+                    cls._adjust(law, year, month, -1)
+
+            added = [key for key in desired if key not in existing]
+            if added:
+                InspectionAccomplishment.objects.bulk_create([
+                    InspectionAccomplishment(inspection_id=inspection.pk, law=law, year=year, month=month)
+                    for law, year, month in added
+                ])
+                for law, year, month in added:
+                    cls._adjust(law, year, month, 1)
+
+    @classmethod
+    def release_inspection(cls, inspection):
+        """Decrement the counters an inspection contributes to (before deletion)"""
+        from django.db import transaction
+
+        with transaction.atomic():
+            entries = list(
+                InspectionAccomplishment.objects.select_for_update()
+                .filter(inspection_id=inspection.pk)
+                .values_list('pk', 'law', 'year', 'month')
+            )
+            if not entries:
+                return
+            InspectionAccomplishment.objects.filter(pk__in=[entry[0] for entry in entries]).delete()
+            for _, law, year, month in entries:
+                cls._adjust(law, year, month, -1)
+
+    @classmethod
+    def rebuild(cls, batch_size=1000):
+        """
+        Recompute the ledger and all counters from scratch.
+        Returns (inspections_counted, counter_rows).
+        """
+        from collections import Counter, defaultdict
+        from django.db import transaction
+
+        finished = (
+            Inspection.objects.filter(current_status__in=ComplianceQuota.FINISHED_STATUSES)
+            .only('pk', 'current_status', 'updated_at')
+            .order_by('pk')
+        )
+        form_laws = (
+            InspectionFormLaw.objects.filter(form__inspection__current_status__in=ComplianceQuota.FINISHED_STATUSES)
+            .values_list('form_id', 'law')
+        )
+
+        with transaction.atomic():
+            InspectionAccomplishment.objects.all().delete()
+            cls.objects.all().delete()
+
+            laws_by_inspection = defaultdict(list)
+            for form_id, law in form_laws.iterator(chunk_size=batch_size):
+                laws_by_inspection[form_id].append(law)
+
+            totals = Counter()
+            counted = 0
+            entries = []
+            for inspection in finished.iterator(chunk_size=batch_size):
+                periods = cls.get_inspection_periods(inspection, laws_by_inspection.get(inspection.pk, ()))
+                if not periods:
+                    continue
+                counted += 1
+                for law, year, month in periods:
+                    totals[(law, year, month)] += 1
+                    entries.append(InspectionAccomplishment(
+                        inspection_id=inspection.pk, law=law, year=year, month=month
+                    ))
+                if len(entries) >= batch_size:
+                    InspectionAccomplishment.objects.bulk_create(entries)
+                    entries = []
+            if entries:
+                InspectionAccomplishment.objects.bulk_create(entries)
+
+            cls.objects.bulk_create(
+                [
+                    cls(law=law, year=year, month=month, count=count)
+                    for (law, year, month), count in totals.items()
+                ],
+                batch_size=batch_size,
+            )
+        return counted, len(totals)
+
+
+class InspectionAccomplishment(models.Model):
+    """
+    Ledger of the quota periods an inspection currently counts toward.
+    Lets QuotaAccomplishment counters be adjusted incrementally when an
+    inspection changes status, checklist laws or update month.
+    """
+    inspection = models.ForeignKey(
+        Inspection,
+        on_delete=models.CASCADE,
+        related_name='quota_accomplishments'
+    )
+    law = models.CharField(max_length=50)
+    year = models.IntegerField()
+    month = models.IntegerField()
+
+    class Meta:
+        unique_together = [('inspection', 'law')]
+        indexes = [
+            models.Index(fields=['law', 'year', 'month']),
+        ]
+
+    def __str__(self):
+        return f"{self.inspection_id} → {self.law} {self.year}-{str(self.month).zfill(2)}"
+
+
+
+class ComplianceRollup(models.Model):
+    """
+    Daily count of inspection forms per (date, law, district, status,
+    compliance_decision), where date is the local day the form was created.
+    Backs the compliance dashboard endpoints so any month/quarter/year window
+    is one grouped query. Maintained by inspections.signals through the
+    ComplianceRollupEntry ledger; rebuild with `manage.py rebuild_compliance_rollup`.
+    """
+    NON_COMPLIANT_DECISIONS = ['NON_COMPLIANT', 'PARTIALLY_COMPLIANT']
+
+    date = models.DateField()
+    law = models.CharField(max_length=50)
+    district = models.CharField(max_length=100, blank=True, default='')
+    status = models.CharField(max_length=40)
+    compliance_decision = models.CharField(max_length=30)
+    count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = [('date', 'law', 'district', 'status', 'compliance_decision')]
+        ordering = ['date', 'law']
+        indexes = [
+            models.Index(fields=['date', 'law']),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.law} {self.status}/{self.compliance_decision}: {self.count}"
+
+    @staticmethod
+    def get_inspection_key(inspection, form):
+        """The (date, law, district, status, compliance_decision) row an inspection counts toward"""
+        if form is None or not form.created_at:
+            return None
+        return (
+            timezone.localdate(form.created_at),
+            inspection.law or '',
+            inspection.district or '',
+            inspection.current_status or '',
+            form.compliance_decision or '',
+        )
+
+    @classmethod
+    def window(cls, start=None, end=None, laws=None, statuses=None):
+        """Rollup rows between start and end (inclusive dates), optionally narrowed by law and status"""
+        queryset = cls.objects.all()
+        if start:
+            queryset = queryset.filter(date__gte=start)
+        if end:
+            queryset = queryset.filter(date__lte=end)
+        if laws is not None:
+            queryset = queryset.filter(law__in=list(laws))
+        if statuses is not None:
+            queryset = queryset.filter(status__in=list(statuses))
+        return queryset
+
+    @classmethod
+    def decision_totals(cls):
+        """Aggregates summing the row counts into pending/compliant/non_compliant"""
+        from django.db.models import Q, Sum
+        from django.db.models.functions import Coalesce
+
+        return {
+            'pending': Coalesce(Sum('count', filter=Q(compliance_decision='PENDING')), 0),
+            'compliant': Coalesce(Sum('count', filter=Q(compliance_decision='COMPLIANT')), 0),
+            'non_compliant': Coalesce(
+                Sum('count', filter=Q(compliance_decision__in=cls.NON_COMPLIANT_DECISIONS)), 0
+            ),
+        }
+
+    @classmethod
+    def _adjust(cls, key, delta):
+        """Atomically add delta to a rollup row, creating it if needed"""
+        date, law, district, status, decision = key
+        row, _ = cls.objects.get_or_create(
+            date=date, law=law, district=district, status=status, compliance_decision=decision
+        )
+        cls.objects.filter(pk=row.pk).update(count=models.F('count') + delta, updated_at=timezone.now())
+
+    @classmethod
+    def sync_inspection(cls, inspection):
+        """Move an inspection's count to the row matching its current status, law, district and decision"""
+        from django.db import transaction
+
+        form = InspectionForm.objects.filter(
+            inspection_id=inspection.pk
+        ).only('created_at', 'compliance_decision').first()
+        desired = cls.get_inspection_key(inspection, form)
+
+        with transaction.atomic():
+            entry = ComplianceRollupEntry.objects.select_for_update().filter(inspection_id=inspection.pk).first()
+            current = entry.key if entry else None
+            if current == desired:
+                return
+
+            if entry:
+                cls._adjust(current, -1)
+            if desired is None:
+                entry.delete()
+                return
+            cls._adjust(desired, 1)
+            date, law, district, status, decision = desired
+            ComplianceRollupEntry.objects.update_or_create(
+                inspection_id=inspection.pk,
+                defaults={
+                    'date': date, 'law': law, 'district': district,
+                    'status': status, 'compliance_decision': decision,
+                },
+            )
+
+    @classmethod
+    def release_inspection(cls, inspection):
+        """Remove an inspection from the rollup (before deletion)"""
+        from django.db import transaction
+
+        with transaction.atomic():
+            entry = ComplianceRollupEntry.objects.select_for_update().filter(inspection_id=inspection.pk).first()
+            if entry is None:
+                return
+            cls._adjust(entry.key, -1)
+            entry.delete()
+
+    @classmethod
+    def rebuild(cls, batch_size=1000):
+        """
+        Recompute the ledger and all rollup rows from scratch.
+        Returns (forms_counted, rollup_rows).
+        """
+        from collections import Counter
+        from django.db import transaction
+
+        forms = (
+            InspectionForm.objects.select_related('inspection')
+            .only(
+                'created_at', 'compliance_decision',
+                'inspection__law', 'inspection__district', 'inspection__current_status',
+            )
+            .order_by('pk')
+        )
+
+        with transaction.atomic():
+            ComplianceRollupEntry.objects.all().delete()
+            cls.objects.all().delete()
+
+            totals = Counter()
+            counted = 0
+            entries = []
+            for form in forms.iterator(chunk_size=batch_size):
+                key = cls.get_inspection_key(form.inspection, form)
+                if key is None:
+                    continue
+                counted += 1
+                totals[key] += 1
+                date, law, district, status, decision = key
+                entries.append(ComplianceRollupEntry(
+                    inspection_id=form.pk, date=date, law=law, district=district,
+                    status=status, compliance_decision=decision,
+                ))
+                if len(entries) >= batch_size:
+                    ComplianceRollupEntry.objects.bulk_create(entries)
+                    entries = []
+            if entries:
+                ComplianceRollupEntry.objects.bulk_create(entries)
+
+            cls.objects.bulk_create(
+                [
+                    cls(date=date, law=law, district=district, status=status,
+                        compliance_decision=decision, count=count)
+                    for (date, law, district, status, decision), count in totals.items()
+                ],
+                batch_size=batch_size,
+            )
+        return counted, len(totals)
+
+
+class ComplianceRollupEntry(models.Model):
+    """
+    Ledger of the ComplianceRollup row each inspection currently counts toward,
+    so the rollup can be adjusted incrementally on status/decision changes.
+    """
+    inspection = models.OneToOneField(
+        Inspection,
+        on_delete=models.CASCADE,
+        related_name='compliance_rollup_entry'
+    )
+    date = models.DateField()
+    law = models.CharField(max_length=50)
+    district = models.CharField(max_length=100, blank=True, default='')
+    status = models.CharField(max_length=40)
+    compliance_decision = models.CharField(max_length=30)
+
+    def __str__(self):
+        return f"{self.inspection_id} → {self.date} {self.law} {self.status}/{self.compliance_decision}"
+
+    @property
+    def key(self):
+        return (self.date, self.law, self.district, self.status, self.compliance_decision)
+
 class QuarterlyEvaluation(models.Model):
     """
     Quarterly evaluation summaries for compliance law inspections.
@@ -7,6 +7,7 @@ from .models import (
     BillingRecord, NoticeOfViolation, NoticeOfOrder
 )
 from establishments.models import Establishment
+from .autosave import autosave_buffer
 
 
 class InspectionHistorySerializer(serializers.ModelSerializer):
@@ -115,6 +116,7 @@ class InspectionFormSerializer(serializers.ModelSerializer):
     inspected_by_name = serializers.SerializerMethodField()
     inspector_info = serializers.SerializerMethodField()
     checklist = serializers.SerializerMethodField()
+    version = serializers.SerializerMethodField()
     
     class Meta:
         model = InspectionForm
@@ -122,16 +124,20 @@ class InspectionFormSerializer(serializers.ModelSerializer):
             'inspection', 'scheduled_at', 'checklist',
             'compliance_decision', 'violations_found', 'documents',
             'nov', 'noo', 'inspected_by', 'inspected_by_name', 'inspector_info',
-            'created_at', 'updated_at'
+            'version', 'created_at', 'updated_at'
         ]
         read_only_fields = [
             'created_at', 'updated_at', 'inspected_by'
         ]
     
+    def get_version(self, obj):
+        """Version to send with the next delta auto-save (includes buffered deltas)"""
+        return autosave_buffer.current_version(obj)
+    
     def get_checklist(self, obj):
-        """Get checklist with absolute URLs for signatures"""
+        """Get checklist (with buffered auto-save deltas) with absolute URLs for signatures"""
         import copy
-        checklist = copy.deepcopy(obj.checklist or {})
+        checklist = copy.deepcopy(autosave_buffer.checklist(obj) or {})
         
         # Convert relative signature URLs to absolute URLs
         if 'signatures' in checklist:
@@ -381,7 +387,14 @@ class InspectionSerializer(serializers.ModelSerializer):
             # Try to get the most recent return entry
             # Use .all() if it's a queryset, otherwise treat as list
             try:
-                if hasattr(obj.history, 'all'):
+                prefetched = getattr(obj, '_prefetched_objects_cache', {}).get('history')
+                if prefetched is not None:
+                    # History was prefetched - pick the latest return in Python
+                    return_entries = [
+                        h for h in prefetched if h.remarks and 'returned' in h.remarks.lower()
+                    ]
+                    latest_return = max(return_entries, key=lambda h: h.created_at) if return_entries else None
+                elif hasattr(obj.history, 'all'):
                     # It's a queryset - filter and get first
                     latest_return = obj.history.filter(
                         remarks__icontains='Returned'
@@ -438,6 +451,35 @@ class InspectionSerializer(serializers.ModelSerializer):
         return None
 
 
+class InspectionSummarySerializer(serializers.Serializer):
+    """
+    Slim list serializer for the tab tables (?view=summary).
+    Works on the value dicts from InspectionViewSet.SUMMARY_FIELDS, so
+    serializing a page never touches the database.
+    """
+    id = serializers.IntegerField(read_only=True)
+    code = serializers.CharField(read_only=True)
+    law = serializers.CharField(read_only=True)
+    district = serializers.CharField(read_only=True)
+    current_status = serializers.CharField(read_only=True)
+    simplified_status = serializers.SerializerMethodField()
+    assigned_to = serializers.IntegerField(read_only=True)
+    assigned_to_name = serializers.SerializerMethodField()
+    establishment_name = serializers.CharField(read_only=True)
+    created_at = serializers.DateTimeField(read_only=True)
+    updated_at = serializers.DateTimeField(read_only=True)
+
+    def get_simplified_status(self, row):
+        status = row['current_status']
+        return Inspection.SIMPLIFIED_STATUS_LABELS.get(status, status)
+
+    def get_assigned_to_name(self, row):
+        if row['assigned_to'] is None:
+            return None
+        name = f"{row['assigned_to__first_name'] or ''} {row['assigned_to__last_name'] or ''}".strip()
+        return name or row['assigned_to__email']
+
+
 class InspectionCreateSerializer(serializers.Serializer):
     """Serializer for creating inspections via wizard"""
     establishments = serializers.ListField(
@@ -510,8 +552,9 @@ class InspectionCreateSerializer(serializers.Serializer):
             if previous_inspection:
                 is_reinspection = True
         
-        # Create inspection
+        # Create inspection (code allocated from the per-day sequence up front)
         inspection = Inspection.objects.create(
+            code=Inspection.reserve_codes(validated_data['law'])[0],
             law=validated_data['law'],
             created_by=user,
             current_status='CREATED',
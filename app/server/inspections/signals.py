@@ -1,10 +1,16 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from datetime import timedelta
-from .models import Inspection, InspectionHistory, ReinspectionSchedule
+from .models import (
+    Inspection, InspectionForm, InspectionHistory, ReinspectionSchedule, QuotaAccomplishment,
+    ComplianceRollup, ComplianceQuota
+)
+from establishments.models import Establishment
 from audit.utils import log_activity
+from core.cache import invalidate_on
 import logging
 
 logger = logging.getLogger(__name__)
@@ -95,3 +101,142 @@ def log_inspection_status_change(sender, instance, created, **kwargs):
         except Exception as e:
             logger.error(f"Failed to log inspection status change: {str(e)}")
 
+
+
+@receiver(post_save, sender=Inspection)
+def sync_inspection_quota_accomplishment(sender, instance, raw=False, **kwargs):
+    """Keep quota accomplishment counters in sync with inspection status"""
+    if raw:
+        return
+    try:
+        QuotaAccomplishment.sync_inspection(instance)
+    except Exception as e:
+        logger.error(f"Failed to sync quota accomplishment for {instance.code}: {str(e)}")
+
+
+@receiver(post_save, sender=InspectionForm)
+def sync_form_laws(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Keep the InspectionFormLaw projection in sync with the checklist (before the receivers that read it)"""
+    if raw or (update_fields is not None and 'checklist' not in update_fields):
+        return
+    try:
+        instance.sync_laws()
+    except Exception as e:
+        logger.error(f"Failed to sync checklist laws for form {instance.pk}: {str(e)}")
+
+
+@receiver(post_save, sender=InspectionForm)
+def sync_form_quota_accomplishment(sender, instance, raw=False, **kwargs):
+    """Keep quota accomplishment counters in sync with checklist laws"""
+    if raw:
+        return
+    try:
+        QuotaAccomplishment.sync_inspection(instance.inspection)
+    except Exception as e:
+        logger.error(f"Failed to sync quota accomplishment for form {instance.pk}: {str(e)}")
+
+
+@receiver(pre_delete, sender=Inspection)
+def release_inspection_quota_accomplishment(sender, instance, **kwargs):
+    """Remove a deleted inspection from the quota accomplishment counters"""
+    try:
+        QuotaAccomplishment.release_inspection(instance)
+    except Exception as e:
+        logger.error(f"Failed to release quota accomplishment for {instance.code}: {str(e)}")
+
+
+@receiver(post_save, sender=Inspection)
+@receiver(post_save, sender=InspectionForm)
+def sync_compliance_rollup(sender, instance, raw=False, **kwargs):
+    """Keep the daily compliance rollup in sync with status and compliance decision"""
+    if raw:
+        return
+    inspection = instance if sender is Inspection else instance.inspection
+    try:
+        ComplianceRollup.sync_inspection(inspection)
+    except Exception as e:
+        logger.error(f"Failed to sync compliance rollup for {inspection.code}: {str(e)}")
+
+
+@receiver(pre_delete, sender=Inspection)
+@receiver(pre_delete, sender=InspectionForm)
+def release_compliance_rollup(sender, instance, **kwargs):
+    """Remove a deleted inspection/form from the compliance rollup"""
+    inspection = instance if sender is Inspection else instance.inspection
+    try:
+        ComplianceRollup.release_inspection(inspection)
+    except Exception as e:
+        logger.error(f"Failed to release compliance rollup for {inspection.code}: {str(e)}")
+
+
+def refresh_establishment_state(establishment_ids):
+    """
+    Recompute the establishments' inspection state now (same transaction as
+    the change) and again once it commits, so a refresh that raced another
+    transaction settles on committed data.
+    """
+    establishment_ids = list(establishment_ids)
+    if not establishment_ids:
+        return
+
+    def refresh():
+        try:
+            Establishment.refresh_inspection_state(establishment_ids)
+        except Exception as e:
+            logger.error(f"Failed to refresh inspection state of establishments {establishment_ids}: {str(e)}")
+
+    refresh()
+    transaction.on_commit(refresh)
+
+
+@receiver(post_save, sender=Inspection)
+def sync_establishment_state_on_save(sender, instance, created, raw=False, **kwargs):
+    """Status changes move establishments in and out of active inspection"""
+    if raw or created:
+        # A new inspection has no establishments until they are added (m2m_changed below)
+        return
+    refresh_establishment_state(instance.establishments.values_list('id', flat=True))
+
+
+@receiver(m2m_changed, sender=Inspection.establishments.through)
+def sync_establishment_state_on_link(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep establishment state in sync when establishments are linked/unlinked"""
+    if action == 'pre_clear':
+        # The cleared ids are gone by post_clear
+        instance._cleared_establishment_ids = (
+            [instance.pk] if reverse else list(instance.establishments.values_list('id', flat=True))
+        )
+    elif action == 'post_clear':
+        refresh_establishment_state(getattr(instance, '_cleared_establishment_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        refresh_establishment_state([instance.pk] if reverse else pk_set or [])
+
+
+@receiver(pre_delete, sender=Inspection)
+def remember_inspection_establishments(sender, instance, **kwargs):
+    instance._establishment_ids = list(instance.establishments.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Inspection)
+def sync_establishment_state_on_delete(sender, instance, **kwargs):
+    refresh_establishment_state(getattr(instance, '_establishment_ids', []))
+
+
+def inspection_cache_scopes(inspection):
+    """Cache scopes (core/cache.py) touched by a change to an inspection"""
+    return ['inspections', f"law:{inspection.law}", f"inspection:{inspection.pk}"]
+
+
+def related_inspection_cache_scopes(instance):
+    return inspection_cache_scopes(instance.inspection)
+
+
+def quota_cache_scopes(quota):
+    return ['quotas', f"law:{quota.law}"]
+
+
+# Retire cached dashboards, tab counts and per-inspection entries whenever inspection state changes
+invalidate_on(Inspection, inspection_cache_scopes)
+invalidate_on(InspectionForm, related_inspection_cache_scopes)
+invalidate_on(InspectionHistory, related_inspection_cache_scopes)
+invalidate_on(ComplianceQuota, quota_cache_scopes)
@@ -23,3 +23,15 @@ def send_nov_compliance_reminders():
         logger.error(f"Error in NOV compliance reminder task: {str(e)}")
         raise
 
+
+
+@shared_task
+def flush_inspection_autosave(form_pk):
+    """Write an inspection form's buffered auto-save deltas (scheduled by inspections.autosave)"""
+    from .autosave import autosave_buffer
+
+    try:
+        return autosave_buffer.flush(form_pk)
+    except Exception as e:
+        logger.error(f"Error flushing auto-save for form {form_pk}: {str(e)}")
+        raise
@@ -0,0 +1,672 @@
+import csv
+import importlib
+import json
+import tempfile
+from datetime import date, datetime, timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from openpyxl import load_workbook
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from core.fake_redis import FakeRedisServer
+from establishments.models import Establishment
+from laws.models import Law
+from reports.jobs import submit_report_job
+from reports.models import ReportJob
+
+from .models import (
+    ComplianceQuota, ComplianceRollup, ComplianceRollupEntry, Inspection, InspectionAccomplishment,
+    InspectionCodeSequence, InspectionForm, InspectionFormLaw, InspectionHistory, QuotaAccomplishment
+)
+
+from .autosave import autosave_buffer, schedule_flush
+
+User = get_user_model()
+
+
+class QuotaAccomplishmentTest(TestCase):
+    def setUp(self):
+        Law.objects.create(
+            law_title='Philippine Clean Air Act',
+            reference_code='RA-8749',
+            description='Clean Air Act',
+            category='Air',
+            effective_date=date(1999, 6, 23),
+        )
+        self.now = timezone.localtime()
+
+    def _finished_inspection(self, laws):
+        inspection = Inspection.objects.create(law='RA-8749', current_status='SECTION_IN_PROGRESS')
+        InspectionForm.objects.create(
+            inspection=inspection,
+            checklist={'general': {'environmental_laws': laws}},
+        )
+        inspection.current_status = 'CLOSED_COMPLIANT'
+        inspection.save()
+        return inspection
+
+    def _count(self, law):
+        return QuotaAccomplishment.get_count(law, self.now.year, self.now.month)
+
+    def test_counter_follows_status_and_checklist(self):
+        inspection = self._finished_inspection(['RA-8749', 'RA-9275'])
+        self.assertEqual(self._count('RA-8749'), 1)
+        self.assertEqual(self._count('RA-9275'), 1)
+
+        form = inspection.form
+        form.checklist = {'general': {'environmental_laws': ['RA-8749']}}
+        form.save()
+        self.assertEqual(self._count('RA-9275'), 0)
+
+        inspection.current_status = 'LEGAL_REVIEW'
+        inspection.save()
+        self.assertEqual(self._count('RA-8749'), 0)
+        self.assertFalse(InspectionAccomplishment.objects.exists())
+
+    def test_delete_releases_counter(self):
+        inspection = self._finished_inspection(['RA-8749'])
+        inspection.delete()
+        self.assertEqual(self._count('RA-8749'), 0)
+
+    def test_quota_reads_counter(self):
+        self._finished_inspection(['RA-8749'])
+        self._finished_inspection(['RA-8749'])
+        quota = ComplianceQuota.objects.create(
+            law='RA-8749', year=self.now.year, month=self.now.month,
+            quarter=ComplianceQuota.get_quarter_from_month(self.now.month), target=1
+        )
+        quota = ComplianceQuota.with_accomplished(ComplianceQuota.objects.filter(pk=quota.pk))[0]
+        with self.assertNumQueries(0):
+            self.assertEqual(quota.accomplished, 2)
+            self.assertTrue(quota.exceeded)
+        quarter = ComplianceQuota.get_quarter_from_month(self.now.month)
+        self.assertEqual(
+            ComplianceQuota.get_quarterly_totals('RA-8749', self.now.year, quarter), (1, 2)
+        )
+
+    def test_rebuild_command(self):
+        self._finished_inspection(['RA-8749'])
+        QuotaAccomplishment.objects.all().delete()
+        InspectionAccomplishment.objects.all().delete()
+        call_command('rebuild_quota_accomplishments', stdout=StringIO())
+        self.assertEqual(self._count('RA-8749'), 1)
+
+
+
+class ComplianceRollupTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email='rollup-admin@example.com', password='testpass123', password_provided=True, userlevel='Admin'
+        )
+        self.today = timezone.localdate()
+
+    def _inspection(self, law, decision, status='SECTION_IN_PROGRESS', **fields):
+        inspection = Inspection.objects.create(law=law, current_status=status, **fields)
+        InspectionForm.objects.create(inspection=inspection, compliance_decision=decision)
+        return inspection
+
+    def _rows(self):
+        return {
+            (row.law, row.status, row.compliance_decision): row.count
+            for row in ComplianceRollup.objects.filter(count__gt=0)
+        }
+
+    def test_rollup_follows_status_and_decision(self):
+        inspection = self._inspection('RA-8749', 'PENDING', district='La Union - 1st District')
+        self.assertEqual(self._rows(), {('RA-8749', 'SECTION_IN_PROGRESS', 'PENDING'): 1})
+        self.assertEqual(ComplianceRollup.objects.get().district, 'La Union - 1st District')
+
+        form = inspection.form
+        form.compliance_decision = 'NON_COMPLIANT'
+        form.save()
+        inspection.current_status = 'LEGAL_REVIEW'
+        inspection.save()
+        self.assertEqual(self._rows(), {('RA-8749', 'LEGAL_REVIEW', 'NON_COMPLIANT'): 1})
+
+        inspection.delete()
+        self.assertEqual(self._rows(), {})
+        self.assertFalse(ComplianceRollupEntry.objects.exists())
+
+    def test_endpoints_read_one_grouped_query(self):
+        self._inspection('PD-1586', 'COMPLIANT', status='CLOSED_COMPLIANT')
+        self._inspection('PD-1586', 'PENDING')
+        self._inspection('RA-9003', 'PARTIALLY_COMPLIANT', status='NOV_SENT')
+        self.client.force_authenticate(user=self.admin)
+
+        with self.assertNumQueries(1):
+            stats = self.client.get('/api/inspections/compliance_stats/').data
+        self.assertEqual(
+            stats, {'pending': 1, 'compliant': 1, 'non_compliant': 1, 'total_completed': 2}
+        )
+
+        with self.assertNumQueries(1):
+            by_law = self.client.get('/api/inspections/compliance_by_law/', {'period_type': 'monthly'}).data
+        rows = {row['law']: row for row in by_law['data']}
+        self.assertEqual((rows['PD-1586']['compliant'], rows['PD-1586']['pending']), (1, 1))
+        self.assertEqual(rows['RA-9003']['non_compliant'], 1)
+        self.assertEqual(rows['RA-6969']['total'], 0)
+
+        with self.assertNumQueries(1):
+            comparison = self.client.get('/api/inspections/quarterly_comparison/', {'period_type': 'yearly'}).data
+        self.assertEqual(comparison['current_period']['total_finished'], 2)
+        self.assertEqual(comparison['last_period']['total_finished'], 0)
+
+        last_year = self.client.get(
+            '/api/inspections/compliance_stats/', {'period_type': 'yearly', 'year': self.today.year - 1}
+        ).data
+        self.assertEqual(last_year['total_completed'], 0)
+
+    def test_legal_unit_sees_legal_statuses_only(self):
+        self._inspection('RA-9003', 'NON_COMPLIANT', status='NOV_SENT')
+        self._inspection('RA-9003', 'NON_COMPLIANT', status='SECTION_IN_PROGRESS')
+        legal = User.objects.create_user(
+            email='rollup-legal@example.com', password='testpass123', password_provided=True, userlevel='Legal Unit'
+        )
+        self.client.force_authenticate(user=legal)
+        data = self.client.get('/api/inspections/compliance_by_law/', {'laws': ['RA-9003']}).data['data']
+        self.assertEqual(data, [{
+            'law': 'RA-9003', 'law_name': 'RA-9003 (WASTE)', 'pending': 0,
+            'compliant': 0, 'non_compliant': 1, 'total': 1,
+        }])
+
+    def test_rebuild_command(self):
+        self._inspection('RA-6969', 'COMPLIANT', status='CLOSED_COMPLIANT')
+        ComplianceRollup.objects.all().delete()
+        ComplianceRollupEntry.objects.all().delete()
+        call_command('rebuild_compliance_rollup', stdout=StringIO())
+        self.assertEqual(self._rows(), {('RA-6969', 'CLOSED_COMPLIANT', 'COMPLIANT'): 1})
+
+class InspectionCodeSequenceTest(TestCase):
+    def test_codes_are_sequential_per_law_and_day(self):
+        today = timezone.now().date()
+        first = Inspection.objects.create(law='PD-1586')
+        second = Inspection.objects.create(law='PD-1586')
+        other = Inspection.objects.create(law='RA-8749')
+
+        self.assertEqual(first.code, InspectionCodeSequence.format_code('EIA', today, 1))
+        self.assertEqual(second.code, InspectionCodeSequence.format_code('EIA', today, 2))
+        self.assertEqual(other.code, InspectionCodeSequence.format_code('AIR', today, 1))
+
+    def test_bulk_reserve_continues_after_existing_codes(self):
+        today = timezone.now().date()
+        # Code issued before the sequence row existed
+        Inspection.objects.create(law='RA-9003', code=InspectionCodeSequence.format_code('WASTE', today, 7))
+
+        codes = Inspection.reserve_codes('RA-9003', count=3)
+        self.assertEqual(codes, [InspectionCodeSequence.format_code('WASTE', today, n) for n in (8, 9, 10)])
+
+        # Savepoint, UPDATE, SELECT, release: no probing for free codes
+        with self.assertNumQueries(4):
+            self.assertEqual(Inspection.reserve_codes('RA-9003'), [InspectionCodeSequence.format_code('WASTE', today, 11)])
+
+
+class TabCountsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.chief = User.objects.create_user(
+            email='section@example.com', password='testpass123', password_provided=True,
+            userlevel='Section Chief', section='PD-1586,RA-8749,RA-9275'
+        )
+        statuses = [
+            'SECTION_ASSIGNED', 'SECTION_ASSIGNED', 'SECTION_IN_PROGRESS',
+            'UNIT_ASSIGNED', 'DIVISION_REVIEWED', 'CLOSED_COMPLIANT',
+        ]
+        for current_status in statuses:
+            inspection = Inspection.objects.create(
+                law='RA-8749', current_status=current_status, assigned_to=self.chief
+            )
+            InspectionForm.objects.create(inspection=inspection, compliance_decision='COMPLIANT')
+        returned = Inspection.objects.create(
+            law='PD-1586', current_status='SECTION_IN_PROGRESS', assigned_to=self.chief
+        )
+        InspectionHistory.objects.create(
+            inspection=returned, new_status='SECTION_IN_PROGRESS', remarks='Returned to Section'
+        )
+        Inspection.objects.create(law='RA-6969', current_status='SECTION_ASSIGNED')
+        self.client.force_authenticate(user=self.chief)
+
+    def test_counts_match_tab_listings(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/inspections/tab_counts/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['section_assigned'], 2)
+        self.assertEqual(response.data['section_in_progress'], 1)
+
+        for params in ({}, {'search': 'RA-8749'}):
+            counts = self.client.get('/api/inspections/tab_counts/', params).data
+            for tab, count in counts.items():
+                listing = self.client.get('/api/inspections/', {**params, 'tab': tab})
+                self.assertEqual(listing.data['count'], count, (params, tab))
+
+    def test_counts_cached_until_status_change(self):
+        first = self.client.get('/api/inspections/tab_counts/').data
+        with self.assertNumQueries(0):
+            self.client.get('/api/inspections/tab_counts/')
+
+        inspection = Inspection.objects.filter(current_status='UNIT_ASSIGNED').first()
+        inspection.current_status = 'SECTION_ASSIGNED'
+        inspection.save()
+        second = self.client.get('/api/inspections/tab_counts/').data
+        self.assertEqual(second['section_assigned'], first['section_assigned'] + 1)
+        self.assertEqual(second['forwarded'], first['forwarded'] - 1)
+
+
+class InspectionSummaryListTest(APITestCase):
+    def setUp(self):
+        self.chief = User.objects.create_user(
+            email='summary@example.com', password='testpass123', password_provided=True,
+            userlevel='Section Chief', section='RA-8749', first_name='Ana', last_name='Cruz'
+        )
+        for i in range(12):
+            establishment = Establishment.objects.create(
+                name=f'Plant {i}', nature_of_business='Manufacturing', year_established='2000',
+                province='La Union', city='San Fernando', barangay='Catbangen',
+                street_building='Main St', postal_code='2500', latitude='16.600000', longitude='120.300000',
+            )
+            inspection = Inspection.objects.create(
+                law='RA-8749', current_status='SECTION_ASSIGNED', assigned_to=self.chief
+            )
+            inspection.establishments.add(establishment)
+            InspectionHistory.objects.create(
+                inspection=inspection, new_status='SECTION_ASSIGNED', remarks='Created'
+            )
+        self.client.force_authenticate(user=self.chief)
+
+    def test_summary_rows(self):
+        response = self.client.get('/api/inspections/', {'view': 'summary', 'tab': 'section_assigned'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 12)
+        row = response.data['results'][0]
+        self.assertEqual(row['assigned_to_name'], 'Ana Cruz')
+        self.assertEqual(row['establishment_name'], 'Plant 11')
+        self.assertEqual(row['simplified_status'], 'New – Waiting for Action')
+        self.assertNotIn('history', row)
+
+    def test_query_count_independent_of_page_size(self):
+        for page_size in (1, 12):
+            with self.assertNumQueries(2):
+                response = self.client.get(
+                    '/api/inspections/', {'view': 'summary', 'page_size': page_size}
+                )
+            self.assertEqual(len(response.data['results']), page_size)
+
+
+class StreamingExcelExportTest(APITestCase):
+    def test_division_report_stream_export(self):
+        chief = User.objects.create_user(
+            email='division@example.com', password='testpass123', password_provided=True,
+            userlevel='Division Chief'
+        )
+        for current_status in ('SECTION_ASSIGNED', 'CLOSED_COMPLIANT', 'DIVISION_REVIEWED'):
+            Inspection.objects.create(law='RA-8749', current_status=current_status, created_by=chief)
+        self.client.force_authenticate(user=chief)
+
+        response = self.client.get('/api/division-reports/export_excel/', {'stream': 'true'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        workbook = load_workbook(BytesIO(b''.join(response.streaming_content)))
+        rows = list(workbook['Detailed Data'].values)
+        self.assertEqual(rows[0][0], 'Inspection No.')
+        self.assertEqual(len(rows), 4)
+        self.assertIn('Closed ✅', [row[4] for row in rows[1:]])
+
+
+@override_settings(REPORT_JOBS_EAGER=True)
+class ReportJobTest(APITestCase):
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        media_override = override_settings(MEDIA_ROOT=self.media.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.chief = User.objects.create_user(
+            email='jobs@example.com', password='testpass123', password_provided=True,
+            userlevel='Division Chief'
+        )
+        for _ in range(3):
+            Inspection.objects.create(law='RA-8749', current_status='SECTION_ASSIGNED', created_by=self.chief)
+        self.client.force_authenticate(user=self.chief)
+
+    def _submit(self):
+        return self.client.post('/api/reports/jobs/', {
+            'report_type': 'division', 'format': 'excel', 'params': {'law': 'RA-8749'},
+        }, format='json')
+
+    def test_job_runs_and_downloads_full_export(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self._submit()
+        self.assertEqual(response.status_code, 202)
+
+        job = self.client.get(f"/api/reports/jobs/{response.data['id']}/").data
+        self.assertEqual(job['status'], 'completed', job['error'])
+        self.assertEqual(job['progress'], 100)
+
+        download = self.client.get(job['download_url'])
+        self.assertEqual(download.status_code, 200)
+        workbook = load_workbook(BytesIO(b''.join(download.streaming_content)))
+        self.assertIn('Detailed Data', workbook.sheetnames)
+
+    def test_identical_in_flight_requests_share_a_job(self):
+        with self.settings(REPORT_JOBS_EAGER=False), mock.patch('reports.jobs.enqueue_report_job'):
+            with self.captureOnCommitCallbacks(execute=True):
+                first = self._submit()
+                second = self._submit()
+        self.assertEqual(first.status_code, 202)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(first.data['id'], second.data['id'])
+        self.assertEqual(ReportJob.objects.count(), 1)
+
+        pending = self.client.get(f"/api/reports/jobs/{first.data['id']}/download/")
+        self.assertEqual(pending.status_code, 409)
+
+    def test_concurrent_submit_reuses_the_winning_job(self):
+        with mock.patch('reports.jobs.enqueue_report_job'):
+            first, _ = submit_report_job(self.chief, 'division', 'excel', {'law': 'RA-8749'})
+            # The second submit looked for an in-flight job before the first one existed
+            with mock.patch.object(ReportJob.objects, 'select_for_update', return_value=ReportJob.objects.none()):
+                second, created = submit_report_job(self.chief, 'division', 'excel', {'law': 'RA-8749'})
+        self.assertFalse(created)
+        self.assertEqual(second.pk, first.pk)
+        self.assertEqual(ReportJob.objects.count(), 1)
+
+    @override_settings(REPORT_JOB_CLAIM_TIMEOUT=60)
+    def test_stale_in_flight_job_is_failed_and_replaced(self):
+        with mock.patch('reports.jobs.enqueue_report_job'):
+            dead, _ = submit_report_job(self.chief, 'division', 'excel', {'law': 'RA-8749'})
+            ReportJob.objects.filter(pk=dead.pk).update(
+                status='running', started_at=timezone.now() - timedelta(minutes=5)
+            )
+            fresh, created = submit_report_job(self.chief, 'division', 'excel', {'law': 'RA-8749'})
+        self.assertTrue(created)
+        self.assertNotEqual(fresh.pk, dead.pk)
+        dead.refresh_from_db()
+        self.assertEqual((dead.status, dead.in_flight_hash), ('failed', None))
+        self.assertEqual(fresh.in_flight_hash, dead.filter_hash)
+
+
+class GenerateReportFormatsTest(APITestCase):
+    def setUp(self):
+        from reports.models import ReportAccess
+
+        self.chief = User.objects.create_user(
+            email='reports@example.com', password='testpass123', password_provided=True,
+            userlevel='Division Chief', first_name='Rosa', last_name='Lim'
+        )
+        ReportAccess.objects.create(role='Division Chief', report_type='inspection')
+        for i in range(5):
+            establishment = Establishment.objects.create(
+                name=f'Mill {i}', nature_of_business='Manufacturing', year_established='2000',
+                province='La Union', city='San Fernando', barangay='Catbangen',
+                street_building='Main St', postal_code='2500', latitude='16.600000', longitude='120.300000',
+            )
+            inspection = Inspection.objects.create(
+                code=f'INS-{i}', law='RA-8749', current_status='SECTION_ASSIGNED', assigned_to=self.chief
+            )
+            inspection.establishments.add(establishment)
+        self.client.force_authenticate(user=self.chief)
+
+    def _generate(self, **options):
+        today = timezone.localdate().isoformat()
+        return self.client.post('/api/reports/generate/', {
+            'report_type': 'inspection', 'time_filter': 'custom',
+            'date_from': '2000-01-01', 'date_to': f'{today}T23:59:59', **options,
+        }, format='json')
+
+    def test_json_report_and_pages(self):
+        from reports.generators import InspectionReportGenerator
+
+        with mock.patch.object(InspectionReportGenerator, 'chunk_size', 2):
+            full = self._generate().data
+        self.assertEqual(full['metadata']['total'], 5)
+        self.assertEqual([row['code'] for row in full['rows']], [f'INS-{i}' for i in range(4, -1, -1)])
+        self.assertEqual(full['rows'][0]['establishment_names'], 'Mill 4')
+        self.assertEqual(full['rows'][0]['assigned_to'], 'Rosa Lim')
+
+        page = self._generate(page=2, page_size=2).data
+        self.assertEqual([row['code'] for row in page['rows']], ['INS-2', 'INS-1'])
+        self.assertEqual((page['metadata']['total'], page['metadata']['total_pages']), (5, 3))
+
+    def test_ndjson_and_csv_stream(self):
+        response = self._generate(format='ndjson')
+        self.assertTrue(response.streaming)
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(lines[0]['metadata']['total'], 5)
+        self.assertEqual([line['code'] for line in lines[1:]], [f'INS-{i}' for i in range(4, -1, -1)])
+
+        response = self._generate(format='csv')
+        rows = list(csv.reader(StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0][:2], ['Inspection Code', 'Establishments'])
+        self.assertEqual(rows[1][:2], ['INS-4', 'Mill 4'])
+        self.assertEqual(len(rows), 6)
+
+    def test_unknown_format_is_rejected(self):
+        self.assertEqual(self._generate(format='xml').status_code, 400)
+
+
+class DeltaAutoSaveTest(APITestCase):
+    @classmethod
+    def setUpClass(cls):
+        # The write-behind buffer only runs on a cache shared across processes
+        cls.redis = FakeRedisServer().start()
+        cls.cache_settings = override_settings(
+            CACHES={
+                'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+                'autosave': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': cls.redis.url},
+            },
+            AUTOSAVE_CACHE_ALIAS='autosave',
+        )
+        cls.cache_settings.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.cache_settings.disable()
+        cls.redis.stop()
+
+    def setUp(self):
+        cache.clear()
+        caches['autosave'].clear()
+        self.chief = User.objects.create_user(
+            email='autosave@example.com', password='testpass123', password_provided=True,
+            userlevel='Section Chief', section='RA-8749'
+        )
+        self.inspection = Inspection.objects.create(
+            law='RA-8749', current_status='SECTION_IN_PROGRESS', assigned_to=self.chief
+        )
+        self.url = f'/api/inspections/{self.inspection.pk}/auto_save_delta/'
+        self.client.force_authenticate(user=self.chief)
+
+    def _save(self, version, **sections):
+        return self.client.patch(self.url, {'version': version, 'sections': sections}, format='json')
+
+    def _autosave_histories(self):
+        return InspectionHistory.objects.filter(inspection=self.inspection, remarks='Auto-saved inspection form')
+
+    @override_settings(AUTOSAVE_COALESCE_SECONDS=0)
+    def test_sections_merge_and_versions_advance(self):
+        response = self._save(0, general={'company_name': 'Acme', 'compliance_observations': 'COMPLIANT'})
+        self.assertEqual((response.status_code, response.data['version'], response.data['buffered']), (200, 1, False))
+        response = self._save(1, general={'company_name': None, 'nature': 'Mill'}, permits=[{'id': 1}])
+        self.assertEqual(response.data['version'], 2)
+
+        form = InspectionForm.objects.get(pk=self.inspection.pk)
+        self.assertEqual(form.version, 2)
+        self.assertEqual(form.checklist['general'], {'compliance_observations': 'COMPLIANT', 'nature': 'Mill'})
+        self.assertEqual(form.checklist['permits'], [{'id': 1}])
+        self.assertEqual(form.compliance_decision, 'COMPLIANT')
+        self.assertEqual(form.inspected_by, self.chief)
+        # History/audit throttled to one entry per interval
+        self.assertEqual(self._autosave_histories().count(), 1)
+
+    @override_settings(AUTOSAVE_COALESCE_SECONDS=0)
+    def test_stale_version_and_bad_payloads_are_rejected(self):
+        self._save(0, purpose={'text': 'Routine'})
+        stale = self._save(0, purpose={'text': 'Overwrite'})
+        self.assertEqual((stale.status_code, stale.data['version']), (409, 1))
+        self.assertEqual(self._save(1, unknown={'a': 1}).status_code, 400)
+        self.assertEqual(self.client.patch(self.url, {'sections': {'purpose': {}}}, format='json').status_code, 400)
+
+    @override_settings(AUTOSAVE_COALESCE_SECONDS=60)
+    def test_rapid_saves_coalesce_into_one_write(self):
+        with CaptureQueriesContext(connection) as queries, \
+                mock.patch('inspections.autosave.schedule_flush') as schedule, \
+                self.captureOnCommitCallbacks(execute=True):
+            for version in range(3):
+                response = self._save(version, general={f'field{version}': version})
+                self.assertTrue(response.data['buffered'])
+        writes = [q['sql'] for q in queries if q['sql'].startswith('UPDATE') and 'inspectionform' in q['sql']]
+        self.assertEqual(writes, [])
+        # One flush scheduled for the buffer, not one per save
+        schedule.assert_called_once_with(self.inspection.pk, 60)
+
+        form = InspectionForm.objects.get(pk=self.inspection.pk)
+        self.assertEqual(form.version, 0)
+        # Readers already see the buffered deltas
+        detail = self.client.get(f'/api/inspections/{self.inspection.pk}/').data['form']
+        self.assertEqual(detail['version'], 3)
+        self.assertEqual(detail['checklist']['general'], {'field0': 0, 'field1': 1, 'field2': 2})
+
+        with mock.patch('inspections.tasks.flush_inspection_autosave.apply_async', side_effect=OSError('no broker')):
+            schedule_flush(self.inspection.pk, 60)
+        form.refresh_from_db()
+        self.assertEqual(form.version, 3)
+        self.assertEqual(form.checklist['general'], {'field0': 0, 'field1': 1, 'field2': 2})
+        self.assertEqual(self._autosave_histories().count(), 1)
+        self.assertFalse(autosave_buffer.flush(form.pk))
+
+    @override_settings(AUTOSAVE_COALESCE_SECONDS=60)
+    def test_full_write_flushes_buffered_deltas_first(self):
+        self._save(0, general={'draft': True})
+        form = InspectionForm.objects.get(pk=self.inspection.pk)
+        form.violations_found = 'Smoke'
+        form.save()
+        self.assertEqual(form.version, 2)
+        self.assertIsNone(autosave_buffer.buffered_version(form.pk))
+        form.refresh_from_db()
+        self.assertEqual((form.checklist['general'], form.violations_found), ({'draft': True}, 'Smoke'))
+
+        stale = self._save(1, general={'draft': False})
+        self.assertEqual((stale.status_code, stale.data['version']), (409, 2))
+
+    @override_settings(AUTOSAVE_COALESCE_SECONDS=60, AUTOSAVE_CACHE_ALIAS='default')
+    def test_per_process_cache_writes_through(self):
+        response = self._save(0, general={'draft': True})
+        self.assertEqual((response.data['version'], response.data['buffered']), (1, False))
+        form = InspectionForm.objects.get(pk=self.inspection.pk)
+        self.assertEqual((form.version, form.checklist['general']), (1, {'draft': True}))
+
+    @override_settings(AUTOSAVE_COALESCE_SECONDS=60)
+    def test_signature_upload_keeps_buffered_deltas(self):
+        self._save(0, general={'company_name': 'Acme', 'compliance_observations': 'COMPLIANT'})
+        self.assertEqual(autosave_buffer.buffered_version(self.inspection.pk), 1)
+
+        image = BytesIO()
+        Image.new('RGB', (4, 4)).save(image, 'PNG')
+        with tempfile.TemporaryDirectory() as media, self.settings(MEDIA_ROOT=media):
+            response = self.client.post(
+                f'/api/inspections/{self.inspection.pk}/upload_signature/',
+                {'slot': 'submitted', 'file': SimpleUploadedFile('sign.png', image.getvalue(), 'image/png')},
+                format='multipart',
+            )
+        self.assertEqual(response.status_code, 200, response.data)
+
+        form = InspectionForm.objects.get(pk=self.inspection.pk)
+        self.assertEqual(form.checklist['general'], {'company_name': 'Acme', 'compliance_observations': 'COMPLIANT'})
+        self.assertIn('submitted', form.checklist['signatures'])
+        self.assertEqual((form.compliance_decision, form.version), ('COMPLIANT', 2))
+        self.assertIsNone(autosave_buffer.buffered_version(form.pk))
+        # The inspector carries on from the version after the upload without a conflict
+        self.assertEqual(self._save(2, purpose={'text': 'Routine'}).status_code, 200)
+
+
+class ChecklistProjectionTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.chief = User.objects.create_user(
+            email='projection@example.com', password='testpass123', password_provided=True,
+            userlevel='Division Chief'
+        )
+        self.client.force_authenticate(user=self.chief)
+
+    def _form(self, **general):
+        inspection = Inspection.objects.create(law='RA-8749', current_status='SECTION_IN_PROGRESS', created_by=self.chief)
+        return InspectionForm.objects.create(inspection=inspection, checklist={'general': general, 'is_draft': True})
+
+    def _laws(self, form):
+        return set(InspectionFormLaw.objects.filter(form=form).values_list('law', flat=True))
+
+    def test_checklist_writes_keep_projection_in_sync(self):
+        form = self._form(environmental_laws=['RA-8749', 'RA-9275'], inspection_date_time='2026-03-05T09:30')
+        form.refresh_from_db()
+        self.assertEqual(self._laws(form), {'RA-8749', 'RA-9275'})
+        self.assertEqual(timezone.localtime(form.inspection_date).replace(tzinfo=None), datetime(2026, 3, 5, 9, 30))
+        self.assertTrue(form.is_draft)
+
+        # Writes that leave the checklist alone leave the projection alone
+        InspectionFormLaw.objects.filter(form=form).delete()
+        form.violations_found = 'Smoke'
+        form.save(update_fields=['violations_found'])
+        self.assertEqual(self._laws(form), set())
+
+        form.checklist = {'general': {'environmental_laws': ['RA-9275', 'PD-1586', None]}, 'is_draft': False}
+        form.save(update_fields=['checklist'])
+        form.refresh_from_db()
+        self.assertEqual(self._laws(form), {'RA-9275', 'PD-1586'})
+        self.assertIsNone(form.inspection_date)
+        self.assertFalse(form.is_draft)
+
+    @override_settings(AUTOSAVE_COALESCE_SECONDS=0)
+    def test_delta_auto_save_projects_checklist(self):
+        section_chief = User.objects.create_user(
+            email='projection-section@example.com', password='testpass123', password_provided=True,
+            userlevel='Section Chief', section='RA-8749'
+        )
+        inspection = Inspection.objects.create(law='RA-8749', current_status='SECTION_IN_PROGRESS', assigned_to=section_chief)
+        self.client.force_authenticate(user=section_chief)
+        response = self.client.patch(
+            f'/api/inspections/{inspection.pk}/auto_save_delta/',
+            {'version': 0, 'sections': {'general': {'environmental_laws': ['RA-6969'], 'inspection_date_time': '2026-04-01'}}},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        form = InspectionForm.objects.get(pk=inspection.pk)
+        self.assertEqual(self._laws(form), {'RA-6969'})
+        self.assertEqual(timezone.localtime(form.inspection_date).date(), date(2026, 4, 1))
+        self.assertTrue(form.is_draft)
+
+    def test_division_report_filters_on_projected_columns(self):
+        march = self._form(environmental_laws=['RA-9275'], inspection_date_time='2026-03-05T23:30')
+        self._form(environmental_laws=['RA-8749'], inspection_date_time='2026-03-05T08:00')
+        self._form(environmental_laws=['RA-9275'], inspection_date_time='2026-03-06T08:00')
+
+        response = self.client.get('/api/division-reports/', {
+            'applicable_law': 'RA-9275', 'inspection_date_from': '2026-03-05', 'inspection_date_to': '2026-03-05',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data['results']], [march.pk])
+
+    def test_backfill_matches_save_projection(self):
+        migration = importlib.import_module('inspections.migrations.0014_inspection_form_projection')
+        for checklist in (
+            {'general': {'environmental_laws': ['RA-8749', ''], 'inspection_date_time': '2026-03-05T09:30:00Z'}},
+            {'general': {'environmental_laws': 'RA-8749', 'inspection_date_time': 'soon'}, 'is_draft': True},
+            None,
+        ):
+            form = InspectionForm(checklist=checklist)
+            form.project_checklist()
+            self.assertEqual(
+                migration.checklist_projection(checklist),
+                (InspectionForm.checklist_laws(checklist), form.inspection_date, form.is_draft),
+            )
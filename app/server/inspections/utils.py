@@ -9,10 +9,103 @@ from django.utils.html import strip_tags, linebreaks
 
 logger = logging.getLogger(__name__)
 
+# Short-lived per-user cache for InspectionViewSet.tab_counts
+TAB_COUNTS_CACHE_TIMEOUT = getattr(settings, 'INSPECTION_TAB_COUNTS_CACHE_TIMEOUT', 5)
+
+
+def get_tab_counts_cache_key(user, query_params):
+    """
+    Build the tab_counts cache key for a user and request filters.
+    The key embeds the "inspections" cache scope version (core/cache.py),
+    bumped by inspections.signals on every inspection change.
+    """
+    from core.cache import make_key
+
+    params = sorted(
+        (key, value)
+        for key in query_params
+        if key != 'tab'
+        for value in query_params.getlist(key)
+    )
+    return make_key('inspections:tab_counts', ['inspections'], user.pk, params)
+
+
+def invalidate_tab_counts_cache():
+    """Invalidate every cached tab_counts result"""
+    from core.cache import bump
+
+    bump('inspections')
+
+
+# Dashboard analytics periods (compliance_stats, quarterly_comparison, compliance_by_law)
+PERIOD_TYPES = ('monthly', 'quarterly', 'yearly')
+QUARTER_LABELS = {1: 'Jan-Mar', 2: 'Apr-Jun', 3: 'Jul-Sep', 4: 'Oct-Dec'}
+
+
+def parse_period_params(query_params, default='quarterly'):
+    """
+    Read period_type/year/month/quarter query params.
+    Returns (period_type, year, number) where number is the month or quarter
+    (None for yearly); missing values default to the current period.
+    """
+    from django.utils import timezone
+
+    today = timezone.localdate()
+    period_type = query_params.get('period_type', default)
+    if period_type not in PERIOD_TYPES:
+        period_type = default
+
+    try:
+        year = int(query_params.get('year', today.year))
+    except (TypeError, ValueError):
+        year = today.year
+
+    number = None
+    try:
+        if period_type == 'monthly':
+            number = int(query_params.get('month', today.month))
+        elif period_type == 'quarterly':
+            number = int(query_params.get('quarter', (today.month - 1) // 3 + 1))
+    except (TypeError, ValueError):
+        number = today.month if period_type == 'monthly' else (today.month - 1) // 3 + 1
+    if period_type == 'monthly':
+        number = min(max(number, 1), 12)
+    elif period_type == 'quarterly':
+        number = min(max(number, 1), 4)
+    return period_type, year, number
+
+
+def get_period_window(period_type, year, number=None):
+    """(first_date, last_date, label) of a month, quarter or year"""
+    from calendar import month_abbr, monthrange
+    from datetime import date
+
+    if period_type == 'monthly':
+        return date(year, number, 1), date(year, number, monthrange(year, number)[1]), f"{month_abbr[number]} {year}"
+    if period_type == 'quarterly':
+        last_month = number * 3
+        return (
+            date(year, last_month - 2, 1),
+            date(year, last_month, monthrange(year, last_month)[1]),
+            f"{QUARTER_LABELS[number]} {year}",
+        )
+    return date(year, 1, 1), date(year, 12, 31), str(year)
+
+
+def get_previous_period(period_type, year, number=None):
+    """(year, number) of the period before the given one"""
+    if period_type == 'monthly':
+        return (year - 1, 12) if number == 1 else (year, number - 1)
+    if period_type == 'quarterly':
+        return (year - 1, 4) if number == 1 else (year, number - 1)
+    return year - 1, None
+
 
 def send_notice_email(subject, body, recipient_email, notice_type='NOV', context=None):
     """
-    Send NOV/NOO notices to establishments using professional government-style templates.
+    Queue NOV/NOO notices to establishments (government-style templates) in the email outbox.
+    Raises only if the notice cannot be rendered or queued; SMTP delivery and retries
+    happen on the Celery worker (notifications.outbox).
     
     Args:
         subject: Email subject line
@@ -80,18 +173,17 @@ def send_notice_email(subject, body, recipient_email, notice_type='NOV', context
         plain_text = re.sub(r'\n\s*\n', '\n\n', plain_text)
         plain_text = plain_text.strip()
         
-        # Create email
-        email = EmailMultiAlternatives(
-            subject=subject,
+        # Queue email; the outbox consumer delivers and retries off the request path
+        from notifications.outbox import enqueue_email
+        logger.info(f"Queueing {notice_type} email to {recipient_email} with subject '{subject}' using backend {backend_name}")
+        enqueue_email(
+            [recipient_email],
+            subject,
             body=plain_text,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[recipient_email],
+            html_body=html_body,
+            category=notice_type.upper(),
         )
-        email.attach_alternative(html_body, "text/html")
-        
-        logger.info(f"Sending {notice_type} email to {recipient_email} with subject '{subject}' using backend {backend_name}")
-        email.send(fail_silently=False)
-        logger.info(f"Notice email sent successfully to {recipient_email} with subject '{subject}'")
+        logger.info(f"Notice email queued for {recipient_email} with subject '{subject}'")
         return True
     except Exception as exc:
         logger.error(f"Failed to send notice email to {recipient_email}: {str(exc)}", exc_info=True)
@@ -305,23 +397,11 @@ def send_inspection_completion_notification(inspection, completed_by, next_assig
         html_message = render_to_string('emails/inspection_completion_notification.html', context)
         plain_message = strip_tags(html_message)
         
-        # Send email to next reviewer
-        email = EmailMessage(
-            subject=subject,
-            body=html_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[next_assignee.email],
-        )
-        email.content_subtype = 'html'  # Set content type to HTML
-        email.extra_headers = {
-            'X-Priority': '1',
-            'X-MSMail-Priority': 'High',
-            'Importance': 'High',
-            'X-Mailer': 'IERMS System - Urgent Notification'
-        }
-        email.send(fail_silently=False)
+        # Queue email to next reviewer (delivered by the Celery worker)
+        from notifications.dispatcher import URGENT_EMAIL_HEADERS, queue_email
+        queue_email(subject, html_message, [next_assignee.email], html=True, headers=URGENT_EMAIL_HEADERS)
         
-        logger.info(f"Inspection completion notification sent to {next_assignee.email} for {inspection.code}")
+        logger.info(f"Inspection completion notification queued for {next_assignee.email} for {inspection.code}")
         return True
         
     except Exception as e:
@@ -334,7 +414,7 @@ def create_completion_notification(recipient, inspection, completed_by, completi
     Create in-app notification when inspection is completed (both compliant and non-compliant)
     """
     try:
-        from notifications.models import Notification
+        from notifications.dispatcher import notify
         
         # Get establishment names
         establishment_names = [est.name for est in inspection.establishments.all()]
@@ -352,15 +432,15 @@ def create_completion_notification(recipient, inspection, completed_by, completi
             message += f" Remarks: {remarks}"
         
         # Create notification
-        notification = Notification.objects.create(
-            recipient=recipient,
+        notification = notify(
+            [recipient],
+            'inspection_completed',
+            f'Inspection Completed ({compliance_text})',
+            message,
             sender=completed_by,
-            notification_type='inspection_completed',
-            title=f'Inspection Completed ({compliance_text})',
-            message=message,
             related_object_type='inspection',
             related_object_id=inspection.id if hasattr(inspection, 'id') else None
-        )
+        )[0]
         
         logger.info(f"In-app completion notification created for {recipient.email}")
         return notification
@@ -407,23 +487,11 @@ def send_inspection_review_notification(inspection, reviewer, next_assignee, rev
         html_message = render_to_string('emails/inspection_review_notification.html', context)
         plain_message = strip_tags(html_message)
         
-        # Send to next reviewer
-        email = EmailMessage(
-            subject=subject,
-            body=html_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[next_assignee.email],
-        )
-        email.content_subtype = 'html'  # Set content type to HTML
-        email.extra_headers = {
-            'X-Priority': '1',
-            'X-MSMail-Priority': 'High',
-            'Importance': 'High',
-            'X-Mailer': 'IERMS System - Urgent Notification'
-        }
-        email.send(fail_silently=False)
+        # Queue email to next reviewer (delivered by the Celery worker)
+        from notifications.dispatcher import URGENT_EMAIL_HEADERS, queue_email
+        queue_email(subject, html_message, [next_assignee.email], html=True, headers=URGENT_EMAIL_HEADERS)
         
-        logger.info(f"Inspection review notification sent to {next_assignee.email} for {inspection.code}")
+        logger.info(f"Inspection review notification queued for {next_assignee.email} for {inspection.code}")
         return True
         
     except Exception as e:
@@ -436,7 +504,7 @@ def create_review_notification(recipient, inspection, reviewer, review_status, r
     Create in-app notification when inspection review is completed and forwarded (both compliant and non-compliant)
     """
     try:
-        from notifications.models import Notification
+        from notifications.dispatcher import notify
         
         # Get establishment names
         establishment_names = [est.name for est in inspection.establishments.all()]
@@ -450,15 +518,15 @@ def create_review_notification(recipient, inspection, reviewer, review_status, r
             message += f" Remarks: {remarks}"
         
         # Create notification
-        notification = Notification.objects.create(
-            recipient=recipient,
+        notification = notify(
+            [recipient],
+            'inspection_review',
+            'Inspection Review Required',
+            message,
             sender=reviewer,
-            notification_type='inspection_review',
-            title='Inspection Review Required',
-            message=message,
             related_object_type='inspection',
             related_object_id=inspection.id if hasattr(inspection, 'id') else None
-        )
+        )[0]
         
         logger.info(f"In-app review notification created for {recipient.email}")
         return notification
@@ -473,7 +541,7 @@ def create_forward_notification(recipient, inspection, forwarded_by, remarks=Non
     Create in-app notification when inspection is forwarded to a user
     """
     try:
-        from notifications.models import Notification
+        from notifications.dispatcher import notify
 
         # Get establishment names
         establishment_names = [est.name for est in inspection.establishments.all()]
@@ -487,15 +555,15 @@ def create_forward_notification(recipient, inspection, forwarded_by, remarks=Non
             message += f" Remarks: {remarks}"
 
         # Create notification
-        notification = Notification.objects.create(
-            recipient=recipient,
+        notification = notify(
+            [recipient],
+            'inspection_forward',
+            'Inspection Forwarded to You',
+            message,
             sender=forwarded_by,
-            notification_type='inspection_forward',
-            title='Inspection Forwarded to You',
-            message=message,
             related_object_type='inspection',
             related_object_id=inspection.id if hasattr(inspection, 'id') else None
-        )
+        )[0]
         
         logger.info(f"In-app forward notification created for {recipient.email}")
         return notification
@@ -510,7 +578,7 @@ def create_return_notification(recipient, inspection, returned_by, return_status
     Create in-app notification when inspection is returned for additional action.
     """
     try:
-        from notifications.models import Notification
+        from notifications.dispatcher import notify
 
         establishment_names = [est.name for est in inspection.establishments.all()]
         establishment_list = ", ".join(establishment_names) if establishment_names else "No establishments"
@@ -541,15 +609,15 @@ def create_return_notification(recipient, inspection, returned_by, return_status
         if remarks:
             message += f" Remarks: {remarks}"
 
-        notification = Notification.objects.create(
-            recipient=recipient,
+        notification = notify(
+            [recipient],
+            'inspection_return',
+            'Inspection Returned for Corrections',
+            message,
             sender=returned_by,
-            notification_type='inspection_return',
-            title='Inspection Returned for Corrections',
-            message=message,
             related_object_type='inspection',
             related_object_id=getattr(inspection, 'id', None)
-        )
+        )[0]
 
         logger.info(f"In-app return notification created for {recipient.email}")
         return notification
@@ -6,7 +6,8 @@ import logging
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q, Exists, OuterRef, Prefetch
+from django.db import transaction
+from django.db.models import Q, Exists, OuterRef, Prefetch, Subquery
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 
@@ -14,14 +15,24 @@ from audit.constants import AUDIT_ACTIONS, AUDIT_MODULES
 from audit.models import ActivityLog
 from audit.serializers import ActivityLogSerializer
 from audit.utils import log_activity
+from core.cache import cached_view
+from core.db_router import ReplicaReadMixin, replica_reads
+from core.pagination import CursorOrPagePagination
 
-from .models import Inspection, InspectionForm, InspectionDocument, InspectionHistory, NoticeOfViolation, NoticeOfOrder, BillingRecord
+from .models import (
+    Inspection, InspectionForm, InspectionFormLaw, InspectionDocument, InspectionHistory, NoticeOfViolation,
+    NoticeOfOrder, BillingRecord
+)
 from .serializers import (
-    InspectionSerializer, InspectionCreateSerializer, InspectionFormSerializer,
+    InspectionSerializer, InspectionSummarySerializer, InspectionCreateSerializer, InspectionFormSerializer,
     InspectionHistorySerializer, InspectionDocumentSerializer,
     InspectionActionSerializer, NOVSerializer, NOOSerializer, BillingRecordSerializer,
     SignatureUploadSerializer, RecommendationSerializer, LegalReportSerializer, DivisionReportSerializer
 )
+from .autosave import AUTOSAVE_SECTIONS, StaleVersion, apply_general_fields, autosave_buffer, log_autosave_history
+from .excel_streaming import (
+    INSPECTION_REPORT_COLUMNS, LEGAL_REPORT_COLUMNS, stream_report_excel, wants_streaming_export
+)
 from .utils import (
     send_inspection_forward_notification,
     create_forward_notification,
@@ -35,6 +46,32 @@ USER_HAS_DISTRICT = any(field.name == 'district' for field in User._meta.get_fie
 logger = logging.getLogger(__name__)
 
 
+# Law codes and display names of the dashboard comparison and compliance-by-law charts
+QUARTERLY_COMPARISON_LAW_NAMES = {
+    "PD-1586": "PD-1586 (EIA)",
+    "RA-6969": "RA-6969 (TOX)",
+    "RA-8749": "RA-8749 (CAA)",
+    "RA-9275": "RA-9275 (CWA)",
+    "RA-9003": "RA-9003 (SWM)",
+}
+COMPLIANCE_BY_LAW_CHOICES = (
+    ("PD-1586", "PD-1586 (EIA)"),
+    ("RA-6969", "RA-6969 (TOX)"),
+    ("RA-8749", "RA-8749 (AIR)"),
+    ("RA-9275", "RA-9275 (WATER)"),
+    ("RA-9003", "RA-9003 (WASTE)"),
+)
+
+
+def user_dashboard_cache_scopes(request):
+    """Role-scoped dashboards change with inspections and with the user's own role/section"""
+    return ['inspections', f"user:{request.user.pk}"]
+
+
+def quota_dashboard_cache_scopes(request):
+    return ['inspections', 'quotas', f"user:{request.user.pk}"]
+
+
 def capture_inspector_info(form, user):
     """Capture inspector information on first form fill-out"""
     if form.inspected_by is None and user:
@@ -66,6 +103,13 @@ def audit_inspection_event(user, inspection, action, description, request, metad
     )
 
 
+def export_row_limit(request, limit):
+    """Row cap for synchronous exports; report jobs (reports.jobs) export everything"""
+    if getattr(request, 'report_job_id', None):
+        return None
+    return limit
+
+
 class InspectionViewSet(viewsets.ModelViewSet):
     """
     Complete Inspection ViewSet with workflow state machine
@@ -73,6 +117,8 @@ class InspectionViewSet(viewsets.ModelViewSet):
     queryset = Inspection.objects.all()
     serializer_class = InspectionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # ?pagination=cursor / ?cursor=... for keyset paging on (created_at, id)
+    pagination_class = CursorOrPagePagination
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action"""
@@ -155,71 +201,87 @@ class InspectionViewSet(viewsets.ModelViewSet):
         # Call the parent update method for other fields
         return super().update(request, *args, **kwargs)
     
+    # Columns returned by ?view=summary (see InspectionSummarySerializer)
+    SUMMARY_FIELDS = (
+        'id', 'code', 'law', 'district', 'current_status',
+        'assigned_to', 'assigned_to__first_name', 'assigned_to__last_name', 'assigned_to__email',
+        'establishment_name', 'created_at', 'updated_at',
+    )
+    
     def list(self, request, *args, **kwargs):
         """List inspections with pagination"""
         queryset = self.filter_queryset(self.get_queryset())
         
+        if request.query_params.get('view') == 'summary':
+            queryset = self._summary_queryset(queryset)
+            serializer_class = InspectionSummarySerializer
+        else:
+            serializer_class = self.get_serializer_class()
+        
         page = self.paginate_queryset(queryset)
         if page is not None:
-            serializer = self.get_serializer(page, many=True)
+            serializer = serializer_class(page, many=True, context=self.get_serializer_context())
             return self.get_paginated_response(serializer.data)
         
-        serializer = self.get_serializer(queryset, many=True)
+        serializer = serializer_class(queryset, many=True, context=self.get_serializer_context())
         return Response(serializer.data)
     
+    def _summary_queryset(self, queryset):
+        """
+        Reduce the list queryset to plain value rows for the tab tables.
+        Page size does not change the query count: one COUNT plus one SELECT
+        (just the SELECT with the keyset cursor).
+        """
+        from establishments.models import Establishment
+        # Same order as the detail serializer's establishments list (Establishment.Meta.ordering), pk as tie-break
+        first_establishment = Establishment.objects.filter(
+            inspections_new=OuterRef('pk')
+        ).order_by('-created_at', '-pk').values('name')[:1]
+        return queryset.select_related(None).prefetch_related(None).annotate(
+            establishment_name=Subquery(first_establishment)
+        ).values(*self.SUMMARY_FIELDS)
+    
     def get_queryset(self):
         """Filter inspections based on user role and tab"""
         user = self.request.user
         queryset = super().get_queryset()
         
-        # Get filter parameters
+        # Role-based filtering
         tab = self.request.query_params.get('tab')
+        queryset = self._filter_by_tab(queryset, user, tab)
+        
+        # Additional filters shared by every tab
+        queryset = self._apply_common_filters(queryset)
+        
+        # Sorting
+        order_by = self.request.query_params.get('order_by', 'created_at')
+        order_direction = self.request.query_params.get('order_direction', 'desc')
+        
+        # Validate sort field
+        valid_sort_fields = ['code', 'created_at', 'updated_at', 'current_status', 'law']
+        if order_by in valid_sort_fields:
+            # Apply direction
+            if order_direction == 'desc':
+                order_by = f'-{order_by}'
+            queryset = queryset.order_by(order_by)
+        else:
+            # Default sorting
+            queryset = queryset.order_by('-created_at')
+        
+        return queryset.select_related(
+            'created_by', 'assigned_to'
+        ).prefetch_related('establishments', 'history').distinct()
+    
+    def _apply_common_filters(self, queryset):
+        """Apply the non-tab filters (status, ownership, law, establishment, dates, search)"""
+        user = self.request.user
+        
+        # Get filter parameters
         status_filter = self.request.query_params.get('status')
         assigned_to_me = self.request.query_params.get('assigned_to_me') == 'true'
         created_by_me = self.request.query_params.get('created_by_me') == 'true'
         search = self.request.query_params.get('search')
         
-        # Role-based filtering
-        if user.userlevel == 'Admin':
-            # Admin sees all inspections but can filter by workflow stage tabs
-            final_statuses = [
-                'SECTION_COMPLETED_COMPLIANT',
-                'SECTION_COMPLETED_NON_COMPLIANT',
-                'UNIT_COMPLETED_COMPLIANT',
-                'UNIT_COMPLETED_NON_COMPLIANT',
-                'MONITORING_COMPLETED_COMPLIANT',
-                'MONITORING_COMPLETED_NON_COMPLIANT',
-                'SECTION_REVIEWED',
-                'UNIT_REVIEWED',
-                'DIVISION_REVIEWED',
-                'LEGAL_REVIEW',
-                'NOV_SENT',
-                'NOO_SENT',
-                'CLOSED_COMPLIANT',
-                'CLOSED_NON_COMPLIANT'
-            ]
-            if tab == 'compliant':
-                queryset = queryset.filter(
-                    form__compliance_decision='COMPLIANT',
-                    current_status='CLOSED_COMPLIANT'
-                )
-            elif tab == 'non_compliant':
-                queryset = queryset.filter(
-                    form__compliance_decision__in=['NON_COMPLIANT', 'PARTIALLY_COMPLIANT'],
-                    current_status='CLOSED_NON_COMPLIANT'
-                )
-            # All other tabs fall back to the unfiltered queryset for Admin
-        elif user.userlevel == 'Division Chief':
-            queryset = self._filter_division_chief(queryset, user, tab)
-        elif user.userlevel == 'Section Chief':
-            queryset = self._filter_section_chief(queryset, user, tab)
-        elif user.userlevel == 'Unit Head':
-            queryset = self._filter_unit_head(queryset, user, tab)
-        elif user.userlevel == 'Monitoring Personnel':
-            queryset = self._filter_monitoring_personnel(queryset, user, tab)
-        elif user.userlevel == 'Legal Unit':
-            queryset = self._filter_legal_unit(queryset, user, tab)
-        
         # Additional filters
         if status_filter:
             queryset = queryset.filter(current_status=status_filter)
@@ -266,59 +328,101 @@ class InspectionViewSet(viewsets.ModelViewSet):
         if search:
             queryset = self._apply_search_filter(queryset, search)
         
-        # Sorting
-        order_by = self.request.query_params.get('order_by', 'created_at')
-        order_direction = self.request.query_params.get('order_direction', 'desc')
-        
-        # Validate sort field
-        valid_sort_fields = ['code', 'created_at', 'updated_at', 'current_status', 'law']
-        if order_by in valid_sort_fields:
-            # Apply direction
-            if order_direction == 'desc':
-                order_by = f'-{order_by}'
-            queryset = queryset.order_by(order_by)
-        else:
-            # Default sorting
-            queryset = queryset.order_by('-created_at')
-        
-        return queryset.select_related(
-            'created_by', 'assigned_to'
-        ).prefetch_related('establishments', 'history').distinct()
+        return queryset
     
-    def _filter_section_chief(self, queryset, user, tab):
-        """Filter for Section Chief based on tab"""
-        # Setup law filter for combined EIA section
+    # Tabs whose serializer output relies on a fully ordered history prefetch
+    RETURNED_TABS = ('returned_inspection', 'returned_reports')
+
+    @staticmethod
+    def _section_law_q(user):
+        """Law predicate for a user's section (handles the combined EIA section)"""
         law_filter = Q(law=user.section)
         if user.section == 'PD-1586,RA-8749,RA-9275':
             law_filter = Q(law=user.section) | Q(law='PD-1586') | Q(law='RA-8749') | Q(law='RA-9275')
+        return law_filter
+
+    @staticmethod
+    def _returned_exists(**history_filters):
+        """Exists() over history entries marked as returned"""
+        from inspections.models import InspectionHistory
+        return Exists(InspectionHistory.objects.filter(
+            inspection=OuterRef('pk'),
+            remarks__icontains='Returned',
+            **history_filters
+        ))
+
+    def _tab_q(self, user, tab):
+        """
+        Return the role/tab predicate as a reusable Q object.
+        An empty Q() means the tab applies no filtering.
+        """
+        if user.userlevel == 'Admin':
+            return self._admin_tab_q(user, tab)
+        elif user.userlevel == 'Division Chief':
+            return self._division_chief_tab_q(user, tab)
+        elif user.userlevel == 'Section Chief':
+            return self._section_chief_tab_q(user, tab)
+        elif user.userlevel == 'Unit Head':
+            return self._unit_head_tab_q(user, tab)
+        elif user.userlevel == 'Monitoring Personnel':
+            return self._monitoring_personnel_tab_q(user, tab)
+        elif user.userlevel == 'Legal Unit':
+            return self._legal_unit_tab_q(user, tab)
+        return Q()
+
+    def _filter_by_tab(self, queryset, user, tab):
+        """Apply the role/tab predicate to a queryset"""
+        tab_q = self._tab_q(user, tab)
+        if tab_q:
+            queryset = queryset.filter(tab_q)
+        if tab in self.RETURNED_TABS and user.userlevel in ('Section Chief', 'Unit Head', 'Monitoring Personnel'):
+            from inspections.models import InspectionHistory
+            queryset = queryset.prefetch_related(
+                Prefetch('history',
+                    queryset=InspectionHistory.objects.select_related('changed_by', 'assigned_to').order_by('-created_at')
+                )
+            )
+        return queryset
+
+    def _admin_tab_q(self, user, tab):
+        """Admin sees all inspections but can filter by workflow stage tabs"""
+        if tab == 'compliant':
+            return Q(
+                form__compliance_decision='COMPLIANT',
+                current_status='CLOSED_COMPLIANT'
+            )
+        elif tab == 'non_compliant':
+            return Q(
+                form__compliance_decision__in=['NON_COMPLIANT', 'PARTIALLY_COMPLIANT'],
+                current_status='CLOSED_NON_COMPLIANT'
+            )
+        # All other tabs fall back to the unfiltered queryset for Admin
+        return Q()
+
+    def _filter_section_chief(self, queryset, user, tab):
+        """Filter for Section Chief based on tab"""
+        return self._filter_by_tab(queryset, user, tab)
+
+    def _section_chief_tab_q(self, user, tab):
+        """Section Chief tab predicates"""
+        # Setup law filter for combined EIA section
+        law_filter = self._section_law_q(user)
         
         if tab == 'section_assigned':
             # Show inspections assigned to this Section Chief but not yet started
-            return queryset.filter(
-                law_filter,
-                current_status='SECTION_ASSIGNED'
-            )
+            return law_filter & Q(current_status='SECTION_ASSIGNED')
         elif tab == 'section_in_progress':
             # Show inspections that this Section Chief is currently working on
             # Exclude returned inspections (they should only appear in returned_inspection tab)
-            from inspections.models import InspectionHistory
-            returned_subquery = InspectionHistory.objects.filter(
-                inspection=OuterRef('pk'),
-                remarks__icontains='Returned'
-            )
-            return queryset.filter(
-                law_filter,
+            return law_filter & Q(
                 assigned_to=user,
                 current_status__in=[
                     'SECTION_IN_PROGRESS'
                 ]
-            ).exclude(
-                Exists(returned_subquery)
-            )
+            ) & ~self._returned_exists()
         elif tab == 'forwarded':
             # Show inspections forwarded to Unit Head or Monitoring Personnel (status-based)
-            return queryset.filter(
-                law_filter,
+            return law_filter & Q(
                 current_status__in=[
                     'UNIT_ASSIGNED',
                     'UNIT_IN_PROGRESS',
@@ -328,8 +432,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
             )
         elif tab == 'inspection_complete':
             # Only show inspections this Section Chief personally completed
-            return queryset.filter(
-                law_filter,
+            return law_filter & Q(
                 form__inspected_by=user,
                 current_status__in=[
                     'SECTION_COMPLETED_COMPLIANT',
@@ -338,8 +441,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
             )
         elif tab == 'review':
             # Show inspections ready for Section Chief review
-            return queryset.filter(
-                law_filter,
+            return law_filter & Q(
                 current_status__in=[
                     'UNIT_COMPLETED_COMPLIANT',
                     'UNIT_COMPLETED_NON_COMPLIANT',
@@ -348,107 +450,64 @@ class InspectionViewSet(viewsets.ModelViewSet):
             )
         elif tab == 'under_review':
             # Show inspections currently under Division review after Section hand-off
-            return queryset.filter(
-                law_filter,
-                current_status='DIVISION_REVIEWED'
-            )
+            return law_filter & Q(current_status='DIVISION_REVIEWED')
         elif tab == 'compliant':
             # Show only COMPLIANT inspections
-            return queryset.filter(
-                law_filter,
+            return law_filter & Q(
                 form__compliance_decision='COMPLIANT',
                 current_status='CLOSED_COMPLIANT'
             )
         elif tab == 'non_compliant':
             # Show only NON_COMPLIANT inspections
-            return queryset.filter(
-                law_filter,
+            return law_filter & Q(
                 form__compliance_decision__in=['NON_COMPLIANT', 'PARTIALLY_COMPLIANT'],
                 current_status='CLOSED_NON_COMPLIANT'
             )
         elif tab == 'returned_inspection':
             # Returned items that are back to Section and not yet started
-            from inspections.models import InspectionHistory
             # Only show returns directed to Section level
-            returned_subquery = InspectionHistory.objects.filter(
-                inspection=OuterRef('pk'),
-                remarks__icontains='Returned',
-                new_status='SECTION_ASSIGNED'
-            )
-            return queryset.filter(
-                law_filter,
-                Exists(returned_subquery),
+            return law_filter & Q(
+                self._returned_exists(new_status='SECTION_ASSIGNED'),
                 current_status='SECTION_ASSIGNED'
-            ).prefetch_related(
-                Prefetch('history',
-                    queryset=InspectionHistory.objects.select_related('changed_by', 'assigned_to').order_by('-created_at')
-                )
             )
         elif tab == 'returned_reports':
             # Show returned reports that were returned back to Section for rework
-            from inspections.models import InspectionHistory
-            
-            # Use Exists subquery to check for history entries with "Returned" in remarks
             # Only show returns directed to Section level (IN_PROGRESS for active rework, REVIEWED for review stage returns)
-            returned_subquery = InspectionHistory.objects.filter(
-                inspection=OuterRef('pk'),
-                remarks__icontains='Returned',
-                new_status__in=['SECTION_IN_PROGRESS', 'SECTION_REVIEWED']
-            )
-            
-            # Filter and prefetch history for serializer
-            # Only show items currently in IN_PROGRESS (rework) or REVIEWED (review stage)
             # Also include lower-stage completed statuses (UNIT_COMPLETED, MONITORING_COMPLETED)
-            return queryset.filter(
-                law_filter,
+            return law_filter & Q(
+                self._returned_exists(new_status__in=['SECTION_IN_PROGRESS', 'SECTION_REVIEWED']),
                 current_status__in=['SECTION_IN_PROGRESS', 'SECTION_REVIEWED',
                     'UNIT_COMPLETED_COMPLIANT', 'UNIT_COMPLETED_NON_COMPLIANT',
                     'MONITORING_COMPLETED_COMPLIANT', 'MONITORING_COMPLETED_NON_COMPLIANT']
-            ).filter(
-                Exists(returned_subquery)
-            ).prefetch_related(
-                Prefetch('history',
-                    queryset=InspectionHistory.objects.select_related('changed_by', 'assigned_to').order_by('-created_at')
-                )
             )
         else:
             # Default: show all inspections for this section
-            return queryset.filter(law_filter)
+            return law_filter
     
     def _filter_unit_head(self, queryset, user, tab):
         """Filter for Unit Head based on tab"""
+        return self._filter_by_tab(queryset, user, tab)
+
+    def _unit_head_tab_q(self, user, tab):
+        """Unit Head tab predicates"""
         # Setup law filter for combined EIA section
-        law_filter = Q(law=user.section)
-        if user.section == 'PD-1586,RA-8749,RA-9275':
-            law_filter = Q(law=user.section) | Q(law='PD-1586') | Q(law='RA-8749') | Q(law='RA-9275')
+        law_filter = self._section_law_q(user)
         
         if tab == 'unit_assigned':
             # Show inspections assigned to this Unit Head but not yet started
-            return queryset.filter(
-                law_filter,
-                current_status='UNIT_ASSIGNED'
-            )
+            return law_filter & Q(current_status='UNIT_ASSIGNED')
         elif tab == 'unit_in_progress':
             # Show inspections that this Unit Head is currently working on
             # Exclude returned inspections (they should only appear in returned_inspection tab)
-            from inspections.models import InspectionHistory
-            returned_subquery = InspectionHistory.objects.filter(
-                inspection=OuterRef('pk'),
-                remarks__icontains='Returned'
-            )
-            return queryset.filter(
-                law_filter,
+            return law_filter & Q(
                 assigned_to=user,
                 current_status__in=[
                     'UNIT_IN_PROGRESS'
                 ]
-            ).exclude(
-                Exists(returned_subquery)
-            )
+            ) & ~self._returned_exists()
         elif tab == 'forwarded':
             # Show inspections forwarded to Monitoring Personnel (status-based)
-            return queryset.filter(
-                law_filter,
+            return law_filter & Q(
                 current_status__in=[
                     'MONITORING_ASSIGNED',
                     'MONITORING_IN_PROGRESS'
@@ -456,8 +515,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
             )
         elif tab == 'inspection_complete':
             # Only show inspections this Unit Head personally completed
-            return queryset.filter(
-                law_filter,
+            return law_filter & Q(
                 form__inspected_by=user,
                 current_status__in=[
                     'UNIT_COMPLETED_COMPLIANT',
@@ -466,8 +524,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
             )
         elif tab == 'review':
             # Show inspections ready for Unit Head review
-            return queryset.filter(
-                law_filter,
+            return law_filter & Q(
                 current_status__in=[
                     'MONITORING_COMPLETED_COMPLIANT',
                     'MONITORING_COMPLETED_NON_COMPLIANT'
@@ -475,8 +532,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
             )
         elif tab == 'under_review':
             # Show inspections now being reviewed by Section or Division Chiefs
-            return queryset.filter(
-                law_filter,
+            return law_filter & Q(
                 current_status__in=[
                     'SECTION_REVIEWED',
                     'DIVISION_REVIEWED'
@@ -484,8 +540,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
             )
         elif tab == 'compliant':
             # Show only COMPLIANT inspections
-            return queryset.filter(
-                law_filter,
+            return law_filter & Q(
                 Q(form__inspected_by=user) | 
                 Q(form__inspected_by__userlevel='Unit Head', form__inspected_by__section=user.section) | 
                 Q(form__inspected_by__userlevel='Monitoring Personnel', form__inspected_by__section=user.section),
@@ -494,8 +549,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
             )
         elif tab == 'non_compliant':
             # Show only NON_COMPLIANT inspections
-            return queryset.filter(
-                law_filter,
+            return law_filter & Q(
                 Q(form__inspected_by=user) | 
                 Q(form__inspected_by__userlevel='Unit Head', form__inspected_by__section=user.section) | 
                 Q(form__inspected_by__userlevel='Monitoring Personnel', form__inspected_by__section=user.section),
@@ -504,76 +558,45 @@ class InspectionViewSet(viewsets.ModelViewSet):
             )
         elif tab == 'returned_inspection':
             # Returned items that are back to Unit and not yet started
-            from inspections.models import InspectionHistory
             # Only show returns directed to Unit level
-            returned_subquery = InspectionHistory.objects.filter(
-                inspection=OuterRef('pk'),
-                remarks__icontains='Returned',
-                new_status='UNIT_ASSIGNED'
-            )
-            return queryset.filter(
-                law_filter,
-                Exists(returned_subquery),
+            return law_filter & Q(
+                self._returned_exists(new_status='UNIT_ASSIGNED'),
                 current_status='UNIT_ASSIGNED'
-            ).prefetch_related(
-                Prefetch('history',
-                    queryset=InspectionHistory.objects.select_related('changed_by', 'assigned_to').order_by('-created_at')
-                )
             )
         elif tab == 'returned_reports':
             # Show returned reports that were returned back to Unit for rework
-            from inspections.models import InspectionHistory
-            
-            # Use Exists subquery to check for history entries with "Returned" in remarks
             # Only show returns directed to Unit level (IN_PROGRESS for active rework, REVIEWED for review stage returns)
-            returned_subquery = InspectionHistory.objects.filter(
-                inspection=OuterRef('pk'),
-                remarks__icontains='Returned',
-                new_status__in=['UNIT_IN_PROGRESS', 'UNIT_REVIEWED']
-            )
-            
-            # Filter and prefetch history for serializer
-            # Only show items currently in IN_PROGRESS (rework) or REVIEWED (review stage)
-            return queryset.filter(
-                law_filter,
+            return law_filter & Q(
+                self._returned_exists(new_status__in=['UNIT_IN_PROGRESS', 'UNIT_REVIEWED']),
                 current_status__in=['UNIT_IN_PROGRESS', 'UNIT_REVIEWED','MONITORING_COMPLETED_COMPLIANT',
                     'MONITORING_COMPLETED_NON_COMPLIANT']
-            ).filter(
-                Exists(returned_subquery)
-            ).prefetch_related(
-                Prefetch('history',
-                    queryset=InspectionHistory.objects.select_related('changed_by', 'assigned_to').order_by('-created_at')
-                )
             )
         else:
             # Default: show all inspections for this section
-            return queryset.filter(law_filter)
+            return law_filter
     
     def _filter_monitoring_personnel(self, queryset, user, tab):
         """Filter for Monitoring Personnel based on tab"""
+        return self._filter_by_tab(queryset, user, tab)
+
+    def _monitoring_personnel_tab_q(self, user, tab):
+        """Monitoring Personnel tab predicates"""
         if tab == 'assigned':
             # Show inspections assigned to this Monitoring Personnel but not yet started
-            return queryset.filter(
+            return Q(
                 assigned_to=user,
                 current_status='MONITORING_ASSIGNED'
             )
         elif tab == 'in_progress':
             # Show inspections that this Monitoring Personnel has started (in progress or with draft)
             # Exclude returned inspections (they should only appear in returned_reports tab)
-            from inspections.models import InspectionHistory
-            returned_subquery = InspectionHistory.objects.filter(
-                inspection=OuterRef('pk'),
-                remarks__icontains='Returned'
-            )
-            return queryset.filter(
+            return Q(
                 assigned_to=user,
                 current_status='MONITORING_IN_PROGRESS'
-            ).exclude(
-                Exists(returned_subquery)
-            )
+            ) & ~self._returned_exists()
         elif tab == 'inspection_complete':
             # Only show inspections this Monitoring Personnel personally completed
-            return queryset.filter(
+            return Q(
                 form__inspected_by=user,
                 current_status__in=[
                     'MONITORING_COMPLETED_COMPLIANT',
@@ -582,7 +605,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
             )
         elif tab == 'under_review':
             # Show inspections currently under review after Monitoring completion
-            return queryset.filter(
+            return Q(
                 Q(form__inspected_by=user) | Q(assigned_to=user, form__inspected_by__isnull=True),
                 current_status__in=[
                     'UNIT_REVIEWED',
@@ -592,14 +615,14 @@ class InspectionViewSet(viewsets.ModelViewSet):
             )
         elif tab == 'compliant':
             # Show only COMPLIANT inspections
-            return queryset.filter(
+            return Q(
                 Q(form__inspected_by=user) | Q(assigned_to=user, form__inspected_by__isnull=True),
                 form__compliance_decision='COMPLIANT',
                 current_status='CLOSED_COMPLIANT'
             )
         elif tab == 'non_compliant':
             # Show only NON_COMPLIANT inspections
-            return queryset.filter(
+            return Q(
                 Q(form__inspected_by=user) | Q(assigned_to=user, form__inspected_by__isnull=True),
                 form__compliance_decision__in=['NON_COMPLIANT', 'PARTIALLY_COMPLIANT'],
                 current_status='CLOSED_NON_COMPLIANT'
@@ -607,40 +630,28 @@ class InspectionViewSet(viewsets.ModelViewSet):
         # No 'returned_inspection' tab for Monitoring Personnel by design
         elif tab == 'returned_reports':
             # Show returned reports that have completed monitoring and were returned back to monitoring for rework
-            from inspections.models import InspectionHistory
-            
-            # Use Exists subquery to check for history entries with "Returned" in remarks
-            # Only show returns directed to Monitoring level AND currently in IN_PROGRESS (active rework)
-            returned_subquery = InspectionHistory.objects.filter(
-                inspection=OuterRef('pk'),
-                remarks__icontains='Returned',
-                new_status='MONITORING_IN_PROGRESS'
-            )
-            
-            # Filter and prefetch history for serializer
             # Only show items that are currently in IN_PROGRESS (being reworked) AND assigned to this user
-            return queryset.filter(
+            return Q(
+                self._returned_exists(new_status='MONITORING_IN_PROGRESS'),
                 assigned_to=user,
                 current_status='MONITORING_IN_PROGRESS'
-            ).filter(
-                Exists(returned_subquery)
-            ).prefetch_related(
-                Prefetch('history',
-                    queryset=InspectionHistory.objects.select_related('changed_by', 'assigned_to').order_by('-created_at')
-                )
             )
         else:
             # Default: show all assigned inspections
-            return queryset.filter(
+            return Q(
                 assigned_to=user,
                 current_status__in=['MONITORING_ASSIGNED', 'MONITORING_IN_PROGRESS', 'MONITORING_COMPLETED_COMPLIANT', 'MONITORING_COMPLETED_NON_COMPLIANT']
             )
     
     def _filter_division_chief(self, queryset, user, tab):
         """Filter for Division Chief based on tab"""
+        return self._filter_by_tab(queryset, user, tab)
+
+    def _division_chief_tab_q(self, user, tab):
+        """Division Chief tab predicates"""
         if tab == 'all_inspections':
             # Show ALL inspections they created - covers entire workflow
-            return queryset.filter(created_by=user)
+            return Q(created_by=user)
         elif tab == 'review':
             # Show inspections ready for Division Chief review
             review_statuses = [
@@ -648,54 +659,58 @@ class InspectionViewSet(viewsets.ModelViewSet):
                     'SECTION_COMPLETED_COMPLIANT',
                 'SECTION_COMPLETED_NON_COMPLIANT'
             ]
-            return queryset.filter(current_status__in=review_statuses)
+            return Q(current_status__in=review_statuses)
         elif tab == 'reviewed':
             # Show inspections already reviewed by the Division Chief
-            return queryset.filter(current_status='DIVISION_REVIEWED')
+            return Q(current_status='DIVISION_REVIEWED')
         elif tab == 'compliant':
             # Show only COMPLIANT inspections
-            return queryset.filter(
+            return Q(
                 form__compliance_decision='COMPLIANT',
                 current_status='CLOSED_COMPLIANT'
             )
         elif tab == 'non_compliant':
             # Show only NON_COMPLIANT inspections
-            return queryset.filter(
+            return Q(
                 form__compliance_decision__in=['NON_COMPLIANT', 'PARTIALLY_COMPLIANT'],
                 current_status='CLOSED_NON_COMPLIANT'
             )
         else:
             # Default to all inspections created by them
-            return queryset.filter(created_by=user)
+            return Q(created_by=user)
 
     def _filter_legal_unit(self, queryset, user, tab):
         """Filter for Legal Unit based on tab"""
+        return self._filter_by_tab(queryset, user, tab)
+
+    def _legal_unit_tab_q(self, user, tab):
+        """Legal Unit tab predicates"""
         if tab == 'legal_review':
             # Show only inspections in legal review status
-            return queryset.filter(current_status='LEGAL_REVIEW')
+            return Q(current_status='LEGAL_REVIEW')
         elif tab == 'nov_sent':
             # Show only inspections with NOV sent
-            return queryset.filter(current_status='NOV_SENT')
+            return Q(current_status='NOV_SENT')
         elif tab == 'noo_sent':
             # Show only NOO sent inspections
-            return queryset.filter(
+            return Q(
                 current_status='NOO_SENT'
             )
         elif tab == 'compliant':
             # Show only COMPLIANT inspections
-            return queryset.filter(
+            return Q(
                 form__compliance_decision='COMPLIANT',
                 current_status='CLOSED_COMPLIANT'
             )
         elif tab == 'non_compliant':
             # Show only NON_COMPLIANT inspections
-            return queryset.filter(
+            return Q(
                 form__compliance_decision__in=['NON_COMPLIANT', 'PARTIALLY_COMPLIANT'],
                 current_status='CLOSED_NON_COMPLIANT'
             )
         else:
             # Default: show all legal unit inspections
-            return queryset.filter(
+            return Q(
                 current_status__in=['LEGAL_REVIEW', 'NOV_SENT', 'NOO_SENT', 'CLOSED_NON_COMPLIANT']
             )
     
@@ -1377,61 +1392,73 @@ class InspectionViewSet(viewsets.ModelViewSet):
         }
         
         # Update direct fields from general data
-        general_data = form_data.get('general', {})
-        if general_data.get('violations_found'):
-            form.violations_found = general_data['violations_found']
-        if general_data.get('compliance_observations'):
-            form.compliance_decision = general_data['compliance_observations']
-        
-        # Update scheduled_at if provided
-        if 'general' in form_data and form_data['general'].get('inspection_date_time'):
-            try:
-                form.scheduled_at = form_data['general']['inspection_date_time']
-            except:
-                pass
-        
+        apply_general_fields(form, form_data.get('general') or {})
         
         # Capture inspector information if this is the first time
         is_first_fill = capture_inspector_info(form, user)
         
         form.save()
         
-        # Only log history for significant changes (not every auto-save)
-        # This reduces database writes for frequent auto-saves
-        last_history = InspectionHistory.objects.filter(
-            inspection=inspection
-        ).order_by('-created_at').first()
+        # Only log history/audit once per AUTOSAVE_HISTORY_INTERVAL, not on every auto-save
+        log_autosave_history(inspection, user, request)
         
-        # Only create history entry if it's been more than 5 minutes since last save
-        should_log = True
-        if last_history and last_history.remarks == 'Auto-saved inspection form':
-            time_diff = timezone.now() - last_history.created_at
-            if time_diff.total_seconds() < 300:  # 5 minutes
-                should_log = False
+        return Response({
+            'message': 'Auto-save successful',
+            'last_saved': form.checklist.get('last_saved'),
+            'version': form.version,
+            'is_draft': True
+        }, status=status.HTTP_200_OK)
+    
+    @action(detail=True, methods=['patch'])
+    def auto_save_delta(self, request, pk=None):
+        """
+        Auto-save only the changed checklist sections.
         
-        if should_log:
-            InspectionHistory.objects.create(
-                inspection=inspection,
-                previous_status=inspection.current_status,
-                new_status=inspection.current_status,
-                changed_by=user,
-                remarks='Auto-saved inspection form'
+        Body: {"version": 7, "sections": {"general": {"company_name": "..."}, "permits": [...]}}
+        Sections are JSON Merge Patches (null removes a key). Returns the new
+        version, or 409 with the current one when the client's version is stale.
+        """
+        inspection = self.get_object()
+        user = request.user
+        
+        if inspection.assigned_to != user:
+            return Response(
+                {'error': 'You are not assigned to this inspection'},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            audit_inspection_event(
-                user,
-                inspection,
-                AUDIT_ACTIONS["UPDATE"],
-                f"{user.email} auto-saved inspection form",
-                request,
-                metadata={
-                    "auto_save": True,
-                    "remarks": "Auto-saved inspection form",
-                },
+        
+        version = request.data.get('version')
+        sections = request.data.get('sections')
+        if isinstance(version, bool) or not isinstance(version, int):
+            return Response({'error': 'version must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(sections, dict) or not sections:
+            return Response({'error': 'sections must be a non-empty object'}, status=status.HTTP_400_BAD_REQUEST)
+        unknown = sorted(set(sections) - set(AUTOSAVE_SECTIONS))
+        if unknown:
+            return Response(
+                {'error': f'Unknown sections: {", ".join(unknown)}'},
+                status=status.HTTP_400_BAD_REQUEST
             )
         
+        with transaction.atomic():
+            form = InspectionForm.objects.select_for_update().filter(inspection=inspection).first()
+            if form is None:
+                # Starts at version 0, the version clients assume for a missing form
+                form = InspectionForm(inspection=inspection)
+                form.save(bump_version=False, force_insert=True)
+            try:
+                new_version, last_saved, written = autosave_buffer.stage(form, user, version, sections, request)
+            except StaleVersion as e:
+                return Response({
+                    'error': 'The form was changed elsewhere. Reload it before saving again.',
+                    'version': e.current_version,
+                }, status=status.HTTP_409_CONFLICT)
+        
         return Response({
             'message': 'Auto-save successful',
-            'last_saved': form.checklist.get('last_saved'),
+            'last_saved': last_saved,
+            'version': new_version,
+            'buffered': not written,
             'is_draft': True
         }, status=status.HTTP_200_OK)
     
@@ -3232,18 +3259,8 @@ class InspectionViewSet(viewsets.ModelViewSet):
             
             # Get inspection date from form if available
             inspection_date = 'N/A'
-            if hasattr(inspection, 'form') and inspection.form:
-                try:
-                    if hasattr(inspection.form, 'checklist') and inspection.form.checklist:
-                        if isinstance(inspection.form.checklist, dict):
-                            general = inspection.form.checklist.get('general', {})
-                            if general and general.get('inspection_date_time'):
-                                from django.utils.dateparse import parse_datetime
-                                date_obj = parse_datetime(general.get('inspection_date_time'))
-                                if date_obj:
-                                    inspection_date = date_obj.strftime('%B %d, %Y')
-                except Exception:
-                    pass
+            if hasattr(inspection, 'form') and inspection.form and inspection.form.inspection_date:
+                inspection_date = timezone.localtime(inspection.form.inspection_date).strftime('%B %d, %Y')
             
             # Prepare template context
             email_context = {
@@ -3260,7 +3277,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
             
             logger.info(f"Attempting to send NOV email to {recipient_email} for inspection {inspection.code}")
             send_notice_email(subject, body, recipient_email, notice_type='NOV', context=email_context)
-            logger.info(f"Successfully sent NOV email to {recipient_email} for inspection {inspection.code}")
+            logger.info(f"Queued NOV email to {recipient_email} for inspection {inspection.code}")
         except Exception as e:
             logger.error(f"Failed to send NOV email for inspection {inspection.code} to {recipient_email}: {str(e)}", exc_info=True)
             inspection.current_status = prev_status
@@ -3447,14 +3464,8 @@ class InspectionViewSet(viewsets.ModelViewSet):
             nov_date = None
             if hasattr(inspection, 'form') and inspection.form:
                 try:
-                    if hasattr(inspection.form, 'checklist') and inspection.form.checklist:
-                        if isinstance(inspection.form.checklist, dict):
-                            general = inspection.form.checklist.get('general', {})
-                            if general and general.get('inspection_date_time'):
-                                from django.utils.dateparse import parse_datetime
-                                date_obj = parse_datetime(general.get('inspection_date_time'))
-                                if date_obj:
-                                    inspection_date = date_obj.strftime('%B %d, %Y')
+                    if inspection.form.inspection_date:
+                        inspection_date = timezone.localtime(inspection.form.inspection_date).strftime('%B %d, %Y')
                     # Try to get NOV sent date
                     if hasattr(inspection.form, 'nov') and inspection.form.nov:
                         if inspection.form.nov.sent_date:
@@ -3480,7 +3491,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
             
             logger.info(f"Attempting to send NOO email to {recipient_email} for inspection {inspection.code}")
             send_notice_email(subject, body, recipient_email, notice_type='NOO', context=email_context)
-            logger.info(f"Successfully sent NOO email to {recipient_email} for inspection {inspection.code}")
+            logger.info(f"Queued NOO email to {recipient_email} for inspection {inspection.code}")
         except Exception as e:
             logger.error(f"Failed to send NOO email for inspection {inspection.code} to {recipient_email}: {str(e)}", exc_info=True)
             inspection.current_status = prev_status
@@ -3763,19 +3774,22 @@ class InspectionViewSet(viewsets.ModelViewSet):
         })
     
     @action(detail=False, methods=['get'])
+    @cached_view('inspections:compliance_stats', scopes=['inspections'], vary_on_user=False)
     def compliance_stats(self, request):
         """
-        Get compliance statistics based on InspectionForm.compliance_decision
+        Get compliance statistics based on InspectionForm.compliance_decision.
+        All time by default; pass period_type (with year/month/quarter) for a window.
+        Read from the daily ComplianceRollup.
         """
-        from django.db.models import Count, Q
-        from .models import InspectionForm
+        from .models import ComplianceRollup
+        from .utils import get_period_window, parse_period_params
         
-        # Get compliance statistics
-        stats = InspectionForm.objects.aggregate(
-            pending=Count('inspection_id', filter=Q(compliance_decision='PENDING')),
-            compliant=Count('inspection_id', filter=Q(compliance_decision='COMPLIANT')),
-            non_compliant=Count('inspection_id', filter=Q(compliance_decision__in=['NON_COMPLIANT', 'PARTIALLY_COMPLIANT']))
-        )
+        start = end = None
+        if 'period_type' in request.query_params:
+            period_type, year, number = parse_period_params(request.query_params)
+            start, end, _ = get_period_window(period_type, year, number)
+        
+        stats = ComplianceRollup.window(start, end).aggregate(**ComplianceRollup.decision_totals())
         
         # Calculate total completed
         stats['total_completed'] = stats['compliant'] + stats['non_compliant']
@@ -3783,153 +3797,49 @@ class InspectionViewSet(viewsets.ModelViewSet):
         return Response(stats)
     
     @action(detail=False, methods=['get'])
+    @replica_reads
+    @cached_view('inspections:quarterly_comparison', scopes=['inspections'], vary_on_user=False)
     def quarterly_comparison(self, request):
         """
         Get comparison data for finished inspections with optional law filtering.
-        Supports monthly, quarterly, and yearly period types.
+        Supports monthly, quarterly, and yearly period types; both periods come
+        from one grouped query over the daily ComplianceRollup.
         """
-        from django.db.models import Count, Q
-        from .models import InspectionForm
-        from datetime import datetime, timedelta
-        from django.utils import timezone as tz
-        from calendar import month_name
+        from django.db.models import Case, CharField, Value, When
+        from .models import ComplianceRollup
+        from .utils import get_period_window, get_previous_period, parse_period_params
         
-        # Get period type (monthly, quarterly, yearly) - default to quarterly for backward compatibility
-        period_type = request.query_params.get('period_type', 'quarterly')
-        if period_type not in ['monthly', 'quarterly', 'yearly']:
-            period_type = 'quarterly'
-        
-        # Get year parameter (default to current year)
-        year = int(request.query_params.get('year', datetime.now().year))
+        # Period type (monthly, quarterly, yearly) - default to quarterly for backward compatibility
+        period_type, current_year, current_number = parse_period_params(request.query_params)
+        last_year, last_number = get_previous_period(period_type, current_year, current_number)
+        current_start, current_end, current_period_label = get_period_window(period_type, current_year, current_number)
+        last_start, last_end, last_period_label = get_period_window(period_type, last_year, last_number)
         
         # Get law parameter for filtering
         law_filter = request.query_params.get('law', 'all')
         
-        # Define law choices
-        law_choices = [
-            ("PD-1586", "PD-1586 (EIA)"),
-            ("RA-6969", "RA-6969 (TOX)"),
-            ("RA-8749", "RA-8749 (CAA)"),
-            ("RA-9275", "RA-9275 (CWA)"),
-            ("RA-9003", "RA-9003 (SWM)")
-        ]
-        
-        # Helper functions for date ranges
-        def get_quarter_range(year, quarter):
-            """Get start and end dates for a quarter"""
-            if quarter == 1:
-                return tz.datetime(year, 1, 1, 0, 0, 0), tz.datetime(year, 3, 31, 23, 59, 59)
-            elif quarter == 2:
-                return tz.datetime(year, 4, 1, 0, 0, 0), tz.datetime(year, 6, 30, 23, 59, 59)
-            elif quarter == 3:
-                return tz.datetime(year, 7, 1, 0, 0, 0), tz.datetime(year, 9, 30, 23, 59, 59)
-            else:  # quarter == 4
-                return tz.datetime(year, 10, 1, 0, 0, 0), tz.datetime(year, 12, 31, 23, 59, 59)
-        
-        def get_month_range(year, month):
-            """Get start and end dates for a month"""
-            if month == 12:
-                end_date = tz.datetime(year + 1, 1, 1, 0, 0, 0) - timedelta(seconds=1)
-            else:
-                end_date = tz.datetime(year, month + 1, 1, 0, 0, 0) - timedelta(seconds=1)
-            return tz.datetime(year, month, 1, 0, 0, 0), end_date
-        
-        def get_year_range(year):
-            """Get start and end dates for a year"""
-            return tz.datetime(year, 1, 1, 0, 0, 0), tz.datetime(year, 12, 31, 23, 59, 59)
-        
-        # Get current date info
-        now = datetime.now()
-        current_year = now.year
-        current_month = now.month
-        current_quarter = ((current_month - 1) // 3) + 1
-        
-        # Calculate date ranges based on period type
-        if period_type == 'monthly':
-            # Current month vs previous month
-            current_start, current_end = get_month_range(current_year, current_month)
-            
-            # Calculate previous month
-            if current_month == 1:
-                last_month = 12
-                last_year = current_year - 1
-            else:
-                last_month = current_month - 1
-                last_year = current_year
-            
-            last_start, last_end = get_month_range(last_year, last_month)
-            
-            # Format labels
-            def get_period_label(year, month):
-                month_abbr = month_name[month][:3] if month_name[month] else f"Month {month}"
-                return f"{month_abbr} {year}"
-            
-            current_period_label = get_period_label(current_year, current_month)
-            last_period_label = get_period_label(last_year, last_month)
-            
-        elif period_type == 'yearly':
-            # Current year vs previous year
-            current_start, current_end = get_year_range(current_year)
-            last_year = current_year - 1
-            last_start, last_end = get_year_range(last_year)
-            
-            # Format labels
-            current_period_label = str(current_year)
-            last_period_label = str(last_year)
-            
-        else:  # quarterly (default)
-            # Current quarter vs previous quarter
-            if current_quarter == 1:
-                last_quarter = 4
-                last_year = current_year - 1
-            else:
-                last_quarter = current_quarter - 1
-                last_year = current_year
-            
-            current_start, current_end = get_quarter_range(current_year, current_quarter)
-            last_start, last_end = get_quarter_range(last_year, last_quarter)
-            
-            # Format labels
-            def get_quarter_name(quarter_num, year):
-                quarter_names = {
-                    1: 'Jan-Mar',
-                    2: 'Apr-Jun', 
-                    3: 'Jul-Sep',
-                    4: 'Oct-Dec'
-                }
-                return f"{quarter_names[quarter_num]} {year}"
-            
-            current_period_label = get_quarter_name(current_quarter, current_year)
-            last_period_label = get_quarter_name(last_quarter, last_year)
-        
-        # Build base query filters
-        base_filters = {
-            'compliance_decision__in': ['COMPLIANT', 'NON_COMPLIANT', 'PARTIALLY_COMPLIANT']
-        }
-        
-        # Add law filter if specified
-        if law_filter != 'all' and law_filter in [choice[0] for choice in law_choices]:
-            base_filters['inspection__law'] = law_filter
+        laws = None
+        if law_filter != 'all' and law_filter in QUARTERLY_COMPARISON_LAW_NAMES:
+            laws = [law_filter]
         
-        # Get current period stats (only finished inspections - not PENDING)
-        current_filters = {
-            'created_at__range': [current_start, current_end],
-            **base_filters
-        }
-        current_stats = InspectionForm.objects.filter(**current_filters).aggregate(
-            compliant=Count('inspection_id', filter=Q(compliance_decision='COMPLIANT')),
-            non_compliant=Count('inspection_id', filter=Q(compliance_decision__in=['NON_COMPLIANT', 'PARTIALLY_COMPLIANT']))
+        # The two periods are adjacent: label each rollup row and group once
+        period = Case(
+            When(date__gte=current_start, then=Value('current')),
+            default=Value('last'),
+            output_field=CharField(),
         )
-        
-        # Get last period stats (only finished inspections - not PENDING)
-        last_filters = {
-            'created_at__range': [last_start, last_end],
-            **base_filters
-        }
-        last_stats = InspectionForm.objects.filter(**last_filters).aggregate(
-            compliant=Count('inspection_id', filter=Q(compliance_decision='COMPLIANT')),
-            non_compliant=Count('inspection_id', filter=Q(compliance_decision__in=['NON_COMPLIANT', 'PARTIALLY_COMPLIANT']))
+        rows = (
+            ComplianceRollup.window(last_start, current_end, laws=laws)
+            .annotate(period=period)
+            .values('period')
+            .annotate(**ComplianceRollup.decision_totals())
+            .order_by()
         )
+        totals = {row['period']: row for row in rows}
+        empty = {'compliant': 0, 'non_compliant': 0}
+        # Only finished inspections (compliant / non-compliant) - not PENDING
+        current_stats = totals.get('current', empty)
+        last_stats = totals.get('last', empty)
         
         # Calculate totals
         current_total = current_stats['compliant'] + current_stats['non_compliant']
@@ -3952,23 +3862,20 @@ class InspectionViewSet(viewsets.ModelViewSet):
         # Get law name for display
         law_name = None
         if law_filter != 'all':
-            for choice in law_choices:
-                if choice[0] == law_filter:
-                    law_name = choice[1]
-                    break
+            law_name = QUARTERLY_COMPARISON_LAW_NAMES.get(law_filter)
         
         # Build response with period-agnostic structure
         response_data = {
             'current_period': {
                 'period': current_period_label,
-                'year': current_year if period_type != 'yearly' else current_year,
+                'year': current_year,
                 'compliant': current_stats['compliant'],
                 'non_compliant': current_stats['non_compliant'],
                 'total_finished': current_total
             },
             'last_period': {
                 'period': last_period_label,
-                'year': last_year if period_type != 'yearly' else last_year,
+                'year': last_year,
                 'compliant': last_stats['compliant'],
                 'non_compliant': last_stats['non_compliant'],
                 'total_finished': last_total
@@ -3990,69 +3897,26 @@ class InspectionViewSet(viewsets.ModelViewSet):
         return Response(response_data)
     
     @action(detail=False, methods=['get'])
+    @replica_reads
+    @cached_view('inspections:compliance_by_law', scopes=user_dashboard_cache_scopes)
     def compliance_by_law(self, request):
         """
         Get compliance statistics grouped by law with role-based filtering.
         Supports monthly, quarterly, and yearly period filtering (defaults to quarterly).
+        One grouped query: over the daily ComplianceRollup for roles scoped by
+        law or status, over the live forms for roles scoped to their own assignments.
         """
-        from django.db.models import Count, Q
-        from .models import InspectionForm, Inspection
-        from datetime import datetime, timedelta
-        from django.utils import timezone as tz
-        from calendar import month_name
+        from datetime import datetime, time, timedelta
+        from django.db.models import Count, F
+        from .models import ComplianceRollup, InspectionForm
+        from .utils import get_period_window, parse_period_params
         
         # Get period type (monthly, quarterly, yearly) - default to 'quarterly'
-        period_type = request.query_params.get('period_type', 'quarterly')
-        if period_type not in ['monthly', 'quarterly', 'yearly']:
-            period_type = 'quarterly'
+        period_type, year, number = parse_period_params(request.query_params)
+        current_start, current_end, _ = get_period_window(period_type, year, number)
         
         user = request.user
-        law_choices = [
-            ("PD-1586", "PD-1586 (EIA)"),
-            ("RA-6969", "RA-6969 (TOX)"),
-            ("RA-8749", "RA-8749 (AIR)"),
-            ("RA-9275", "RA-9275 (WATER)"),
-            ("RA-9003", "RA-9003 (WASTE)")
-        ]
-        
-        # Helper functions for date ranges (same as quarterly_comparison)
-        def get_quarter_range(year, quarter):
-            """Get start and end dates for a quarter"""
-            if quarter == 1:
-                return tz.datetime(year, 1, 1, 0, 0, 0), tz.datetime(year, 3, 31, 23, 59, 59)
-            elif quarter == 2:
-                return tz.datetime(year, 4, 1, 0, 0, 0), tz.datetime(year, 6, 30, 23, 59, 59)
-            elif quarter == 3:
-                return tz.datetime(year, 7, 1, 0, 0, 0), tz.datetime(year, 9, 30, 23, 59, 59)
-            else:  # quarter == 4
-                return tz.datetime(year, 10, 1, 0, 0, 0), tz.datetime(year, 12, 31, 23, 59, 59)
-        
-        def get_month_range(year, month):
-            """Get start and end dates for a month"""
-            if month == 12:
-                end_date = tz.datetime(year + 1, 1, 1, 0, 0, 0) - timedelta(seconds=1)
-            else:
-                end_date = tz.datetime(year, month + 1, 1, 0, 0, 0) - timedelta(seconds=1)
-            return tz.datetime(year, month, 1, 0, 0, 0), end_date
-        
-        def get_year_range(year):
-            """Get start and end dates for a year"""
-            return tz.datetime(year, 1, 1, 0, 0, 0), tz.datetime(year, 12, 31, 23, 59, 59)
-        
-        # Calculate date range based on period type
-        now = datetime.now()
-        current_year = now.year
-        current_month = now.month
-        current_quarter = ((current_month - 1) // 3) + 1
-        
-        if period_type == 'monthly':
-            current_start, current_end = get_month_range(current_year, current_month)
-        elif period_type == 'quarterly':
-            current_start, current_end = get_quarter_range(current_year, current_quarter)
-        else:  # yearly
-            current_start, current_end = get_year_range(current_year)
-        
-        date_filter = Q(created_at__range=[current_start, current_end])
+        law_choices = COMPLIANCE_BY_LAW_CHOICES
         
         # Get selected laws from query parameter
         selected_laws = request.query_params.getlist('laws')
@@ -4071,72 +3935,46 @@ class InspectionViewSet(viewsets.ModelViewSet):
             # Filter law_choices to only include allowed laws
             law_choices = [(code, name) for code, name in law_choices if code in allowed_laws]
         
-        stats_by_law = []
+        laws = [code for code, _ in law_choices]
         
-        for law_code, law_name in law_choices:
-            # Get base inspection queryset for this law
-            base_inspections = Inspection.objects.filter(law=law_code)
-            
-            # Apply role-based filtering (similar to get_queryset logic)
-            if user.userlevel == 'Admin':
-                # Admin sees all inspections
-                filtered_inspections = base_inspections
-            elif user.userlevel == 'Division Chief':
+        if user.userlevel in ['Admin', 'Section Chief', 'Unit Head']:
+            # Admin sees all inspections; Section Chief / Unit Head see every
+            # inspection of their section's laws (already applied to law_choices)
+            rows = ComplianceRollup.window(current_start, current_end, laws=laws).values('law').annotate(
+                **ComplianceRollup.decision_totals()
+            )
+        elif user.userlevel == 'Legal Unit':
+            # Legal Unit sees inspections in legal review status
+            rows = ComplianceRollup.window(
+                current_start, current_end, laws=laws, statuses=['LEGAL_REVIEW', 'NOV_SENT', 'NOO_SENT']
+            ).values('law').annotate(**ComplianceRollup.decision_totals())
+        else:
+            # Visibility depends on the user's own assignments, which the rollup does not track
+            if user.userlevel == 'Division Chief':
                 # Division Chief sees inspections they created or are assigned for review
-                filtered_inspections = base_inspections.filter(
-                    Q(created_by=user) | Q(current_status='DIVISION_REVIEWED')
-                )
-            elif user.userlevel == 'Section Chief':
-                # Section Chief sees inspections related to their section
-                if user.section == 'PD-1586,RA-8749,RA-9275':
-                    # Special case for combined EIA section
-                    filtered_inspections = base_inspections.filter(
-                        Q(assigned_to=user) | 
-                        Q(law__in=['PD-1586', 'RA-8749', 'RA-9275'])
-                    )
-                else:
-                    filtered_inspections = base_inspections.filter(
-                        Q(assigned_to=user) | Q(law=user.section)
-                    )
-            elif user.userlevel == 'Unit Head':
-                # Unit Head sees inspections related to their section
-                if user.section == 'PD-1586,RA-8749,RA-9275':
-                    # Special case for combined EIA section
-                    filtered_inspections = base_inspections.filter(
-                        Q(assigned_to=user) | 
-                        Q(law__in=['PD-1586', 'RA-8749', 'RA-9275'])
-                    )
-                else:
-                    filtered_inspections = base_inspections.filter(
-                        Q(assigned_to=user) | Q(law=user.section)
-                    )
-            elif user.userlevel == 'Monitoring Personnel':
-                # Monitoring Personnel sees inspections assigned to them
-                filtered_inspections = base_inspections.filter(assigned_to=user)
-            elif user.userlevel == 'Legal Unit':
-                # Legal Unit sees inspections in legal review status
-                filtered_inspections = base_inspections.filter(
-                    current_status__in=['LEGAL_REVIEW', 'NOV_SENT', 'NOO_SENT']
-                )
+                scope = Q(inspection__created_by=user) | Q(inspection__current_status='DIVISION_REVIEWED')
             else:
-                # Default: only see inspections assigned to user
-                filtered_inspections = base_inspections.filter(assigned_to=user)
-            
-            # Get inspection IDs for compliance stats
-            inspection_ids = filtered_inspections.values_list('id', flat=True)
-            
-            # Build compliance stats query with optional date filter
-            compliance_query = Q(inspection_id__in=inspection_ids)
-            if date_filter:
-                compliance_query &= date_filter
-            
-            # Get compliance stats for these inspections
-            law_stats = InspectionForm.objects.filter(compliance_query).aggregate(
+                # Monitoring Personnel and others see inspections assigned to them
+                scope = Q(inspection__assigned_to=user)
+            range_start = timezone.make_aware(datetime.combine(current_start, time.min))
+            range_end = timezone.make_aware(datetime.combine(current_end + timedelta(days=1), time.min))
+            rows = InspectionForm.objects.filter(
+                scope,
+                inspection__law__in=laws,
+                created_at__gte=range_start,
+                created_at__lt=range_end,
+            ).values(law=F('inspection__law')).annotate(
                 pending=Count('inspection_id', filter=Q(compliance_decision='PENDING')),
                 compliant=Count('inspection_id', filter=Q(compliance_decision='COMPLIANT')),
-                non_compliant=Count('inspection_id', filter=Q(compliance_decision__in=['NON_COMPLIANT', 'PARTIALLY_COMPLIANT']))
+                non_compliant=Count(
+                    'inspection_id', filter=Q(compliance_decision__in=ComplianceRollup.NON_COMPLIANT_DECISIONS)
+                ),
             )
-            
+        totals = {row['law']: row for row in rows.order_by()}
+        
+        stats_by_law = []
+        for law_code, law_name in law_choices:
+            law_stats = totals.get(law_code, {'pending': 0, 'compliant': 0, 'non_compliant': 0})
             total = law_stats['pending'] + law_stats['compliant'] + law_stats['non_compliant']
             
             stats_by_law.append({
@@ -4157,7 +3995,9 @@ class InspectionViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def tab_counts(self, request):
         """Get tab counts for role-based dashboard"""
-        from django.http import QueryDict
+        from django.core.cache import cache
+        from django.db.models import Count
+        from .utils import get_tab_counts_cache_key, TAB_COUNTS_CACHE_TIMEOUT
         
         user = request.user
         
@@ -4173,30 +4013,30 @@ class InspectionViewSet(viewsets.ModelViewSet):
         
         user_level = user.userlevel
         tabs = tab_list.get(user_level, [])
-        counts = {}
         
-        # Save original query params
-        original_params = self.request.query_params
+        cache_key = get_tab_counts_cache_key(user, request.query_params)
+        counts = cache.get(cache_key)
+        if counts is not None:
+            return Response(counts)
         
-        for tab_name in tabs:
-            # Create a mutable copy of query params and set tab
-            query_params = QueryDict('', mutable=True)
-            query_params.update(original_params)
-            query_params['tab'] = tab_name
-            
-            # Temporarily replace query_params
-            self.request._request.GET = query_params
-            
-            # Get queryset with tab filtering applied
-            queryset = self.get_queryset()
-            counts[tab_name] = queryset.count()
+        # Shared (non-tab) filters; collapse M2M joins into a pk subquery so
+        # each tab can be counted without DISTINCT
+        base_queryset = self._apply_common_filters(Inspection.objects.all())
+        if base_queryset.query.where:
+            base_queryset = Inspection.objects.filter(pk__in=base_queryset.values('pk'))
         
-        # Restore original query params
-        self.request._request.GET = original_params
+        # One conditional aggregate per tab, evaluated in a single query
+        aggregates = {}
+        for tab_name in tabs:
+            tab_q = self._tab_q(user, tab_name)
+            aggregates[tab_name] = Count('pk', filter=tab_q) if tab_q else Count('pk')
+        counts = base_queryset.order_by().aggregate(**aggregates) if aggregates else {}
         
+        cache.set(cache_key, counts, TAB_COUNTS_CACHE_TIMEOUT)
         return Response(counts)
 
     @action(detail=False, methods=['get'])
+    @cached_view('inspections:quotas', scopes=quota_dashboard_cache_scopes)
     def get_quotas(self, request):
         """Get quotas with support for monthly, quarterly, and yearly views"""
         from datetime import datetime
@@ -4245,6 +4085,9 @@ class InspectionViewSet(viewsets.ModelViewSet):
                 quotas = quotas.filter(law=user.section)
         # Admin and Division Chief see all quotas (no filter)
         
+        # Attach materialized accomplished counts in a single query
+        quotas = ComplianceQuota.with_accomplished(quotas)
+        
         quota_data = []
         
         # For quarterly and yearly views, aggregate monthly quotas by law
@@ -4482,7 +4325,9 @@ class InspectionViewSet(viewsets.ModelViewSet):
         year = int(request.data.get('year', datetime.now().year))
         quarter = int(request.data.get('quarter', ((datetime.now().month - 1) // 3) + 1))
         
-        current_quotas = ComplianceQuota.objects.filter(year=year, quarter=quarter)
+        current_quotas = ComplianceQuota.with_accomplished(
+            ComplianceQuota.objects.filter(year=year, quarter=quarter)
+        )
         adjusted_quotas = []
         
         for quota in current_quotas:
@@ -5416,7 +5261,26 @@ class BillingViewSet(viewsets.ModelViewSet):
         })
 
 
-class LegalReportViewSet(viewsets.ViewSet):
+def local_day_bounds(value):
+    """
+    (start, end) aware datetimes of the local day in a YYYY-MM-DD query
+    parameter, or None. Range filters on a datetime column stay index-friendly
+    where a __date lookup would not.
+    """
+    from datetime import datetime, time, timedelta
+    from django.utils.dateparse import parse_date
+
+    try:
+        day = parse_date(value) if value else None
+    except ValueError:
+        return None
+    if day is None:
+        return None
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+
+
+class LegalReportViewSet(ReplicaReadMixin, viewsets.ViewSet):
     """
     ViewSet for Legal Unit Report Generation
     Provides comprehensive reporting with filtering, statistics, and export capabilities
@@ -5474,6 +5338,16 @@ class LegalReportViewSet(viewsets.ViewSet):
         if law and law != 'ALL':
             queryset = queryset.filter(related_law__icontains=law.replace('-', ''))
         
+        # Inspection date filters (indexed projection of the checklist's inspection date)
+        inspection_date_from = request.query_params.get('inspection_date_from')
+        inspection_date_to = request.query_params.get('inspection_date_to')
+        bounds = local_day_bounds(inspection_date_from)
+        if bounds:
+            queryset = queryset.filter(inspection__form__inspection_date__gte=bounds[0])
+        bounds = local_day_bounds(inspection_date_to)
+        if bounds:
+            queryset = queryset.filter(inspection__form__inspection_date__lt=bounds[1])
+        
         # Compliance status filter (requires join with inspection form)
         compliance_status = request.query_params.get('compliance_status')
         if compliance_status and compliance_status != 'ALL':
@@ -5686,7 +5560,7 @@ class LegalReportViewSet(viewsets.ViewSet):
         try:
             # Get filtered data
             queryset = self._get_base_queryset(request)
-            queryset = queryset.order_by('-created_at')[:100]  # Limit to 100 records
+            queryset = queryset.order_by('-created_at')[:export_row_limit(request, 100)]  # Limit to 100 records (no cap for background jobs)
             
             serializer = LegalReportSerializer(queryset, many=True)
             
@@ -5775,7 +5649,15 @@ class LegalReportViewSet(viewsets.ViewSet):
         
         # Get filtered data
         queryset = self._get_base_queryset(request)
-        queryset = queryset.order_by('-created_at')[:500]  # Limit to 500 records
+        
+        # Write-only streaming export for large downloads (?stream=true)
+        if wants_streaming_export(request):
+            return stream_report_excel(
+                queryset.order_by('-created_at'), LegalReportSerializer, LEGAL_REPORT_COLUMNS,
+                f"legal_report_{timezone.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+            )
+        
+        queryset = queryset.order_by('-created_at')[:export_row_limit(request, 500)]  # Limit to 500 records (no cap for background jobs)
         
         serializer = LegalReportSerializer(queryset, many=True)
         
@@ -5820,7 +5702,7 @@ class LegalReportViewSet(viewsets.ViewSet):
         return response
 
 
-class DivisionReportViewSet(viewsets.ViewSet):
+class DivisionReportViewSet(ReplicaReadMixin, viewsets.ViewSet):
     """
     ViewSet for Division Report Generation
     Provides comprehensive reporting with filtering, statistics, and export capabilities
@@ -5879,6 +5761,23 @@ class DivisionReportViewSet(viewsets.ViewSet):
         if law and law != 'ALL':
             queryset = queryset.filter(law__icontains=law.replace('-', ''))
         
+        # Laws covered by the inspection form's checklist (indexed InspectionFormLaw rows)
+        applicable_law = request.query_params.get('applicable_law')
+        if applicable_law and applicable_law != 'ALL':
+            queryset = queryset.filter(
+                Exists(InspectionFormLaw.objects.filter(form_id=OuterRef('pk'), law=applicable_law))
+            )
+        
+        # Inspection date filters (indexed projection of the checklist's inspection date)
+        inspection_date_from = request.query_params.get('inspection_date_from')
+        inspection_date_to = request.query_params.get('inspection_date_to')
+        bounds = local_day_bounds(inspection_date_from)
+        if bounds:
+            queryset = queryset.filter(form__inspection_date__gte=bounds[0])
+        bounds = local_day_bounds(inspection_date_to)
+        if bounds:
+            queryset = queryset.filter(form__inspection_date__lt=bounds[1])
+        
         # Compliance status filter (requires join with inspection form)
         compliance_status = request.query_params.get('compliance_status')
         if compliance_status and compliance_status != 'ALL':
@@ -6075,7 +5974,7 @@ class DivisionReportViewSet(viewsets.ViewSet):
         
         # Get filtered data
         queryset = self._get_base_queryset(request)
-        queryset = queryset.order_by('-created_at')[:100]  # Limit to 100 records
+        queryset = queryset.order_by('-created_at')[:export_row_limit(request, 100)]  # Limit to 100 records (no cap for background jobs)
         
         serializer = DivisionReportSerializer(queryset, many=True, context={'request': request})
         
@@ -6126,7 +6025,15 @@ class DivisionReportViewSet(viewsets.ViewSet):
         
         # Get filtered data
         queryset = self._get_base_queryset(request)
-        queryset = queryset.order_by('-created_at')[:500]  # Limit to 500 records
+        
+        # Write-only streaming export for large downloads (?stream=true)
+        if wants_streaming_export(request):
+            return stream_report_excel(
+                queryset.order_by('-created_at'), DivisionReportSerializer, INSPECTION_REPORT_COLUMNS,
+                f"division_report_{timezone.now().strftime('%Y%m%d_%H%M%S')}.xlsx", context={'request': request}
+            )
+        
+        queryset = queryset.order_by('-created_at')[:export_row_limit(request, 500)]  # Limit to 500 records (no cap for background jobs)
         
         serializer = DivisionReportSerializer(queryset, many=True, context={'request': request})
         
@@ -6170,7 +6077,7 @@ class DivisionReportViewSet(viewsets.ViewSet):
         return response
 
 
-class SectionReportViewSet(viewsets.ViewSet):
+class SectionReportViewSet(ReplicaReadMixin, viewsets.ViewSet):
     """
     ViewSet for Section Report Generation
     Shows only inspections inspected by the current Section Chief user
@@ -6362,7 +6269,7 @@ class SectionReportViewSet(viewsets.ViewSet):
         import io
         
         queryset = self._get_base_queryset(request)
-        queryset = queryset.order_by('-created_at')[:100]
+        queryset = queryset.order_by('-created_at')[:export_row_limit(request, 100)]
         
         serializer = DivisionReportSerializer(queryset, many=True, context={'request': request})
         
@@ -6465,7 +6372,15 @@ class SectionReportViewSet(viewsets.ViewSet):
         from .section_report_excel import SectionReportExcelGenerator
         
         queryset = self._get_base_queryset(request)
-        queryset = queryset.order_by('-created_at')[:500]
+        
+        # Write-only streaming export for large downloads (?stream=true)
+        if wants_streaming_export(request):
+            return stream_report_excel(
+                queryset.order_by('-created_at'), DivisionReportSerializer, INSPECTION_REPORT_COLUMNS,
+                f"section_report_{timezone.now().strftime('%Y%m%d_%H%M%S')}.xlsx", context={'request': request}
+            )
+        
+        queryset = queryset.order_by('-created_at')[:export_row_limit(request, 500)]
         
         serializer = DivisionReportSerializer(queryset, many=True, context={'request': request})
         
@@ -6498,7 +6413,7 @@ class SectionReportViewSet(viewsets.ViewSet):
         return response
 
 
-class UnitReportViewSet(viewsets.ViewSet):
+class UnitReportViewSet(ReplicaReadMixin, viewsets.ViewSet):
     """
     ViewSet for Unit Report Generation
     Shows only inspections inspected by the current Unit Head user
@@ -6688,7 +6603,7 @@ class UnitReportViewSet(viewsets.ViewSet):
         import io
         
         queryset = self._get_base_queryset(request)
-        queryset = queryset.order_by('-created_at')[:100]
+        queryset = queryset.order_by('-created_at')[:export_row_limit(request, 100)]
         
         serializer = DivisionReportSerializer(queryset, many=True, context={'request': request})
         
@@ -6791,7 +6706,15 @@ class UnitReportViewSet(viewsets.ViewSet):
         from .unit_report_excel import UnitReportExcelGenerator
         
         queryset = self._get_base_queryset(request)
-        queryset = queryset.order_by('-created_at')[:500]
+        
+        # Write-only streaming export for large downloads (?stream=true)
+        if wants_streaming_export(request):
+            return stream_report_excel(
+                queryset.order_by('-created_at'), DivisionReportSerializer, INSPECTION_REPORT_COLUMNS,
+                f"unit_report_{timezone.now().strftime('%Y%m%d_%H%M%S')}.xlsx", context={'request': request}
+            )
+        
+        queryset = queryset.order_by('-created_at')[:export_row_limit(request, 500)]
         
         serializer = DivisionReportSerializer(queryset, many=True, context={'request': request})
         
@@ -6824,7 +6747,7 @@ class UnitReportViewSet(viewsets.ViewSet):
         return response
 
 
-class MonitoringReportViewSet(viewsets.ViewSet):
+class MonitoringReportViewSet(ReplicaReadMixin, viewsets.ViewSet):
     """
     ViewSet for Monitoring Report Generation
     Shows only inspections inspected by the current Monitoring Personnel user
@@ -7014,7 +6937,7 @@ class MonitoringReportViewSet(viewsets.ViewSet):
         import io
         
         queryset = self._get_base_queryset(request)
-        queryset = queryset.order_by('-created_at')[:100]
+        queryset = queryset.order_by('-created_at')[:export_row_limit(request, 100)]
         
         serializer = DivisionReportSerializer(queryset, many=True, context={'request': request})
         
@@ -7117,7 +7040,15 @@ class MonitoringReportViewSet(viewsets.ViewSet):
         from .monitoring_report_excel import MonitoringReportExcelGenerator
         
         queryset = self._get_base_queryset(request)
-        queryset = queryset.order_by('-created_at')[:500]
+        
+        # Write-only streaming export for large downloads (?stream=true)
+        if wants_streaming_export(request):
+            return stream_report_excel(
+                queryset.order_by('-created_at'), DivisionReportSerializer, INSPECTION_REPORT_COLUMNS,
+                f"monitoring_report_{timezone.now().strftime('%Y%m%d_%H%M%S')}.xlsx", context={'request': request}
+            )
+        
+        queryset = queryset.order_by('-created_at')[:export_row_limit(request, 500)]
         
         serializer = DivisionReportSerializer(queryset, many=True, context={'request': request})
         
@@ -7150,7 +7081,7 @@ class MonitoringReportViewSet(viewsets.ViewSet):
         return response
 
 
-class AdminReportViewSet(viewsets.ViewSet):
+class AdminReportViewSet(ReplicaReadMixin, viewsets.ViewSet):
     """
     ViewSet for Admin Report Generation - Establishments and Users
     Provides comprehensive reporting with filtering, statistics, and export capabilities
@@ -5,4 +5,5 @@ class LawsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'laws'
 
-
+    def ready(self):
+        import laws.signals  # keeps the reference data registry in sync
@@ -0,0 +1,16 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.reference_data import reference_data
+from .models import Law
+
+
+@receiver(post_save, sender=Law)
+@receiver(post_delete, sender=Law)
+def invalidate_reference_data(sender, instance, raw=False, **kwargs):
+    """Reload the law registry now (same request) and again once the change is committed"""
+    if raw:
+        return
+    reference_data.invalidate()
+    transaction.on_commit(reference_data.invalidate)
@@ -1,6 +1,6 @@
 # notifications/admin.py
 from django.contrib import admin
-from .models import Notification
+from .models import Notification, OutboundEmail
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
@@ -10,4 +10,15 @@ class NotificationAdmin(admin.ModelAdmin):
     readonly_fields = ('created_at',)
     
     def has_add_permission(self, request):
-        return False  # Prevent adding notifications manually through admin
\ No newline at end of file
+        return False  # Prevent adding notifications manually through admin
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'subject', 'category', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status', 'category', 'created_at')
+    search_fields = ('recipient', 'subject')
+    readonly_fields = ('created_at', 'sent_at', 'claimed_at', 'last_error')
+    exclude = ('body', 'html_body')  # message contents stay out of the admin
+
+    def has_add_permission(self, request):
+        return False
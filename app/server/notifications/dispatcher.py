@@ -0,0 +1,129 @@
+"""
+Central notification fan-out.
+
+notify() writes one Notification row per recipient in a single bulk INSERT,
+filling the legacy `recipient` and the newer `user` foreign keys together
+(bulk_create skips Notification.save(), which used to sync them row by row).
+Role-based recipient sets come from cached rosters of (user id, email), so an
+event costs a constant number of queries regardless of how many users it
+reaches. Emails go through the outbox (notifications/outbox.py) and are
+delivered by the Celery consumer once the surrounding transaction commits.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.cache import bump, make_key
+
+logger = logging.getLogger(__name__)
+
+ROSTER_CACHE_TIMEOUT = getattr(settings, 'NOTIFICATION_ROSTER_CACHE_TIMEOUT', 300)
+ROSTER_CACHE_SCOPE = 'rosters'
+
+# High-priority headers used for workflow emails
+URGENT_EMAIL_HEADERS = {
+    'X-Priority': '1',
+    'X-MSMail-Priority': 'High',
+    'Importance': 'High',
+    'X-Mailer': 'IERMS System - Urgent Notification'
+}
+
+
+def get_role_roster(userlevels, section=None):
+    """Return [(user_id, email)] of active users with any of the userlevels (optionally in a section)"""
+    from django.contrib.auth import get_user_model
+
+    if isinstance(userlevels, str):
+        userlevels = [userlevels]
+    userlevels = sorted(set(userlevels))
+
+    cache_key = make_key('notifications:roster', [ROSTER_CACHE_SCOPE], userlevels, section or '')
+
+    roster = cache.get(cache_key)
+    if roster is None:
+        queryset = get_user_model().objects.filter(userlevel__in=userlevels, is_active=True)
+        if section:
+            queryset = queryset.filter(section=section)
+        roster = [tuple(row) for row in queryset.order_by('pk').values_list('pk', 'email')]
+        cache.set(cache_key, roster, ROSTER_CACHE_TIMEOUT)
+    return roster
+
+
+def invalidate_role_rosters():
+    """Invalidate every cached roster (called on user changes)"""
+    bump(ROSTER_CACHE_SCOPE)
+
+
+def _normalize_recipients(recipients):
+    """Accept users, user ids or (id, email) roster entries; drop duplicates and blanks"""
+    seen = {}
+    for recipient in recipients:
+        if recipient is None:
+            continue
+        if isinstance(recipient, (tuple, list)):
+            user_id, email = recipient
+        elif isinstance(recipient, int):
+            user_id, email = recipient, None
+        else:
+            user_id, email = recipient.pk, getattr(recipient, 'email', None)
+        if user_id is not None and user_id not in seen:
+            seen[user_id] = email
+    return list(seen.items())
+
+
+def queue_email(subject, body, recipient_list, html=False, headers=None):
+    """Put an email for each recipient in the outbox (delivered by the Celery consumer)"""
+    from .outbox import enqueue_email
+
+    if html:
+        return enqueue_email(recipient_list, subject, html_body=body, html_only=True,
+                             headers=headers, category='notification')
+    return enqueue_email(recipient_list, subject, body=body, headers=headers, category='notification')
+
+
+def notify(recipients, notification_type, title, message, sender=None,
+           related_object_type='', related_object_id=None,
+           email_subject=None, email_body=None, email_html=False, email_headers=None):
+    """
+    Create the same notification for every recipient with one bulk INSERT.
+    If email_subject is given, the email is queued for all recipients that have an address.
+    Returns the created Notification objects.
+    """
+    from .models import Notification
+
+    entries = _normalize_recipients(recipients)
+    if not entries:
+        return []
+
+    sender_id = getattr(sender, 'pk', sender)
+    notifications = Notification.objects.bulk_create([
+        Notification(
+            recipient_id=user_id,
+            user_id=user_id,
+            sender_id=sender_id,
+            notification_type=notification_type,
+            title=title,
+            message=message,
+            related_object_type=related_object_type or '',
+            related_object_id=related_object_id,
+        )
+        for user_id, _ in entries
+    ])
+
+    if email_subject:
+        queue_email(
+            email_subject,
+            email_body if email_body is not None else message,
+            [email for _, email in entries],
+            html=email_html,
+            headers=email_headers,
+        )
+    return notifications
+
+
+def notify_roles(userlevels, notification_type, title, message, section=None, exclude=None, **kwargs):
+    """notify() every active user with the given userlevels (optionally in a section)"""
+    exclude_id = getattr(exclude, 'pk', exclude)
+    roster = [entry for entry in get_role_roster(userlevels, section) if entry[0] != exclude_id]
+    return notify(roster, notification_type, title, message, **kwargs)
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.17 on 2026-10-17 00:50
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_alter_notification_notification_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recipient', models.EmailField(max_length=254)),
+                ('subject', models.CharField(max_length=500)),
+                ('body', models.TextField(blank=True, help_text='Plain text body')),
+                ('html_body', models.TextField(blank=True, help_text='HTML alternative (or the body itself when html_only)')),
+                ('html_only', models.BooleanField(default=False, help_text='Send html_body as the text/html body without a plain part')),
+                ('from_email', models.CharField(blank=True, max_length=255)),
+                ('headers', models.JSONField(blank=True, default=dict)),
+                ('category', models.CharField(blank=True, help_text='e.g. NOV, NOO, security, notification', max_length=50)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('SENDING', 'Sending'), ('SENT', 'Sent'), ('FAILED', 'Failed')], default='PENDING', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('max_attempts', models.PositiveIntegerField(default=3)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='notificatio_status_36aace_idx'), models.Index(fields=['recipient', '-created_at'], name='notificatio_recipie_9d6fe7_idx')],
+            },
+        ),
+    ]
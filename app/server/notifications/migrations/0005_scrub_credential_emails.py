@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+# Subjects of the welcome (default password) and OTP emails, which no longer go through the outbox
+CREDENTIAL_SUBJECTS = (
+    'Account Activation - IERMS Access Credentials',
+    'Password Reset Verification Code',
+)
+
+
+def scrub_credential_emails(apps, schema_editor):
+    OutboundEmail = apps.get_model('notifications', 'OutboundEmail')
+    for subject in CREDENTIAL_SUBJECTS:
+        OutboundEmail.objects.filter(subject__endswith=subject).update(body='', html_body='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0004_outbound_email'),
+    ]
+
+    operations = [
+        migrations.RunPython(scrub_credential_emails, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
 # notifications/models.py
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 class Notification(models.Model):
     NOTIFICATION_TYPES = [
@@ -59,4 +60,46 @@ class Notification(models.Model):
     
     def __str__(self):
         recipient_email = self.recipient.email if self.recipient else (self.user.email if self.user else 'N/A')
-        return f"{self.notification_type} - {recipient_email}"
\ No newline at end of file
+        return f"{self.notification_type} - {recipient_email}"
+
+class OutboundEmail(models.Model):
+    """
+    Email outbox: one row per recipient, delivered by the Celery consumer in
+    notifications/outbox.py over a single reused SMTP connection, with
+    exponential-backoff retries and the delivery outcome recorded here.
+    """
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('SENDING', 'Sending'),
+        ('SENT', 'Sent'),
+        ('FAILED', 'Failed'),
+    ]
+
+    recipient = models.EmailField()
+    subject = models.CharField(max_length=500)
+    body = models.TextField(blank=True, help_text='Plain text body')
+    html_body = models.TextField(blank=True, help_text='HTML alternative (or the body itself when html_only)')
+    html_only = models.BooleanField(default=False, help_text='Send html_body as the text/html body without a plain part')
+    from_email = models.CharField(max_length=255, blank=True)
+    headers = models.JSONField(default=dict, blank=True)
+    category = models.CharField(max_length=50, blank=True, help_text='e.g. NOV, NOO, security, notification')
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+            models.Index(fields=['recipient', '-created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.status} - {self.recipient}: {self.subject}"
@@ -0,0 +1,187 @@
+"""
+Outbound email pipeline.
+
+enqueue_email() stores one OutboundEmail row per recipient and, once the
+surrounding transaction commits, asks the Celery consumer to deliver it.
+deliver_pending() claims a batch of due rows, sends them over a single SMTP
+connection and records the outcome: SENT, or a retry with exponential backoff
+(EMAIL_OUTBOX_RETRY_BASE * 2**(attempts - 1) seconds) until max_attempts,
+after which the row is FAILED. Nothing here sleeps in the request thread.
+purge_finished() deletes SENT/FAILED rows after EMAIL_OUTBOX_RETENTION_DAYS.
+
+The connection comes from EMAIL_OUTBOX_BACKEND (default: EMAIL_BACKEND), so
+the console and locmem backends work as local/test stand-ins.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(recipients, subject, body='', html_body='', html_only=False, headers=None,
+                  from_email=None, category='', max_attempts=None):
+    """Queue an email for each recipient address; returns the OutboundEmail rows"""
+    from .models import OutboundEmail
+
+    if isinstance(recipients, str):
+        recipients = [recipients]
+    recipients = list(dict.fromkeys(address.strip() for address in recipients if address and address.strip()))
+    if not recipients:
+        return []
+
+    rows = OutboundEmail.objects.bulk_create([
+        OutboundEmail(
+            recipient=address,
+            subject=subject[:500],
+            body=body or '',
+            html_body=html_body or '',
+            html_only=html_only,
+            from_email=from_email or getattr(settings, 'DEFAULT_FROM_EMAIL', '') or '',
+            headers=headers or {},
+            category=category or '',
+            max_attempts=max_attempts or getattr(settings, 'EMAIL_RETRY_ATTEMPTS', 3),
+        )
+        for address in recipients
+    ])
+    transaction.on_commit(schedule_delivery)
+    return rows
+
+
+def schedule_delivery():
+    """Wake the Celery consumer; deliver in-process when EMAIL_OUTBOX_EAGER is set or the broker is down"""
+    from .tasks import deliver_outbox
+
+    if getattr(settings, 'EMAIL_OUTBOX_EAGER', False):
+        deliver_pending()
+        return
+    try:
+        deliver_outbox.apply_async(retry=False)
+    except Exception as e:
+        logger.error(f"Could not queue email outbox delivery, delivering inline: {str(e)}")
+        deliver_pending()
+
+
+def _claim_batch(batch_size):
+    """Mark up to batch_size due rows as SENDING and return their ids"""
+    from .models import OutboundEmail
+
+    now = timezone.now()
+    stale = now - timedelta(seconds=getattr(settings, 'EMAIL_OUTBOX_CLAIM_TIMEOUT', 600))
+    with transaction.atomic():
+        ids = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status='PENDING', next_attempt_at__lte=now)
+                # Rows left in SENDING by a worker that died mid-batch
+                | Q(status='SENDING', claimed_at__lt=stale)
+            )
+            .order_by('next_attempt_at')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if ids:
+            OutboundEmail.objects.filter(pk__in=ids).update(status='SENDING', claimed_at=now)
+    return ids
+
+
+def build_message(outbound, connection=None):
+    if outbound.html_only:
+        message = EmailMessage(
+            subject=outbound.subject, body=outbound.html_body, from_email=outbound.from_email or None,
+            to=[outbound.recipient], headers=outbound.headers or None, connection=connection,
+        )
+        message.content_subtype = 'html'
+        return message
+    message = EmailMultiAlternatives(
+        subject=outbound.subject, body=outbound.body, from_email=outbound.from_email or None,
+        to=[outbound.recipient], headers=outbound.headers or None, connection=connection,
+    )
+    if outbound.html_body:
+        message.attach_alternative(outbound.html_body, 'text/html')
+    return message
+
+
+def _record_failure(outbound, error):
+    from .models import OutboundEmail
+
+    attempts = outbound.attempts + 1
+    if attempts >= outbound.max_attempts:
+        OutboundEmail.objects.filter(pk=outbound.pk).update(
+            status='FAILED', attempts=attempts, last_error=error, claimed_at=None
+        )
+        logger.error(f"Email to {outbound.recipient} failed after {attempts} attempts: {error}")
+        return 'failed'
+
+    delay = getattr(settings, 'EMAIL_OUTBOX_RETRY_BASE', 30) * 2 ** (attempts - 1)
+    OutboundEmail.objects.filter(pk=outbound.pk).update(
+        status='PENDING', attempts=attempts, last_error=error, claimed_at=None,
+        next_attempt_at=timezone.now() + timedelta(seconds=delay),
+    )
+    logger.warning(f"Email to {outbound.recipient} failed (attempt {attempts}), retrying in {delay}s: {error}")
+    return 'retrying'
+
+
+def deliver_pending(batch_size=None):
+    """Deliver one batch of due emails; returns {'sent': n, 'retrying': n, 'failed': n, 'more': bool}"""
+    from .models import OutboundEmail
+
+    batch_size = batch_size or getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 50)
+    result = {'sent': 0, 'retrying': 0, 'failed': 0, 'more': False}
+
+    ids = _claim_batch(batch_size)
+    if not ids:
+        return result
+    result['more'] = len(ids) >= batch_size
+
+    outbounds = list(OutboundEmail.objects.filter(pk__in=ids).order_by('pk'))
+    backend = getattr(settings, 'EMAIL_OUTBOX_BACKEND', None) or None
+    connection = get_connection(backend=backend, fail_silently=False)
+    sent_ids = []
+    try:
+        connection.open()
+    except Exception as e:
+        # SMTP unreachable: the whole batch is retried later
+        for outbound in outbounds:
+            result[_record_failure(outbound, str(e))] += 1
+        return result
+
+    try:
+        for outbound in outbounds:
+            try:
+                build_message(outbound, connection).send(fail_silently=False)
+                sent_ids.append(outbound.pk)
+            except Exception as e:
+                result[_record_failure(outbound, str(e))] += 1
+    finally:
+        try:
+            connection.close()
+        except Exception as e:
+            logger.warning(f"Failed to close email connection: {str(e)}")
+
+    if sent_ids:
+        OutboundEmail.objects.filter(pk__in=sent_ids).update(
+            status='SENT', attempts=F('attempts') + 1, sent_at=timezone.now(),
+            claimed_at=None, last_error='',
+        )
+        result['sent'] = len(sent_ids)
+    logger.info(f"Email outbox batch: {result['sent']} sent, {result['retrying']} retrying, {result['failed']} failed")
+    return result
+
+
+def purge_finished(days=None):
+    """Delete SENT and FAILED rows older than EMAIL_OUTBOX_RETENTION_DAYS; returns the count"""
+    from .models import OutboundEmail
+
+    days = days if days is not None else getattr(settings, 'EMAIL_OUTBOX_RETENTION_DAYS', 30)
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = OutboundEmail.objects.filter(
+        Q(status='SENT', sent_at__lt=cutoff) | Q(status='FAILED', created_at__lt=cutoff)
+    ).delete()
+    if deleted:
+        logger.info(f"Purged {deleted} finished outbox emails older than {days} days")
+    return deleted
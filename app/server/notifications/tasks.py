@@ -0,0 +1,36 @@
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def deliver_outbox():
+    """
+    Deliver due outbox emails (notifications/outbox.py).
+    Queued after new emails commit; Celery Beat also runs it periodically to pick up retries.
+    """
+    from .outbox import deliver_pending
+
+    try:
+        result = deliver_pending()
+    except Exception as e:
+        logger.error(f"Email outbox delivery failed: {str(e)}")
+        raise
+    if result['more']:
+        # Full batch: keep draining without waiting for the next beat
+        deliver_outbox.apply_async()
+    return {key: value for key, value in result.items() if key != 'more'}
+
+
+@shared_task
+def purge_outbox():
+    """Delete delivered and failed outbox emails past EMAIL_OUTBOX_RETENTION_DAYS"""
+    from .outbox import purge_finished
+
+    try:
+        return {'purged': purge_finished()}
+    except Exception as e:
+        logger.error(f"Email outbox purge failed: {str(e)}")
+        raise
@@ -1,3 +1,132 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail import get_connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .dispatcher import get_role_roster, notify, notify_roles
+from .models import Notification, OutboundEmail
+from .outbox import deliver_pending, enqueue_email, purge_finished
+
+User = get_user_model()
+
+
+@override_settings(EMAIL_OUTBOX_EAGER=True)
+class NotificationDispatcherTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.sender = User.objects.create_user(
+            email='sender@example.com', password='testpass123', password_provided=True, userlevel='Admin'
+        )
+        self.chiefs = [
+            User.objects.create_user(
+                email=f'chief{n}@example.com', password='testpass123', password_provided=True,
+                userlevel='Division Chief'
+            )
+            for n in range(5)
+        ]
+
+    def test_fan_out_is_one_insert_and_fills_both_user_fields(self):
+        get_role_roster('Division Chief')  # warm the roster cache
+
+        with self.assertNumQueries(1):
+            notify_roles('Division Chief', 'new_establishment', 'Title', 'Body', sender=self.sender)
+
+        notifications = Notification.objects.filter(notification_type='new_establishment')
+        self.assertEqual(notifications.count(), 5)
+        for notification in notifications:
+            self.assertEqual(notification.user_id, notification.recipient_id)
+            self.assertEqual(notification.sender_id, self.sender.pk)
+
+    def test_roster_is_refreshed_when_users_change(self):
+        self.assertEqual(len(get_role_roster('Division Chief')), 5)
+        self.chiefs[0].is_active = False
+        self.chiefs[0].save()
+        self.assertEqual(len(get_role_roster('Division Chief')), 4)
+
+    def test_emails_go_to_the_outbox_one_per_recipient(self):
+        with mock.patch('notifications.tasks.deliver_outbox.apply_async') as apply_async:
+            with override_settings(EMAIL_OUTBOX_EAGER=False):
+                with self.captureOnCommitCallbacks(execute=True):
+                    notify(self.chiefs[:2], 'new_inspection', 'Title', 'Body',
+                           email_subject='Subject', email_body='Email body')
+        apply_async.assert_called_once()
+        self.assertEqual(
+            sorted(OutboundEmail.objects.filter(status='PENDING').values_list('recipient', flat=True)),
+            ['chief0@example.com', 'chief1@example.com']
+        )
+        self.assertEqual(len(mail.outbox), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            notify(self.chiefs[:2], 'new_inspection', 'Title', 'Body', email_subject='Subject')
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [
+            'chief0@example.com', 'chief0@example.com', 'chief1@example.com', 'chief1@example.com'
+        ])
+
+
+class EmailOutboxTest(TestCase):
+    def test_batch_is_sent_over_one_connection(self):
+        enqueue_email(['a@example.com', 'b@example.com', 'c@example.com'], 'Subject',
+                      body='Plain', html_body='<p>Html</p>', category='NOV')
+
+        with mock.patch('notifications.outbox.get_connection', wraps=get_connection) as connection_factory:
+            result = deliver_pending()
+        connection_factory.assert_called_once()
+        self.assertEqual(result['sent'], 3)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].alternatives, [('<p>Html</p>', 'text/html')])
+        self.assertFalse(OutboundEmail.objects.exclude(status='SENT').exists())
+
+    @override_settings(EMAIL_OUTBOX_RETRY_BASE=30)
+    def test_failures_back_off_then_give_up(self):
+        outbound = enqueue_email('a@example.com', 'Subject', body='Plain', max_attempts=2)[0]
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('down')):
+            deliver_pending()
+            outbound.refresh_from_db()
+            self.assertEqual((outbound.status, outbound.attempts), ('PENDING', 1))
+            self.assertGreater(outbound.next_attempt_at, timezone.now() + timedelta(seconds=25))
+
+            # Not due yet
+            self.assertEqual(deliver_pending()['retrying'], 0)
+
+            OutboundEmail.objects.filter(pk=outbound.pk).update(next_attempt_at=timezone.now())
+            deliver_pending()
+        outbound.refresh_from_db()
+        self.assertEqual((outbound.status, outbound.attempts), ('FAILED', 2))
+        self.assertIn('down', outbound.last_error)
+
+    def test_credential_emails_bypass_the_outbox(self):
+        from users.utils.email_utils import send_otp_email
+
+        user = User.objects.create_user(
+            email='otp@example.com', password='testpass123', password_provided=True, userlevel='Admin'
+        )
+        mail.outbox.clear()
+
+        self.assertTrue(send_otp_email(user, '482913'))
+        self.assertFalse(OutboundEmail.objects.exists())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('482913', mail.outbox[0].body)
+
+    @override_settings(EMAIL_OUTBOX_RETENTION_DAYS=30)
+    def test_finished_emails_are_purged_after_retention(self):
+        old, recent, failed, pending = enqueue_email(
+            ['old@example.com', 'recent@example.com', 'failed@example.com', 'pending@example.com'],
+            'Subject', body='Plain',
+        )
+        long_ago = timezone.now() - timedelta(days=31)
+        OutboundEmail.objects.filter(pk=old.pk).update(status='SENT', sent_at=long_ago)
+        OutboundEmail.objects.filter(pk=recent.pk).update(status='SENT', sent_at=timezone.now())
+        OutboundEmail.objects.filter(pk=failed.pk).update(status='FAILED', created_at=long_ago)
+        OutboundEmail.objects.filter(pk=pending.pk).update(created_at=long_ago)
+
+        self.assertEqual(purge_finished(), 2)
+        self.assertEqual(
+            sorted(OutboundEmail.objects.values_list('recipient', flat=True)),
+            ['pending@example.com', 'recent@example.com'],
+        )
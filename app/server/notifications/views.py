@@ -3,6 +3,7 @@ from rest_framework import generics, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from core.pagination import CursorOrPagePagination
 from .models import Notification
 from .serializers import NotificationSerializer
 from django.contrib.auth import get_user_model
@@ -14,6 +15,8 @@ User = get_user_model()
 class NotificationListView(generics.ListAPIView):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # ?pagination=cursor / ?cursor=... for keyset paging on (created_at, id)
+    pagination_class = CursorOrPagePagination
     
     def get_queryset(self):
         return Notification.objects.filter(recipient=self.request.user).order_by('-created_at')
@@ -1,10 +1,22 @@
 """
 Report Generator Functions
 Handles generation of different report types with consistent structure
+
+Generators never materialize a whole report: rows are read as .values()
+projections in chunks of chunk_size (primary keys first, then each chunk's
+columns by pk, since MySQL drivers buffer a full result set even for
+.iterator()) and format_rows() formats one chunk at a time. generate()
+returns the JSON report, optionally one page of it; iter_ndjson() and
+iter_csv() feed StreamingHttpResponse.
 """
+import csv
+import json
+from collections import defaultdict
 from datetime import datetime, date
 from decimal import Decimal
-from django.db.models import Q, Count, Avg
+from itertools import islice
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, Count, Avg, Exists, OuterRef
 from django.contrib.auth import get_user_model
 from establishments.models import Establishment
 from inspections.models import Inspection, BillingRecord, ComplianceQuota, NoticeOfViolation, NoticeOfOrder
@@ -12,6 +24,15 @@ from laws.models import Law
 
 User = get_user_model()
 
+INSPECTION_STATUS_LABELS = dict(Inspection.STATUS_CHOICES)
+
+
+class _Echo:
+    """File-like object whose write() returns the line, for streaming csv.writer output"""
+
+    def write(self, value):
+        return value
+
 
 class BaseReportGenerator:
     """
@@ -20,33 +41,52 @@ class BaseReportGenerator:
     """
     report_type = None
     report_title = None
+    # .values() fields read for each row (the primary key is always included)
+    value_fields = ()
+    # Rows fetched and formatted per database round trip
+    chunk_size = 500
     
-    def generate(self, filters, user):
+    def generate(self, filters, user, page=None, page_size=None):
         """
         Main entry point for report generation
         
         Args:
             filters: dict with date_from, date_to, and report-specific filters
             user: current user making the request
+            page, page_size: optional 1-based page of rows to return
         
         Returns:
             dict with columns, rows, and metadata
         """
-        # Apply date filtering
-        date_from = filters.get('date_from')
-        date_to = filters.get('date_to')
-        extra_filters = filters.get('extra_filters', {})
-        
-        # Fetch data with filters
-        data = self.fetch_data(date_from, date_to, extra_filters, user)
+        queryset = self.get_queryset(filters, user)
+        total = queryset.count()
+        metadata = self.get_metadata(total, filters)
+        
+        start = stop = None
+        if page and page_size:
+            start = (page - 1) * page_size
+            stop = start + page_size
+            metadata.update({
+                'page': page,
+                'page_size': page_size,
+                'total_pages': (total + page_size - 1) // page_size,
+            })
         
-        # Format the data
         return {
             'columns': self.get_columns(),
-            'rows': self.format_rows(data),
-            'metadata': self.get_metadata(data, filters)
+            'rows': list(self.iter_rows(queryset, start, stop)),
+            'metadata': metadata
         }
     
+    def get_queryset(self, filters, user):
+        """Filtered, ordered queryset for the report"""
+        return self.fetch_data(
+            filters.get('date_from'),
+            filters.get('date_to'),
+            filters.get('extra_filters', {}),
+            user
+        )
+    
     def fetch_data(self, date_from, date_to, extra_filters, user):
         """Fetch raw data from database - to be implemented by subclasses"""
         raise NotImplementedError("Subclasses must implement fetch_data()")
@@ -56,15 +96,57 @@ class BaseReportGenerator:
         raise NotImplementedError("Subclasses must implement get_columns()")
     
     def format_rows(self, data):
-        """Format data into table rows - to be implemented by subclasses"""
+        """Format one chunk of .values() dicts into table rows - to be implemented by subclasses"""
         raise NotImplementedError("Subclasses must implement format_rows()")
     
-    def get_metadata(self, data, filters):
+    def iter_chunks(self, queryset, start=None, stop=None):
+        """Yield lists of .values() dicts in queryset order, chunk_size at a time"""
+        ids = queryset.values_list('pk', flat=True)
+        if start is not None or stop is not None:
+            ids = ids[start:stop]
+        ids = ids.iterator(chunk_size=self.chunk_size)
+        # Re-fetching by pk keeps annotations; the ordering comes from the id list
+        unordered = queryset.order_by()
+        while True:
+            chunk_ids = list(islice(ids, self.chunk_size))
+            if not chunk_ids:
+                return
+            by_pk = {
+                row['pk']: row
+                for row in unordered.filter(pk__in=chunk_ids).values('pk', *self.value_fields)
+            }
+            yield [by_pk[pk] for pk in chunk_ids if pk in by_pk]
+    
+    def iter_rows(self, queryset, start=None, stop=None):
+        """Yield formatted rows without loading the whole report"""
+        for chunk in self.iter_chunks(queryset, start, stop):
+            yield from self.format_rows(chunk)
+    
+    def iter_ndjson(self, filters, user):
+        """NDJSON lines: a header object with columns and metadata, then one object per row"""
+        queryset = self.get_queryset(filters, user)
+        header = {
+            'columns': self.get_columns(),
+            'metadata': self.get_metadata(queryset.count(), filters),
+        }
+        yield json.dumps(header, cls=DjangoJSONEncoder) + '\n'
+        for row in self.iter_rows(queryset):
+            yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+    
+    def iter_csv(self, filters, user):
+        """CSV lines: column labels, then one line per row in column order"""
+        columns = self.get_columns()
+        writer = csv.writer(_Echo())
+        yield writer.writerow([column['label'] for column in columns])
+        for row in self.iter_rows(self.get_queryset(filters, user)):
+            yield writer.writerow([row.get(column['key'], '') for column in columns])
+    
+    def get_metadata(self, total, filters):
         """Generate report metadata"""
         return {
             'report_type': self.report_type,
             'report_title': self.report_title,
-            'total': len(data) if hasattr(data, '__len__') else data.count() if hasattr(data, 'count') else 0,
+            'total': total,
             'generated_at': datetime.now().isoformat(),
             'filters_applied': {
                 'date_from': filters.get('date_from'),
@@ -83,12 +165,49 @@ class BaseReportGenerator:
         if date_to:
             queryset = queryset.filter(**{f"{date_field}__lte": date_to})
         return queryset
+    
+    @staticmethod
+    def get_establishment_names(inspection_ids):
+        """{inspection_id: 'Name A, Name B'} for a chunk of inspections in one query"""
+        names = defaultdict(list)
+        links = Inspection.establishments.through.objects.filter(
+            inspection_id__in=list(inspection_ids)
+        ).order_by('-establishment__created_at', 'establishment_id').values_list('inspection_id', 'establishment__name')
+        for inspection_id, name in links:
+            names[inspection_id].append(name)
+        return {inspection_id: ', '.join(items) for inspection_id, items in names.items()}
+    
+    @staticmethod
+    def _format_user(first_name, last_name, email, default='N/A'):
+        """Format user display name from projected user fields"""
+        if not email:
+            return default
+        if first_name and last_name:
+            return f"{first_name} {last_name}"
+        return email
+    
+    @staticmethod
+    def _format_date(value, fmt='%Y-%m-%d', default='N/A'):
+        return value.strftime(fmt) if value else default
+    
+    @staticmethod
+    def _compliance_label(status):
+        if 'COMPLIANT' in status and 'NON' not in status:
+            return 'Compliant'
+        if 'NON_COMPLIANT' in status:
+            return 'Non-Compliant'
+        return 'Pending'
 
 
 class InspectionReportGenerator(BaseReportGenerator):
     """Generate inspection reports with filtering"""
     report_type = 'inspection'
     report_title = 'Inspection Report'
+    value_fields = (
+        'code', 'law', 'district', 'current_status', 'created_at',
+        'assigned_to__first_name', 'assigned_to__last_name', 'assigned_to__email',
+        'created_by__first_name', 'created_by__last_name', 'created_by__email',
+    )
     
     def get_columns(self):
         return [
@@ -104,9 +223,7 @@ class InspectionReportGenerator(BaseReportGenerator):
     
     def fetch_data(self, date_from, date_to, extra_filters, user):
         """Fetch inspection data"""
-        queryset = Inspection.objects.all().select_related(
-            'assigned_to', 'created_by'
-        ).prefetch_related('establishments')
+        queryset = Inspection.objects.all()
         
         # Apply date filter
         queryset = self.apply_date_filter(queryset, 'created_at', date_from, date_to)
@@ -136,38 +253,34 @@ class InspectionReportGenerator(BaseReportGenerator):
     
     def format_rows(self, data):
         """Format inspection data into table rows"""
-        rows = []
+        establishment_names = self.get_establishment_names(row['pk'] for row in data)
         for inspection in data:
-            # Get establishment names
-            establishment_names = ', '.join([
-                est.name for est in inspection.establishments.all()
-            ])
-            
-            rows.append({
-                'code': inspection.code or 'N/A',
-                'establishment_names': establishment_names or 'N/A',
-                'law': inspection.law,
-                'district': inspection.district or 'N/A',
-                'status': inspection.get_current_status_display(),
-                'assigned_to': self._format_user(inspection.assigned_to),
-                'created_by': self._format_user(inspection.created_by),
-                'created_at': inspection.created_at.strftime('%Y-%m-%d %H:%M') if inspection.created_at else 'N/A',
-            })
-        return rows
-    
-    def _format_user(self, user):
-        """Format user display name"""
-        if not user:
-            return 'N/A'
-        if user.first_name and user.last_name:
-            return f"{user.first_name} {user.last_name}"
-        return user.email
+            yield {
+                'code': inspection['code'] or 'N/A',
+                'establishment_names': establishment_names.get(inspection['pk']) or 'N/A',
+                'law': inspection['law'],
+                'district': inspection['district'] or 'N/A',
+                'status': INSPECTION_STATUS_LABELS.get(inspection['current_status'], inspection['current_status']),
+                'assigned_to': self._format_user(
+                    inspection['assigned_to__first_name'], inspection['assigned_to__last_name'],
+                    inspection['assigned_to__email']
+                ),
+                'created_by': self._format_user(
+                    inspection['created_by__first_name'], inspection['created_by__last_name'],
+                    inspection['created_by__email']
+                ),
+                'created_at': self._format_date(inspection['created_at'], '%Y-%m-%d %H:%M'),
+            }
 
 
 class EstablishmentReportGenerator(BaseReportGenerator):
     """Generate establishment reports with filtering"""
     report_type = 'establishment'
     report_title = 'Establishment Report'
+    value_fields = (
+        'name', 'nature_of_business', 'province', 'city', 'barangay', 'street_building',
+        'year_established', 'is_active', 'inspection_count', 'created_at',
+    )
     
     def get_columns(self):
         return [
@@ -216,27 +329,29 @@ class EstablishmentReportGenerator(BaseReportGenerator):
     
     def format_rows(self, data):
         """Format establishment data into table rows"""
-        rows = []
         for establishment in data:
-            rows.append({
-                'name': establishment.name,
-                'nature_of_business': establishment.nature_of_business,
-                'province': establishment.province,
-                'city': establishment.city,
-                'barangay': establishment.barangay,
-                'street_building': establishment.street_building,
-                'year_established': establishment.year_established,
-                'status': 'Active' if establishment.is_active else 'Inactive',
-                'inspection_count': establishment.inspection_count,
-                'created_at': establishment.created_at.strftime('%Y-%m-%d') if establishment.created_at else 'N/A',
-            })
-        return rows
+            yield {
+                'name': establishment['name'],
+                'nature_of_business': establishment['nature_of_business'],
+                'province': establishment['province'],
+                'city': establishment['city'],
+                'barangay': establishment['barangay'],
+                'street_building': establishment['street_building'],
+                'year_established': establishment['year_established'],
+                'status': 'Active' if establishment['is_active'] else 'Inactive',
+                'inspection_count': establishment['inspection_count'],
+                'created_at': self._format_date(establishment['created_at']),
+            }
 
 
 class UserReportGenerator(BaseReportGenerator):
     """Generate user reports with filtering"""
     report_type = 'user'
     report_title = 'User Report'
+    value_fields = (
+        'email', 'first_name', 'last_name', 'userlevel', 'section', 'is_active',
+        'date_joined', 'last_login', 'inspections_created', 'inspections_assigned',
+    )
     
     def get_columns(self):
         return [
@@ -281,28 +396,30 @@ class UserReportGenerator(BaseReportGenerator):
     
     def format_rows(self, data):
         """Format user data into table rows"""
-        rows = []
         for user in data:
-            full_name = f"{user.first_name} {user.last_name}".strip() or 'N/A'
+            full_name = f"{user['first_name']} {user['last_name']}".strip() or 'N/A'
             
-            rows.append({
-                'email': user.email,
+            yield {
+                'email': user['email'],
                 'full_name': full_name,
-                'userlevel': user.userlevel,
-                'section': user.section or 'N/A',
-                'status': 'Active' if user.is_active else 'Inactive',
-                'date_joined': user.date_joined.strftime('%Y-%m-%d') if user.date_joined else 'N/A',
-                'last_login': user.last_login.strftime('%Y-%m-%d %H:%M') if user.last_login else 'Never',
-                'inspections_created': user.inspections_created,
-                'inspections_assigned': user.inspections_assigned,
-            })
-        return rows
+                'userlevel': user['userlevel'],
+                'section': user['section'] or 'N/A',
+                'status': 'Active' if user['is_active'] else 'Inactive',
+                'date_joined': self._format_date(user['date_joined']),
+                'last_login': self._format_date(user['last_login'], '%Y-%m-%d %H:%M', 'Never'),
+                'inspections_created': user['inspections_created'],
+                'inspections_assigned': user['inspections_assigned'],
+            }
 
 
 class BillingReportGenerator(BaseReportGenerator):
     """Generate billing reports with filtering"""
     report_type = 'billing'
     report_title = 'Billing Report'
+    value_fields = (
+        'billing_code', 'establishment_name', 'related_law', 'billing_type', 'amount',
+        'payment_status', 'due_date', 'payment_date', 'created_at',
+    )
     
     def get_columns(self):
         return [
@@ -319,7 +436,7 @@ class BillingReportGenerator(BaseReportGenerator):
     
     def fetch_data(self, date_from, date_to, extra_filters, user):
         """Fetch billing data"""
-        queryset = BillingRecord.objects.all().select_related('establishment', 'inspection')
+        queryset = BillingRecord.objects.all()
         
         # Apply date filter
         queryset = self.apply_date_filter(queryset, 'created_at', date_from, date_to)
@@ -345,26 +462,30 @@ class BillingReportGenerator(BaseReportGenerator):
     
     def format_rows(self, data):
         """Format billing data into table rows"""
-        rows = []
+        billing_types = dict(BillingRecord.BILLING_TYPE_CHOICES)
+        payment_statuses = dict(BillingRecord.PAYMENT_STATUS_CHOICES)
         for billing in data:
-            rows.append({
-                'billing_code': billing.billing_code,
-                'establishment_name': billing.establishment_name,
-                'related_law': billing.related_law,
-                'billing_type': billing.get_billing_type_display(),
-                'amount': f"₱{billing.amount:,.2f}",
-                'payment_status': billing.get_payment_status_display(),
-                'due_date': billing.due_date.strftime('%Y-%m-%d') if billing.due_date else 'N/A',
-                'payment_date': billing.payment_date.strftime('%Y-%m-%d') if billing.payment_date else 'N/A',
-                'created_at': billing.created_at.strftime('%Y-%m-%d') if billing.created_at else 'N/A',
-            })
-        return rows
+            yield {
+                'billing_code': billing['billing_code'],
+                'establishment_name': billing['establishment_name'],
+                'related_law': billing['related_law'],
+                'billing_type': billing_types.get(billing['billing_type'], billing['billing_type']),
+                'amount': f"₱{billing['amount']:,.2f}",
+                'payment_status': payment_statuses.get(billing['payment_status'], billing['payment_status']),
+                'due_date': self._format_date(billing['due_date']),
+                'payment_date': self._format_date(billing['payment_date']),
+                'created_at': self._format_date(billing['created_at']),
+            }
 
 
 class ComplianceReportGenerator(BaseReportGenerator):
     """Generate compliance reports (compliant inspections)"""
     report_type = 'compliance'
     report_title = 'Compliance Report'
+    value_fields = (
+        'code', 'law', 'current_status', 'created_at',
+        'assigned_to__first_name', 'assigned_to__last_name', 'assigned_to__email',
+    )
     
     def get_columns(self):
         return [
@@ -388,7 +509,7 @@ class ComplianceReportGenerator(BaseReportGenerator):
         
         queryset = Inspection.objects.filter(
             current_status__in=compliant_statuses
-        ).select_related('assigned_to', 'created_by').prefetch_related('establishments')
+        )
         
         # Apply date filter
         queryset = self.apply_date_filter(queryset, 'created_at', date_from, date_to)
@@ -402,34 +523,29 @@ class ComplianceReportGenerator(BaseReportGenerator):
     
     def format_rows(self, data):
         """Format compliance data into table rows"""
-        rows = []
+        establishment_names = self.get_establishment_names(row['pk'] for row in data)
         for inspection in data:
-            establishment_names = ', '.join([
-                est.name for est in inspection.establishments.all()
-            ])
-            
-            assigned_to = 'N/A'
-            if inspection.assigned_to:
-                if inspection.assigned_to.first_name and inspection.assigned_to.last_name:
-                    assigned_to = f"{inspection.assigned_to.first_name} {inspection.assigned_to.last_name}"
-                else:
-                    assigned_to = inspection.assigned_to.email
-            
-            rows.append({
-                'code': inspection.code or 'N/A',
-                'establishment_names': establishment_names or 'N/A',
-                'law': inspection.law,
-                'status': inspection.get_current_status_display(),
-                'assigned_to': assigned_to,
-                'created_at': inspection.created_at.strftime('%Y-%m-%d') if inspection.created_at else 'N/A',
-            })
-        return rows
+            yield {
+                'code': inspection['code'] or 'N/A',
+                'establishment_names': establishment_names.get(inspection['pk']) or 'N/A',
+                'law': inspection['law'],
+                'status': INSPECTION_STATUS_LABELS.get(inspection['current_status'], inspection['current_status']),
+                'assigned_to': self._format_user(
+                    inspection['assigned_to__first_name'], inspection['assigned_to__last_name'],
+                    inspection['assigned_to__email']
+                ),
+                'created_at': self._format_date(inspection['created_at']),
+            }
 
 
 class NonCompliantReportGenerator(BaseReportGenerator):
     """Generate non-compliant reports"""
     report_type = 'non_compliant'
     report_title = 'Non-Compliant Report'
+    value_fields = (
+        'code', 'law', 'current_status', 'created_at', 'has_billing_record',
+        'assigned_to__first_name', 'assigned_to__last_name', 'assigned_to__email',
+    )
     
     def get_columns(self):
         return [
@@ -457,7 +573,9 @@ class NonCompliantReportGenerator(BaseReportGenerator):
         
         queryset = Inspection.objects.filter(
             current_status__in=non_compliant_statuses
-        ).select_related('assigned_to', 'created_by').prefetch_related('establishments')
+        ).annotate(
+            has_billing_record=Exists(BillingRecord.objects.filter(inspection=OuterRef('pk')))
+        )
         
         # Apply date filter
         queryset = self.apply_date_filter(queryset, 'created_at', date_from, date_to)
@@ -477,38 +595,30 @@ class NonCompliantReportGenerator(BaseReportGenerator):
     
     def format_rows(self, data):
         """Format non-compliant data into table rows"""
-        rows = []
+        establishment_names = self.get_establishment_names(row['pk'] for row in data)
         for inspection in data:
-            establishment_names = ', '.join([
-                est.name for est in inspection.establishments.all()
-            ])
-            
-            assigned_to = 'N/A'
-            if inspection.assigned_to:
-                if inspection.assigned_to.first_name and inspection.assigned_to.last_name:
-                    assigned_to = f"{inspection.assigned_to.first_name} {inspection.assigned_to.last_name}"
-                else:
-                    assigned_to = inspection.assigned_to.email
-            
-            # Check if billing exists
-            has_billing = 'Billed' if hasattr(inspection, 'billing_record') else 'Not Billed'
-            
-            rows.append({
-                'code': inspection.code or 'N/A',
-                'establishment_names': establishment_names or 'N/A',
-                'law': inspection.law,
-                'status': inspection.get_current_status_display(),
-                'assigned_to': assigned_to,
-                'has_billing': has_billing,
-                'created_at': inspection.created_at.strftime('%Y-%m-%d') if inspection.created_at else 'N/A',
-            })
-        return rows
+            yield {
+                'code': inspection['code'] or 'N/A',
+                'establishment_names': establishment_names.get(inspection['pk']) or 'N/A',
+                'law': inspection['law'],
+                'status': INSPECTION_STATUS_LABELS.get(inspection['current_status'], inspection['current_status']),
+                'assigned_to': self._format_user(
+                    inspection['assigned_to__first_name'], inspection['assigned_to__last_name'],
+                    inspection['assigned_to__email']
+                ),
+                'has_billing': 'Billed' if inspection['has_billing_record'] else 'Not Billed',
+                'created_at': self._format_date(inspection['created_at']),
+            }
 
 
 class QuotaReportGenerator(BaseReportGenerator):
     """Generate quota reports"""
     report_type = 'quota'
     report_title = 'Quota Report'
+    value_fields = (
+        'law', 'year', 'month', 'quarter', 'target', 'auto_adjusted', 'created_at',
+        'created_by__first_name', 'created_by__last_name', 'created_by__email',
+    )
     
     def get_columns(self):
         return [
@@ -524,7 +634,7 @@ class QuotaReportGenerator(BaseReportGenerator):
     
     def fetch_data(self, date_from, date_to, extra_filters, user):
         """Fetch quota data"""
-        queryset = ComplianceQuota.objects.all().select_related('created_by')
+        queryset = ComplianceQuota.objects.all()
         
         # Apply year/quarter filters
         year = extra_filters.get('year')
@@ -549,32 +659,29 @@ class QuotaReportGenerator(BaseReportGenerator):
             9: 'September', 10: 'October', 11: 'November', 12: 'December'
         }
         
-        rows = []
         for quota in data:
-            created_by = 'System'
-            if quota.created_by:
-                if quota.created_by.first_name and quota.created_by.last_name:
-                    created_by = f"{quota.created_by.first_name} {quota.created_by.last_name}"
-                else:
-                    created_by = quota.created_by.email
-            
-            rows.append({
-                'law': quota.law,
-                'year': quota.year,
-                'month': month_names.get(quota.month, str(quota.month)),
-                'quarter': f"Q{quota.quarter}",
-                'target': quota.target,
-                'auto_adjusted': 'Yes' if quota.auto_adjusted else 'No',
-                'created_by': created_by,
-                'created_at': quota.created_at.strftime('%Y-%m-%d') if quota.created_at else 'N/A',
-            })
-        return rows
+            yield {
+                'law': quota['law'],
+                'year': quota['year'],
+                'month': month_names.get(quota['month'], str(quota['month'])),
+                'quarter': f"Q{quota['quarter']}",
+                'target': quota['target'],
+                'auto_adjusted': 'Yes' if quota['auto_adjusted'] else 'No',
+                'created_by': self._format_user(
+                    quota['created_by__first_name'], quota['created_by__last_name'],
+                    quota['created_by__email'], default='System'
+                ),
+                'created_at': self._format_date(quota['created_at']),
+            }
 
 
 class LawReportGenerator(BaseReportGenerator):
     """Generate law reports"""
     report_type = 'law'
     report_title = 'Law Report'
+    value_fields = (
+        'reference_code', 'law_title', 'category', 'description', 'effective_date', 'status', 'created_at',
+    )
     
     def get_columns(self):
         return [
@@ -612,24 +719,27 @@ class LawReportGenerator(BaseReportGenerator):
     
     def format_rows(self, data):
         """Format law data into table rows"""
-        rows = []
         for law in data:
-            rows.append({
-                'reference_code': law.reference_code or 'N/A',
-                'title': law.law_title,
-                'category': law.category or 'N/A',
-                'description': law.description[:100] + '...' if len(law.description) > 100 else law.description,
-                'effective_date': law.effective_date.strftime('%Y-%m-%d') if law.effective_date else 'N/A',
-                'status': law.status,
-                'created_at': law.created_at.strftime('%Y-%m-%d') if law.created_at else 'N/A',
-            })
-        return rows
+            description = law['description']
+            yield {
+                'reference_code': law['reference_code'] or 'N/A',
+                'title': law['law_title'],
+                'category': law['category'] or 'N/A',
+                'description': description[:100] + '...' if len(description) > 100 else description,
+                'effective_date': self._format_date(law['effective_date']),
+                'status': law['status'],
+                'created_at': self._format_date(law['created_at']),
+            }
 
 
 class SectionAccomplishmentReportGenerator(BaseReportGenerator):
     """Generate accomplishment reports for Section Chief"""
     report_type = 'section_accomplishment'
     report_title = 'Section Accomplishment Report'
+    value_fields = (
+        'code', 'law', 'current_status', 'updated_at',
+        'assigned_to__first_name', 'assigned_to__last_name', 'assigned_to__email',
+    )
     
     def get_columns(self):
         return [
@@ -657,7 +767,7 @@ class SectionAccomplishmentReportGenerator(BaseReportGenerator):
         
         queryset = Inspection.objects.filter(
             current_status__in=completed_statuses
-        ).select_related('assigned_to', 'created_by').prefetch_related('establishments')
+        )
         
         # Apply date filter
         queryset = self.apply_date_filter(queryset, 'updated_at', date_from, date_to)
@@ -690,43 +800,30 @@ class SectionAccomplishmentReportGenerator(BaseReportGenerator):
     
     def format_rows(self, data):
         """Format section accomplishment data"""
-        rows = []
+        establishment_names = self.get_establishment_names(row['pk'] for row in data)
         for inspection in data:
-            establishment_names = ', '.join([
-                est.name for est in inspection.establishments.all()
-            ])
-            
-            # Determine compliance
-            if 'COMPLIANT' in inspection.current_status and 'NON' not in inspection.current_status:
-                compliance = 'Compliant'
-            elif 'NON_COMPLIANT' in inspection.current_status:
-                compliance = 'Non-Compliant'
-            else:
-                compliance = 'Pending'
-            
-            rows.append({
-                'code': inspection.code or 'N/A',
-                'establishment_names': establishment_names or 'N/A',
-                'law': inspection.law,
-                'status': inspection.get_current_status_display(),
-                'compliance_decision': compliance,
-                'assigned_to': self._format_user(inspection.assigned_to),
-                'completed_at': inspection.updated_at.strftime('%Y-%m-%d') if inspection.updated_at else 'N/A',
-            })
-        return rows
-    
-    def _format_user(self, user):
-        if not user:
-            return 'N/A'
-        if user.first_name and user.last_name:
-            return f"{user.first_name} {user.last_name}"
-        return user.email
+            yield {
+                'code': inspection['code'] or 'N/A',
+                'establishment_names': establishment_names.get(inspection['pk']) or 'N/A',
+                'law': inspection['law'],
+                'status': INSPECTION_STATUS_LABELS.get(inspection['current_status'], inspection['current_status']),
+                'compliance_decision': self._compliance_label(inspection['current_status']),
+                'assigned_to': self._format_user(
+                    inspection['assigned_to__first_name'], inspection['assigned_to__last_name'],
+                    inspection['assigned_to__email']
+                ),
+                'completed_at': self._format_date(inspection['updated_at']),
+            }
 
 
 class UnitAccomplishmentReportGenerator(BaseReportGenerator):
     """Generate accomplishment reports for Unit Head"""
     report_type = 'unit_accomplishment'
     report_title = 'Unit Accomplishment Report'
+    value_fields = (
+        'code', 'law', 'current_status', 'updated_at',
+        'assigned_to__first_name', 'assigned_to__last_name', 'assigned_to__email',
+    )
     
     def get_columns(self):
         return [
@@ -754,7 +851,7 @@ class UnitAccomplishmentReportGenerator(BaseReportGenerator):
         
         queryset = Inspection.objects.filter(
             current_status__in=completed_statuses
-        ).select_related('assigned_to', 'created_by').prefetch_related('establishments')
+        )
         
         # Apply date filter
         queryset = self.apply_date_filter(queryset, 'updated_at', date_from, date_to)
@@ -787,43 +884,30 @@ class UnitAccomplishmentReportGenerator(BaseReportGenerator):
     
     def format_rows(self, data):
         """Format unit accomplishment data"""
-        rows = []
+        establishment_names = self.get_establishment_names(row['pk'] for row in data)
         for inspection in data:
-            establishment_names = ', '.join([
-                est.name for est in inspection.establishments.all()
-            ])
-            
-            # Determine compliance
-            if 'COMPLIANT' in inspection.current_status and 'NON' not in inspection.current_status:
-                compliance = 'Compliant'
-            elif 'NON_COMPLIANT' in inspection.current_status:
-                compliance = 'Non-Compliant'
-            else:
-                compliance = 'Pending'
-            
-            rows.append({
-                'code': inspection.code or 'N/A',
-                'establishment_names': establishment_names or 'N/A',
-                'law': inspection.law,
-                'status': inspection.get_current_status_display(),
-                'compliance_decision': compliance,
-                'assigned_to': self._format_user(inspection.assigned_to),
-                'completed_at': inspection.updated_at.strftime('%Y-%m-%d') if inspection.updated_at else 'N/A',
-            })
-        return rows
-    
-    def _format_user(self, user):
-        if not user:
-            return 'N/A'
-        if user.first_name and user.last_name:
-            return f"{user.first_name} {user.last_name}"
-        return user.email
+            yield {
+                'code': inspection['code'] or 'N/A',
+                'establishment_names': establishment_names.get(inspection['pk']) or 'N/A',
+                'law': inspection['law'],
+                'status': INSPECTION_STATUS_LABELS.get(inspection['current_status'], inspection['current_status']),
+                'compliance_decision': self._compliance_label(inspection['current_status']),
+                'assigned_to': self._format_user(
+                    inspection['assigned_to__first_name'], inspection['assigned_to__last_name'],
+                    inspection['assigned_to__email']
+                ),
+                'completed_at': self._format_date(inspection['updated_at']),
+            }
 
 
 class MonitoringAccomplishmentReportGenerator(BaseReportGenerator):
     """Generate accomplishment reports for Monitoring Personnel"""
     report_type = 'monitoring_accomplishment'
     report_title = 'Monitoring Accomplishment Report'
+    value_fields = (
+        'code', 'law', 'current_status', 'updated_at',
+        'assigned_to__first_name', 'assigned_to__last_name', 'assigned_to__email',
+    )
     
     def get_columns(self):
         return [
@@ -851,7 +935,7 @@ class MonitoringAccomplishmentReportGenerator(BaseReportGenerator):
         
         queryset = Inspection.objects.filter(
             current_status__in=completed_statuses
-        ).select_related('assigned_to', 'created_by').prefetch_related('establishments')
+        )
         
         # Apply date filter
         queryset = self.apply_date_filter(queryset, 'updated_at', date_from, date_to)
@@ -880,43 +964,31 @@ class MonitoringAccomplishmentReportGenerator(BaseReportGenerator):
     
     def format_rows(self, data):
         """Format monitoring accomplishment data"""
-        rows = []
+        establishment_names = self.get_establishment_names(row['pk'] for row in data)
         for inspection in data:
-            establishment_names = ', '.join([
-                est.name for est in inspection.establishments.all()
-            ])
-            
-            # Determine compliance
-            if 'COMPLIANT' in inspection.current_status and 'NON' not in inspection.current_status:
-                compliance = 'Compliant'
-            elif 'NON_COMPLIANT' in inspection.current_status:
-                compliance = 'Non-Compliant'
-            else:
-                compliance = 'Pending'
-            
-            rows.append({
-                'code': inspection.code or 'N/A',
-                'establishment_names': establishment_names or 'N/A',
-                'law': inspection.law,
-                'status': inspection.get_current_status_display(),
-                'compliance_decision': compliance,
-                'assigned_to': self._format_user(inspection.assigned_to),
-                'completed_at': inspection.updated_at.strftime('%Y-%m-%d') if inspection.updated_at else 'N/A',
-            })
-        return rows
-    
-    def _format_user(self, user):
-        if not user:
-            return 'N/A'
-        if user.first_name and user.last_name:
-            return f"{user.first_name} {user.last_name}"
-        return user.email
+            yield {
+                'code': inspection['code'] or 'N/A',
+                'establishment_names': establishment_names.get(inspection['pk']) or 'N/A',
+                'law': inspection['law'],
+                'status': INSPECTION_STATUS_LABELS.get(inspection['current_status'], inspection['current_status']),
+                'compliance_decision': self._compliance_label(inspection['current_status']),
+                'assigned_to': self._format_user(
+                    inspection['assigned_to__first_name'], inspection['assigned_to__last_name'],
+                    inspection['assigned_to__email']
+                ),
+                'completed_at': self._format_date(inspection['updated_at']),
+            }
 
 
 class NoticeOfViolationReportGenerator(BaseReportGenerator):
     """Generate Notice of Violation (NOV) reports"""
     report_type = 'nov'
     report_title = 'Notice of Violation Report'
+    value_fields = (
+        'sent_date', 'compliance_deadline', 'violations', 'recipient_name',
+        'inspection_form__inspection_id', 'inspection_form__inspection__code', 'inspection_form__inspection__law',
+        'sent_by__first_name', 'sent_by__last_name', 'sent_by__email',
+    )
     
     def get_columns(self):
         return [
@@ -932,12 +1004,7 @@ class NoticeOfViolationReportGenerator(BaseReportGenerator):
         ]
     
     def fetch_data(self, date_from, date_to, extra_filters, user):
-        queryset = NoticeOfViolation.objects.select_related(
-            'inspection_form__inspection',
-            'sent_by'
-        ).prefetch_related(
-            'inspection_form__inspection__establishments'
-        )
+        queryset = NoticeOfViolation.objects.all()
         
         # Apply date filter on sent_date
         queryset = self.apply_date_filter(queryset, 'sent_date', date_from, date_to)
@@ -966,48 +1033,44 @@ class NoticeOfViolationReportGenerator(BaseReportGenerator):
         return queryset.order_by('-sent_date')
     
     def format_rows(self, data):
-        rows = []
+        establishment_names = self.get_establishment_names(row['inspection_form__inspection_id'] for row in data)
+        today = datetime.now().date()
         for nov in data:
-            inspection = nov.inspection_form.inspection
-            establishment_names = ', '.join([est.name for est in inspection.establishments.all()])
-            
             # Determine status
-            if nov.compliance_deadline:
-                if nov.compliance_deadline.date() < datetime.now().date():
+            compliance_deadline = nov['compliance_deadline']
+            if compliance_deadline:
+                if compliance_deadline.date() < today:
                     status = 'Overdue'
-                elif nov.compliance_deadline.date() == datetime.now().date():
+                elif compliance_deadline.date() == today:
                     status = 'Due Today'
                 else:
                     status = 'Pending'
             else:
                 status = 'No Deadline'
             
-            rows.append({
-                'inspection_code': inspection.code,
-                'establishment_name': establishment_names,
-                'law': inspection.law,
-                'sent_date': nov.sent_date.strftime('%Y-%m-%d') if nov.sent_date else 'Not Sent',
-                'compliance_deadline': nov.compliance_deadline.strftime('%Y-%m-%d %H:%M') if nov.compliance_deadline else 'N/A',
-                'violations': (nov.violations[:100] + '...') if nov.violations and len(nov.violations) > 100 else (nov.violations or 'N/A'),
-                'recipient_name': nov.recipient_name or 'N/A',
-                'sent_by': self._format_user(nov.sent_by),
+            violations = nov['violations']
+            yield {
+                'inspection_code': nov['inspection_form__inspection__code'],
+                'establishment_name': establishment_names.get(nov['inspection_form__inspection_id'], ''),
+                'law': nov['inspection_form__inspection__law'],
+                'sent_date': self._format_date(nov['sent_date'], default='Not Sent'),
+                'compliance_deadline': self._format_date(compliance_deadline, '%Y-%m-%d %H:%M'),
+                'violations': (violations[:100] + '...') if violations and len(violations) > 100 else (violations or 'N/A'),
+                'recipient_name': nov['recipient_name'] or 'N/A',
+                'sent_by': self._format_user(nov['sent_by__first_name'], nov['sent_by__last_name'], nov['sent_by__email']),
                 'status': status,
-            })
-        return rows
-    
-    def _format_user(self, user):
-        """Format user display name"""
-        if not user:
-            return 'N/A'
-        if user.first_name and user.last_name:
-            return f"{user.first_name} {user.last_name}"
-        return user.email
+            }
 
 
 class NoticeOfOrderReportGenerator(BaseReportGenerator):
     """Generate Notice of Order (NOO) reports"""
     report_type = 'noo'
     report_title = 'Notice of Order Report'
+    value_fields = (
+        'sent_date', 'penalty_fees', 'payment_deadline', 'recipient_name',
+        'inspection_form__inspection_id', 'inspection_form__inspection__code', 'inspection_form__inspection__law',
+        'sent_by__first_name', 'sent_by__last_name', 'sent_by__email',
+    )
     
     def get_columns(self):
         return [
@@ -1023,12 +1086,7 @@ class NoticeOfOrderReportGenerator(BaseReportGenerator):
         ]
     
     def fetch_data(self, date_from, date_to, extra_filters, user):
-        queryset = NoticeOfOrder.objects.select_related(
-            'inspection_form__inspection',
-            'sent_by'
-        ).prefetch_related(
-            'inspection_form__inspection__establishments'
-        )
+        queryset = NoticeOfOrder.objects.all()
         
         # Apply date filter on sent_date
         queryset = self.apply_date_filter(queryset, 'sent_date', date_from, date_to)
@@ -1063,42 +1121,33 @@ class NoticeOfOrderReportGenerator(BaseReportGenerator):
         return queryset.order_by('-sent_date')
     
     def format_rows(self, data):
-        rows = []
+        establishment_names = self.get_establishment_names(row['inspection_form__inspection_id'] for row in data)
+        today = datetime.now().date()
         for noo in data:
-            inspection = noo.inspection_form.inspection
-            establishment_names = ', '.join([est.name for est in inspection.establishments.all()])
-            
             # Determine status
-            if noo.payment_deadline:
-                if noo.payment_deadline < datetime.now().date():
+            payment_deadline = noo['payment_deadline']
+            if payment_deadline:
+                if payment_deadline < today:
                     status = 'Overdue'
-                elif noo.payment_deadline == datetime.now().date():
+                elif payment_deadline == today:
                     status = 'Due Today'
                 else:
                     status = 'Pending'
             else:
                 status = 'No Deadline'
             
-            rows.append({
-                'inspection_code': inspection.code,
-                'establishment_name': establishment_names,
-                'law': inspection.law,
-                'sent_date': noo.sent_date.strftime('%Y-%m-%d') if noo.sent_date else 'Not Sent',
-                'penalty_fees': f'₱{noo.penalty_fees:,.2f}' if noo.penalty_fees else '₱0.00',
-                'payment_deadline': noo.payment_deadline.strftime('%Y-%m-%d') if noo.payment_deadline else 'N/A',
-                'recipient_name': noo.recipient_name or 'N/A',
-                'sent_by': self._format_user(noo.sent_by),
+            penalty_fees = noo['penalty_fees']
+            yield {
+                'inspection_code': noo['inspection_form__inspection__code'],
+                'establishment_name': establishment_names.get(noo['inspection_form__inspection_id'], ''),
+                'law': noo['inspection_form__inspection__law'],
+                'sent_date': self._format_date(noo['sent_date'], default='Not Sent'),
+                'penalty_fees': f'₱{penalty_fees:,.2f}' if penalty_fees else '₱0.00',
+                'payment_deadline': self._format_date(payment_deadline),
+                'recipient_name': noo['recipient_name'] or 'N/A',
+                'sent_by': self._format_user(noo['sent_by__first_name'], noo['sent_by__last_name'], noo['sent_by__email']),
                 'status': status,
-            })
-        return rows
-    
-    def _format_user(self, user):
-        """Format user display name"""
-        if not user:
-            return 'N/A'
-        if user.first_name and user.last_name:
-            return f"{user.first_name} {user.last_name}"
-        return user.email
+            }
 
 
 # Report generator registry
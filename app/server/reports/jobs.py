@@ -0,0 +1,189 @@
+"""
+Report job queue: run the report ViewSets' PDF/Excel exports off the request path.
+
+A job replays the same export action the synchronous endpoint uses (so access
+control, filters and document layout stay identical) against a GET request
+built from the stored filter params and the requesting user. Because the
+request carries report_job_id, inspections.views.export_row_limit lifts the
+row caps for job runs.
+
+A job that stays pending or running longer than REPORT_JOB_CLAIM_TIMEOUT
+(worker crash, lost task) is marked failed when an identical request comes in,
+and a fresh job takes its place instead of the request waiting on it forever.
+"""
+import hashlib
+import json
+import logging
+import re
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.http import HttpRequest, QueryDict
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# report_type -> (ViewSet path, {format: action})
+REPORT_EXPORTS = {
+    'legal': ('inspections.views.LegalReportViewSet', {'pdf': 'export_pdf', 'excel': 'export_excel'}),
+    'division': ('inspections.views.DivisionReportViewSet', {'pdf': 'export_pdf', 'excel': 'export_excel'}),
+    'section': ('inspections.views.SectionReportViewSet', {'pdf': 'export_pdf', 'excel': 'export_excel'}),
+    'unit': ('inspections.views.UnitReportViewSet', {'pdf': 'export_pdf', 'excel': 'export_excel'}),
+    'monitoring': ('inspections.views.MonitoringReportViewSet', {'pdf': 'export_pdf', 'excel': 'export_excel'}),
+    'admin_establishments': (
+        'inspections.views.AdminReportViewSet',
+        {'pdf': 'export_establishments_pdf', 'excel': 'export_establishments_excel'},
+    ),
+    'admin_users': (
+        'inspections.views.AdminReportViewSet',
+        {'pdf': 'export_users_pdf', 'excel': 'export_users_excel'},
+    ),
+}
+
+_FILENAME_RE = re.compile(r'filename="?([^";]+)"?')
+
+
+def compute_filter_hash(user, report_type, export_format, params):
+    """Stable hash of who asked for what; access control is per user, so the user is part of it"""
+    payload = json.dumps(
+        {'user': user.pk, 'type': report_type, 'format': export_format, 'params': params},
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def is_stale(job, now=None):
+    """True when an in-flight job has gone past REPORT_JOB_CLAIM_TIMEOUT since it was queued or started"""
+    timeout = timedelta(seconds=getattr(settings, 'REPORT_JOB_CLAIM_TIMEOUT', 1800))
+    return (job.started_at or job.created_at) < (now or timezone.now()) - timeout
+
+
+def submit_report_job(user, report_type, export_format, params):
+    """Return (job, created); an identical pending/running job is reused unless it went stale"""
+    from .models import ReportJob
+
+    params = {key: str(value) for key, value in (params or {}).items() if value not in (None, '')}
+    filter_hash = compute_filter_hash(user, report_type, export_format, params)
+
+    with transaction.atomic():
+        existing = ReportJob.objects.select_for_update().filter(in_flight_hash=filter_hash).first()
+        if existing:
+            if not is_stale(existing):
+                return existing, False
+            logger.warning(f"Report job {existing.pk} stuck in {existing.status}; marking it failed and starting over")
+            ReportJob.objects.filter(pk=existing.pk).update(
+                status='failed',
+                error='Timed out waiting for the report worker',
+                finished_at=timezone.now(),
+                in_flight_hash=None,
+            )
+        try:
+            # The unique in_flight_hash settles concurrent submits that both found nothing above
+            with transaction.atomic():
+                job = ReportJob.objects.create(
+                    report_type=report_type,
+                    export_format=export_format,
+                    params=params,
+                    filter_hash=filter_hash,
+                    in_flight_hash=filter_hash,
+                    requested_by=user,
+                )
+        except IntegrityError:
+            return ReportJob.objects.get(in_flight_hash=filter_hash), False
+
+    transaction.on_commit(lambda: enqueue_report_job(job))
+    return job, True
+
+
+def enqueue_report_job(job):
+    """Hand the job to Celery; run it inline when REPORT_JOBS_EAGER is set or the broker is down"""
+    from .tasks import run_report_job
+
+    if getattr(settings, 'REPORT_JOBS_EAGER', False):
+        run_report_job(job.pk)
+        return
+    try:
+        result = run_report_job.apply_async(args=[job.pk], retry=False)
+        type(job).objects.filter(pk=job.pk).update(task_id=result.id or '')
+    except Exception as e:
+        logger.error(f"Could not queue report job {job.pk}, running inline: {str(e)}")
+        run_report_job(job.pk)
+
+
+def _build_request(job):
+    request = HttpRequest()
+    request.method = 'GET'
+    request.META['SERVER_NAME'] = 'localhost'
+    request.META['SERVER_PORT'] = '80'
+    query = QueryDict(mutable=True)
+    query.update(job.params)
+    request.GET = query
+    # DRF's Request picks this up and skips the normal authenticators
+    request._force_auth_user = job.requested_by
+    request.report_job_id = job.pk
+    return request
+
+
+def _set_progress(job, progress, **fields):
+    from .models import ReportJob
+    ReportJob.objects.filter(pk=job.pk).update(progress=progress, **fields)
+
+
+def execute_report_job(job_id):
+    """Execute a job and attach the generated document to it"""
+    from .models import ReportJob
+
+    job = ReportJob.objects.select_related('requested_by').get(pk=job_id)
+    if job.status not in ReportJob.IN_FLIGHT_STATUSES:
+        return job
+
+    _set_progress(job, 5, status='running', started_at=timezone.now())
+    try:
+        viewset_path, actions = REPORT_EXPORTS[job.report_type]
+        action = actions[job.export_format]
+        view = import_string(viewset_path).as_view({'get': action})
+
+        response = view(_build_request(job))
+        if hasattr(response, 'render'):
+            response.render()
+        if response.status_code != 200:
+            detail = getattr(response, 'data', None) or response.content[:500]
+            raise RuntimeError(f"Export returned HTTP {response.status_code}: {detail}")
+        _set_progress(job, 80)
+
+        match = _FILENAME_RE.search(response.get('Content-Disposition', ''))
+        file_name = match.group(1) if match else f"{job.report_type}_report_{job.pk}"
+
+        # Spool to disk so streaming exports never sit fully in memory
+        with tempfile.TemporaryFile() as tmp:
+            if response.streaming:
+                for chunk in response.streaming_content:
+                    tmp.write(chunk)
+            else:
+                tmp.write(response.content)
+            if hasattr(response, 'close'):
+                response.close()
+            tmp.seek(0)
+            job.result_file.save(file_name, File(tmp), save=False)
+
+        # Only while still ours: a job marked failed as stale stays failed
+        ReportJob.objects.filter(pk=job.pk, status='running').update(
+            status='completed',
+            progress=100,
+            in_flight_hash=None,
+            result_file=job.result_file.name,
+            file_name=file_name,
+            content_type=response.get('Content-Type', 'application/octet-stream'),
+            finished_at=timezone.now(),
+        )
+    except Exception as e:
+        logger.error(f"Report job {job.pk} failed: {str(e)}")
+        ReportJob.objects.filter(pk=job.pk).update(
+            status='failed', error=str(e), finished_at=timezone.now(), in_flight_hash=None
+        )
+    job.refresh_from_db()
+    return job
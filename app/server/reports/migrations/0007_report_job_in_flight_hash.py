@@ -0,0 +1,30 @@
+# Generated by Django 4.2.17 on 2026-10-17 01:44
+
+from django.db import migrations, models
+
+
+def claim_in_flight_jobs(apps, schema_editor):
+    # Newest pending/running job per filter hash keeps deduplicating identical requests
+    ReportJob = apps.get_model('reports', 'ReportJob')
+    claimed = set()
+    jobs = ReportJob.objects.filter(status__in=('pending', 'running')).order_by('-created_at', '-pk')
+    for pk, filter_hash in jobs.values_list('pk', 'filter_hash'):
+        if filter_hash not in claimed:
+            claimed.add(filter_hash)
+            ReportJob.objects.filter(pk=pk).update(in_flight_hash=filter_hash)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0006_report_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportjob',
+            name='in_flight_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True),
+        ),
+        migrations.RunPython(claim_in_flight_jobs, migrations.RunPython.noop),
+    ]
@@ -194,3 +194,54 @@ class ReportAccess(models.Model):
         super().save(*args, **kwargs)
 
 
+
+
+class ReportJob(models.Model):
+    """
+    Background PDF/Excel export (see reports/jobs.py and reports/tasks.py).
+    Identical in-flight requests share one job via filter_hash.
+    in_flight_hash carries the filter_hash only while the job is pending or
+    running; its unique index lets at most one in-flight job exist per hash.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    FORMAT_CHOICES = [
+        ('pdf', 'PDF'),
+        ('excel', 'Excel'),
+    ]
+
+    report_type = models.CharField(max_length=50, help_text="Export key from reports.jobs.REPORT_EXPORTS")
+    export_format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    params = models.JSONField(default=dict, blank=True, help_text="Filter query parameters")
+    filter_hash = models.CharField(max_length=64, db_index=True)
+    in_flight_hash = models.CharField(max_length=64, null=True, blank=True, unique=True, editable=False)
+    requested_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='report_jobs')
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    progress = models.PositiveSmallIntegerField(default=0, help_text="Percent complete")
+    result_file = models.FileField(upload_to='report_jobs/%Y/%m/', blank=True, null=True)
+    file_name = models.CharField(max_length=255, blank=True)
+    content_type = models.CharField(max_length=100, blank=True)
+    error = models.TextField(blank=True)
+    task_id = models.CharField(max_length=255, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    IN_FLIGHT_STATUSES = ('pending', 'running')
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['filter_hash', 'status']),
+            models.Index(fields=['requested_by', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.report_type} {self.export_format} ({self.status})"
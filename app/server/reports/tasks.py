@@ -0,0 +1,17 @@
+"""
+Celery tasks for reports app
+"""
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def run_report_job(job_id):
+    """Generate the document for a queued ReportJob (see reports/jobs.py)"""
+    from .jobs import execute_report_job
+
+    job = execute_report_job(job_id)
+    logger.info(f"Report job {job_id} finished with status {job.status}")
+    return job.status
@@ -8,4 +8,9 @@ urlpatterns = [
     path('access/', views.get_report_access, name='report-access'),
     path('generate/', views.generate_report, name='generate-report'),
     path('filter-options/', views.get_filter_options, name='filter-options'),
+
+    # Background PDF/Excel export jobs
+    path('jobs/', views.report_jobs, name='report-jobs'),
+    path('jobs/<int:job_id>/', views.report_job_detail, name='report-job-detail'),
+    path('jobs/<int:job_id>/download/', views.report_job_download, name='report-job-download'),
 ]
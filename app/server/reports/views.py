@@ -1,8 +1,12 @@
 from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 
+from core.db_router import replica_reads
+
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
@@ -94,6 +98,7 @@ def get_report_access(request):
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
+@replica_reads
 def generate_report(request):
     """
     Generate a report based on report type and filters
@@ -109,8 +114,14 @@ def generate_report(request):
         "extra_filters": {
             "inspector_id": 12,
             "law": "PD-1586"
-        }
+        },
+        "format": "json",           // optional: json (default), ndjson or csv
+        "page": 1,                  // optional, json only: return one page of rows
+        "page_size": 500            // optional, json only (max REPORT_MAX_PAGE_SIZE)
     }
+    
+    ndjson and csv are streamed row by row; ndjson starts with a
+    {"columns": [...], "metadata": {...}} line.
     """
     from .models import ReportAccess
     from .generators import get_generator
@@ -243,9 +254,40 @@ def generate_report(request):
                 'error': str(e)
             }, status=status.HTTP_400_BAD_REQUEST)
         
+        output_format = (request.data.get('format') or 'json').lower()
+        if output_format not in ('json', 'ndjson', 'csv'):
+            return Response({
+                'error': 'format must be one of json, ndjson, csv'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if output_format != 'json':
+            # Rows are read, formatted and sent in chunks; nothing is built up in memory
+            if output_format == 'csv':
+                response = StreamingHttpResponse(
+                    generator.iter_csv(filters, request.user), content_type='text/csv; charset=utf-8'
+                )
+            else:
+                response = StreamingHttpResponse(
+                    generator.iter_ndjson(filters, request.user), content_type='application/x-ndjson'
+                )
+            response['Content-Disposition'] = f'attachment; filename="{report_type}_report.{output_format}"'
+            return response
+        
+        # Optional server-side paging for the JSON report
+        page = page_size = None
+        if request.data.get('page') or request.data.get('page_size'):
+            try:
+                page = max(int(request.data.get('page') or 1), 1)
+                page_size = int(request.data.get('page_size') or settings.REPORT_DEFAULT_PAGE_SIZE)
+            except (TypeError, ValueError):
+                return Response({
+                    'error': 'page and page_size must be integers'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            page_size = min(max(page_size, 1), settings.REPORT_MAX_PAGE_SIZE)
+        
         # Generate the report
         try:
-            report_data = generator.generate(filters, request.user)
+            report_data = generator.generate(filters, request.user, page=page, page_size=page_size)
             return Response(report_data, status=status.HTTP_200_OK)
         except Exception as e:
             import traceback
@@ -435,3 +477,96 @@ def get_filter_options(request):
             'error': 'Failed to retrieve filter options',
             'detail': str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def _serialize_report_job(job):
+    return {
+        'id': job.id,
+        'report_type': job.report_type,
+        'format': job.export_format,
+        'params': job.params,
+        'status': job.status,
+        'progress': job.progress,
+        'file_name': job.file_name,
+        'error': job.error,
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'finished_at': job.finished_at,
+        'download_url': f"/api/reports/jobs/{job.id}/download/" if job.status == 'completed' else None,
+    }
+
+
+def _get_report_job(request, job_id):
+    from .models import ReportJob
+    jobs = ReportJob.objects.all()
+    if request.user.userlevel != 'Admin':
+        jobs = jobs.filter(requested_by=request.user)
+    return jobs.filter(pk=job_id).first()
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([permissions.IsAuthenticated])
+def report_jobs(request):
+    """
+    POST: queue a PDF/Excel export {report_type, format, params}; identical
+    in-flight requests return the existing job.
+    GET: the current user's recent jobs.
+    """
+    from .jobs import REPORT_EXPORTS, submit_report_job
+    from .models import ReportJob
+
+    if request.method == 'GET':
+        jobs = ReportJob.objects.filter(requested_by=request.user)[:20]
+        return Response([_serialize_report_job(job) for job in jobs])
+
+    report_type = request.data.get('report_type')
+    export_format = request.data.get('format')
+    params = request.data.get('params') or {}
+
+    if report_type not in REPORT_EXPORTS:
+        return Response(
+            {'error': f"Unknown report_type. Expected one of: {', '.join(REPORT_EXPORTS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if export_format not in REPORT_EXPORTS[report_type][1]:
+        return Response({'error': "format must be 'pdf' or 'excel'"}, status=status.HTTP_400_BAD_REQUEST)
+    if not isinstance(params, dict):
+        return Response({'error': 'params must be an object'}, status=status.HTTP_400_BAD_REQUEST)
+
+    job, created = submit_report_job(request.user, report_type, export_format, params)
+    return Response(
+        _serialize_report_job(job),
+        status=status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK
+    )
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def report_job_detail(request, job_id):
+    """Poll a report job's status and progress"""
+    job = _get_report_job(request, job_id)
+    if job is None:
+        return Response({'error': 'Report job not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(_serialize_report_job(job))
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def report_job_download(request, job_id):
+    """Stream the finished document of a report job"""
+    from django.http import FileResponse
+
+    job = _get_report_job(request, job_id)
+    if job is None:
+        return Response({'error': 'Report job not found'}, status=status.HTTP_404_NOT_FOUND)
+    if job.status != 'completed' or not job.result_file:
+        return Response(
+            {'error': f"Report job is {job.status}", 'status': job.status, 'progress': job.progress},
+            status=status.HTTP_409_CONFLICT
+        )
+    return FileResponse(
+        job.result_file.open('rb'),
+        as_attachment=True,
+        filename=job.file_name,
+        content_type=job.content_type or 'application/octet-stream'
+    )
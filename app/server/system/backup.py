@@ -0,0 +1,317 @@
+"""
+Streaming SQL backup/restore engines used by the system views and tasks.
+
+Backups read rows through an unbuffered (server-side) PyMySQL cursor and
+write extended multi-row INSERT statements, so memory stays flat regardless
+of table size. Output can go through gzip or zstd (``zstandard`` package).
+
+Restores tokenize the dump line by line from a plain, gzip or zstd stream
+and execute statements in batched transactions, in constant memory.
+"""
+import gzip
+import io
+import logging
+import os
+import re
+import time
+from datetime import datetime
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Compression name -> file name suffix
+BACKUP_EXTENSIONS = {
+    '': '.sql',
+    'gzip': '.sql.gz',
+    'zstd': '.sql.zst',
+}
+
+
+def get_backup_compression():
+    compression = (getattr(settings, 'BACKUP_COMPRESSION', '') or '').lower()
+    if compression not in BACKUP_EXTENSIONS:
+        logger.warning(f"Unknown BACKUP_COMPRESSION '{compression}', writing plain SQL")
+        return ''
+    return compression
+
+
+def backup_file_name(timestamp, compression=''):
+    """backup_YYYYMMDD_HHMMSS.sql[.gz|.zst]"""
+    return f"backup_{timestamp}{BACKUP_EXTENSIONS[compression]}"
+
+
+def is_backup_file(file_name):
+    return file_name.endswith(tuple(BACKUP_EXTENSIONS.values()))
+
+
+def strip_backup_extension(file_name):
+    for extension in sorted(BACKUP_EXTENSIONS.values(), key=len, reverse=True):
+        if file_name.endswith(extension):
+            return file_name[:-len(extension)]
+    return file_name
+
+
+def open_backup_writer(file_path, compression=''):
+    """Open a text stream for writing a dump, compressing if requested"""
+    if compression == 'gzip':
+        return gzip.open(file_path, 'wt', encoding='utf-8', compresslevel=6)
+    if compression == 'zstd':
+        import zstandard
+        raw = open(file_path, 'wb')
+        writer = zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(writer, encoding='utf-8')
+    return open(file_path, 'w', encoding='utf-8', buffering=1024 * 1024)
+
+
+def open_backup_reader(file_path):
+    """
+    Open a dump for reading as text, detecting gzip/zstd by magic bytes.
+    Returns (text_stream, raw_file); raw_file.tell() gives compressed progress.
+    """
+    raw = open(file_path, 'rb')
+    try:
+        magic = raw.read(4)
+        raw.seek(0)
+        if magic[:2] == b'\x1f\x8b':
+            binary = gzip.GzipFile(fileobj=raw, mode='rb')
+        elif magic == b'\x28\xb5\x2f\xfd':
+            import zstandard
+            binary = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw))
+        else:
+            binary = raw
+        return io.TextIOWrapper(binary, encoding='utf-8', errors='replace'), raw
+    except Exception:
+        raw.close()
+        raise
+
+
+class StreamingSQLBackup:
+    """
+    Dump a MySQL database table by table.
+
+    batch_rows caps the rows per INSERT; max_statement_bytes keeps each
+    statement below the server's max_allowed_packet. progress, if given, is
+    called as progress(table, rows, table_number, table_count) after each table.
+    """
+
+    def __init__(self, db_config, batch_rows=None, max_statement_bytes=None, progress=None):
+        self.db_config = db_config
+        self.batch_rows = batch_rows or getattr(settings, 'BACKUP_INSERT_BATCH_ROWS', 500)
+        self.max_statement_bytes = max_statement_bytes or getattr(
+            settings, 'BACKUP_MAX_STATEMENT_BYTES', 1024 * 1024
+        )
+        self.progress = progress
+
+    def connect(self):
+        import pymysql
+        return pymysql.connect(
+            host=self.db_config['host'] or 'localhost',
+            port=int(self.db_config['port'] or 3306),
+            user=self.db_config['user'],
+            password=self.db_config['password'],
+            database=self.db_config['name'],
+            charset='utf8mb4',
+        )
+
+    def dump(self, file_path, compression=''):
+        """Write the dump to file_path; returns {'tables': n, 'rows': n}"""
+        import pymysql
+
+        conn = self.connect()
+        total_rows = 0
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SHOW FULL TABLES WHERE Table_type = 'BASE TABLE'")
+                tables = [row[0] for row in cursor.fetchall()]
+
+            with open_backup_writer(file_path, compression) as out:
+                self._write_header(out)
+                for number, table in enumerate(tables, start=1):
+                    with conn.cursor() as cursor:
+                        cursor.execute(f"SHOW CREATE TABLE `{table}`")
+                        create_table_sql = cursor.fetchone()[1]
+                    out.write(f"--\n-- Table structure for table `{table}`\n--\n")
+                    out.write(f"DROP TABLE IF EXISTS `{table}`;\n")
+                    out.write(f"{create_table_sql};\n\n")
+
+                    out.write(f"--\n-- Dumping data for table `{table}`\n--\n")
+                    with conn.cursor(pymysql.cursors.SSCursor) as cursor:
+                        rows = self._write_table_data(conn, cursor, table, out)
+                    out.write("\n")
+                    total_rows += rows
+
+                    logger.info(f"Backup: {table} ({number}/{len(tables)}) - {rows} rows")
+                    if self.progress:
+                        self.progress(table, rows, number, len(tables))
+
+                out.write("SET FOREIGN_KEY_CHECKS=1;\n")
+                out.write("-- Dump completed\n")
+        finally:
+            conn.close()
+        return {'tables': len(tables), 'rows': total_rows}
+
+    def _write_header(self, out):
+        out.write("-- MySQL dump created by Python\n")
+        out.write(f"-- Database: {self.db_config['name']}\n")
+        out.write(f"-- Server: {self.db_config['host'] or 'localhost'}:{self.db_config['port'] or 3306}\n")
+        out.write(f"-- Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        out.write("SET NAMES utf8mb4;\n")
+        out.write("SET FOREIGN_KEY_CHECKS=0;\n\n")
+
+    def _write_table_data(self, conn, cursor, table, out):
+        cursor.execute(f"SELECT * FROM `{table}`")
+        columns = ', '.join(f"`{col[0]}`" for col in cursor.description)
+        prefix = f"INSERT INTO `{table}` ({columns}) VALUES\n"
+
+        rows = 0
+        batch = []
+        batch_bytes = 0
+        while True:
+            chunk = cursor.fetchmany(self.batch_rows)
+            if not chunk:
+                break
+            for row in chunk:
+                # conn.literal applies the driver's escaping for every column type
+                values = f"({','.join(conn.literal(value) for value in row)})"
+                if batch and (
+                    len(batch) >= self.batch_rows
+                    or batch_bytes + len(values) > self.max_statement_bytes
+                ):
+                    out.write(prefix + ',\n'.join(batch) + ';\n')
+                    batch = []
+                    batch_bytes = 0
+                batch.append(values)
+                batch_bytes += len(values) + 2
+                rows += 1
+        if batch:
+            out.write(prefix + ',\n'.join(batch) + ';\n')
+        return rows
+
+
+# Per-state scanners for the statement tokenizer
+_NORMAL_TOKENS = re.compile(r"['\"`;#]|--(?=\s)|/\*")
+_STATE_END = {
+    "'": re.compile(r"\\.|'", re.S),
+    '"': re.compile(r'\\.|"', re.S),
+    '`': re.compile(r'`'),
+    '/*': re.compile(r'\*/'),
+}
+
+
+def iter_sql_statements(stream):
+    """
+    Yield complete SQL statements from a text stream without loading it whole.
+
+    Quotes, backtick identifiers and block comments (including MySQL
+    /*!...*/ conditional comments, which are kept) may span lines; ``--`` and
+    ``#`` line comments are dropped.
+    """
+    parts = []
+    state = None  # None, a quote character, or '/*'
+    for line in stream:
+        pos = 0
+        length = len(line)
+        while pos < length:
+            if state is None:
+                match = _NORMAL_TOKENS.search(line, pos)
+                if match is None:
+                    parts.append(line[pos:])
+                    break
+                token = match.group()
+                if token == ';':
+                    parts.append(line[pos:match.start()])
+                    statement = ''.join(parts).strip()
+                    parts = []
+                    if statement:
+                        yield statement
+                    pos = match.end()
+                elif token in ('--', '#'):
+                    parts.append(line[pos:match.start()])
+                    parts.append('\n')
+                    break
+                else:
+                    parts.append(line[pos:match.end()])
+                    state = token
+                    pos = match.end()
+            else:
+                scanner = _STATE_END[state]
+                while True:
+                    match = scanner.search(line, pos)
+                    if match is None or len(match.group()) == 1 or state == '/*':
+                        break
+                    # Backslash escape inside a string; keep scanning
+                    parts.append(line[pos:match.end()])
+                    pos = match.end()
+                if match is None:
+                    parts.append(line[pos:])
+                    break
+                parts.append(line[pos:match.end()])
+                state = None
+                pos = match.end()
+
+    statement = ''.join(parts).strip()
+    if statement:
+        yield statement
+
+
+class StreamingSQLRestore:
+    """
+    Execute a dump statement by statement on a dedicated PyMySQL connection.
+
+    Statements are committed every commit_every statements. Failing statements
+    are logged and skipped, as before. progress, if given, is called as
+    progress(bytes_read, total_bytes, executed, failed) at most every
+    progress_interval seconds and once at the end.
+    """
+
+    def __init__(self, db_config, commit_every=None, progress=None, progress_interval=2.0):
+        self.db_config = db_config
+        self.commit_every = commit_every or getattr(settings, 'RESTORE_COMMIT_EVERY', 200)
+        self.progress = progress
+        self.progress_interval = progress_interval
+
+    def connect(self):
+        import pymysql
+        return pymysql.connect(
+            host=self.db_config['host'] or 'localhost',
+            port=int(self.db_config['port'] or 3306),
+            user=self.db_config['user'],
+            password=self.db_config['password'],
+            database=self.db_config['name'],
+            charset='utf8mb4',
+            autocommit=False,
+        )
+
+    def restore(self, file_path):
+        """Restore file_path; returns {'executed': n, 'failed': n}"""
+        total_bytes = os.path.getsize(file_path)
+        executed = failed = pending = 0
+        last_report = time.monotonic()
+
+        conn = self.connect()
+        stream, raw = open_backup_reader(file_path)
+        try:
+            with conn.cursor() as cursor:
+                for statement in iter_sql_statements(stream):
+                    try:
+                        cursor.execute(statement)
+                        executed += 1
+                    except Exception as e:
+                        failed += 1
+                        logger.warning(f"Failed to execute statement: {statement[:100]}... Error: {str(e)}")
+                    pending += 1
+                    if pending >= self.commit_every:
+                        conn.commit()
+                        pending = 0
+                    if self.progress and time.monotonic() - last_report >= self.progress_interval:
+                        last_report = time.monotonic()
+                        self.progress(raw.tell(), total_bytes, executed, failed)
+            conn.commit()
+        finally:
+            stream.close()
+            conn.close()
+
+        if self.progress:
+            self.progress(total_bytes, total_bytes, executed, failed)
+        return {'executed': executed, 'failed': failed}
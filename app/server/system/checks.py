@@ -0,0 +1,22 @@
+"""
+System checks for deployment configuration.
+
+These run with manage.py commands (runserver, migrate, check) rather than at
+settings import, so gunicorn workers and Celery processes don't repeat them.
+"""
+from django.conf import settings
+from django.core.checks import Warning, register
+
+
+@register()
+def check_email_credentials(app_configs, **kwargs):
+    if getattr(settings, 'EMAIL_HOST_USER', '') and getattr(settings, 'EMAIL_HOST_PASSWORD', ''):
+        return []
+    return [
+        Warning(
+            'Email credentials are not set; emails are printed to the console instead of sent.',
+            hint='Set EMAIL_HOST_USER (Gmail address), EMAIL_HOST_PASSWORD (Gmail app password) '
+                 'and DEFAULT_FROM_EMAIL.',
+            id='system.W001',
+        )
+    ]
@@ -0,0 +1,79 @@
+"""
+Management command to measure worker boot cost: import time and RSS per app
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Boot the project in fresh interpreters (settings, django.setup(), each app, URLconf) '
+        'and report import time and resident memory per stage. An app is charged for '
+        'whatever its modules import first, including other apps.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Number of fresh interpreters to boot; times are the median (default: 3)',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the per-stage results as JSON',
+        )
+        parser.add_argument(
+            '--max-ms',
+            type=float,
+            default=None,
+            help='Exit with an error if the median total boot time exceeds this many milliseconds',
+        )
+
+    def _run_probe(self):
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+        result = subprocess.run(
+            [sys.executable, '-X', 'utf8', '-m', 'system.startup_probe'],
+            cwd=str(settings.BASE_DIR), env=env, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Startup probe failed:\n{result.stderr.strip()}")
+        return [json.loads(line) for line in result.stdout.splitlines() if line.startswith('{')]
+
+    def handle(self, *args, **options):
+        repeat = max(options['repeat'], 1)
+        runs = [self._run_probe() for _ in range(repeat)]
+
+        stages = []
+        for index, stage in enumerate(runs[-1]):
+            stages.append({
+                **stage,
+                'ms': round(statistics.median(run[index]['ms'] for run in runs), 1),
+            })
+        total_ms = round(sum(stage['ms'] for stage in stages), 1)
+        final_rss = stages[-1]['rss']
+
+        if options['json']:
+            self.stdout.write(json.dumps({'runs': repeat, 'total_ms': total_ms, 'rss': final_rss, 'stages': stages}, indent=2))
+        else:
+            self.stdout.write(f"Boot profile (median of {repeat} fresh interpreters)")
+            self.stdout.write(f"{'stage':<24}{'ms':>10}{'+RSS MB':>10}{'RSS MB':>10}  heavy modules loaded")
+            for stage in stages:
+                self.stdout.write(
+                    f"{stage['stage']:<24}{stage['ms']:>10.1f}{stage['rss_delta'] / 1048576:>10.1f}"
+                    f"{stage['rss'] / 1048576:>10.1f}  {', '.join(stage['heavy'])}"
+                )
+            self.stdout.write(
+                self.style.SUCCESS(f"Total: {total_ms:.1f} ms, {final_rss / 1048576:.1f} MB resident")
+            )
+
+        if options['max_ms'] is not None and total_ms > options['max_ms']:
+            raise CommandError(f"Boot took {total_ms:.1f} ms, over the {options['max_ms']:.1f} ms budget")
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.17 on 2026-10-17 00:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('system', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RestoreProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64, unique=True)),
+                ('file_name', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='running', max_length=10)),
+                ('bytes_read', models.BigIntegerField(default=0)),
+                ('total_bytes', models.BigIntegerField(default=0)),
+                ('statements_executed', models.PositiveIntegerField(default=0)),
+                ('statements_failed', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('backup_record', models.ForeignKey(blank=True, db_constraint=False, help_text='Backup being restored, if it has a record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='restore_progress', to='system.backuprecord')),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+    ]
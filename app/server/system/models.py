@@ -1,6 +1,10 @@
+import logging
+
 from django.db import models
 from django.utils import timezone
 
+logger = logging.getLogger(__name__)
+
 class BackupRecord(models.Model):
     """Model to track database backup records"""
     
@@ -21,4 +25,53 @@ class BackupRecord(models.Model):
         verbose_name_plural = "Backup Records"
     
     def __str__(self):
-        return f"{self.fileName} ({self.location})"
\ No newline at end of file
+        return f"{self.fileName} ({self.location})"
+
+
+class RestoreProgress(models.Model):
+    """
+    Progress of a running restore, polled by the UI via restore/status/<token>/.
+    The dump being restored recreates this table, so rows are keyed by a
+    client-visible token and rewritten with update_or_create on every report.
+    """
+
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    token = models.CharField(max_length=64, unique=True)
+    backup_record = models.ForeignKey(
+        BackupRecord, on_delete=models.SET_NULL, null=True, blank=True, db_constraint=False,
+        related_name='restore_progress', help_text="Backup being restored, if it has a record"
+    )
+    file_name = models.CharField(max_length=255)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='running')
+    bytes_read = models.BigIntegerField(default=0)
+    total_bytes = models.BigIntegerField(default=0)
+    statements_executed = models.PositiveIntegerField(default=0)
+    statements_failed = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    started_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"Restore {self.token} ({self.status})"
+
+    @property
+    def percent(self):
+        if not self.total_bytes:
+            return 0
+        return min(100, round(self.bytes_read * 100 / self.total_bytes, 1))
+
+    @classmethod
+    def report(cls, token, **fields):
+        """Upsert progress; failures (e.g. the table is mid-restore) are logged and ignored"""
+        try:
+            cls.objects.update_or_create(token=token, defaults=fields)
+        except Exception as e:
+            logger.warning(f"Could not record restore progress: {str(e)}")
@@ -0,0 +1,98 @@
+"""
+Boot-time probe run in a fresh interpreter by `manage.py bench_startup`.
+
+Loads the project the way a gunicorn worker does (settings, django.setup(),
+each local app's modules, then the URLconf) and prints one JSON object per
+stage with the wall time and resident memory it added, plus which heavy
+optional libraries had been imported by then. Nothing Django-related is
+imported before the first measurement.
+
+    python -m system.startup_probe
+"""
+import importlib
+import json
+import os
+import sys
+import time
+
+HEAVY_MODULES = ('reportlab', 'openpyxl', 'shapely', 'Levenshtein')
+APP_MODULES = ('models', 'signals', 'serializers', 'views', 'urls', 'admin', 'tasks')
+
+
+def rss_bytes():
+    """Current resident set size (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _module_exists(name):
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class Probe:
+    def __init__(self):
+        self.last_time = time.perf_counter()
+        self.last_rss = rss_bytes()
+        self.seen_heavy = set()
+
+    def record(self, stage, modules=()):
+        now = time.perf_counter()
+        rss = rss_bytes()
+        heavy = sorted(name for name in HEAVY_MODULES if name in sys.modules and name not in self.seen_heavy)
+        self.seen_heavy.update(heavy)
+        print(json.dumps({
+            'stage': stage,
+            'ms': round((now - self.last_time) * 1000, 1),
+            'rss': rss,
+            'rss_delta': rss - self.last_rss,
+            'modules': list(modules),
+            'heavy': heavy,
+        }), flush=True)
+        # Exclude the bookkeeping above from the next stage
+        self.last_time = time.perf_counter()
+        self.last_rss = rss
+
+
+def main():
+    probe = Probe()
+    probe.record('interpreter')
+
+    from django.conf import settings
+    settings.INSTALLED_APPS  # noqa: B018 - forces the settings module to load
+    probe.record('settings')
+
+    import django
+    django.setup()
+    probe.record('django.setup')
+
+    from django.apps import apps
+    base_dir = str(settings.BASE_DIR)
+    for app_config in apps.get_app_configs():
+        if not str(app_config.path).startswith(base_dir):
+            continue
+        loaded = []
+        for module in APP_MODULES:
+            name = f"{app_config.name}.{module}"
+            if name in sys.modules or _module_exists(name):
+                importlib.import_module(name)
+                loaded.append(module)
+        probe.record(app_config.name, loaded)
+
+    importlib.import_module(settings.ROOT_URLCONF)
+    probe.record(settings.ROOT_URLCONF)
+
+    from django.urls import get_resolver
+    get_resolver().url_patterns  # noqa: B018 - resolves every include()
+    probe.record('url resolver')
+
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,7 @@ import os
 import subprocess
 import logging
 from system.models import BackupRecord
+from system.backup import backup_file_name, get_backup_compression
 from system.views import get_db_config, get_mysqldump_path, create_sql_backup_python, BACKUP_DIR
 
 logger = logging.getLogger(__name__)
@@ -80,8 +81,11 @@ def create_scheduled_backup():
                     logger.error(f"Scheduled backup error: {str(e)}")
                     return {"success": False, "error": str(e)}
             else:
-                # Fallback to Python-based SQL backup
-                success, message = create_sql_backup_python(db_config, file_path)
+                # Fallback to Python-based SQL backup (optionally compressed)
+                compression = get_backup_compression()
+                file_name = backup_file_name(timestamp, compression)
+                file_path = os.path.join(backup_path, file_name)
+                success, message = create_sql_backup_python(db_config, file_path, compression)
                 if not success:
                     if os.path.exists(file_path):
                         os.remove(file_path)
@@ -1,3 +1,165 @@
-from django.test import TestCase
+import gzip
+import io
+import os
+import tempfile
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase
+from pymysql.converters import escape_item
+
+from .backup import (
+    StreamingSQLBackup, backup_file_name, is_backup_file, iter_sql_statements,
+    open_backup_reader, open_backup_writer
+)
+from .models import BackupRecord, RestoreProgress
+
+
+class _Connection:
+    def literal(self, value):
+        return escape_item(value, 'utf8mb4')
+
+
+class _Cursor:
+    description = [('id',), ('name',)]
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+
+    def execute(self, sql):
+        pass
+
+    def fetchmany(self, size):
+        chunk, self.rows = self.rows[:size], self.rows[size:]
+        return chunk
+
+
+class StreamingSQLBackupTest(SimpleTestCase):
+    def test_extended_inserts_are_batched_and_escaped(self):
+        rows = [(i, f"O'Brien {i}") for i in range(5)] + [(5, None)]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, backup_file_name('20240101_000000', 'gzip'))
+            engine = StreamingSQLBackup({}, batch_rows=2)
+            with open_backup_writer(path, 'gzip') as out:
+                written = engine._write_table_data(_Connection(), _Cursor(rows), 'users_user', out)
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                dump = f.read()
+
+        self.assertEqual(written, 6)
+        self.assertEqual(dump.count('INSERT INTO `users_user` (`id`, `name`) VALUES'), 3)
+        self.assertIn("(1,'O\\'Brien 1')", dump)
+        self.assertIn('(5,NULL);', dump)
+
+    def test_statement_size_limit_splits_batches(self):
+        rows = [(i, 'x' * 100) for i in range(4)]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'backup.sql')
+            engine = StreamingSQLBackup({}, batch_rows=100, max_statement_bytes=250)
+            with open_backup_writer(path) as out:
+                engine._write_table_data(_Connection(), _Cursor(rows), 't', out)
+            with open(path, encoding='utf-8') as f:
+                self.assertEqual(f.read().count('INSERT INTO'), 2)
+
+    def test_backup_file_names(self):
+        self.assertTrue(is_backup_file('backup_20240101_000000.sql.gz'))
+        self.assertTrue(is_backup_file(backup_file_name('20240101_000000')))
+        self.assertFalse(is_backup_file('notes.txt'))
+
+
+class StreamingSQLRestoreTest(SimpleTestCase):
+    DUMP = (
+        "-- MySQL dump created by Python\n"
+        "SET NAMES utf8mb4;\n"
+        "/*!40101 SET @OLD_SQL_MODE=@@SQL_MODE */;\n"
+        "INSERT INTO `t` VALUES (1,'a;b'),(2,'it\\'s; \\\\'),(3,'two\nlines;'),(4,'O''Brien;');\n"
+        "# trailing comment\n"
+        "DROP TABLE IF EXISTS `odd;name`; SELECT 1\n"
+    )
+
+    def test_statements_split_outside_quotes_and_comments(self):
+        statements = list(iter_sql_statements(io.StringIO(self.DUMP)))
+        self.assertEqual(len(statements), 5)
+        self.assertEqual(statements[0], 'SET NAMES utf8mb4')
+        self.assertTrue(statements[1].startswith('/*!40101'))
+        self.assertIn("'two\nlines;'", statements[2])
+        self.assertTrue(statements[2].endswith("(4,'O''Brien;')"))
+        self.assertEqual(statements[3], 'DROP TABLE IF EXISTS `odd;name`')
+        self.assertEqual(statements[4], 'SELECT 1')
+
+    def test_reader_detects_gzip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'upload.sql')
+            with gzip.open(path, 'wt', encoding='utf-8') as f:
+                f.write(self.DUMP)
+            stream, raw = open_backup_reader(path)
+            with stream:
+                self.assertEqual(len(list(iter_sql_statements(stream))), 5)
+
+
+class RestoreStatusTest(TestCase):
+    def test_status_reports_progress(self):
+        record = BackupRecord.objects.create(fileName='backup_20240101_000000.sql', location='/tmp')
+        RestoreProgress.report(
+            'abc123', backup_record_id=record.id, file_name=record.fileName,
+            bytes_read=50, total_bytes=200, statements_executed=10
+        )
+        data = self.client.get('/api/db/restore/status/abc123/').json()
+        self.assertEqual(data['status'], 'running')
+        self.assertEqual(data['percent'], 25.0)
+        self.assertEqual(data['backupRecordId'], record.id)
+        self.assertEqual(self.client.get('/api/db/restore/status/missing/').status_code, 404)
+
+
+class BackupDownloadTest(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.content = b''.join(f"INSERT INTO t VALUES ({i});\n".encode() for i in range(5000))
+        with open(os.path.join(self.tmp.name, 'backup_20240101_000000.sql'), 'wb') as f:
+            f.write(self.content)
+        BackupRecord.objects.create(fileName='backup_20240101_000000.sql', location=self.tmp.name)
+        self.url = '/api/db/download/backup_20240101_000000.sql/'
+
+    def test_full_download_is_streamed_with_length_and_etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Length'], str(len(self.content)))
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+
+        revalidated = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_range_requests(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(self.content)}')
+        self.assertEqual(b''.join(response.streaming_content), self.content[100:200])
+
+        suffix = self.client.get(self.url, HTTP_RANGE='bytes=-10')
+        self.assertEqual(b''.join(suffix.streaming_content), self.content[-10:])
+
+        unsatisfiable = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.content)}-')
+        self.assertEqual(unsatisfiable.status_code, 416)
+
+        stale = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(stale.status_code, 200)
+
+
+class StartupCostTest(SimpleTestCase):
+    def test_boot_does_not_load_heavy_modules(self):
+        import json
+        from django.core.management import call_command
+
+        out = io.StringIO()
+        call_command('bench_startup', '--repeat', '1', '--json', stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['stages'][-1]['stage'], 'url resolver')
+        loaded = [name for stage in report['stages'] for name in stage['heavy']]
+        self.assertEqual(loaded, [])
+
+    def test_missing_email_credentials_is_a_check_warning(self):
+        from .checks import check_email_credentials
+
+        with self.settings(EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD=''):
+            self.assertEqual([message.id for message in check_email_credentials(None)], ['system.W001'])
+        with self.settings(EMAIL_HOST_USER='ops@example.com', EMAIL_HOST_PASSWORD='secret'):
+            self.assertEqual(check_email_credentials(None), [])
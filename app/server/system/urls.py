@@ -4,7 +4,9 @@ from . import views
 urlpatterns = [
     path("backup/", views.backup_database, name="backup"),
     path("restore/", views.restore_database, name="restore"),
+    path("restore/status/<str:token>/", views.restore_status, name="restore_status"),
     path("backups/", views.list_backups, name="list_backups"),
     path("delete/<str:file_name>/", views.delete_backup, name="delete_backup"),
     path("download/<str:file_name>/", views.download_backup, name="download_backup"),
+    path("perf/", views.performance_report, name="performance_report"),
 ]
\ No newline at end of file
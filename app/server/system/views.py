@@ -1,22 +1,32 @@
 import os
+import re
 import subprocess
 import json
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, FileResponse, StreamingHttpResponse
 from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.timezone import now
 from datetime import datetime, timedelta
 import logging
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 import traceback
-from .models import BackupRecord
+import uuid
+from .models import BackupRecord, RestoreProgress
+from .backup import (
+    StreamingSQLBackup, StreamingSQLRestore, backup_file_name, get_backup_compression,
+    is_backup_file, strip_backup_extension
+)
 from audit.constants import AUDIT_ACTIONS, AUDIT_MODULES
 from audit.utils import log_activity
+from core.db_router import replica_status
+from core.middleware import perf_stats
 
 logger = logging.getLogger(__name__)
 
 # Directory where backups are stored
 BACKUP_DIR = os.path.join(settings.BASE_DIR, "backups")
-os.makedirs(BACKUP_DIR, exist_ok=True)
 
 def get_db_config():
     """Get database configuration with fallbacks"""
@@ -34,6 +44,81 @@ def get_db_config():
     
     return config
 
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _iter_file_range(f, start, length):
+    """Yield `length` bytes of f from `start` in DOWNLOAD_CHUNK_SIZE chunks, then close it"""
+    try:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(DOWNLOAD_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
+
+
+def ranged_file_response(request, file_path, file_name, content_type="application/octet-stream"):
+    """
+    Serve a file without reading it into memory.
+
+    Sends Content-Length and an ETag (size + mtime) up front, answers
+    If-None-Match with 304, and honours a single "bytes=" Range (guarded by
+    If-Range) with 206 so interrupted downloads can resume.
+    """
+    stat = os.stat(file_path)
+    size = stat.st_size
+    etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+
+    if request.headers.get("If-None-Match") == etag:
+        response = HttpResponse(status=304)
+        response["ETag"] = etag
+        return response
+
+    range_header = request.headers.get("Range", "")
+    if_range = request.headers.get("If-Range")
+    match = _RANGE_RE.match(range_header.strip()) if range_header else None
+    if match and (not if_range or if_range == etag):
+        first, last = match.groups()
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        elif last:
+            # Suffix range: the final N bytes
+            start = max(size - int(last), 0)
+            end = size - 1
+        else:
+            start, end = 0, -1
+
+        if start >= size or end < start:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            _iter_file_range(open(file_path, "rb"), start, length),
+            status=206,
+            content_type=content_type,
+        )
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = str(length)
+    else:
+        response = FileResponse(
+            open(file_path, "rb"), as_attachment=True, filename=file_name, content_type=content_type
+        )
+        response.block_size = DOWNLOAD_CHUNK_SIZE
+
+    response["Content-Disposition"] = f'attachment; filename="{file_name}"'
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    return response
+
 def is_mysql_available():
     """Check if MySQL utilities are available"""
     try:
@@ -171,164 +256,57 @@ def run_django_dumpdata_safe():
     except Exception as e:
         return False, str(e)
 
-def create_sql_backup_python(db_config, file_path):
-    """Create SQL backup using pure Python without mysqldump"""
+def create_sql_backup_python(db_config, file_path, compression=''):
+    """Create SQL backup using pure Python without mysqldump (streaming engine)"""
     try:
-        import pymysql
-        
         logger.info("Creating SQL backup using Python...")
+        stats = StreamingSQLBackup(db_config).dump(file_path, compression)
+        return True, f"SQL backup created successfully ({stats['tables']} tables, {stats['rows']} rows)"
         
-        # Get database connection parameters
-        host = db_config['host'] or 'localhost'
-        port = int(db_config['port'] or 3306)
-        user = db_config['user']
-        password = db_config['password']
-        database = db_config['name']
-        
-        # Connect to database
-        conn = pymysql.connect(
-            host=host,
-            port=port,
-            user=user,
-            password=password,
-            database=database,
-            charset='utf8mb4'
-        )
-        
-        with conn.cursor() as cursor, open(file_path, 'w', encoding='utf-8') as f:
-            # Write header
-            f.write("-- MySQL dump created by Python\n")
-            f.write(f"-- Database: {database}\n")
-            f.write(f"-- Server: {host}:{port}\n")
-            f.write(f"-- Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write("SET FOREIGN_KEY_CHECKS=0;\n\n")
-            
-            # Get all tables
-            cursor.execute("SHOW TABLES")
-            tables = [row[0] for row in cursor.fetchall()]
-            
-            for table in tables:
-                f.write(f"--\n-- Table structure for table `{table}`\n--\n")
-                f.write(f"DROP TABLE IF EXISTS `{table}`;\n")
-                
-                # Get table creation script
-                cursor.execute(f"SHOW CREATE TABLE `{table}`")
-                create_table_sql = cursor.fetchone()[1]
-                f.write(f"{create_table_sql};\n\n")
-                
-                # Get table data
-                f.write(f"--\n-- Dumping data for table `{table}`\n--\n")
-                cursor.execute(f"SELECT * FROM `{table}`")
-                rows = cursor.fetchall()
-                
-                if rows:
-                    # Get column names
-                    cursor.execute(f"DESCRIBE `{table}`")
-                    columns = [col[0] for col in cursor.fetchall()]
-                    
-                    for row in rows:
-                        values = []
-                        for value in row:
-                            if value is None:
-                                values.append("NULL")
-                            elif isinstance(value, (int, float)):
-                                values.append(str(value))
-                            else:
-                                # Escape special characters
-                                escaped_value = str(value).replace("'", "''").replace("\\", "\\\\")
-                                values.append(f"'{escaped_value}'")
-                        
-                        insert_sql = f"INSERT INTO `{table}` ({', '.join([f'`{col}`' for col in columns])}) VALUES ({', '.join(values)});\n"
-                        f.write(insert_sql)
-                
-                f.write("\n")
-            
-            f.write("SET FOREIGN_KEY_CHECKS=1;\n")
-            f.write("-- Dump completed\n")
-        
-        conn.close()
-        return True, "SQL backup created successfully"
-        
-    except ImportError:
+    except ImportError as e:
+        if 'zstandard' in str(e):
+            return False, "zstandard not installed. Run: pip install zstandard"
         return False, "PyMySQL not installed. Run: pip install pymysql"
     except Exception as e:
         return False, f"Python SQL backup failed: {str(e)}"
 
-def restore_sql_backup_python(db_config, file_path):
-    """Restore SQL backup using pure Python without mysql client"""
+def restore_sql_backup_python(db_config, file_path, progress_token=None, backup_record=None):
+    """Restore SQL backup using pure Python without mysql client (streaming, batched commits)"""
+    file_name = os.path.basename(file_path)
+    started_at = now()
+
+    def report(**fields):
+        if progress_token:
+            RestoreProgress.report(
+                progress_token,
+                backup_record_id=getattr(backup_record, 'id', None),
+                file_name=file_name,
+                started_at=started_at,
+                **fields
+            )
+
+    def on_progress(bytes_read, total_bytes, executed, failed):
+        report(
+            bytes_read=bytes_read,
+            total_bytes=total_bytes,
+            statements_executed=executed,
+            statements_failed=failed,
+        )
+
     try:
-        import pymysql
-        
         logger.info("Restoring SQL backup using Python...")
+        report(status='running', total_bytes=os.path.getsize(file_path))
+        stats = StreamingSQLRestore(db_config, progress=on_progress).restore(file_path)
+        report(status='completed')
+        return True, f"SQL restore completed successfully ({stats['executed']} statements, {stats['failed']} failed)"
         
-        # Get database connection parameters
-        host = db_config['host'] or 'localhost'
-        port = int(db_config['port'] or 3306)
-        user = db_config['user']
-        password = db_config['password']
-        database = db_config['name']
-        
-        # Connect to database
-        conn = pymysql.connect(
-            host=host,
-            port=port,
-            user=user,
-            password=password,
-            database=database,
-            charset='utf8mb4'
-        )
-        
-        with conn.cursor() as cursor, open(file_path, 'r', encoding='utf-8') as f:
-            sql_script = f.read()
-            
-            # Split by semicolons but be careful about semicolons in strings
-            statements = []
-            current_statement = ""
-            in_string = False
-            string_char = None
-            escaped = False
-            
-            for char in sql_script:
-                if escaped:
-                    current_statement += char
-                    escaped = False
-                elif char == '\\':
-                    current_statement += char
-                    escaped = True
-                elif char in ('"', "'") and not in_string:
-                    in_string = True
-                    string_char = char
-                    current_statement += char
-                elif char == string_char and in_string:
-                    in_string = False
-                    string_char = None
-                    current_statement += char
-                elif char == ';' and not in_string:
-                    statements.append(current_statement.strip())
-                    current_statement = ""
-                else:
-                    current_statement += char
-            
-            # Add the last statement if any
-            if current_statement.strip():
-                statements.append(current_statement.strip())
-            
-            # Execute each statement
-            for statement in statements:
-                if statement and not statement.startswith('--') and not statement.startswith('/*'):
-                    try:
-                        cursor.execute(statement)
-                    except Exception as e:
-                        logger.warning(f"Failed to execute statement: {statement[:100]}... Error: {str(e)}")
-                        # Continue with next statement
-        
-        conn.commit()
-        conn.close()
-        return True, "SQL restore completed successfully"
-        
-    except ImportError:
-        return False, "PyMySQL not installed. Run: pip install pymysql"
+    except ImportError as e:
+        message = "zstandard not installed. Run: pip install zstandard" if 'zstandard' in str(e) \
+            else "PyMySQL not installed. Run: pip install pymysql"
+        report(status='failed', error=message)
+        return False, message
     except Exception as e:
+        report(status='failed', error=str(e))
         return False, f"Python SQL restore failed: {str(e)}"
 
 @csrf_exempt
@@ -473,8 +451,11 @@ def backup_database(request):
                     )
                     return JsonResponse({"error": f"MySQL backup error: {str(e)}"}, status=500)
             else:
-                # Fallback to Python-based SQL backup
-                success, message = create_sql_backup_python(db_config, file_path)
+                # Fallback to Python-based SQL backup (optionally compressed)
+                compression = get_backup_compression()
+                file_name = backup_file_name(timestamp, compression)
+                file_path = os.path.join(custom_path, file_name)
+                success, message = create_sql_backup_python(db_config, file_path, compression)
                 if not success:
                     if os.path.exists(file_path):
                         os.remove(file_path)
@@ -585,6 +566,7 @@ def restore_database(request):
         file = request.FILES.get("file")
         file_name = None
         backup_record_id = None
+        progress_token = None
         
         # Extract file name or backup record ID from JSON body
         if request.content_type == 'application/json':
@@ -592,20 +574,26 @@ def restore_database(request):
                 body = json.loads(request.body.decode("utf-8"))
                 file_name = body.get("fileName")
                 backup_record_id = body.get("backupRecordId")
+                progress_token = body.get("progressToken")
             except json.JSONDecodeError:
                 pass
         else:
             file_name = request.POST.get("fileName")
             backup_record_id = request.POST.get("backupRecordId")
+            progress_token = request.POST.get("progressToken")
+        
+        # Clients may pass their own token so they can poll restore/status/<token>/ meanwhile
+        progress_token = str(progress_token or uuid.uuid4().hex)[:64]
         
         file_path = None
         original_backup_record = None  # Track original backup record for restore log
 
         if file:
             # Handle uploaded file
-            if not file.name.endswith('.sql'):
-                return JsonResponse({"error": "Only .sql files are supported"}, status=400)
+            if not is_backup_file(file.name):
+                return JsonResponse({"error": "Only .sql, .sql.gz or .sql.zst files are supported"}, status=400)
                 
+            os.makedirs(BACKUP_DIR, exist_ok=True)
             file_path = os.path.join(BACKUP_DIR, file.name)
             with open(file_path, "wb+") as dest:
                 for chunk in file.chunks():
@@ -679,7 +667,7 @@ def restore_database(request):
             )
             return JsonResponse({"error": "Backup file not found"}, status=404)
 
-        if not file_path.endswith(".sql"):
+        if not is_backup_file(file_path):
             log_activity(
                 audit_user,
                 AUDIT_ACTIONS["RESTORE"],
@@ -692,7 +680,7 @@ def restore_database(request):
                 },
                 request=request,
             )
-            return JsonResponse({"error": "Only .sql files are supported"}, status=400)
+            return JsonResponse({"error": "Only .sql, .sql.gz or .sql.zst files are supported"}, status=400)
 
         db_config = get_db_config()
         db_engine = db_config['engine']
@@ -700,7 +688,8 @@ def restore_database(request):
         if 'mysql' in db_engine:
             # Try using mysql client first if available
             mysql_path = get_mysql_path()
-            if mysql_path:
+            # The mysql client can only read plain dumps; compressed ones use the Python engine
+            if mysql_path and file_path.endswith('.sql'):
                 # MySQL restore for Windows
                 cmd = [mysql_path]
                 
@@ -760,7 +749,9 @@ def restore_database(request):
                     return JsonResponse({"error": "Restore timed out after 5 minutes"}, status=500)
             else:
                 # Fallback to Python-based SQL restore
-                success, message = restore_sql_backup_python(db_config, file_path)
+                success, message = restore_sql_backup_python(
+                    db_config, file_path, progress_token=progress_token, backup_record=original_backup_record
+                )
                 if not success:
                     log_activity(
                         audit_user,
@@ -815,10 +806,8 @@ def restore_database(request):
         original_file_name = original_backup_record.fileName if original_backup_record else file_name
         
         # Generate restore log filename
-        # Remove .sql extension, add restore timestamp, then add .sql back
-        base_name = original_file_name
-        if base_name.endswith('.sql'):
-            base_name = base_name[:-4]
+        # Remove the dump extension, add restore timestamp, then add .sql back
+        base_name = strip_backup_extension(original_file_name)
         restore_file_name = f"restore_{restore_timestamp}_from_{base_name}.sql"
         
         # Ensure filename is unique (in case of multiple restores)
@@ -853,7 +842,7 @@ def restore_database(request):
             },
             request=request,
         )
-        return JsonResponse({"message": "Database restored successfully!"})
+        return JsonResponse({"message": "Database restored successfully!", "progressToken": progress_token})
 
     except Exception as e:
         logger.error(f"Restore error: {str(e)}")
@@ -924,7 +913,7 @@ def download_backup(request, file_name):
             return JsonResponse({"error": "File not found"}, status=404)
         
         # Ensure it's a backup file
-        if not file_name.endswith('.sql'):
+        if not is_backup_file(file_name):
             log_activity(
                 audit_user,
                 AUDIT_ACTIONS["EXPORT"],
@@ -939,10 +928,10 @@ def download_backup(request, file_name):
             )
             return JsonResponse({"error": "Not a backup file"}, status=400)
             
-        # Serve the file for download
-        with open(file_path, 'rb') as f:
-            response = HttpResponse(f.read(), content_type='application/octet-stream')
-            response['Content-Disposition'] = f'attachment; filename="{file_name}"'
+        # Stream the file in chunks (supports Range/If-None-Match)
+        response = ranged_file_response(request, file_path, file_name)
+        if response.status_code == 200:
+            # Only log full downloads, not every resumed range or cache revalidation
             log_activity(
                 audit_user,
                 AUDIT_ACTIONS["EXPORT"],
@@ -955,7 +944,7 @@ def download_backup(request, file_name):
                 },
                 request=request,
             )
-            return response
+        return response
             
     except Exception as e:
         logger.error(f"Download backup error: {str(e)}")
@@ -1080,7 +1069,7 @@ def delete_backup(request, file_name):
             # Fallback: try to delete file from default directory
             file_path = os.path.join(BACKUP_DIR, file_name)
             if os.path.exists(file_path):
-                if not file_name.endswith('.sql'):
+                if not is_backup_file(file_name):
                     log_activity(
                         audit_user,
                         AUDIT_ACTIONS["DELETE"],
@@ -1139,4 +1128,49 @@ def delete_backup(request, file_name):
             },
             request=request,
         )
-        return JsonResponse({"error": f"Delete failed: {str(e)}"}, status=500)
\ No newline at end of file
+        return JsonResponse({"error": f"Delete failed: {str(e)}"}, status=500)
+
+
+def restore_status(request, token):
+    """Return progress of a Python-engine restore started with this token"""
+    if request.method != "GET":
+        return JsonResponse({"error": "Method not allowed"}, status=405)
+
+    try:
+        progress = RestoreProgress.objects.get(token=token)
+    except RestoreProgress.DoesNotExist:
+        return JsonResponse({"error": "Restore not found"}, status=404)
+
+    return JsonResponse({
+        "token": progress.token,
+        "backupRecordId": progress.backup_record_id,
+        "fileName": progress.file_name,
+        "status": progress.status,
+        "percent": progress.percent,
+        "bytesRead": progress.bytes_read,
+        "totalBytes": progress.total_bytes,
+        "statementsExecuted": progress.statements_executed,
+        "statementsFailed": progress.statements_failed,
+        "error": progress.error,
+        "started_at": progress.started_at.isoformat(),
+        "updated_at": progress.updated_at.isoformat(),
+    })
+
+
+@api_view(["GET", "DELETE"])
+@permission_classes([IsAuthenticated])
+def performance_report(request):
+    """Per-endpoint query/timing histogram from QueryBudgetMiddleware (admin only)"""
+    if not (request.user.is_staff or request.user.userlevel == "Admin"):
+        return Response({"error": "Only administrators can view performance data"}, status=403)
+
+    if request.method == "DELETE":
+        perf_stats.reset()
+        return Response({"message": "Performance samples cleared"})
+
+    return Response({
+        "pid": os.getpid(),
+        "default_budget": settings.QUERY_BUDGET_DEFAULT,
+        "replica": replica_status(),
+        "endpoints": perf_stats.summary(),
+    })
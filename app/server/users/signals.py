@@ -1,4 +1,4 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver, Signal
 from django.conf import settings
 from django.contrib.auth.signals import user_logged_in, user_logged_out, user_login_failed
@@ -7,6 +7,9 @@ from .models import User
 from .utils.email_utils import send_welcome_email, send_security_alert
 from audit.constants import AUDIT_ACTIONS, AUDIT_MODULES
 from audit.utils import log_activity
+from core.search_index import search_index, USER_INDEXED_FIELDS
+from core.cache import invalidate_on
+from notifications.dispatcher import invalidate_role_rosters
 
 # Custom signal for user creation with password
 user_created_with_password = Signal()
@@ -42,6 +45,39 @@ def log_user_activity(sender, instance, created, **kwargs):
             },
         )
 
+# 🔹 Keep the search suggestions index current
+@receiver(post_save, sender=User)
+def update_search_index(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Login bookkeeping (last_login, failed attempts, lockout) saves with update_fields
+    if raw or (update_fields is not None and not USER_INDEXED_FIELDS & set(update_fields)):
+        return
+    search_index.index_user(instance)
+
+
+@receiver(post_delete, sender=User)
+def remove_from_search_index(sender, instance, **kwargs):
+    search_index.remove_user(instance.pk)
+
+# 🔹 Drop cached notification rosters when role, section, status or email may have changed
+@receiver(post_save, sender=User)
+def invalidate_notification_rosters(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {'userlevel', 'section', 'is_active', 'email'} & set(update_fields):
+        return
+    invalidate_role_rosters()
+
+
+@receiver(post_delete, sender=User)
+def invalidate_notification_rosters_on_delete(sender, instance, **kwargs):
+    invalidate_role_rosters()
+
+
+# 🔹 Retire per-user cache entries (core/cache.py) on any user change
+def user_cache_scopes(user):
+    return [f"user:{user.pk}"]
+
+
+invalidate_on(User, user_cache_scopes)
+
 # 🔹 Handle user creation with password
 @receiver(user_created_with_password)
 def send_welcome_email_on_creation(sender, user, password, **kwargs):
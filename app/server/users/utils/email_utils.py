@@ -1,10 +1,8 @@
 """
 Enhanced email utilities for IERMS notification system
 """
-import time
 import logging
 from typing import List, Dict, Any, Optional
-from django.core.mail import send_mail, EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.conf import settings
 from django.core.exceptions import ValidationError
@@ -33,7 +31,6 @@ class EnhancedEmailService:
     
     def __init__(self):
         self.max_retries = getattr(settings, 'EMAIL_RETRY_ATTEMPTS', 3)
-        self.retry_delay = getattr(settings, 'EMAIL_RETRY_DELAY', 5)
         self.subject_prefix = getattr(settings, 'EMAIL_SUBJECT_PREFIX', '[IERMS] ')
     
     def validate_email_address(self, email: str) -> bool:
@@ -120,9 +117,12 @@ class EnhancedEmailService:
                             html_message: str,
                             plain_message: str = None,
                             email_type: str = 'default',
-                            context: Dict[str, Any] = None) -> bool:
+                            context: Dict[str, Any] = None,
+                            sensitive: bool = False) -> bool:
         """
-        Send email with retry logic and comprehensive error handling
+        Queue email for delivery with retries (see notifications.outbox).
+        Sensitive mail (passwords, OTP codes) is sent right away instead so
+        the secret is never stored in the outbox table.
         """
         context = context or {}
         
@@ -133,51 +133,64 @@ class EnhancedEmailService:
         # Get appropriate headers
         headers = self.get_email_headers(email_type)
         
-        # Get sender email
-        from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', None)
+        if sensitive:
+            return self.send_email_now(recipient_email, subject, html_message, plain_message, headers)
         
-        # Try to send email with retry logic
-        last_exception = None
+        # Queue for the outbox consumer, which reuses one SMTP connection per
+        # batch and retries with backoff off the request path
+        try:
+            from notifications.outbox import enqueue_email
+            enqueue_email(
+                [recipient_email],
+                subject,
+                body=plain_message or '',
+                html_body=html_message,
+                headers=headers,
+                category=email_type,
+                max_attempts=self.max_retries,
+            )
+        except Exception as e:
+            logger.error(f"Failed to queue email for {recipient_email}: {str(e)}")
+            raise EmailDeliveryError(f"Failed to queue email: {str(e)}")
+        
+        logger.info(f"Email queued for {recipient_email}")
+        return True
+    
+    def send_email_now(self,
+                       recipient_email: str,
+                       subject: str,
+                       html_message: str,
+                       plain_message: str = None,
+                       headers: Dict[str, str] = None) -> bool:
+        """
+        Send one email in a single attempt, without the outbox; callers handle failures
+        """
+        from django.core.mail import EmailMultiAlternatives
         
-        for attempt in range(1, self.max_retries + 1):
-            try:
-                # Create email message
-                email = EmailMultiAlternatives(
-                    subject=subject,
-                    body=plain_message or '',
-                    from_email=from_email,
-                    to=[recipient_email],
-                    headers=headers
-                )
-                
-                # Attach HTML version
-                email.attach_alternative(html_message, "text/html")
-                
-                # Send email
-                email.send(fail_silently=False)
-                
-                # Log successful delivery
-                logger.info(f"Email sent successfully to {recipient_email} (attempt {attempt})")
-                return True
-                
-            except Exception as e:
-                last_exception = e
-                logger.warning(f"Email delivery attempt {attempt} failed for {recipient_email}: {str(e)}")
-                
-                # Wait before retry (except on last attempt)
-                if attempt < self.max_retries:
-                    time.sleep(self.retry_delay)
+        try:
+            email = EmailMultiAlternatives(
+                subject=subject,
+                body=plain_message or '',
+                from_email=getattr(settings, 'DEFAULT_FROM_EMAIL', None),
+                to=[recipient_email],
+                headers=headers
+            )
+            email.attach_alternative(html_message, "text/html")
+            email.send(fail_silently=False)
+        except Exception as e:
+            logger.error(f"Email delivery failed for {recipient_email}: {str(e)}")
+            raise EmailDeliveryError(f"Failed to deliver email: {str(e)}")
         
-        # All retry attempts failed
-        logger.error(f"Email delivery failed after {self.max_retries} attempts for {recipient_email}")
-        raise EmailDeliveryError(f"Failed to deliver email after {self.max_retries} attempts: {str(last_exception)}")
+        logger.info(f"Email sent to {recipient_email}")
+        return True
     
     def send_template_email(self, 
                           template_name: str,
                           recipient_email: str,
                           subject: str,
                           context: Dict[str, Any] = None,
-                          email_type: str = 'default') -> bool:
+                          email_type: str = 'default',
+                          sensitive: bool = False) -> bool:
         """
         Send email using Django template with full validation and error handling
         """
@@ -206,7 +219,8 @@ class EnhancedEmailService:
                 html_message=html_message,
                 plain_message=plain_message,
                 email_type=email_type,
-                context=context
+                context=context,
+                sensitive=sensitive
             )
             
         except (EmailValidationError, EmailDeliveryError) as e:
@@ -293,7 +307,8 @@ def send_welcome_email(user: User, default_password: str, **kwargs) -> bool:
         recipient_email=user.email,
         subject=subject,
         context=context,
-        email_type='system'
+        email_type='system',
+        sensitive=True  # carries the default password
     )
 
 
@@ -316,7 +331,8 @@ def send_otp_email(user: User, otp_code: str, **kwargs) -> bool:
         recipient_email=user.email,
         subject=subject,
         context=context,
-        email_type='security'
+        email_type='security',
+        sensitive=True  # carries the OTP code
     )
 
 
@@ -17,9 +17,10 @@ from django.utils import timezone
 from django.db.models import Q
 from django.utils.dateparse import parse_datetime
 from core.settings import generate_secure_password
+from core.pagination import ListPagePagination
 
 # Notifications
-from notifications.models import Notification
+from notifications.dispatcher import notify_roles
 
 # Audit logging
 from audit.constants import AUDIT_ACTIONS, AUDIT_MODULES
@@ -324,84 +325,34 @@ class RegisterView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def create_new_user_notifications(self, new_user):
-        division_chiefs = User.objects.filter(userlevel="Division Chief", is_active=True)
+        def notify_new_user(userlevels, title, message, section=None):
+            notify_roles(userlevels, 'new_user', title, message, section=section, sender=new_user)
 
         if new_user.userlevel == "Division Chief":
-            for recipient in division_chiefs:
-                Notification.objects.create(
-                    recipient=recipient,
-                    sender=new_user,
-                    notification_type='new_user',
-                    title='New Division Chief Created',
-                    message=f'A new Division Chief ({new_user.email}) has been created.'
-                )
+            notify_new_user("Division Chief", 'New Division Chief Created',
+                            f'A new Division Chief ({new_user.email}) has been created.')
 
         elif new_user.userlevel == "Section Chief":
-            for recipient in division_chiefs:
-                Notification.objects.create(
-                    recipient=recipient,
-                    sender=new_user,
-                    notification_type='new_user',
-                    title='New Section Chief Created',
-                    message=f'A new Section Chief ({new_user.email}) created for section: {new_user.section}.'
-                )
+            notify_new_user("Division Chief", 'New Section Chief Created',
+                            f'A new Section Chief ({new_user.email}) created for section: {new_user.section}.')
 
         elif new_user.userlevel == "Unit Head":
-            for recipient in division_chiefs:
-                Notification.objects.create(
-                    recipient=recipient,
-                    sender=new_user,
-                    notification_type='new_user',
-                    title='New Unit Head Created',
-                    message=f'A new Unit Head ({new_user.email}) created for section: {new_user.section}.'
-                )
-            section_chiefs = User.objects.filter(userlevel="Section Chief", section=new_user.section, is_active=True)
-            for recipient in section_chiefs:
-                Notification.objects.create(
-                    recipient=recipient,
-                    sender=new_user,
-                    notification_type='new_user',
-                    title='New Unit Head Created',
-                    message=f'Unit Head ({new_user.email}) created in your section: {new_user.section}.'
-                )
+            notify_new_user("Division Chief", 'New Unit Head Created',
+                            f'A new Unit Head ({new_user.email}) created for section: {new_user.section}.')
+            notify_new_user("Section Chief", 'New Unit Head Created',
+                            f'Unit Head ({new_user.email}) created in your section: {new_user.section}.',
+                            section=new_user.section)
 
         elif new_user.userlevel == "Monitoring Personnel":
-            for recipient in division_chiefs:
-                Notification.objects.create(
-                    recipient=recipient,
-                    sender=new_user,
-                    notification_type='new_user',
-                    title='New Monitoring Personnel Created',
-                    message=f'New Monitoring Personnel ({new_user.email}) created for section: {new_user.section}.'
-                )
-            section_chiefs = User.objects.filter(userlevel="Section Chief", section=new_user.section, is_active=True)
-            for recipient in section_chiefs:
-                Notification.objects.create(
-                    recipient=recipient,
-                    sender=new_user,
-                    notification_type='new_user',
-                    title='New Monitoring Personnel Created',
-                    message=f'New Monitoring Personnel ({new_user.email}) created in your section: {new_user.section}.'
-                )
-            unit_heads = User.objects.filter(userlevel="Unit Head", section=new_user.section, is_active=True)
-            for recipient in unit_heads:
-                Notification.objects.create(
-                    recipient=recipient,
-                    sender=new_user,
-                    notification_type='new_user',
-                    title='New Monitoring Personnel Created',
-                    message=f'New Monitoring Personnel ({new_user.email}) created in your section: {new_user.section}.'
-                )
+            notify_new_user("Division Chief", 'New Monitoring Personnel Created',
+                            f'New Monitoring Personnel ({new_user.email}) created for section: {new_user.section}.')
+            notify_new_user(["Section Chief", "Unit Head"], 'New Monitoring Personnel Created',
+                            f'New Monitoring Personnel ({new_user.email}) created in your section: {new_user.section}.',
+                            section=new_user.section)
 
         elif new_user.userlevel in ["Admin", "Legal Unit"]:
-            for recipient in division_chiefs:
-                Notification.objects.create(
-                    recipient=recipient,
-                    sender=new_user,
-                    notification_type='new_user',
-                    title=f'New {new_user.userlevel} Created',
-                    message=f'A new {new_user.userlevel} ({new_user.email}) has been created.'
-                )
+            notify_new_user("Division Chief", f'New {new_user.userlevel} Created',
+                            f'A new {new_user.userlevel} ({new_user.email}) has been created.')
 
 
 # ---------------------------
@@ -421,15 +372,12 @@ class ProfileView(APIView):
 class UserListView(generics.ListAPIView):
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ListPagePagination
 
     def get_queryset(self):
         return User.objects.exclude(userlevel="Admin").order_by('-updated_at')
     
     def list(self, request, *args, **kwargs):
-        # Get pagination parameters
-        page = int(request.query_params.get('page', 1))
-        page_size = int(request.query_params.get('page_size', 10))
-        
         # Get filtered queryset
         queryset = self.get_queryset()
         
@@ -456,25 +404,9 @@ class UserListView(generics.ListAPIView):
             elif status == 'inactive':
                 queryset = queryset.filter(is_active=False)
         
-        # Calculate pagination
-        total_count = queryset.count()
-        start_index = (page - 1) * page_size
-        end_index = start_index + page_size
-        
-        # Apply pagination
-        users = queryset[start_index:end_index]
-        
-        # Serialize data
+        users = self.paginate_queryset(queryset)
         serializer = self.get_serializer(users, many=True)
-        
-        # Return paginated response
-        return Response({
-            'count': total_count,
-            'page': page,
-            'page_size': page_size,
-            'total_pages': (total_count + page_size - 1) // page_size,
-            'results': serializer.data
-        })
+        return self.get_paginated_response(serializer.data)
 
 
 # ---------------------------